@@ -4,23 +4,40 @@ from yamkix.__version__ import __version__
 from yamkix.config import (
     YamkixConfig,
     YamkixInputOutputConfig,
+    YamkixResourceLimits,
     create_yamkix_config_from_typer_args,
     get_default_yamkix_config,
     get_yamkix_config_from_default,
 )
 from yamkix.helpers import get_yamkix_version
-from yamkix.yamkix import yamkix_dump_all, yamkix_dump_one
+from yamkix.hooks import YamkixHooks, register_hooks, unregister_hooks
+from yamkix.minimal_edit import MinimalEditFormatter
+from yamkix.yamkix import (
+    FileProcessingResult,
+    format_yaml_content,
+    round_trip_and_format,
+    yamkix_dump_all,
+    yamkix_dump_one,
+)
 from yamkix.yaml_writer import get_opinionated_yaml_writer
 
 __all__ = [
+    "FileProcessingResult",
+    "MinimalEditFormatter",
     "YamkixConfig",
+    "YamkixHooks",
     "YamkixInputOutputConfig",
+    "YamkixResourceLimits",
     "__version__",
     "create_yamkix_config_from_typer_args",
+    "format_yaml_content",
     "get_default_yamkix_config",
     "get_opinionated_yaml_writer",
     "get_yamkix_config_from_default",
     "get_yamkix_version",
+    "register_hooks",
+    "round_trip_and_format",
+    "unregister_hooks",
     "yamkix_dump_all",
     "yamkix_dump_one",
 ]
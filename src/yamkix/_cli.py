@@ -1,21 +1,105 @@
 """Typer-based CLI implementation for yamkix."""
 
+import contextlib
+import functools
+import sys
 import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from enum import Enum
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any, Final
 
 import typer
+from ruamel.yaml.error import YAMLError
+from typer.core import TyperGroup
 
 from yamkix.__version__ import __version__
-from yamkix.config import DEFAULT_LINE_WIDTH, create_yamkix_config_from_typer_args, print_yamkix_config
-from yamkix.errors import InvalidYamlContentError
-from yamkix.helpers import get_stderr_console, get_stdout_console
-from yamkix.yamkix import FileProcessingResult, round_trip_and_format
+from yamkix.bench import (
+    DEFAULT_REPETITIONS,
+    DEFAULT_WARMUP,
+    BenchResult,
+    format_bench_results,
+    format_bench_results_as_json,
+    read_bench_files,
+    run_benchmark,
+)
+from yamkix.config import (
+    DEFAULT_LINE_WIDTH,
+    YamkixConfig,
+    YamkixResourceLimits,
+    create_yamkix_config_from_typer_args,
+    get_yamkix_config_for_file,
+    get_yamkix_config_from_default,
+)
+from yamkix.config_file import YamkixConfigResolver
+from yamkix.errors import (
+    FileProcessingTimeoutError,
+    FormattingVerificationError,
+    GitCommandError,
+    InvalidConfigFileError,
+    InvalidShardReportError,
+    InvalidShardSpecError,
+    InvalidYamlContentError,
+    ResourceLimitExceededError,
+    WorkerProcessError,
+)
+from yamkix.git_index import GitIndexFormatter
+from yamkix.helpers import MEBIBYTE, get_stdout_console, iter_paths_from_stream
+from yamkix.logger import Verbosity, YamkixLogger, get_verbosity
+from yamkix.lsp import run_language_server
+from yamkix.pipeline import PipelinedFormatter
+from yamkix.profiling import DEFAULT_PROFILE_TOP, ProfileCollector
+from yamkix.progress import ProgressReporter
+from yamkix.report import FileProcessingStats, ReportWriter
+from yamkix.shard import (
+    ShardReport,
+    ShardSpec,
+    merge_shard_reports,
+    parse_shard_spec,
+    read_shard_report,
+    select_shard,
+    write_shard_report,
+)
+from yamkix.supervisor import SupervisedFormatter
+from yamkix.watch import YamkixWatcher
+from yamkix.yamkix import FileProcessingResult, format_yaml_content, round_trip_and_format
+
+DEFAULT_COMMAND_NAME = "format"
+# Formatting options that, when explicitly set on the command line, take precedence over the configuration files
+CLI_PARAMETERS_TO_CONFIG_OPTIONS: Final = {
+    "typ": "parsing_mode",
+    "no_explicit_start": "explicit_start",
+    "explicit_end": "explicit_end",
+    "no_quotes_preserved": "quotes_preserved",
+    "enforce_double_quotes": "enforce_double_quotes",
+    "default_flow_style": "default_flow_style",
+    "enforce_block_style": "enforce_block_style",
+    "no_dash_inwards": "dash_inwards",
+    "spaces_before_comment": "spaces_before_comment",
+    "align_comments": "align_comments",
+    "line_width": "line_width",
+}
+
+
+class YamkixGroup(TyperGroup):
+    """Run the `format` command unless the first argument is the name of another command.
+
+    This keeps `yamkix [OPTIONS] [FILES]...` working while allowing subcommands like `yamkix lsp`.
+    """
+
+    def parse_args(self, ctx: typer.Context, args: list[str]) -> list[str]:  # pyright: ignore[reportIncompatibleMethodOverride]
+        """Insert the name of the default command when no command is specified."""
+        if not args or args[0] not in self.commands:
+            args = [DEFAULT_COMMAND_NAME, *args]
+        return super().parse_args(ctx, args)
+
 
 # Create the Typer app
 app = typer.Typer(
     name="yamkix",
+    cls=YamkixGroup,
     help=f"Yamkix v{__version__}. Format yaml input file.",
     context_settings={"help_option_names": ["-h", "--help"]},
     add_completion=False,
@@ -35,6 +119,430 @@ def version_callback(value: bool) -> None:
         raise typer.Exit(code=0)
 
 
+def process_yamkix_config(
+    config: YamkixConfig,
+    process: Callable[[YamkixConfig, FileProcessingStats | None], FileProcessingResult],
+    status_log: YamkixLogger,
+    stats: FileProcessingStats | None,
+) -> FileProcessingResult:
+    """Process a config, reporting invalid YAML content, exceeded limits, timeouts and YAML errors as an error result.
+
+    The processing time of the file is recorded in its result.
+    """
+    start_time = time.perf_counter()
+    try:
+        # Process the file(s)
+        result = process(config, stats)
+    except InvalidYamlContentError as e:
+        status_log.error(f"Error processing [{config.io_config.input_display_name}]: {e}")
+        status_log.error(str(e.__cause__))
+        result = FileProcessingResult(
+            input_display_name=config.io_config.input_display_name,
+            error=True,
+            unchanged=False,
+        )
+    except (
+        FileProcessingTimeoutError,
+        FormattingVerificationError,
+        ResourceLimitExceededError,
+        WorkerProcessError,
+        # e.g. a duplicated key, or a too deeply nested document, in a worker process or not
+        YAMLError,
+        RecursionError,
+    ) as e:
+        status_log.error(f"Error processing [{config.io_config.input_display_name}]: {e}")
+        result = FileProcessingResult(
+            input_display_name=config.io_config.input_display_name,
+            error=True,
+            unchanged=False,
+            timed_out=isinstance(e, FileProcessingTimeoutError),
+        )
+    result.elapsed = time.perf_counter() - start_time
+    return result
+
+
+def process_yamkix_configs(  # noqa: PLR0913, PLR0917
+    yamkix_configs: Iterable[YamkixConfig],
+    process: Callable[[YamkixConfig, FileProcessingStats | None], FileProcessingResult],
+    status_log: YamkixLogger,
+    report: ReportWriter | None = None,
+    threads: int = 1,
+    pipeline: PipelinedFormatter | None = None,
+) -> list[FileProcessingResult]:
+    """Process each config, reporting invalid YAML content, exceeded limits and timeouts as error results.
+
+    The processing time of each file is recorded in its result. When `report` is set, the
+    measures of each file are written to the report as soon as the file is processed.
+    When `threads` is greater than 1, the files are processed concurrently by as many threads.
+    When `pipeline` is set, the result of a file is only logged and reported once its output
+    is written behind, so that an output that cannot be written is reported as an error.
+    """
+    if threads > 1:
+        return process_yamkix_configs_in_threads(yamkix_configs, process, status_log, report, threads)
+    results: list[FileProcessingResult] = []
+    unwritten: deque[tuple[FileProcessingResult, FileProcessingStats | None]] = deque()
+
+    def log_written_results() -> None:
+        while unwritten and (pipeline is None or pipeline.is_written(unwritten[0][0])):
+            result, stats = unwritten.popleft()
+            status_log.log_result(result)
+            if report is not None:
+                report.write(result, stats)
+
+    for config in yamkix_configs:
+        status_log.log_config(config)
+        stats = FileProcessingStats() if report is not None else None
+        result = process_yamkix_config(config, process, status_log, stats)
+        unwritten.append((result, stats))
+        log_written_results()
+        results.append(result)
+    if pipeline is not None:
+        pipeline.wait_for_outputs()
+    log_written_results()
+    return results
+
+
+def process_yamkix_configs_in_threads(
+    yamkix_configs: Iterable[YamkixConfig],
+    process: Callable[[YamkixConfig, FileProcessingStats | None], FileProcessingResult],
+    status_log: YamkixLogger,
+    report: ReportWriter | None,
+    threads: int,
+) -> list[FileProcessingResult]:
+    """Process the configs in a pool of `threads` threads, like `process_yamkix_configs` does.
+
+    The configs are consumed as threads become available, at most `2 * threads` files being
+    submitted and not processed yet: `threads` files being processed, and `threads` files
+    queued ahead. The results are logged and reported (by the calling thread) as the files
+    are processed, and returned in the order of the configs.
+    """
+    results: list[tuple[int, FileProcessingResult]] = []
+    pending: dict[Future[FileProcessingResult], tuple[int, FileProcessingStats | None]] = {}
+
+    def collect(return_when: str) -> None:
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            index, stats = pending.pop(future)
+            result = future.result()
+            status_log.log_result(result)
+            if report is not None:
+                report.write(result, stats)
+            results.append((index, result))
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="yamkix") as executor:
+        for index, config in enumerate(yamkix_configs):
+            status_log.log_config(config)
+            stats = FileProcessingStats() if report is not None else None
+            future = executor.submit(process_yamkix_config, config, process, status_log, stats)
+            pending[future] = (index, stats)
+            if len(pending) >= 2 * threads:
+                collect(FIRST_COMPLETED)
+        collect(ALL_COMPLETED)
+    return [result for _, result in sorted(results, key=lambda item: item[0])]
+
+
+def get_shard_options(
+    shard: str | None, shard_timings: Path | None
+) -> tuple[ShardSpec | None, dict[str, float] | None]:
+    """Parse the `--shard` and `--shard-timings` options."""
+    if shard is None:
+        return None, None
+    try:
+        shard_spec = parse_shard_spec(shard)
+    except InvalidShardSpecError as e:
+        raise typer.BadParameter(str(e), param_hint="'--shard'") from e
+    if shard_timings is None or not shard_timings.exists():
+        # e.g. the first run, before any report was recorded
+        return shard_spec, None
+    try:
+        return shard_spec, read_shard_report(shard_timings).get_timings()
+    except InvalidShardReportError as e:
+        raise typer.BadParameter(str(e), param_hint="'--shard-timings'") from e
+
+
+def select_yamkix_configs_shard(
+    yamkix_configs: Iterable[YamkixConfig], shard: ShardSpec | None, timings: dict[str, float] | None
+) -> Iterable[YamkixConfig]:
+    """Return the configs of the files belonging to `shard`, or all of them if `shard` is `None`."""
+    if shard is None:
+        return yamkix_configs
+    yamkix_configs = list(yamkix_configs)
+    selected = select_shard([config.io_config.input_display_name for config in yamkix_configs], shard, timings)
+    return [config for config, is_selected in zip(yamkix_configs, selected, strict=True) if is_selected]
+
+
+def select_yamkix_configs(
+    yamkix_configs: Iterable[YamkixConfig],
+    shard: ShardSpec | None,
+    timings: dict[str, float] | None,
+    progress: ProgressReporter | None,
+) -> Iterable[YamkixConfig]:
+    """Return the configs of the files to process, tracked by `progress` if set."""
+    selected = select_yamkix_configs_shard(yamkix_configs, shard, timings)
+    return progress.track(selected) if progress is not None else selected
+
+
+def format_staged_files(  # noqa: PLR0913, PLR0917
+    yamkix_configs: Iterable[YamkixConfig],
+    config_resolver: YamkixConfigResolver,
+    select: Callable[[Iterable[YamkixConfig]], Iterable[YamkixConfig]],
+    format_content: Callable[[str, YamkixConfig, FileProcessingStats | None], str],
+    status_log: YamkixLogger,
+    report: ReportWriter | None = None,
+) -> list[FileProcessingResult]:
+    """Format the staged content of the files in the git index.
+
+    Raises:
+        GitCommandError: If a git command fails.
+    """
+    with GitIndexFormatter(format_content=format_content) as git_index_formatter:
+        return process_yamkix_configs(
+            (
+                config_resolver.resolve(config, git_index_formatter.toplevel / str(config.io_config.input))
+                for config in select(git_index_formatter.get_configs(yamkix_configs))
+            ),
+            process=git_index_formatter.format_staged_file,
+            status_log=status_log,
+            report=report,
+        )
+
+
+@contextlib.contextmanager
+def get_formatters(
+    timeout: float | None,
+    profiler: ProfileCollector | None = None,
+    max_files_per_worker: int | None = None,
+    max_worker_rss: int | None = None,
+) -> Iterator[
+    tuple[
+        Callable[[YamkixConfig, FileProcessingStats | None], FileProcessingResult],
+        Callable[[str, YamkixConfig, FileProcessingStats | None], str],
+        SupervisedFormatter | None,
+    ]
+]:
+    """Yield the functions processing a file and formatting content, and the supervised formatter if any.
+
+    When `timeout` is set, the content is formatted in a supervised worker process, recycled
+    according to `max_files_per_worker` and `max_worker_rss` (in bytes).
+    When `profiler` is set, the processing is profiled, in process or in the worker processes.
+    """
+    if timeout is None:
+        if profiler is None:
+            yield round_trip_and_format, format_yaml_content, None
+        else:
+            yield profiler.profiled(round_trip_and_format), profiler.profiled(format_yaml_content), None
+        return
+    with SupervisedFormatter(
+        timeout, profiler, max_files_per_worker=max_files_per_worker, max_worker_rss=max_worker_rss
+    ) as supervised_formatter:
+        yield supervised_formatter.round_trip_and_format, supervised_formatter.format, supervised_formatter
+
+
+@contextlib.contextmanager
+def get_pipelined_processors(
+    process_file: Callable[[YamkixConfig, FileProcessingStats | None], FileProcessingResult],
+    format_content: Callable[[str, YamkixConfig, FileProcessingStats | None], str],
+    read_ahead: int,
+    write_behind: int,
+    status_log: YamkixLogger,
+) -> Iterator[
+    tuple[
+        Callable[[Iterable[YamkixConfig]], Iterable[YamkixConfig]],
+        Callable[[YamkixConfig, FileProcessingStats | None], FileProcessingResult],
+        PipelinedFormatter | None,
+    ]
+]:
+    """Yield the functions prefetching the inputs of the configs and processing a file, and the pipeline if any.
+
+    When `read_ahead` or `write_behind` is set, the files are read ahead of, and written behind,
+    their formatting by `format_content` in background threads, an output that cannot be written
+    behind being reported as an error of its file. Otherwise, nothing is prefetched and the files
+    are processed by `process_file`.
+    """
+    if read_ahead == 0 and write_behind == 0:
+        yield lambda yamkix_configs: yamkix_configs, process_file, None
+        return
+
+    def log_write_error(result: FileProcessingResult, error: Exception) -> None:
+        status_log.error(f"Error processing [{result.input_display_name}]: {error}")
+
+    with PipelinedFormatter(
+        format_content, read_ahead=read_ahead, write_behind=write_behind, on_write_error=log_write_error
+    ) as pipelined_formatter:
+        yield pipelined_formatter.prefetch, pipelined_formatter.round_trip_and_format, pipelined_formatter
+
+
+def timeout_callback(value: float | None) -> float | None:
+    """Check that the timeout is positive."""
+    if value is not None and value <= 0:
+        msg = "must be a positive number of seconds."
+        raise typer.BadParameter(msg)
+    return value
+
+
+def check_incompatible_options(option: str, is_used: bool, incompatible_options: dict[str, bool]) -> None:
+    """Check that `option` is not used with an option that processes the files differently."""
+    if not is_used:
+        return
+    for incompatible_option, is_set in incompatible_options.items():
+        if is_set:
+            msg = f"cannot be used with {incompatible_option}."
+            raise typer.BadParameter(msg, param_hint=f"'{option}'")
+
+
+def check_execution_options(  # noqa: PLR0913
+    *,
+    threads: int,
+    read_ahead: int,
+    write_behind: int,
+    timeout: float | None,
+    max_files_per_worker: int | None,
+    max_worker_rss: int | None,
+    profile: bool,
+    progress: bool,
+    git_index: bool,
+    watch: bool,
+) -> None:
+    """Check that the options choosing how the files are processed can be used together."""
+    if timeout is None and (max_files_per_worker is not None or max_worker_rss is not None):
+        msg = "requires --timeout."
+        raise typer.BadParameter(
+            msg, param_hint="'--max-files-per-worker'" if max_files_per_worker is not None else "'--max-worker-rss'"
+        )
+    check_incompatible_options(
+        "--threads",
+        threads > 1,
+        {
+            "--timeout": timeout is not None,
+            "--profile-out": profile,
+            "--git-index": git_index,
+            "--watch": watch,
+        },
+    )
+    check_incompatible_options(
+        "--read-ahead" if read_ahead > 0 else "--write-behind",
+        read_ahead > 0 or write_behind > 0,
+        # The worker processes of --timeout are forked, which must not happen while the pipeline threads run
+        {"--threads": threads > 1, "--timeout": timeout is not None, "--git-index": git_index, "--watch": watch},
+    )
+    check_incompatible_options(
+        "--progress",
+        progress,
+        # The files are counted when their config is consumed, i.e. when they are read ahead or queued to the threads,
+        # and the worker processes of --timeout must not be forked while the progress thread runs
+        {"--threads": threads > 1, "--read-ahead": read_ahead > 0, "--timeout": timeout is not None},
+    )
+
+
+def get_resource_limits(
+    max_bytes: int | None,
+    max_documents: int | None,
+    max_depth: int | None,
+    max_nodes: int | None,
+    max_alias_expansion: int | None,
+) -> YamkixResourceLimits | None:
+    """Return the resource limits set on the command line, `None` if there is none."""
+    limits = YamkixResourceLimits(
+        max_bytes=max_bytes,
+        max_documents=max_documents,
+        max_depth=max_depth,
+        max_nodes=max_nodes,
+        max_alias_expansion=max_alias_expansion,
+    )
+    return limits if limits != YamkixResourceLimits() else None
+
+
+def print_summary(
+    results: list[FileProcessingResult], elapsed: float, status_log: YamkixLogger, recycled_workers: int = 0
+) -> None:
+    """Print the processing statistics on stderr, whatever the verbosity level."""
+    errors = sum(1 for r in results if r.error)
+    unchanged = sum(1 for r in results if r.unchanged)
+    timed_out = sum(1 for r in results if r.timed_out)
+    total = len(results)
+    timed_out_summary = f" ({timed_out} timed out)" if timed_out else ""
+    recycled_workers_summary = f"{recycled_workers} worker(s) recycled, " if recycled_workers else ""
+    status_log.log(
+        Verbosity.QUIET,
+        f"[yamkix] Summary: {total} file(s) processed, {errors} error(s){timed_out_summary}, {unchanged} unchanged, "
+        f"{recycled_workers_summary}{elapsed:.3f}s",
+    )
+
+
+def exit_on_errors_if_verifying(results: list[FileProcessingResult], verify: bool) -> None:
+    """With `--verify`, exit with code 1 if a file could not be formatted, e.g. failed the verification."""
+    if verify and any(result.error for result in results):
+        raise typer.Exit(code=1)
+
+
+def write_profile(
+    profiler: ProfileCollector | None, profile_out: Path | None, profile_top: int, status_log: YamkixLogger
+) -> None:
+    """Write the profile collected for `--profile-out`, if any."""
+    if profiler is None or profile_out is None:
+        return
+    summary_path = profiler.write(profile_out, profile_top)
+    status_log.info(f"[yamkix] Profile written to {profile_out}, summary written to {summary_path}")
+
+
+def get_explicit_cli_options(ctx: typer.Context, yamkix_config: YamkixConfig) -> dict[str, Any]:
+    """Return the formatting options explicitly set on the command line, with their value in `yamkix_config`."""
+    explicit_options = {}
+    for parameter, option in CLI_PARAMETERS_TO_CONFIG_OPTIONS.items():
+        source = ctx.get_parameter_source(parameter)
+        if source is not None and source.name == "COMMANDLINE":
+            explicit_options[option] = getattr(yamkix_config, option)
+    return explicit_options
+
+
+def get_config_resolver(
+    ctx: typer.Context, yamkix_config: YamkixConfig, config_file: Path | None, status_log: YamkixLogger
+) -> YamkixConfigResolver:
+    """Return the resolver of the configuration files, exiting on an invalid `--config` file."""
+    try:
+        return YamkixConfigResolver(
+            yamkix_config, forced_options=get_explicit_cli_options(ctx, yamkix_config), config_file=config_file
+        )
+    except InvalidConfigFileError as e:
+        status_log.error(f"Error: {e}")
+        raise typer.Exit(code=1) from e
+
+
+def iter_yamkix_configs_from_files_list(
+    yamkix_config: YamkixConfig, files_from: str, nul_separated: bool
+) -> Iterator[YamkixConfig]:
+    """Lazily yield one config per file listed in `files_from` (`-` for `STDIN`)."""
+    if files_from == "-":
+        for file in iter_paths_from_stream(sys.stdin.buffer, nul_separated=nul_separated):
+            yield get_yamkix_config_for_file(yamkix_config, file)
+        return
+    with Path(files_from).open(mode="rb") as stream:
+        for file in iter_paths_from_stream(stream, nul_separated=nul_separated):
+            yield get_yamkix_config_for_file(yamkix_config, file)
+
+
+def watch_and_reformat(
+    roots: list[Path],
+    yamkix_config: YamkixConfig,
+    use_polling: bool,
+    status_log: YamkixLogger,
+    config_resolver: YamkixConfigResolver | None = None,
+) -> None:
+    """Reformat the yaml files under `roots` as they change, until interrupted."""
+
+    def print_results(results: list[FileProcessingResult]) -> None:
+        for result in results:
+            if result.error:
+                status_log.error(f"Error processing [{result.input_display_name}]")
+            elif not result.unchanged:
+                status_log.info(f"[yamkix] Reformatted: {result.input_display_name}")
+
+    status_log.info(f"[yamkix] Watching {len(roots)} path(s) with: {yamkix_config}, press Ctrl+C to stop")
+    watcher = YamkixWatcher(roots, yamkix_config, use_polling=use_polling, config_resolver=config_resolver)
+    with contextlib.suppress(KeyboardInterrupt):
+        watcher.run(on_results=print_results)
+
+
 # We cannot use StrEnum as we want to support python 3.10 too
 class SupportedYamlParserMode(str, Enum):
     """Supported YAML parser modes."""
@@ -43,8 +551,9 @@ class SupportedYamlParserMode(str, Enum):
     RT = "rt"
 
 
-@app.command()
+@app.command(name=DEFAULT_COMMAND_NAME)
 def main(  # noqa: PLR0913, PLR0917
+    ctx: typer.Context,
     input_file: Annotated[
         str | None,
         typer.Option(
@@ -186,7 +695,272 @@ def main(  # noqa: PLR0913, PLR0917
         typer.Option(
             "-S",
             "--silent",
-            help="silent mode, don't print config when processing file(s)",
+            help="silent mode, only print errors (and the summary if requested).",
+        ),
+    ] = False,
+    verbose: Annotated[
+        int,
+        typer.Option(
+            "-V",
+            "--verbose",
+            help=(
+                "print a line per processed file (the effective config is otherwise printed once per distinct "
+                "config). Repeat (-VV) to also print the outcome and processing time of each file."
+            ),
+            count=True,
+        ),
+    ] = 0,
+    files_from: Annotated[
+        str | None,
+        typer.Option(
+            "--files-from",
+            help=(
+                "read the files to process from FILE, one per line ('-' for STDIN). "
+                "The list is consumed as a stream, so processing starts immediately. Cannot be used with files."
+            ),
+            metavar="FILE",
+        ),
+    ] = None,
+    null_separated: Annotated[
+        bool,
+        typer.Option(
+            "-0",
+            "--null",
+            help="with --files-from, files are separated by NUL characters (git ls-files -z, find -print0).",
+        ),
+    ] = False,
+    watch: Annotated[
+        bool,
+        typer.Option(
+            "--watch",
+            help=(
+                "watch the files and directories passed as arguments and reformat the yaml files as they are "
+                "saved, until interrupted. Uses inotify on Linux and polling elsewhere."
+            ),
+        ),
+    ] = False,
+    watch_polling: Annotated[
+        bool,
+        typer.Option(
+            "--watch-polling",
+            help="with --watch, poll the watched trees instead of using inotify (e.g. on network file systems).",
+        ),
+    ] = False,
+    git_index: Annotated[
+        bool,
+        typer.Option(
+            "--git-index",
+            help=(
+                "format the staged content of the files directly in the git index, without touching the "
+                "working tree. If no file is specified, all the staged yaml files are formatted."
+            ),
+        ),
+    ] = False,
+    config_file: Annotated[
+        Path | None,
+        typer.Option(
+            "--config",
+            help=(
+                "the configuration file to use for all the files, instead of the nearest '.yamkix.toml' or "
+                "'pyproject.toml' (with a [tool.yamkix] table) of each file. "
+                "Options explicitly set on the command line take precedence over the configuration files."
+            ),
+            metavar="FILE",
+        ),
+    ] = None,
+    timeout: Annotated[
+        float | None,
+        typer.Option(
+            "--timeout",
+            help=(
+                "process each file in a supervised worker process, killed when the file takes longer than SECONDS. "
+                "Such files are reported as timed out and the processing goes on with the other files."
+            ),
+            metavar="SECONDS",
+            callback=timeout_callback,
+        ),
+    ] = None,
+    max_files_per_worker: Annotated[
+        int | None,
+        typer.Option(
+            "--max-files-per-worker",
+            help="with --timeout, replace the worker process once it formatted N files, to keep its memory flat.",
+            metavar="N",
+            min=1,
+        ),
+    ] = None,
+    max_worker_rss: Annotated[
+        int | None,
+        typer.Option(
+            "--max-worker-rss",
+            help=(
+                "with --timeout, replace the worker process once its resident memory exceeds MB MiB after "
+                "formatting a file. The number of replaced workers is printed in the --summary."
+            ),
+            metavar="MB",
+            min=1,
+        ),
+    ] = None,
+    threads: Annotated[
+        int,
+        typer.Option(
+            "--threads",
+            help=(
+                "process the files concurrently in N threads of the yamkix process. Files are parsed and formatted "
+                "in parallel on free-threaded Python builds, only the reads and writes overlap otherwise."
+            ),
+            metavar="N",
+            min=1,
+        ),
+    ] = 1,
+    read_ahead: Annotated[
+        int,
+        typer.Option(
+            "--read-ahead",
+            help=(
+                "read up to N files ahead of their formatting, in a background thread, so that reading the files "
+                "overlaps with formatting them (e.g. on network file systems)."
+            ),
+            metavar="N",
+            min=0,
+        ),
+    ] = 0,
+    write_behind: Annotated[
+        int,
+        typer.Option(
+            "--write-behind",
+            help=(
+                "write the formatted files in a background thread, the formatting waiting when N outputs are "
+                "pending, so that writing the files overlaps with formatting the next ones."
+            ),
+            metavar="N",
+            min=0,
+        ),
+    ] = 0,
+    max_bytes: Annotated[
+        int | None,
+        typer.Option(
+            "--max-bytes",
+            help="reject the inputs larger than BYTES (UTF-8 encoded), before parsing them.",
+            metavar="BYTES",
+            min=1,
+        ),
+    ] = None,
+    max_documents: Annotated[
+        int | None,
+        typer.Option(
+            "--max-documents", help="reject the inputs holding more than N yaml documents.", metavar="N", min=1
+        ),
+    ] = None,
+    max_depth: Annotated[
+        int | None,
+        typer.Option(
+            "--max-depth", help="reject the inputs whose maps and lists are nested deeper than N.", metavar="N", min=1
+        ),
+    ] = None,
+    max_nodes: Annotated[
+        int | None,
+        typer.Option(
+            "--max-nodes",
+            help="reject the inputs holding more than N nodes (scalars, maps and lists).",
+            metavar="N",
+            min=1,
+        ),
+    ] = None,
+    max_alias_expansion: Annotated[
+        int | None,
+        typer.Option(
+            "--max-alias-expansion",
+            help=(
+                "reject the inputs whose aliases expand to more than N nodes in total, "
+                "e.g. 'billion laughs' documents. Limits are enforced while parsing."
+            ),
+            metavar="N",
+            min=1,
+        ),
+    ] = None,
+    shard: Annotated[
+        str | None,
+        typer.Option(
+            "--shard",
+            help=(
+                "only process the I-th of N deterministic shards of the files (e.g. 2/8), to split the work "
+                "across CI nodes. Shards are balanced by file size, or by the timings of --shard-timings."
+            ),
+            metavar="I/N",
+        ),
+    ] = None,
+    shard_timings: Annotated[
+        Path | None,
+        typer.Option(
+            "--shard-timings",
+            help=(
+                "with --shard, balance the shards using the processing times recorded in a (merged) shard report. "
+                "Ignored if FILE does not exist."
+            ),
+            metavar="FILE",
+        ),
+    ] = None,
+    shard_report: Annotated[
+        Path | None,
+        typer.Option(
+            "--shard-report",
+            help="write the results of the processed files to FILE, to be combined with 'yamkix merge-reports'.",
+            metavar="FILE",
+        ),
+    ] = None,
+    report: Annotated[
+        Path | None,
+        typer.Option(
+            "--report",
+            help=(
+                "write one JSON record per processed file to FILE (NDJSON), as the files are processed: the durations "
+                "of the read, parse, transform (and of each transform), emit, verify and write phases, the input and "
+                "output sizes in bytes, and the number of documents, nodes and comments."
+            ),
+            metavar="FILE",
+        ),
+    ] = None,
+    profile_out: Annotated[
+        Path | None,
+        typer.Option(
+            "--profile-out",
+            help=(
+                "profile the processing of each file (in process or in the worker processes of --timeout) and write "
+                "the merged profile to FILE (pstats format), and a summary of the hottest functions of yamkix and "
+                "ruamel.yaml to FILE.txt."
+            ),
+            metavar="FILE",
+        ),
+    ] = None,
+    profile_top: Annotated[
+        int,
+        typer.Option(
+            "--profile-top",
+            help="the number of functions listed for each package in the summary of --profile-out.",
+            metavar="N",
+            min=1,
+        ),
+    ] = DEFAULT_PROFILE_TOP,
+    progress: Annotated[
+        bool,
+        typer.Option(
+            "--progress",
+            help=(
+                "report the progress (files, bytes, throughput, ETA and slowest file) on stderr while processing. "
+                "The line is refreshed in place on a terminal, and printed every 10s otherwise (e.g. in CI logs)."
+            ),
+        ),
+    ] = False,
+    verify: Annotated[
+        bool,
+        typer.Option(
+            "--verify",
+            help=(
+                "check that the formatted output holds the same data as the input, comparing structural hashes of "
+                "the documents. The files that fail the check are reported as errors and not written, "
+                "and yamkix exits with code 1 if a file could not be formatted."
+            ),
         ),
     ] = False,
     summary_mode: Annotated[
@@ -211,6 +985,8 @@ def main(  # noqa: PLR0913, PLR0917
     and array elements are pushed inwards the start of the
     matching sequence. Comments are preserved if you use the default
     parsing mode 'rt'.
+
+    Run `yamkix lsp` to start a Language Server Protocol server instead.
     """
     # Create configuration
     yamkix_configs = create_yamkix_config_from_typer_args(
@@ -229,36 +1005,212 @@ def main(  # noqa: PLR0913, PLR0917
         line_width=line_width,
         align_comments=align_comments,
         files=files,
+        limits=get_resource_limits(max_bytes, max_documents, max_depth, max_nodes, max_alias_expansion),
+        verify=verify,
     )
-    console = get_stderr_console()
-    results: list[FileProcessingResult] = []
+    configs_to_process: Iterable[YamkixConfig] = yamkix_configs
+    if files_from is not None:
+        if files:
+            msg = "cannot be used with files arguments."
+            raise typer.BadParameter(msg, param_hint="'--files-from'")
+        configs_to_process = iter_yamkix_configs_from_files_list(yamkix_configs[0], files_from, null_separated)
+    status_log = YamkixLogger(get_verbosity(silent_mode, verbose))
+    shard_spec, shard_timings_by_file = get_shard_options(shard, shard_timings)
+    if shard_spec is not None and not files and files_from is None and not git_index:
+        msg = "requires files, --files-from or --git-index."
+        raise typer.BadParameter(msg, param_hint="'--shard'")
+    check_execution_options(
+        threads=threads,
+        read_ahead=read_ahead,
+        write_behind=write_behind,
+        timeout=timeout,
+        max_files_per_worker=max_files_per_worker,
+        max_worker_rss=max_worker_rss,
+        profile=profile_out is not None,
+        progress=progress,
+        git_index=git_index,
+        watch=watch,
+    )
+    config_resolver = get_config_resolver(ctx, yamkix_configs[0], config_file, status_log)
+    if watch:
+        if not files:
+            msg = "requires files or directories to watch as arguments."
+            raise typer.BadParameter(msg, param_hint="'--watch'")
+        watch_and_reformat(
+            files,
+            yamkix_configs[0],
+            use_polling=watch_polling,
+            status_log=status_log,
+            config_resolver=config_resolver,
+        )
+        return
     start_time = time.monotonic()
-    for config in yamkix_configs:
-        if not silent_mode:
-            print_yamkix_config(config)
-        try:
-            # Process the file(s)
-            result = round_trip_and_format(config)
-            results.append(result)
-        except InvalidYamlContentError as e:
-            console.print(rf"Error processing \[{config.io_config.input_display_name}]: {e}", style="error")
-            console.print(e.__cause__, style="error")
-            results.append(
-                FileProcessingResult(
-                    input_display_name=config.io_config.input_display_name,
-                    error=True,
-                    unchanged=False,
+    progress_reporter = ProgressReporter() if progress else None
+    profiler = ProfileCollector() if profile_out is not None else None
+    select = functools.partial(
+        select_yamkix_configs, shard=shard_spec, timings=shard_timings_by_file, progress=progress_reporter
+    )
+    try:
+        with (
+            get_formatters(
+                timeout,
+                profiler,
+                max_files_per_worker=max_files_per_worker,
+                max_worker_rss=max_worker_rss * MEBIBYTE if max_worker_rss is not None else None,
+            ) as (process_file, format_content, supervised_formatter),
+            get_pipelined_processors(process_file, format_content, read_ahead, write_behind, status_log) as (
+                prefetch,
+                process,
+                pipeline,
+            ),
+            progress_reporter or contextlib.nullcontext(),
+            ReportWriter(report) if report is not None else contextlib.nullcontext() as report_writer,
+        ):
+            if git_index:
+                results = format_staged_files(
+                    configs_to_process,
+                    config_resolver,
+                    select=select,
+                    format_content=format_content,
+                    status_log=status_log,
+                    report=report_writer,
+                )
+            else:
+                results = process_yamkix_configs(
+                    prefetch(config_resolver.resolve(config) for config in select(configs_to_process)),
+                    process=process,
+                    status_log=status_log,
+                    report=report_writer,
+                    threads=threads,
+                    pipeline=pipeline,
                 )
-            )
+    except (GitCommandError, InvalidConfigFileError) as e:
+        status_log.error(f"Error: {e}")
+        raise typer.Exit(code=1) from e
+    elapsed = time.monotonic() - start_time
+    if shard_report is not None:
+        write_shard_report(shard_report, ShardReport(shard=shard_spec, elapsed=elapsed, results=results))
+    write_profile(profiler, profile_out, profile_top, status_log)
     if summary_mode:
-        elapsed = time.monotonic() - start_time
-        total = len(results)
-        errors = sum(1 for r in results if r.error)
-        unchanged = sum(1 for r in results if r.unchanged)
-        console.print(
-            f"[yamkix] Summary: {total} file(s) processed, {errors} error(s), {unchanged} unchanged, {elapsed:.3f}s",
-            style="info",
+        print_summary(
+            results,
+            elapsed,
+            status_log,
+            recycled_workers=supervised_formatter.recycled_workers if supervised_formatter is not None else 0,
         )
+    exit_on_errors_if_verifying(results, verify)
+
+
+@app.command(name="lsp")
+def lsp() -> None:
+    """Run a Language Server Protocol server on STDIN/STDOUT.
+
+    The server implements `textDocument/formatting` and `textDocument/rangeFormatting`.
+    Formatting options can be passed as `initializationOptions`, using the parameter names of
+    `get_yamkix_config_from_default` (e.g. `{"dash_inwards": false}`).
+    """
+    if not run_language_server(sys.stdin.buffer, sys.stdout.buffer):
+        # The client left without requesting a shutdown first
+        raise typer.Exit(code=1)
+
+
+@app.command(name="merge-reports")
+def merge_reports(
+    reports: Annotated[list[Path], typer.Argument(help="the shard reports to merge", show_default=False)],
+    output: Annotated[
+        Path | None,
+        typer.Option(
+            "-o",
+            "--output",
+            help="write the merged report to FILE, e.g. to balance the next runs with --shard-timings.",
+            metavar="FILE",
+        ),
+    ] = None,
+) -> None:
+    """Merge the reports written by `yamkix --shard I/N --shard-report FILE` and print a summary.
+
+    Exits with a non zero code if a file could not be processed or if a shard report is missing.
+    """
+    status_log = YamkixLogger()
+    try:
+        merged = merge_shard_reports(read_shard_report(report) for report in reports)
+    except InvalidShardReportError as e:
+        status_log.error(f"Error: {e}")
+        raise typer.Exit(code=1) from e
+    if output is not None:
+        write_shard_report(output, merged)
+    for result in merged.results:
+        if result.error:
+            status_log.error(f"Error processing [{result.input_display_name}]")
+    print_summary(merged.results, merged.elapsed, status_log)
+    missing_shards = merged.get_missing_shards()
+    if missing_shards:
+        status_log.error(f"Error: missing shard report(s) for {', '.join(str(shard) for shard in missing_shards)}")
+    if merged.errors or missing_shards:
+        raise typer.Exit(code=1)
+
+
+@app.command(name="bench")
+def bench(
+    paths: Annotated[
+        list[Path],
+        typer.Argument(help="the files, and directories holding yaml files, to benchmark", show_default=False),
+    ],
+    config_files: Annotated[
+        list[Path] | None,
+        typer.Option(
+            "--config",
+            help=(
+                "benchmark the configuration FILE, can be repeated to compare several configurations. "
+                "Defaults to the nearest configuration file of each file."
+            ),
+            metavar="FILE",
+            exists=True,
+            dir_okay=False,
+        ),
+    ] = None,
+    warmup: Annotated[
+        int, typer.Option("--warmup", help="format the files N times before measuring.", metavar="N", min=0)
+    ] = DEFAULT_WARMUP,
+    repetitions: Annotated[
+        int, typer.Option("--repetitions", help="measure N formattings of the files.", metavar="N", min=1)
+    ] = DEFAULT_REPETITIONS,
+    json_output: Annotated[
+        Path | None,
+        typer.Option(
+            "--json",
+            help="write the results as JSON to FILE ('-' for STDOUT, instead of the table), e.g. to track them.",
+            metavar="FILE",
+        ),
+    ] = None,
+) -> None:
+    """Benchmark the formatting of your own files, in memory, with one or more configurations.
+
+    Prints the throughput, the latency percentiles of the files and the peak memory of each
+    configuration. Nothing is written to the files.
+    """
+    status_log = YamkixLogger()
+    files = read_bench_files(paths)
+    if not files:
+        status_log.error("Error: no yaml file to benchmark")
+        raise typer.Exit(code=1)
+    base_config = get_yamkix_config_from_default()
+    results: list[BenchResult] = []
+    try:
+        for config_file in config_files or [None]:
+            resolver = YamkixConfigResolver(base_config, config_file=config_file)
+            name = str(config_file) if config_file is not None else "default"
+            status_log.info(f"[yamkix] Benchmarking {name} on {len(files)} file(s)")
+            results.append(run_benchmark(name, files, resolver.get_formatting_config, warmup, repetitions))
+    except InvalidConfigFileError as e:
+        status_log.error(f"Error: {e}")
+        raise typer.Exit(code=1) from e
+    if json_output is not None and str(json_output) == "-":
+        sys.stdout.write(format_bench_results_as_json(results))
+        return
+    if json_output is not None:
+        json_output.write_text(format_bench_results_as_json(results), encoding="UTF-8")
+    sys.stdout.write(format_bench_results(results))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+"""Benchmark the formatting of a corpus with one or more configurations (`yamkix bench`).
+
+The files are read once and formatted in memory: nothing is written. Each configuration
+formats the whole corpus `warmup` times, then `repetitions` times while the latency of each
+file is measured, and a last time under `tracemalloc` for the peak memory, so that tracing
+the allocations does not slow down the timed repetitions.
+"""
+
+import json
+import math
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Final
+
+from yamkix.config import YamkixConfig
+from yamkix.errors import FormattingVerificationError, InvalidYamlContentError, ResourceLimitExceededError
+from yamkix.helpers import MEBIBYTE, iter_yaml_files
+from yamkix.yamkix import format_yaml_content
+
+DEFAULT_WARMUP: Final = 1
+DEFAULT_REPETITIONS: Final = 5
+PERCENTILES: Final = (50, 90, 99)
+
+
+@dataclass(frozen=True)
+class BenchFile:
+    """A file of the corpus, read in memory.
+
+    Attributes:
+        path: The path of the file.
+        content: The content of the file.
+        size: The size of the content, encoded in UTF-8.
+    """
+
+    path: Path
+    content: str
+    size: int
+
+
+def read_bench_files(paths: Iterable[Path]) -> list[BenchFile]:
+    """Read the files, and the YAML files found under the directories, in memory."""
+    files = []
+    for path in iter_yaml_files(paths):
+        content = path.read_text(encoding="UTF-8")
+        files.append(BenchFile(path=path, content=content, size=len(content.encode("UTF-8"))))
+    return files
+
+
+def get_percentile(sorted_values: list[float], percentile: float) -> float:
+    """Return the `percentile` of some sorted values, using the nearest rank method (0 without values)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * percentile / 100))
+    return sorted_values[rank - 1]
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    """The measures of the benchmark of a configuration.
+
+    Attributes:
+        name: The name of the configuration, e.g. the path of its configuration file.
+        files: The number of files formatted, the files that could not be formatted being excluded.
+        errors: The number of files that could not be formatted (invalid YAML, resource limit exceeded,
+            failed verification).
+        total_bytes: The size of the files formatted, encoded in UTF-8.
+        repetitions: The number of timed repetitions.
+        latencies: The sorted durations of the formatting of each file in each repetition, in seconds.
+        peak_memory: The peak of the memory allocated while formatting a file, in bytes.
+    """
+
+    name: str
+    files: int
+    errors: int
+    total_bytes: int
+    repetitions: int
+    latencies: list[float]
+    peak_memory: int
+
+    @property
+    def elapsed(self) -> float:
+        """The time spent formatting the files in the timed repetitions, in seconds."""
+        return sum(self.latencies)
+
+    @property
+    def bytes_per_second(self) -> float:
+        """The number of bytes formatted per second."""
+        return self.total_bytes * self.repetitions / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        """The number of files formatted per second."""
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def get_latency_percentile(self, percentile: float) -> float:
+        """Return a percentile of the latency of the files, in seconds."""
+        return get_percentile(self.latencies, percentile)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the measures as a JSON compatible dict, durations in seconds and sizes in bytes."""
+        return {
+            "name": self.name,
+            "files": self.files,
+            "errors": self.errors,
+            "total_bytes": self.total_bytes,
+            "repetitions": self.repetitions,
+            "elapsed": self.elapsed,
+            "bytes_per_second": self.bytes_per_second,
+            "files_per_second": self.files_per_second,
+            "latency": {f"p{percentile}": self.get_latency_percentile(percentile) for percentile in PERCENTILES},
+            "peak_memory": self.peak_memory,
+        }
+
+
+def run_benchmark(  # noqa: PLR0913, PLR0917
+    name: str,
+    files: list[BenchFile],
+    get_config: Callable[[Path], YamkixConfig],
+    warmup: int = DEFAULT_WARMUP,
+    repetitions: int = DEFAULT_REPETITIONS,
+    clock: Callable[[], float] = time.perf_counter,
+) -> BenchResult:
+    """Benchmark the formatting of `files` with the configs returned by `get_config` for each file.
+
+    Args:
+        name: The name of the configuration, for the result.
+        files: The corpus.
+        get_config: Return the config to format a file with, from its path.
+        warmup: The number of untimed formattings of the corpus.
+        repetitions: The number of timed formattings of the corpus.
+        clock: The clock measuring the latencies.
+
+    Returns:
+        The measures of the benchmark.
+    """
+    # The files that cannot be formatted are found by the first pass, and excluded from the measures
+    jobs = []
+    errors = 0
+    for file in files:
+        config = get_config(file.path)
+        try:
+            format_yaml_content(file.content, config)
+        except (FormattingVerificationError, InvalidYamlContentError, ResourceLimitExceededError):
+            errors += 1
+        else:
+            jobs.append((file, config))
+    for _ in range(warmup):
+        for file, config in jobs:
+            format_yaml_content(file.content, config)
+    latencies = []
+    for _ in range(repetitions):
+        for file, config in jobs:
+            start_time = clock()
+            format_yaml_content(file.content, config)
+            latencies.append(clock() - start_time)
+    return BenchResult(
+        name=name,
+        files=len(jobs),
+        errors=errors,
+        total_bytes=sum(file.size for file, _ in jobs),
+        repetitions=repetitions,
+        latencies=sorted(latencies),
+        peak_memory=measure_peak_memory(jobs),
+    )
+
+
+def measure_peak_memory(jobs: list[tuple[BenchFile, YamkixConfig]]) -> int:
+    """Return the peak of the memory allocated while formatting a file, in bytes."""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        peak_memory = 0
+        for file, config in jobs:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            format_yaml_content(file.content, config)
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1] - baseline)
+        return peak_memory
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+
+def format_bench_results(results: list[BenchResult]) -> str:
+    """Return the results as a table, the elapsed time being compared with the one of the first result."""
+    header = (
+        f"{'config':<30} {'files':>6} {'errors':>6} {'MiB/s':>8} {'files/s':>9} "
+        + " ".join(f"{f'p{percentile}(ms)':>9}" for percentile in PERCENTILES)
+        + f" {'peak(MiB)':>9} {'relative':>8}"
+    )
+    lines = [header]
+    reference = results[0].elapsed if results else 0.0
+    for result in results:
+        relative = f"x{result.elapsed / reference:.2f}" if reference else "-"
+        lines.append(
+            f"{result.name:<30} {result.files:>6} {result.errors:>6} {result.bytes_per_second / MEBIBYTE:>8.3f} "
+            f"{result.files_per_second:>9.1f} "
+            + " ".join(f"{1000 * result.get_latency_percentile(percentile):>9.3f}" for percentile in PERCENTILES)
+            + f" {result.peak_memory / MEBIBYTE:>9.2f} {relative:>8}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def format_bench_results_as_json(results: list[BenchResult]) -> str:
+    """Return the results as a JSON list, e.g. to track them over time."""
+    return json.dumps([result.to_dict() for result in results], indent=2) + "\n"
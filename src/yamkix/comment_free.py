@@ -0,0 +1,50 @@
+"""Load the contents without comments through a scanner that does not look for comments.
+
+The round trip scanner of `ruamel.yaml` gathers the comments (and the blank lines, kept as
+comments) around each token, a large part of its cost. Many contents, e.g. generated
+manifests, have none: they are loaded with the scanner of the `safe` loader and a round trip
+parser that does not move comments around, the nodes being constructed by the round trip
+constructor as usual. The documents are the same `CommentedMap` and `CommentedSeq`, with
+the same styles, quotes, anchors and tags, without comments: the comment transforms
+(`--spaces-before-comment`, `--align-comments`) have nothing to do and are skipped.
+
+A content is only loaded that way when the round trip scanner would not record anything
+else than the tokens: it holds no `#` (even in a scalar), no blank line, and no folded
+block scalar (the round trip scanner records where its lines are folded). A content with
+directives is not loaded that way either: the scanner of the `safe` loader drops the `%TAG`
+directives, that the round trip one keeps.
+
+The C parser of `ruamel.yaml.clib` is not used: `ruamel.yaml` does not support it with the
+round trip constructor.
+"""
+
+import re
+from typing import Any, Final
+
+from ruamel.yaml.parser import RoundTripParser
+
+# A blank line, kept as a comment by the round trip scanner
+BLANK_LINE: Final = re.compile(r"\n[ \t\r]*\n")
+LEADING_BLANK_LINE: Final = re.compile(r"[ \t\r]*\n")
+# The header of a folded block scalar (or a plain scalar ending with `>`), without comment
+FOLDED_SCALAR_HEADER: Final = re.compile(r">[-+1-9]{0,2}[ \t]*\r?$", re.MULTILINE)
+# A `%YAML` or `%TAG` directive (or a line of a plain scalar starting with `%`)
+DIRECTIVE: Final = re.compile(r"^%", re.MULTILINE)
+
+
+def is_comment_free(content: str) -> bool:
+    """Tell whether `content` can be loaded without looking for comments, for the same documents."""
+    return (
+        "#" not in content
+        and LEADING_BLANK_LINE.match(content) is None
+        and BLANK_LINE.search(content) is None
+        and FOLDED_SCALAR_HEADER.search(content) is None
+        and DIRECTIVE.search(content) is None
+    )
+
+
+class CommentFreeParser(RoundTripParser):
+    """A round trip parser for the tokens of a scanner that does not look for comments."""
+
+    def move_token_comment(self, token: Any, nt: Any = None, empty: bool | None = False) -> None:  # noqa: ANN401
+        """Do nothing: the tokens carry no comment."""
@@ -1,5 +1,7 @@
 """Deal with comments."""
 
+from typing import Any
+
 from ruamel.yaml.comments import CommentedBase, CommentedMap, CommentedSeq, NotNone
 from ruamel.yaml.error import CommentMark
 from ruamel.yaml.tokens import CommentToken
@@ -7,17 +9,25 @@ from ruamel.yaml.tokens import CommentToken
 from yamkix.helpers import remove_all_linebreaks, string_is_comment
 
 
-def yamkix_add_eol_comment(self, comment: str, key=NotNone, column: int | None = None) -> None:  # noqa: ANN001
-    """Provide a custom add_eol_comment function.
+def yamkix_add_eol_comment(
+    data: CommentedBase,
+    comment: str,
+    key: Any = NotNone,  # noqa: ANN401
+    column: int | None = None,
+) -> None:
+    """Add an EOL comment to `data`, like `CommentedBase.yaml_add_eol_comment` does.
 
     We need to be able to tune the number of spaces between
     the content and the comment for CommentedSeqs and CommentedMaps
     see https://stackoverflow.com/q/60915926
+
+    `CommentedBase` is not patched: the `ruamel.yaml` classes are left untouched for the other
+    users of the library, and for the threads processing files concurrently.
     """
     org_col = column
     if column is None:
         try:
-            column = self._yaml_get_column(key)
+            column = data._yaml_get_column(key)  # noqa: SLF001
         except AttributeError:
             column = 0
     if comment[0] != "#":
@@ -28,16 +38,13 @@ def yamkix_add_eol_comment(self, comment: str, key=NotNone, column: int | None =
         column = 0
     start_mark = CommentMark(column)
     comment_as_list = [CommentToken(comment, start_mark, None), None]
-    self._yaml_add_eol_comment(comment_as_list, key=key)
-
-
-CommentedBase.yaml_add_eol_comment = yamkix_add_eol_comment  # pyright: ignore[reportAttributeAccessIssue]
+    data._yaml_add_eol_comment(comment_as_list, key=key)  # noqa: SLF001
 
 
 def process_single_comment(data: CommentedBase, comment: str, key: str, column: int | None) -> None:
     """Process a single comment."""
     comment = remove_all_linebreaks(comment)
-    data.yaml_add_eol_comment(comment, key, column=column)
+    yamkix_add_eol_comment(data, comment, key, column=column)
 
 
 def fix_for_issue29(data: CommentedMap, key: str) -> None:
@@ -1,9 +1,9 @@
 """Yamkix configuration helpers."""
 
 from argparse import Namespace
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Final
+from typing import Final, TypeAlias
 
 from yamkix.__version__ import __version__
 from yamkix.errors import InvalidTypValueError
@@ -14,6 +14,35 @@ STDIN_DISPLAY_NAME: Final = "STDIN"
 STDOUT_DISPLAY_NAME: Final = "STDOUT"
 
 
+@dataclass(frozen=True)
+class YamkixResourceLimits:
+    """Limits protecting the processing of untrusted input, enforced while parsing.
+
+    `None` means no limit.
+
+    Attributes:
+        max_bytes: Maximum size of the input, in bytes (UTF-8 encoded).
+        max_documents: Maximum number of documents in the input.
+        max_depth: Maximum nesting depth of the nodes, the root node of a document being at depth 1.
+        max_nodes: Maximum number of nodes (scalars, sequences and mappings) in the input.
+        max_alias_expansion: Maximum number of nodes reached through aliases, each alias
+            counting as a full copy of the node it refers to.
+    """
+
+    max_bytes: int | None = None
+    max_documents: int | None = None
+    max_depth: int | None = None
+    max_nodes: int | None = None
+    max_alias_expansion: int | None = None
+
+    def __str__(self) -> str:
+        """Return a string representation of the limits that are set."""
+        return ", ".join(f"{name}={value}" for name, value in vars(self).items() if value is not None)
+
+
+YamkixStyleKey: TypeAlias = tuple[bool | int | str | YamkixResourceLimits | None, ...]
+
+
 @dataclass
 class YamkixInputOutputConfig:
     """`Yamkix` input/output configuration.
@@ -62,6 +91,8 @@ class YamkixConfig:  # pylint: disable=too-many-instance-attributes
         io_config: Input/Output configuration.
         enforce_block_style: Whether to convert flow-style (JSON-like) collections to block style.
             Only applies in `rt` parsing mode. Takes precedence over `default_flow_style`.
+        limits: The resource limits enforced while parsing the input, `None` meaning no limit.
+        verify: Whether to check that the formatted output holds the same data as the input.
 
     """
 
@@ -78,6 +109,8 @@ class YamkixConfig:  # pylint: disable=too-many-instance-attributes
     version: bool | None
     io_config: YamkixInputOutputConfig
     enforce_block_style: bool = False
+    limits: YamkixResourceLimits | None = None
+    verify: bool = False
 
     def __str__(self) -> str:
         """Return a string representation of the YamkixConfig."""
@@ -104,9 +137,32 @@ class YamkixConfig:  # pylint: disable=too-many-instance-attributes
             + str(self.line_width)
             + ", align_comments="
             + str(self.align_comments)
+            + ("" if self.limits is None else ", limits=(" + str(self.limits) + ")")
+            + (", verify=True" if self.verify else "")
         )
 
 
+def get_yamkix_style_key(yamkix_config: YamkixConfig) -> YamkixStyleKey:
+    """Return a hashable key made of the formatting options of a config.
+
+    Two configs with the same key format content the same way, whatever their `io_config`.
+    """
+    return (
+        yamkix_config.parsing_mode,
+        yamkix_config.explicit_start,
+        yamkix_config.explicit_end,
+        yamkix_config.default_flow_style,
+        yamkix_config.dash_inwards,
+        yamkix_config.quotes_preserved,
+        yamkix_config.enforce_double_quotes,
+        yamkix_config.enforce_block_style,
+        yamkix_config.spaces_before_comment,
+        yamkix_config.line_width,
+        yamkix_config.align_comments,
+        yamkix_config.limits,
+    )
+
+
 def get_default_yamkix_config() -> YamkixConfig:
     """Return `Yamkix` default configuration.
 
@@ -176,6 +232,8 @@ def get_yamkix_config_from_default(  # noqa: PLR0913, PLR0917
     line_width: int | None = None,
     align_comments: bool | None = None,
     io_config: YamkixInputOutputConfig | None = None,
+    limits: YamkixResourceLimits | None = None,
+    verify: bool = False,
 ) -> YamkixConfig:
     """Return a `Yamkix` configuration, based on the default one.
 
@@ -199,6 +257,8 @@ def get_yamkix_config_from_default(  # noqa: PLR0913, PLR0917
         line_width: Maximum line width.
         align_comments: Whether to align EOL comments within each dict/list to the maximum column.
         io_config: Input/Output configuration.
+        limits: The resource limits enforced while parsing the input, `None` meaning no limit.
+        verify: Whether to check that the formatted output holds the same data as the input.
 
     Returns:
         yamkix_config: A `YamkixConfig` object with the specified overrides.
@@ -231,9 +291,16 @@ def get_yamkix_config_from_default(  # noqa: PLR0913, PLR0917
         align_comments=align_comments if align_comments is not None else default_config.align_comments,
         version=None,
         io_config=io_config if io_config is not None else get_default_yamkix_input_output_config(),
+        limits=limits,
+        verify=verify,
     )
 
 
+def get_yamkix_config_for_file(yamkix_config: YamkixConfig, file: str) -> YamkixConfig:
+    """Return a copy of `yamkix_config` that formats `file` in place."""
+    return replace(yamkix_config, io_config=YamkixInputOutputConfig(input=file, output=file))
+
+
 def print_yamkix_config(yamkix_config: YamkixConfig) -> None:
     """Print a human readable Yamkix config on stderr."""
     yamkix_input_output_config = yamkix_config.io_config
@@ -359,6 +426,8 @@ def create_yamkix_config_from_typer_args(  # noqa: PLR0913, PLR0917
     align_comments: bool,
     files: list[Path] | None,
     enforce_block_style: bool = False,
+    limits: YamkixResourceLimits | None = None,
+    verify: bool = False,
 ) -> list[YamkixConfig]:
     """Create a list of YamkixConfig from Typer arguments.
 
@@ -425,6 +494,8 @@ def create_yamkix_config_from_typer_args(  # noqa: PLR0913, PLR0917
             align_comments=align_comments,
             version=None,
             io_config=io_config,
+            limits=limits,
+            verify=verify,
         )
         for io_config in io_configs
     ]
@@ -0,0 +1,299 @@
+"""Discover and resolve yamkix configuration files.
+
+Formatting options can be set in a `.yamkix.toml` file, or in the `[tool.yamkix]` table of
+a `pyproject.toml` file. The nearest configuration file, looking up from the directory of
+each formatted file, applies to it. Per-glob `overrides` tables change the options of the
+files they match:
+
+```toml
+dash_inwards = true
+spaces_before_comment = 1
+
+[[overrides]]
+files = ["vendor/**", "*.generated.yaml"]
+dash_inwards = false
+```
+"""
+
+import re
+import sys
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Final
+
+from yamkix.config import YamkixConfig, YamkixStyleKey, get_yamkix_style_key
+from yamkix.errors import InvalidConfigFileError
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+YAMKIX_CONFIG_FILE_NAME: Final = ".yamkix.toml"
+PYPROJECT_FILE_NAME: Final = "pyproject.toml"
+# Looked up in this order in each directory
+CONFIG_FILE_NAMES: Final = (YAMKIX_CONFIG_FILE_NAME, PYPROJECT_FILE_NAME)
+OVERRIDES_KEY: Final = "overrides"
+OVERRIDE_FILES_KEY: Final = "files"
+CONFIG_FILE_OPTIONS: Final[dict[str, type]] = {
+    "parsing_mode": str,
+    "explicit_start": bool,
+    "explicit_end": bool,
+    "default_flow_style": bool,
+    "dash_inwards": bool,
+    "quotes_preserved": bool,
+    "enforce_double_quotes": bool,
+    "enforce_block_style": bool,
+    "spaces_before_comment": int,
+    "line_width": int,
+    "align_comments": bool,
+}
+SUPPORTED_PARSING_MODES: Final = ("rt", "safe")
+
+
+def compile_glob(pattern: str) -> re.Pattern[str]:
+    """Compile a glob pattern matching paths relative to the directory of a configuration file.
+
+    `*` and `?` do not match `/`, `**` matches any number of directories. A pattern also matches
+    all the files below the directories it matches. Like in `.gitignore` files, a pattern without
+    `/` (other than a trailing one) matches at any depth, otherwise it is anchored to the
+    directory of the configuration file.
+    """
+    anchored = "/" in pattern.rstrip("/")
+    segments = pattern.strip("/").split("/")
+    regex = "" if anchored else "(?:.*/)?"
+    for index, segment in enumerate(segments):
+        is_last = index == len(segments) - 1
+        if segment == "**":
+            regex += ".*" if is_last else "(?:[^/]+/)*"
+            continue
+        regex += _translate_glob_segment(segment) + ("" if is_last else "/")
+    return re.compile(regex + r"(?:/.*)?\Z")
+
+
+def _translate_glob_segment(segment: str) -> str:
+    regex = ""
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        index += 1
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[" and (end := segment.find("]", index + 1)) != -1:
+            content = segment[index:end]
+            if content.startswith("!"):
+                content = "^" + content[1:]
+            regex += "[" + content.replace("\\", "\\\\") + "]"
+            index = end + 1
+        else:
+            regex += re.escape(char)
+    return regex
+
+
+def _get_options(table: dict[str, Any], path: Path, ignored_keys: tuple[str, ...] = ()) -> dict[str, Any]:
+    """Validate the formatting options of a table, accepting `kebab-case` names too."""
+    options = {}
+    for key, value in table.items():
+        if key in ignored_keys:
+            continue
+        name = key.replace("-", "_")
+        expected_type = CONFIG_FILE_OPTIONS.get(name)
+        if expected_type is None:
+            raise InvalidConfigFileError(str(path), f"unknown option '{key}'")
+        # bool is a subclass of int
+        if not isinstance(value, expected_type) or (expected_type is int and isinstance(value, bool)):
+            raise InvalidConfigFileError(str(path), f"option '{key}' must be of type {expected_type.__name__}")
+        if name == "parsing_mode" and value not in SUPPORTED_PARSING_MODES:
+            raise InvalidConfigFileError(str(path), f"option '{key}' must be one of 'rt' or 'safe'")
+        options[name] = value
+    return options
+
+
+@dataclass
+class YamkixConfigOverride:
+    """Formatting options applying to the files matching some glob patterns.
+
+    Attributes:
+        files: The glob patterns, relative to the directory of the configuration file.
+        options: The formatting options, named like the attributes of `YamkixConfig`.
+    """
+
+    files: list[str]
+    options: dict[str, Any]
+    _compiled: list[re.Pattern[str]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Compile the glob patterns."""
+        self._compiled = [compile_glob(pattern) for pattern in self.files]
+
+    def matches(self, relative_path: str) -> bool:
+        """Tell whether a path, relative to the directory of the configuration file, matches."""
+        return any(compiled.match(relative_path) for compiled in self._compiled)
+
+
+@dataclass
+class YamkixConfigFile:
+    """A parsed yamkix configuration file.
+
+    Attributes:
+        path: The path of the configuration file.
+        options: The formatting options, named like the attributes of `YamkixConfig`.
+        overrides: The per-glob overrides, the last matching one wins for a given option.
+    """
+
+    path: Path
+    options: dict[str, Any]
+    overrides: list[YamkixConfigOverride]
+
+    @property
+    def root(self) -> Path:
+        """Return the directory the glob patterns of the overrides are relative to."""
+        return self.path.parent
+
+    def get_matching_overrides(self, file: Path) -> tuple[int, ...]:
+        """Return the indexes of the overrides matching `file` (an absolute path)."""
+        try:
+            relative_path = file.relative_to(self.root).as_posix()
+        except ValueError:
+            return ()
+        return tuple(index for index, override in enumerate(self.overrides) if override.matches(relative_path))
+
+
+def load_config_file(path: Path) -> YamkixConfigFile | None:
+    """Load a configuration file.
+
+    Returns:
+        The parsed configuration file, or `None` for a `pyproject.toml` file without a `[tool.yamkix]` table.
+
+    Raises:
+        InvalidConfigFileError: If the file is not valid TOML or holds invalid options.
+    """
+    try:
+        with path.open(mode="rb") as stream:
+            content = tomllib.load(stream)
+    except tomllib.TOMLDecodeError as e:
+        raise InvalidConfigFileError(str(path), str(e)) from e
+    if path.name == PYPROJECT_FILE_NAME:
+        content = content.get("tool", {}).get("yamkix")
+        if content is None:
+            return None
+    overrides = []
+    for table in content.get(OVERRIDES_KEY, []):
+        files = table.get(OVERRIDE_FILES_KEY)
+        if not isinstance(files, list) or not all(isinstance(pattern, str) for pattern in files):
+            msg = f"each '{OVERRIDES_KEY}' table requires a '{OVERRIDE_FILES_KEY}' list of glob patterns"
+            raise InvalidConfigFileError(str(path), msg)
+        overrides.append(
+            YamkixConfigOverride(files=files, options=_get_options(table, path, ignored_keys=(OVERRIDE_FILES_KEY,)))
+        )
+    return YamkixConfigFile(
+        path=path.resolve(),
+        options=_get_options(content, path, ignored_keys=(OVERRIDES_KEY,)),
+        overrides=overrides,
+    )
+
+
+class YamkixConfigResolver:
+    """Resolve the effective configuration of each file from the configuration files.
+
+    Options are applied in this order: the base config, the options of the configuration file,
+    the matching overrides and finally the `forced_options` (e.g. options explicitly set on
+    the command line).
+
+    Discovery results are cached per directory, and effective configs are cached per
+    configuration file and set of matching overrides: files with the same effective options
+    get configs with the same style key, hence share the cached `YAML` writers.
+    """
+
+    def __init__(
+        self,
+        base_config: YamkixConfig,
+        forced_options: dict[str, Any] | None = None,
+        config_file: Path | None = None,
+    ) -> None:
+        """Create a new resolver.
+
+        Args:
+            base_config: The config to start from, for the files without configuration file.
+            forced_options: Options taking precedence over the configuration files.
+            config_file: A configuration file to use for all the files, disabling the discovery.
+
+        Raises:
+            InvalidConfigFileError: If `config_file` is invalid.
+        """
+        self.base_config = base_config
+        self.forced_options = forced_options or {}
+        self._forced_config_file = None
+        if config_file is not None:
+            self._forced_config_file = load_config_file(config_file) or YamkixConfigFile(
+                path=config_file.resolve(), options={}, overrides=[]
+            )
+        self._config_files_by_directory: dict[Path, YamkixConfigFile | None] = {}
+        self._configs: dict[tuple[Path, tuple[int, ...]], YamkixConfig] = {}
+        self._configs_by_style: dict[YamkixStyleKey, YamkixConfig] = {}
+
+    def find_config_file(self, directory: Path) -> YamkixConfigFile | None:
+        """Return the nearest configuration file of an absolute directory, looking up the tree.
+
+        Raises:
+            InvalidConfigFileError: If the nearest configuration file is invalid.
+        """
+        if directory in self._config_files_by_directory:
+            return self._config_files_by_directory[directory]
+        config_file = None
+        for file_name in CONFIG_FILE_NAMES:
+            candidate = directory / file_name
+            if candidate.is_file() and (config_file := load_config_file(candidate)) is not None:
+                break
+        if config_file is None and directory.parent != directory:
+            config_file = self.find_config_file(directory.parent)
+        self._config_files_by_directory[directory] = config_file
+        return config_file
+
+    def get_formatting_config(self, file: Path) -> YamkixConfig:
+        """Return the effective formatting options of a file, the `io_config` being the base one.
+
+        Raises:
+            InvalidConfigFileError: If the configuration file of `file` is invalid.
+        """
+        file = file.resolve()
+        config_file = self._forced_config_file or self.find_config_file(file.parent)
+        if config_file is None:
+            return self._get_shared_config({})
+        overrides = config_file.get_matching_overrides(file)
+        cache_key = (config_file.path, overrides)
+        config = self._configs.get(cache_key)
+        if config is None:
+            options = dict(config_file.options)
+            for index in overrides:
+                options.update(config_file.overrides[index].options)
+            config = self._get_shared_config(options)
+            self._configs[cache_key] = config
+        return config
+
+    def _get_shared_config(self, options: dict[str, Any]) -> YamkixConfig:
+        if not options and not self.forced_options:
+            return self.base_config
+        config = replace(self.base_config, **{**options, **self.forced_options})
+        return self._configs_by_style.setdefault(get_yamkix_style_key(config), config)
+
+    def resolve(self, yamkix_config: YamkixConfig, file: Path | None = None) -> YamkixConfig:
+        """Return `yamkix_config` with the effective formatting options of its input file.
+
+        Args:
+            yamkix_config: The config of a file to process.
+            file: The path of the file to use for the resolution, the input of the config by default.
+                `STDIN` is resolved from the current directory.
+
+        Raises:
+            InvalidConfigFileError: If the configuration file is invalid.
+        """
+        if file is None:
+            input_file = yamkix_config.io_config.input
+            file = Path(input_file) if input_file is not None else Path.cwd() / "-"
+        config = self.get_formatting_config(file)
+        if get_yamkix_style_key(config) == get_yamkix_style_key(yamkix_config):
+            return yamkix_config
+        return replace(config, io_config=yamkix_config.io_config)
@@ -0,0 +1,306 @@
+"""Emit the documents in the yamkix layout without the serializer and emitter of `ruamel.yaml`.
+
+`ruamel.yaml` dumps a document through a generic pipeline: the representer builds a node
+graph, the serializer turns it into an event queue and the emitter runs a state machine
+over the events, looking ahead in the queue. The layout yamkix asks for is fixed (block
+style, mappings indented by 2, sequences by 4 with their dash at 2, or by 2 with their
+dash at 0 without `--dash-inwards`): a document made of block collections and simple
+scalars is walked once, its lines being written straight to a buffer.
+
+The output must be the one of `ruamel.yaml`, byte for byte: the scalars are written in
+the style its emitter would choose, and any construct that is not covered makes the
+whole document go through `ruamel.yaml`:
+
+- anchors, aliases, tags, merge keys and comments;
+- flow style collections (other than the empty ones), and collections as keys;
+- scalars that are too long for their line, keys too long to be simple keys;
+- multi-line scalars other than plain literal block scalars, non printable characters;
+- scalar types other than strings, booleans, integers, floats and `None`;
+- a `%YAML` or `%TAG` directive to write, a document that is not a collection.
+"""
+
+import re
+from typing import Any, Final
+
+from ruamel.yaml import YAML
+from ruamel.yaml.anchor import Anchor
+from ruamel.yaml.comments import Comment, CommentedMap, CommentedSeq, Format, merge_attrib
+from ruamel.yaml.emitter import Emitter
+from ruamel.yaml.nodes import ScalarNode
+from ruamel.yaml.scalarstring import DoubleQuotedScalarString, LiteralScalarString, SingleQuotedScalarString
+from ruamel.yaml.tag import Tag
+
+# The (map indent, sequence indent, dash offset) layouts of the yamkix writers, with and without `--dash-inwards`
+SUPPORTED_LAYOUTS: Final = frozenset({(2, 4, 2), (2, 2, 0)})
+STR_TAG: Final = "tag:yaml.org,2002:str"
+LONGEST_KEY_TAG: Final = "!!float"
+# The characters that the emitter writes as they are, line breaks excluded
+NOT_PRINTABLE: Final = re.compile(
+    r"[^\x20-\x7e\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd\U00010000-\U0010ffff]"
+)
+NOT_PRINTABLE_IN_LITERAL: Final = re.compile(
+    r"[^\t\n\x20-\x7e\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd\U00010000-\U0010ffff]"
+)
+# The indicators and spaces that forbid a plain scalar in block context
+NOT_PLAIN: Final = re.compile(r"^(?:[ #,\[\]{}&*!|>'\"%@`]|[?:-](?: |$)|---|\.\.\.)|: |:$| #| $")
+
+
+class _NotCoveredError(ValueError):
+    """Raised while walking a document holding a construct that must be emitted by `ruamel.yaml`."""
+
+    def __init__(self, reason: str) -> None:
+        """Initialize _NotCoveredError."""
+        super().__init__(f"Not covered by the direct emitter: {reason}")
+
+
+def _check_no_anchor(data: Any) -> None:  # noqa: ANN401
+    """Reject the nodes with an anchor to write."""
+    anchor = getattr(data, Anchor.attrib, None)
+    if anchor is not None and anchor.value is not None:
+        raise _NotCoveredError(reason="anchor")
+
+
+class _DirectEmitter:
+    """Write the lines of a document the way the emitter of a yamkix `YAML` writer would."""
+
+    def __init__(self, yaml: YAML) -> None:
+        """Initialize _DirectEmitter from the settings of `yaml`."""
+        self.map_indent: int = yaml.map_indent or 2
+        self.sequence_indent: int = yaml.sequence_indent or 2
+        self.dash_offset: int = yaml.sequence_dash_offset or 0
+        self.best_width: int = yaml.width if yaml.width and yaml.width > 2 * 2 else 80
+        self.default_flow_style = yaml.default_flow_style
+        self.boolean_representation = getattr(yaml, "boolean_representation", ("false", "true"))
+        self.resolver = yaml.resolver
+        self.representer = yaml.representer
+        self.lines: list[str] = []
+        self.collection_ids: set[int] = set()
+        self.resolved_tags: dict[str, Any] = {}
+
+    def _check_collection(self, data: Any) -> None:  # noqa: ANN401
+        """Reject the collections that are aliased, or carry comments, an anchor, a tag or merge keys."""
+        if id(data) in self.collection_ids:
+            raise _NotCoveredError(reason="alias")
+        self.collection_ids.add(id(data))
+        comment = getattr(data, Comment.attrib, None)
+        if comment is not None and (comment.comment or comment.items or comment.end or comment.pre):
+            raise _NotCoveredError(reason="comment")
+        _check_no_anchor(data)
+        tag = getattr(data, Tag.attrib, None)
+        if tag is not None and tag.value is not None:
+            raise _NotCoveredError(reason="tag")
+        if getattr(data, merge_attrib, None):
+            raise _NotCoveredError(reason="merge keys")
+
+    def _is_block(self, data: Any) -> bool:  # noqa: ANN401
+        """Tell whether a collection is written in block style, rejecting the non empty flow style ones."""
+        if not data:
+            return False
+        data_format = getattr(data, Format.attrib, None)
+        flow_style = None if data_format is None else data_format.flow_style()
+        if flow_style is None:
+            flow_style = self.default_flow_style
+        if flow_style is not False:
+            raise _NotCoveredError(reason="flow style")
+        return True
+
+    def _resolves_to(self, text: str) -> Any:  # noqa: ANN401
+        """Return the tag of `text` written as a plain scalar."""
+        tag = self.resolved_tags.get(text)
+        if tag is None:
+            tag = self.resolved_tags[text] = self.resolver.resolve(ScalarNode, text, (True, False))
+        return tag
+
+    def _plain(self, text: str, tag: Any) -> str:  # noqa: ANN401
+        """Return `text` as a plain scalar, that must be read back with `tag`."""
+        if not text or NOT_PRINTABLE.search(text) or NOT_PLAIN.search(text) or self._resolves_to(text) != tag:
+            raise _NotCoveredError(reason="scalar not plain")
+        return text
+
+    def _str(self, text: str) -> str:
+        """Return a string scalar in the style chosen by the emitter: plain, or quoted if it cannot be plain."""
+        if NOT_PRINTABLE.search(text):
+            raise _NotCoveredError(reason="non printable character")
+        if text and NOT_PLAIN.search(text) is None and self._resolves_to(text) == STR_TAG:
+            return text
+        if "'" in text:
+            return self._double_quoted(text)
+        return "'" + text + "'"
+
+    @staticmethod
+    def _double_quoted(text: str) -> str:
+        """Return a double quoted scalar."""
+        if NOT_PRINTABLE.search(text):
+            raise _NotCoveredError(reason="non printable character")
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    def _scalar(self, value: Any) -> str:  # noqa: ANN401, PLR0911
+        """Return the text of a single line scalar, empty for `None`."""
+        value_type = type(value)
+        if value_type is str:
+            return self._str(value)
+        if value is None:
+            return ""
+        if value_type is bool:
+            return self._plain(self.boolean_representation[value], "tag:yaml.org,2002:bool")
+        if value_type is int:
+            return str(value)
+        _check_no_anchor(value)
+        if value_type is SingleQuotedScalarString:
+            if NOT_PRINTABLE.search(value):
+                raise _NotCoveredError(reason="non printable character")
+            return "'" + value.replace("'", "''") + "'"
+        if value_type is DoubleQuotedScalarString:
+            return self._double_quoted(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            # Integers and floats keeping their representation (e.g. `0x1F`, `1.50`)
+            node = self.representer.represent_data(value)
+            if node.style or node.comment:
+                raise _NotCoveredError(reason="scalar style")
+            return self._plain(node.value, node.ctag)
+        raise _NotCoveredError(reason=f"scalar type {value_type.__name__}")
+
+    def _key(self, key: Any) -> str:  # noqa: ANN401
+        """Return the text of a simple key."""
+        if key is None or type(key) is LiteralScalarString:
+            raise _NotCoveredError(reason="key")
+        text = self._scalar(key)
+        # The emitter counts the tag of the key in its length, even when it is not written
+        if len(text) + len(LONGEST_KEY_TAG) >= Emitter.MAX_SIMPLE_KEY_LENGTH:
+            raise _NotCoveredError(reason="key too long")
+        return text
+
+    def _line(self, line: str) -> None:
+        """Write a line holding a scalar, or ending with a key, that the emitter would not fold."""
+        if len(line) > self.best_width:
+            raise _NotCoveredError(reason="line too long")
+        self.lines.append(line)
+
+    def _literal(self, head: str, value: LiteralScalarString, indent: int) -> None:
+        """Write a literal block scalar, its header ending `head` and its lines indented by `indent`."""
+        _check_no_anchor(value)
+        if (
+            getattr(value, "comment", None) is not None
+            or not value
+            or value[0] in " \n"
+            or value.endswith((" ", "\n\n"))
+            or " \n" in value
+            or NOT_PRINTABLE_IN_LITERAL.search(value)
+        ):
+            raise _NotCoveredError(reason="literal block scalar")
+        if value.endswith("\n"):
+            self._line(head + "|")
+            value = value[:-1]
+        else:
+            self._line(head + "|-")
+        padding = " " * indent
+        self.lines.extend(padding + line if line else "" for line in value.split("\n"))
+
+    def _value(self, head: str, value: Any, indent: int) -> None:  # noqa: ANN401
+        """Write the value of a mapping key at `indent`, `head` being the key and its colon."""
+        value_type = type(value)
+        if value_type is CommentedMap:
+            self._check_collection(value)
+            if self._is_block(value):
+                self._line(head)
+                self._mapping(value, indent + self.map_indent, None)
+            else:
+                self._line(head + " {}")
+        elif value_type is CommentedSeq:
+            self._check_collection(value)
+            if self._is_block(value):
+                self._line(head)
+                self._sequence(value, indent, None)
+            else:
+                self._line(head + " []")
+        elif value_type is LiteralScalarString:
+            self._literal(head + " ", value, indent + self.map_indent)
+        else:
+            text = self._scalar(value)
+            self._line(f"{head} {text}" if text else head)
+
+    def _item(self, head: str, item: Any, indent: int) -> None:  # noqa: ANN401
+        """Write a sequence item, its content at `indent`, `head` ending with its dash and a space."""
+        item_type = type(item)
+        if item_type is CommentedMap:
+            self._check_collection(item)
+            if self._is_block(item):
+                self._mapping(item, indent, head)
+            else:
+                self._line(head + "{}")
+        elif item_type is CommentedSeq:
+            self._check_collection(item)
+            if self._is_block(item):
+                self._sequence(item, indent, head)
+            else:
+                self._line(head + "[]")
+        elif item_type is LiteralScalarString:
+            self._literal(head, item, indent)
+        else:
+            text = self._scalar(item)
+            self._line(head + text if text else head.rstrip(" "))
+
+    def _mapping(self, mapping: CommentedMap, indent: int, prefix: str | None) -> None:
+        """Write a block mapping, its keys at `indent`, the first one after `prefix` if set."""
+        padding = " " * indent
+        start = padding if prefix is None else prefix
+        for key, value in mapping.items():
+            self._value(f"{start}{self._key(key)}:", value, indent)
+            start = padding
+
+    def _sequence(self, sequence: CommentedSeq, base: int, prefix: str | None) -> None:
+        """Write a block sequence nested at `base`, the first dash after `prefix` if set."""
+        dash_column = base + self.dash_offset
+        padding = " " * dash_column
+        start = padding if prefix is None else prefix + " " * (dash_column - len(prefix))
+        for item in sequence:
+            self._item(start + "- ", item, base + self.sequence_indent)
+            start = padding
+
+    def emit(self, data: Any, explicit_start: bool, explicit_end: bool) -> str:  # noqa: ANN401
+        """Return the document `data`, its start and end markers included if explicit."""
+        if explicit_start:
+            self.lines.append("---")
+        data_type = type(data)
+        if data_type is CommentedMap:
+            self._check_collection(data)
+            if not self._is_block(data):
+                raise _NotCoveredError(reason="empty document")
+            self._mapping(data, 0, None)
+        elif data_type is CommentedSeq:
+            self._check_collection(data)
+            if not self._is_block(data):
+                raise _NotCoveredError(reason="empty document")
+            self._sequence(data, 0, None)
+        else:
+            raise _NotCoveredError(reason="scalar document")
+        if explicit_end:
+            self.lines.append("...")
+        self.lines.append("")
+        return "\n".join(self.lines)
+
+
+def emit_document(data: Any, yaml: YAML) -> str | None:  # noqa: ANN401
+    """Emit `data` like `yaml.dump` would, without its serializer and emitter, if the document is covered.
+
+    Args:
+        data: The document to emit, loaded by a `rt` loader.
+        yaml: The yamkix `YAML` writer that would dump the document, for its settings.
+
+    Returns:
+        The document as `yaml.dump` would write it (before any transform), or `None` if it must be
+        dumped by `yaml`.
+    """
+    if (
+        "rt" not in yaml.typ
+        or (yaml.map_indent or 2, yaml.sequence_indent or 2, yaml.sequence_dash_offset or 0) not in SUPPORTED_LAYOUTS
+        or yaml.version is not None
+        or yaml.tags
+        or not yaml.allow_unicode
+        or yaml.line_break not in {None, "\n"}
+    ):
+        return None
+    try:
+        return _DirectEmitter(yaml).emit(data, bool(yaml.explicit_start), bool(yaml.explicit_end))
+    except (_NotCoveredError, RecursionError):
+        return None
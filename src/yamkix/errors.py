@@ -15,3 +15,87 @@ class InvalidYamlContentError(ValueError):
     def __init__(self) -> None:
         """Initialize InvalidYamlContentError."""
         super().__init__("Invalid YAML content")
+
+
+class ResourceLimitExceededError(ValueError):
+    """Exception raised when the input exceeds one of the configured resource limits."""
+
+    def __init__(self, limit: str, maximum: int) -> None:
+        """Initialize ResourceLimitExceededError."""
+        super().__init__(f"Resource limit exceeded: {limit} is {maximum}")
+        self.limit = limit
+        self.maximum = maximum
+
+    def __reduce__(self) -> tuple[type["ResourceLimitExceededError"], tuple[str, int]]:
+        """Pickle the error with its arguments, e.g. to send it from a worker process."""
+        return self.__class__, (self.limit, self.maximum)
+
+
+class FormattingVerificationError(ValueError):
+    """Exception raised by `--verify` when the formatted output does not hold the same data as the input."""
+
+    def __init__(self, reason: str) -> None:
+        """Initialize FormattingVerificationError."""
+        super().__init__(f"Formatting verification failed: {reason}")
+        self.reason = reason
+
+    def __reduce__(self) -> tuple[type["FormattingVerificationError"], tuple[str]]:
+        """Pickle the error with its arguments, e.g. to send it from a worker process."""
+        return self.__class__, (self.reason,)
+
+
+class FileProcessingTimeoutError(TimeoutError):
+    """Exception raised when processing a file takes longer than its time budget."""
+
+    def __init__(self, timeout: float) -> None:
+        """Initialize FileProcessingTimeoutError."""
+        super().__init__(f"Processing took longer than {timeout:g}s")
+        self.timeout = timeout
+
+
+class WorkerProcessError(RuntimeError):
+    """Exception raised when a worker process dies while processing a file."""
+
+    def __init__(self, exit_code: int | None) -> None:
+        """Initialize WorkerProcessError."""
+        super().__init__(f"The worker process died (exit code {exit_code})")
+
+
+class GitCommandError(RuntimeError):
+    """Exception raised when a git command fails."""
+
+    def __init__(self, command: str, stderr: str) -> None:
+        """Initialize GitCommandError."""
+        super().__init__(f"git {command} failed: {stderr.strip()}")
+
+
+class GitBlobReadError(GitCommandError):
+    """Exception raised when a blob cannot be read from the git object database."""
+
+    def __init__(self, object_name: str, header: str) -> None:
+        """Initialize GitBlobReadError."""
+        super().__init__("cat-file --batch", f"cannot read blob {object_name} ({header})")
+
+
+class InvalidConfigFileError(ValueError):
+    """Exception raised for an invalid yamkix configuration file."""
+
+    def __init__(self, path: str, reason: str) -> None:
+        """Initialize InvalidConfigFileError."""
+        super().__init__(f"Invalid yamkix configuration file [{path}]: {reason}")
+
+
+class InvalidShardSpecError(ValueError):
+    """Exception raised for an invalid --shard option value."""
+
+    def __init__(self, value: str) -> None:
+        """Initialize InvalidShardSpecError."""
+        super().__init__(f"'{value}' is not a valid shard, expected 'I/N' with 1 <= I <= N")
+
+
+class InvalidShardReportError(ValueError):
+    """Exception raised for an invalid shard report file."""
+
+    def __init__(self, path: str, reason: str) -> None:
+        """Initialize InvalidShardReportError."""
+        super().__init__(f"Invalid shard report [{path}]: {reason}")
@@ -0,0 +1,267 @@
+"""Format staged YAML blobs directly in the git index, without touching the working tree.
+
+Blobs are read through a single long-lived `git cat-file --batch` process, formatted in
+memory, streamed back to a single `git fast-import` call and the index is updated with a
+single `git update-index --index-info` call.
+
+The paths are decoded like the file system paths (`os.fsdecode`): the paths that are not
+valid UTF-8 keep their bytes, as surrogates.
+"""
+
+import os
+import subprocess
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Final
+
+from yamkix.config import YamkixConfig, get_yamkix_config_for_file
+from yamkix.errors import GitBlobReadError, GitCommandError, InvalidYamlContentError
+from yamkix.report import READ, FileProcessingStats, measure
+from yamkix.yamkix import FileProcessingResult, format_yaml_content
+
+GIT_YAML_SUFFIXES: Final = (".yml", ".yaml")
+GIT_REGULAR_FILE_MODES: Final = ("100644", "100755")
+
+
+@dataclass
+class GitIndexEntry:
+    """A stage 0 entry of the git index.
+
+    Attributes:
+        mode: The file mode, as an octal string (e.g. `100644`).
+        object_name: The name (hash) of the blob.
+        path: The path of the file, relative to the top level of the repository, decoded with `os.fsdecode`.
+    """
+
+    mode: str
+    object_name: str
+    path: str
+
+
+def run_git(args: list[str], cwd: Path | None = None, stdin: bytes | None = None) -> bytes:
+    """Run a git command and return its standard output.
+
+    Raises:
+        GitCommandError: If the command exits with a non zero status.
+    """
+    completed = subprocess.run(  # noqa: S603
+        ["git", *args],  # noqa: S607
+        cwd=cwd,
+        input=stdin,
+        capture_output=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise GitCommandError(" ".join(args), completed.stderr.decode("UTF-8", errors="replace"))
+    return completed.stdout
+
+
+def get_git_toplevel(cwd: Path | None = None) -> Path:
+    """Return the top level directory of the git repository containing `cwd`."""
+    return Path(os.fsdecode(run_git(["rev-parse", "--show-toplevel"], cwd=cwd).rstrip(b"\n"))).resolve()
+
+
+def list_index_entries(toplevel: Path) -> list[GitIndexEntry]:
+    """List the stage 0 regular file entries of the index.
+
+    Unmerged entries, symbolic links and submodules are skipped.
+    """
+    entries = []
+    output = run_git(["ls-files", "--stage", "-z"], cwd=toplevel)
+    for record in output.split(b"\0"):
+        if not record:
+            continue
+        info, path = record.split(b"\t", 1)
+        mode, object_name, stage = info.decode("ascii").split(" ")
+        if stage == "0" and mode in GIT_REGULAR_FILE_MODES:
+            entries.append(GitIndexEntry(mode=mode, object_name=object_name, path=os.fsdecode(path)))
+    return entries
+
+
+class GitCatFileBatch:
+    """Wrap a long-lived `git cat-file --batch` process."""
+
+    def __init__(self, toplevel: Path) -> None:
+        """Start the `git cat-file --batch` process."""
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],  # noqa: S607
+            cwd=toplevel,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    @property
+    def _stdin(self) -> IO[bytes]:
+        assert self._process.stdin is not None  # noqa: S101
+        return self._process.stdin
+
+    @property
+    def _stdout(self) -> IO[bytes]:
+        assert self._process.stdout is not None  # noqa: S101
+        return self._process.stdout
+
+    def read_blob(self, object_name: str) -> bytes:
+        """Return the content of a blob.
+
+        Raises:
+            GitBlobReadError: If the object does not exist or is not a blob.
+        """
+        self._stdin.write(object_name.encode("ascii") + b"\n")
+        self._stdin.flush()
+        header = self._stdout.readline().decode("ascii", errors="replace").split()
+        if len(header) != 3 or header[1] != "blob":  # noqa: PLR2004
+            raise GitBlobReadError(object_name, " ".join(header))
+        content = self._stdout.read(int(header[2]))
+        self._stdout.read(1)  # Trailing LF
+        return content
+
+    def close(self) -> None:
+        """Stop the `git cat-file --batch` process."""
+        self._stdin.close()
+        self._process.wait()
+        self._stdout.close()
+
+
+def write_blobs(toplevel: Path, contents: list[bytes]) -> list[str]:
+    """Write blobs to the object database with a single `git fast-import` call.
+
+    The contents are streamed to `git fast-import`, that writes them as they are (like
+    `git hash-object --no-filters`), each one with a mark whose blob name is then requested
+    with `get-mark`: no file is written but the objects.
+
+    Returns:
+        The names of the written blobs, in the same order as `contents`.
+    """
+    if not contents:
+        return []
+    stream = []
+    for mark, content in enumerate(contents, start=1):
+        stream.extend((f"blob\nmark :{mark}\ndata {len(content)}\n".encode("ascii"), content, b"\n"))
+    stream.extend(f"get-mark :{mark}\n".encode("ascii") for mark in range(1, len(contents) + 1))
+    output = run_git(["fast-import", "--quiet"], cwd=toplevel, stdin=b"".join(stream))
+    return output.decode("ascii").split()
+
+
+def update_index(toplevel: Path, entries: list[GitIndexEntry]) -> None:
+    """Update the index entries with a single `git update-index --index-info` call."""
+    if not entries:
+        return
+    index_info = b"".join(
+        f"{entry.mode} {entry.object_name}\t".encode("ascii") + os.fsencode(entry.path) + b"\0" for entry in entries
+    )
+    run_git(["update-index", "-z", "--index-info"], cwd=toplevel, stdin=index_info)
+
+
+class GitIndexFormatter:
+    """Format staged YAML files in the git index.
+
+    Use it as a context manager: the formatted blobs are written and the index
+    is updated in batch when leaving the context without error.
+    """
+
+    def __init__(
+        self,
+        cwd: Path | None = None,
+        format_content: Callable[[str, YamkixConfig, FileProcessingStats | None], str] = format_yaml_content,
+    ) -> None:
+        """Create a new GitIndexFormatter for the repository containing `cwd`.
+
+        Args:
+            cwd: A directory of the repository, the current directory by default.
+            format_content: The function formatting the content of a blob, taking an optional
+                `FileProcessingStats` instance as third argument.
+        """
+        self.toplevel = get_git_toplevel(cwd)
+        self._format_content = format_content
+        self._entries: dict[str, GitIndexEntry] = {}
+        self._pending: list[tuple[GitIndexEntry, bytes]] = []
+        self._cat_file: GitCatFileBatch | None = None
+
+    def __enter__(self) -> "GitIndexFormatter":  # noqa: PYI034
+        """Start the `git cat-file --batch` process."""
+        self._entries = {entry.path: entry for entry in list_index_entries(self.toplevel)}
+        self._cat_file = GitCatFileBatch(self.toplevel)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Write the formatted blobs and update the index."""
+        if self._cat_file is not None:
+            self._cat_file.close()
+            self._cat_file = None
+        if exc_type is None:
+            self.flush()
+
+    def get_configs(self, yamkix_configs: Iterable[YamkixConfig]) -> list[YamkixConfig]:
+        """Return one config per staged file to format.
+
+        If `yamkix_configs` holds a single config without input file (`STDIN`), all the
+        staged YAML files are selected. Otherwise only the staged files matching the input
+        files of the configs are selected. The input and output of the returned configs are
+        the paths of the files, relative to the top level of the repository.
+        """
+        yamkix_configs = list(yamkix_configs)
+        if len(yamkix_configs) == 1 and yamkix_configs[0].io_config.input is None:
+            return [
+                get_yamkix_config_for_file(yamkix_configs[0], path)
+                for path in self._entries
+                if path.endswith(GIT_YAML_SUFFIXES)
+            ]
+        configs = []
+        for config in yamkix_configs:
+            path = Path(str(config.io_config.input)).resolve()
+            if not path.is_relative_to(self.toplevel):
+                continue
+            relative_path = path.relative_to(self.toplevel).as_posix()
+            if relative_path in self._entries:
+                configs.append(get_yamkix_config_for_file(config, relative_path))
+        return configs
+
+    def format_staged_file(
+        self, yamkix_config: YamkixConfig, stats: FileProcessingStats | None = None
+    ) -> FileProcessingResult:
+        """Format the staged content of the file designated by the input of the config.
+
+        The formatted blobs are written in batch by `flush`: no write duration is measured in `stats`.
+
+        Raises:
+            InvalidYamlContentError: If the staged content is not valid YAML, or not UTF-8.
+        """
+        if self._cat_file is None:
+            msg = "GitIndexFormatter must be used as a context manager."
+            raise RuntimeError(msg)
+        entry = self._entries[str(yamkix_config.io_config.input)]
+        with measure(stats, READ):
+            blob = self._cat_file.read_blob(entry.object_name)
+        try:
+            raw_input = blob.decode("UTF-8")
+        except UnicodeDecodeError as e:
+            # Reported as an invalid content, the blob is left as is
+            raise InvalidYamlContentError from e
+        formatted = self._format_content(raw_input, yamkix_config, stats)
+        unchanged = formatted == raw_input
+        if not unchanged:
+            self._pending.append((entry, formatted.encode("UTF-8")))
+        return FileProcessingResult(
+            input_display_name=yamkix_config.io_config.input_display_name,
+            error=False,
+            unchanged=unchanged,
+        )
+
+    def flush(self) -> None:
+        """Write the pending formatted blobs and update the index accordingly."""
+        object_names = write_blobs(self.toplevel, [content for _, content in self._pending])
+        update_index(
+            self.toplevel,
+            [
+                GitIndexEntry(mode=entry.mode, object_name=object_name, path=entry.path)
+                for (entry, _), object_name in zip(self._pending, object_names, strict=True)
+            ],
+        )
+        self._pending = []
@@ -1,16 +1,26 @@
 """Useful (I guess) helpers."""
 
+import os
+from collections.abc import Iterable, Iterator
 from functools import lru_cache
-from typing import Any
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Final
 
-from rich.console import Console
-from rich.theme import Theme
 from ruamel.yaml.comments import CommentedMap, CommentedSeq
 from ruamel.yaml.scalarstring import DoubleQuotedScalarString, SingleQuotedScalarString
 
 from yamkix.__version__ import __version__
 
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.theme import Theme
+
 StreamType = Any  # Copied from ruamel.yaml compat.py line 58
+FILES_FROM_CHUNK_SIZE: Final = 64 * 1024
+# The unit of the sizes, memory and throughputs printed by yamkix (MiB)
+MEBIBYTE: Final = 1024 * 1024
+# The suffixes of the files found as YAML files under a directory
+YAML_FILE_SUFFIXES: Final = (".yml", ".yaml")
 
 
 def remove_all_linebreaks(comment: StreamType) -> StreamType:
@@ -69,25 +79,33 @@ def get_yamkix_version() -> str:
     return __version__
 
 
-def get_custom_theme() -> Theme:
+def get_custom_theme() -> "Theme":
     """Get the custom theme for the CLI.
 
+    `rich` is imported on demand, to keep it out of the non interactive runs.
+
     Returns:
         Theme: The custom theme for the CLI.
     """
+    from rich.theme import Theme  # noqa: PLC0415
+
     return Theme({"info": "dim cyan", "warning": "bold yellow", "error": "bold red"})
 
 
 @lru_cache
-def get_stderr_console() -> Console:
+def get_stderr_console() -> "Console":
     """Return the CLI rich console."""
+    from rich.console import Console  # noqa: PLC0415
+
     custom_theme = get_custom_theme()
     return Console(theme=custom_theme, stderr=True)
 
 
 @lru_cache
-def get_stdout_console() -> Console:
+def get_stdout_console() -> "Console":
     """Return the CLI rich console."""
+    from rich.console import Console  # noqa: PLC0415
+
     custom_theme = get_custom_theme()
     return Console(theme=custom_theme, stderr=False)
 
@@ -135,3 +153,49 @@ def convert_flow_to_block_style(
         data.fa.set_block_style()
         for item in data:
             convert_flow_to_block_style(item)
+
+
+def iter_paths_from_stream(stream: IO[bytes], nul_separated: bool = False) -> Iterator[str]:
+    """Lazily read a list of paths from a binary stream.
+
+    Paths are yielded as soon as they are available, so that processing can start
+    before the producer (`git ls-files -z`, `find -print0`, ...) is done.
+    Empty entries are skipped.
+
+    Args:
+        stream: The binary stream to read from (a file or `sys.stdin.buffer`).
+        nul_separated: Whether the paths are separated by NUL characters instead of newlines.
+
+    Yields:
+        The paths, decoded with the file system encoding.
+    """
+    if not nul_separated:
+        for line in stream:
+            path = line.rstrip(b"\r\n")
+            if path:
+                yield os.fsdecode(path)
+        return
+    read = getattr(stream, "read1", stream.read)
+    remainder = b""
+    while chunk := read(FILES_FROM_CHUNK_SIZE):
+        *paths, remainder = (remainder + chunk).split(b"\0")
+        yield from (os.fsdecode(path) for path in paths if path)
+    if remainder:
+        yield os.fsdecode(remainder)
+
+
+def is_yaml_file(path: Path | str) -> bool:
+    """Tell whether a file is a YAML file, according to its suffix."""
+    return str(path).endswith(YAML_FILE_SUFFIXES)
+
+
+def iter_yaml_files(roots: Iterable[Path]) -> Iterator[Path]:
+    """Yield the roots that are files, and the YAML files found under the roots that are directories."""
+    for root in roots:
+        if root.is_file():
+            yield root
+            continue
+        for dir_path, _, file_names in os.walk(root):
+            for file_name in file_names:
+                if is_yaml_file(file_name):
+                    yield Path(dir_path) / file_name
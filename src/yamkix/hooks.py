@@ -0,0 +1,92 @@
+"""Let library users observe the processing of files, e.g. to export metrics or traces.
+
+Subclass `YamkixHooks`, override the methods of the events to observe and register an
+instance with `register_hooks`. Without registered hooks, the processing only pays for
+a check of an empty list per event.
+
+Hooks are called synchronously, in the process (and thread) doing the work: the worker
+processes of the `--timeout` CLI option are not observed, and the threads of the `--threads`
+CLI option call the hooks concurrently. An exception raised by a hook aborts the processing
+of the file.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from yamkix.config import YamkixConfig
+    from yamkix.yamkix import FileProcessingResult
+
+
+class YamkixHooks:
+    """The events that can be observed, each method does nothing by default."""
+
+    def on_file_start(self, yamkix_config: "YamkixConfig") -> None:
+        """Call when `round_trip_and_format` starts processing the input of `yamkix_config`."""
+
+    def on_phase_end(self, phase: str, duration: float) -> None:
+        """Call when a phase ends, `duration` being in seconds.
+
+        `phase` is one of `read`, `parse`, `emit`, `verify` and `write` (see `yamkix.report.PHASES`), or the
+        name of a transform: `quotes`, `block_style`, `comment_alignment` and `comment_spacing`.
+        The `emit` phase and the transforms run once per document.
+        """
+
+    def on_document(self, document: Any, index: int) -> None:  # noqa: ANN401
+        """Call when a document has been dumped, `index` being its position in the input.
+
+        The large literal block scalars are not set aside while hooks are registered (see `yamkix.passthrough`): the
+        document holds their values.
+        """
+
+    def on_file_end(self, result: "FileProcessingResult") -> None:
+        """Call when `round_trip_and_format` successfully processed a file."""
+
+    def on_file_error(self, yamkix_config: "YamkixConfig", error: Exception) -> None:
+        """Call when `round_trip_and_format` fails to process the input of `yamkix_config`."""
+
+
+registered_hooks: list[YamkixHooks] = []
+
+
+def register_hooks(hooks: YamkixHooks) -> None:
+    """Start calling `hooks` on each event, after the hooks already registered."""
+    registered_hooks.append(hooks)
+
+
+def unregister_hooks(hooks: YamkixHooks) -> None:
+    """Stop calling `hooks`.
+
+    Raises:
+        ValueError: If `hooks` is not registered.
+    """
+    registered_hooks.remove(hooks)
+
+
+def notify_file_start(yamkix_config: "YamkixConfig") -> None:
+    """Call `on_file_start` on the registered hooks."""
+    for hooks in registered_hooks:
+        hooks.on_file_start(yamkix_config)
+
+
+def notify_phase_end(phase: str, duration: float) -> None:
+    """Call `on_phase_end` on the registered hooks."""
+    for hooks in registered_hooks:
+        hooks.on_phase_end(phase, duration)
+
+
+def notify_document(document: Any, index: int) -> None:  # noqa: ANN401
+    """Call `on_document` on the registered hooks."""
+    for hooks in registered_hooks:
+        hooks.on_document(document, index)
+
+
+def notify_file_end(result: "FileProcessingResult") -> None:
+    """Call `on_file_end` on the registered hooks."""
+    for hooks in registered_hooks:
+        hooks.on_file_end(result)
+
+
+def notify_file_error(yamkix_config: "YamkixConfig", error: Exception) -> None:
+    """Call `on_file_error` on the registered hooks."""
+    for hooks in registered_hooks:
+        hooks.on_file_error(yamkix_config, error)
@@ -0,0 +1,136 @@
+"""Load JSON content with the C parser of the standard library instead of the YAML parser.
+
+JSON files (valid YAML) are common, e.g. generated by tools, and the pure Python scanner of
+`ruamel.yaml` is the bulk of their formatting time. A content made of an object or an array
+is parsed by the `json` module, and its document is built the way the loader of the parsing
+mode builds it, so that the output does not depend on the path taken:
+
+- in `rt` mode, `CommentedMap` and `CommentedSeq` in flow style, the strings being double
+  quoted scalar strings when the quotes are preserved and the floats keeping their
+  representation (`1.5e3` stays `1.5e3`);
+- in `safe` mode, plain dicts and lists.
+
+The content goes through the YAML parser when it is not valid JSON (e.g. a flow mapping with
+plain scalars), or when the YAML parser would load it differently or reject it: blank lines,
+tabs out of the collection, duplicated keys, keys too long for or not on the line of their
+colon, surrogate pairs, `NaN` and `Infinity`. Generated JSON (e.g. `json.dumps`, `jq`) has
+none of them.
+"""
+
+import json
+import re
+from typing import Any, Final
+
+from ruamel.yaml import YAML
+from ruamel.yaml.comments import CommentedMap, CommentedSeq
+from ruamel.yaml.nodes import ScalarNode
+from ruamel.yaml.scalarstring import DoubleQuotedScalarString
+
+# The content may be JSON: an object or an array, without the leading line breaks that the YAML
+# parser keeps as a comment, nor the tabs that it rejects out of the collection
+JSON_START: Final = re.compile(r" *[\[{]")
+JSON_TRAILING_BLANKS: Final = " \r\n"
+# Loaded differently, or rejected, by the YAML parser. Each pattern starts with a literal, for
+# the search to stay cheap on large contents.
+NOT_LOADED_AS_YAML: Final = (
+    # The halves of an escaped surrogate pair are kept, the `json` module combines them
+    re.compile(r"\\u[dD][89abAB]"),
+    # A blank line may be kept as a comment, an implicit key spans a single line
+    re.compile(r"\n[ \t\r]*[\n:]"),
+    # A line break made of a single carriage return
+    re.compile(r"\r(?!\n)"),
+)
+# A YAML simple key spans at most 1024 characters, an escaped character taking up to 6 of them
+MAX_KEY_LENGTH: Final = 1024 // len("\\uXXXX")
+FLOAT_TAG: Final = "tag:yaml.org,2002:float"
+
+
+class _NotLoadedAsYamlError(ValueError):
+    """Raised while parsing JSON content that the YAML parser would load differently, or reject."""
+
+    def __init__(self, reason: str) -> None:
+        """Initialize _NotLoadedAsYamlError."""
+        super().__init__(f"Not loaded as YAML: {reason}")
+
+
+def _reject_constant(name: str) -> Any:  # noqa: ANN401
+    """Reject `NaN`, `Infinity` and `-Infinity`, that are not JSON (nor YAML) numbers."""
+    raise _NotLoadedAsYamlError(reason=name)
+
+
+def _check_keys(pairs: list[tuple[str, Any]]) -> None:
+    """Reject the keys of an object that the YAML parser would reject."""
+    if len({key for key, _ in pairs}) != len(pairs):
+        raise _NotLoadedAsYamlError(reason="duplicated key")
+    if any(len(key) > MAX_KEY_LENGTH for key, _ in pairs):
+        raise _NotLoadedAsYamlError(reason="key too long")
+
+
+def _load_safe(content: str) -> Any:  # noqa: ANN401
+    """Parse JSON content into the plain dicts and lists of the `safe` loader."""
+
+    def build_map(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+        _check_keys(pairs)
+        return dict(pairs)
+
+    return json.loads(content, object_pairs_hook=build_map, parse_constant=_reject_constant)
+
+
+def _load_round_trip(content: str, yaml: YAML) -> Any:  # noqa: ANN401
+    """Parse JSON content into the flow style collections and scalars of the `rt` loader of `yaml`."""
+    constructor = yaml.constructor
+    quote = DoubleQuotedScalarString if yaml.preserve_quotes else str
+
+    def build_value(value: Any) -> Any:  # noqa: ANN401
+        # The objects are already built, bottom up, by `build_map`
+        value_type = type(value)
+        if value_type is str:
+            return quote(value)
+        if value_type is list:
+            seq = CommentedSeq(build_value(item) for item in value)
+            seq.fa.set_flow_style()
+            return seq
+        return value
+
+    def build_map(pairs: list[tuple[str, Any]]) -> CommentedMap:
+        _check_keys(pairs)
+        data = CommentedMap()
+        data.fa.set_flow_style()
+        for key, value in pairs:
+            data[quote(key)] = build_value(value)
+        return data
+
+    def build_float(text: str) -> Any:  # noqa: ANN401
+        return constructor.construct_yaml_float(ScalarNode(FLOAT_TAG, text))
+
+    return build_value(
+        json.loads(content, object_pairs_hook=build_map, parse_float=build_float, parse_constant=_reject_constant)
+    )
+
+
+def looks_like_json(content: str) -> bool:
+    """Tell whether `content` may be JSON that the YAML parser loads like the `json` module, without parsing it."""
+    if JSON_START.match(content) is None:
+        return False
+    # The trailing blank lines are not kept by the YAML parser
+    stripped = content.rstrip(JSON_TRAILING_BLANKS)
+    return stripped[-1:] in {"]", "}"} and all(pattern.search(stripped) is None for pattern in NOT_LOADED_AS_YAML)
+
+
+def load_json_document(content: str, yaml: YAML) -> Any | None:  # noqa: ANN401
+    """Load `content` with the `json` module, if it is JSON that the YAML parser would load the same way.
+
+    Args:
+        content: The content to load, for which `looks_like_json` is true.
+        yaml: The `YAML` instance that would load the content, for its parsing mode and options.
+
+    Returns:
+        The document, built like `yaml` would build it, or `None` if the content must be loaded by `yaml`.
+    """
+    try:
+        if yaml.typ == ["rt"]:
+            return _load_round_trip(content, yaml)
+        return _load_safe(content)
+    except (ValueError, RecursionError):
+        # Not JSON, or not loaded the same way by the YAML parser
+        return None
@@ -0,0 +1,125 @@
+"""Enforce resource limits while parsing untrusted YAML input.
+
+The limits are checked by a `ruamel.yaml` composer, while the node graph is built and
+before any Python object is constructed, so that a pathological input (deeply nested,
+huge or expanding aliases like the "billion laughs" attack) is rejected early.
+"""
+
+import functools
+from pathlib import Path
+from typing import Any, Final
+
+from ruamel.yaml import YAML
+from ruamel.yaml.composer import Composer
+from ruamel.yaml.events import AliasEvent, StreamStartEvent
+
+from yamkix.config import YamkixResourceLimits
+from yamkix.errors import ResourceLimitExceededError
+
+# Worst case size of a character encoded in UTF-8
+MAX_UTF8_BYTES_PER_CHAR: Final = 4
+# Names of the limits, as reported by ResourceLimitExceededError
+MAX_BYTES: Final = "max_bytes"
+MAX_DOCUMENTS: Final = "max_documents"
+MAX_DEPTH: Final = "max_depth"
+MAX_NODES: Final = "max_nodes"
+MAX_ALIAS_EXPANSION: Final = "max_alias_expansion"
+
+
+def check_input_size(raw_input: str, limits: YamkixResourceLimits | None) -> None:
+    """Check the size of some YAML content, encoded in UTF-8, against `limits.max_bytes`.
+
+    Raises:
+        ResourceLimitExceededError: If the content is too large.
+    """
+    if limits is None or limits.max_bytes is None:
+        return
+    # Avoid encoding the content when its length is enough to decide
+    if len(raw_input) > limits.max_bytes or (
+        len(raw_input) * MAX_UTF8_BYTES_PER_CHAR > limits.max_bytes
+        and len(raw_input.encode("UTF-8")) > limits.max_bytes
+    ):
+        raise ResourceLimitExceededError(MAX_BYTES, limits.max_bytes)
+
+
+def check_file_size(path: str, limits: YamkixResourceLimits | None) -> None:
+    """Check the size of a file against `limits.max_bytes`, before reading it.
+
+    Raises:
+        ResourceLimitExceededError: If the file is too large.
+    """
+    if limits is not None and limits.max_bytes is not None and Path(path).stat().st_size > limits.max_bytes:
+        raise ResourceLimitExceededError(MAX_BYTES, limits.max_bytes)
+
+
+class LimitedComposer(Composer):
+    """A composer enforcing resource limits on each stream it composes.
+
+    Each alias adds the number of nodes of the node it refers to (including the nodes
+    reached through its own aliases) to the alias expansion count.
+    """
+
+    def __init__(self, loader: Any = None, limits: YamkixResourceLimits | None = None) -> None:  # noqa: ANN401
+        """Create a new composer.
+
+        Args:
+            loader: The `YAML` instance the composer belongs to.
+            limits: The limits to enforce.
+        """
+        super().__init__(loader=loader)
+        self.limits = limits if limits is not None else YamkixResourceLimits()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.depth = 0
+        self._documents = 0
+        self._nodes = 0
+        self._expanded_nodes = 0
+        self._alias_expansion = 0
+        self._anchor_sizes: dict[str, int] = {}
+
+    def check_node(self) -> Any:  # noqa: ANN401
+        """Tell whether a document is available, resetting the counters at the start of a stream."""
+        if self.parser.check_event(StreamStartEvent):
+            self._reset_counters()
+        return super().check_node()
+
+    def compose_document(self) -> Any:  # noqa: ANN401
+        """Compose a document, enforcing `max_documents`."""
+        self._documents += 1
+        max_documents = self.limits.max_documents
+        if max_documents is not None and self._documents > max_documents:
+            raise ResourceLimitExceededError(MAX_DOCUMENTS, max_documents)
+        return super().compose_document()
+
+    def compose_node(self, parent: Any, index: Any) -> Any:  # noqa: ANN401
+        """Compose a node, enforcing `max_depth`, `max_nodes` and `max_alias_expansion`."""
+        event = self.parser.peek_event()
+        if isinstance(event, AliasEvent):
+            size = self._anchor_sizes.get(event.anchor, 0)
+            self._expanded_nodes += size
+            self._alias_expansion += size
+            max_alias_expansion = self.limits.max_alias_expansion
+            if max_alias_expansion is not None and self._alias_expansion > max_alias_expansion:
+                raise ResourceLimitExceededError(MAX_ALIAS_EXPANSION, max_alias_expansion)
+            return super().compose_node(parent, index)
+        self._nodes += 1
+        if self.limits.max_nodes is not None and self._nodes > self.limits.max_nodes:
+            raise ResourceLimitExceededError(MAX_NODES, self.limits.max_nodes)
+        if self.limits.max_depth is not None and self.depth >= self.limits.max_depth:
+            raise ResourceLimitExceededError(MAX_DEPTH, self.limits.max_depth)
+        expanded_nodes_before = self._expanded_nodes
+        self._expanded_nodes += 1
+        node = super().compose_node(parent, index)
+        if event.anchor is not None:
+            self._anchor_sizes[event.anchor] = self._expanded_nodes - expanded_nodes_before
+        return node
+
+
+def set_resource_limits(yaml: YAML, limits: YamkixResourceLimits) -> None:
+    """Make a `YAML` instance enforce resource limits when loading content.
+
+    The `YAML` instance must use the pure Python parser (`pure=True`): the C parser
+    composes the nodes by itself.
+    """
+    yaml.Composer = functools.partial(LimitedComposer, limits=limits)
@@ -0,0 +1,92 @@
+"""Print the yamkix status lines on stderr, according to a verbosity level.
+
+Messages are written as plain text, unless stderr is an interactive terminal: the `rich`
+console (with its markup and theming) is only used in that case. The effective configuration is printed once
+per distinct configuration, not once per file, so that batch runs over thousands of
+files do not flood the logs.
+"""
+
+import sys
+from enum import IntEnum
+from typing import TextIO
+
+from yamkix.__version__ import __version__
+from yamkix.config import YamkixConfig, YamkixStyleKey, get_yamkix_style_key
+from yamkix.helpers import get_stderr_console
+from yamkix.yamkix import FileProcessingResult
+
+
+class Verbosity(IntEnum):
+    """The verbosity levels, each level printing the messages of the lower ones too."""
+
+    QUIET = 0
+    """Errors and explicitly requested output (e.g. `--summary`) only."""
+    NORMAL = 1
+    """Warnings and each distinct effective configuration."""
+    VERBOSE = 2
+    """One line per processed file."""
+    DEBUG = 3
+    """The outcome and processing time of each file."""
+
+
+def get_verbosity(silent: bool, verbose: int) -> Verbosity:
+    """Return the verbosity level matching the `--silent` and `--verbose` (count) options, `--silent` winning."""
+    if silent:
+        return Verbosity.QUIET
+    return Verbosity(min(Verbosity.NORMAL + verbose, Verbosity.DEBUG))
+
+
+class YamkixLogger:
+    """Print messages on stderr (or a given stream) when the verbosity level allows it."""
+
+    def __init__(self, verbosity: Verbosity = Verbosity.NORMAL, stream: TextIO | None = None) -> None:
+        """Create a new logger.
+
+        Args:
+            verbosity: The maximum level of the messages to print.
+            stream: The stream to write to, `sys.stderr` (at the time of writing) by default.
+                Messages written to a given stream are always plain text.
+        """
+        self.verbosity = verbosity
+        self._stream = stream
+        self._interactive = stream is None and sys.stderr.isatty()
+        self._logged_configs: set[YamkixStyleKey] = set()
+
+    def log(self, level: Verbosity, message: str, style: str = "info") -> None:
+        """Print a message if `level` is enabled, `style` being a style of the rich theme of yamkix."""
+        if level > self.verbosity:
+            return
+        if self._interactive:
+            get_stderr_console().print(message, style=style, markup=False, highlight=False)
+        else:
+            (self._stream or sys.stderr).write(message + "\n")
+
+    def error(self, message: str) -> None:
+        """Print an error, whatever the verbosity level."""
+        self.log(Verbosity.QUIET, message, style="error")
+
+    def warning(self, message: str) -> None:
+        """Print a warning."""
+        self.log(Verbosity.NORMAL, message, style="warning")
+
+    def info(self, message: str) -> None:
+        """Print an informational message."""
+        self.log(Verbosity.NORMAL, message)
+
+    def log_config(self, yamkix_config: YamkixConfig) -> None:
+        """Print the effective configuration the first time it is seen, and the processed file when verbose."""
+        if self.verbosity < Verbosity.NORMAL:
+            return
+        style_key = get_yamkix_style_key(yamkix_config)
+        if style_key not in self._logged_configs:
+            self._logged_configs.add(style_key)
+            self.info(f"[yamkix({__version__})] Configuration: {yamkix_config}")
+        self.log(Verbosity.VERBOSE, f"[yamkix] Processing: {yamkix_config.io_config}")
+
+    def log_result(self, result: FileProcessingResult) -> None:
+        """Print the outcome and processing time of a file."""
+        if self.verbosity < Verbosity.DEBUG:
+            return
+        outcome = "error" if result.error else "unchanged" if result.unchanged else "reformatted"
+        elapsed = f" in {result.elapsed:.3f}s" if result.elapsed is not None else ""
+        self.log(Verbosity.DEBUG, f"[yamkix] {result.input_display_name}: {outcome}{elapsed}")
@@ -0,0 +1,349 @@
+"""Provide a Language Server Protocol server formatting YAML documents.
+
+The server speaks JSON-RPC over `STDIN`/`STDOUT` and implements `textDocument/formatting`
+and `textDocument/rangeFormatting`. Open documents are kept in memory (incremental sync)
+and formatted with warm cached writers. Formatting results are returned as a single
+minimal text edit, covering only the lines that actually change.
+"""
+
+import json
+import re
+from dataclasses import fields
+from typing import IO, TYPE_CHECKING, Any, Final
+
+from ruamel.yaml.error import YAMLError
+
+from yamkix.config import YamkixConfig, get_default_yamkix_config, get_yamkix_config_from_default
+from yamkix.errors import FormattingVerificationError, InvalidYamlContentError, ResourceLimitExceededError
+from yamkix.minimal_edit import MinimalEditFormatter
+from yamkix.yamkix import format_yaml_content
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+JsonObject = dict[str, Any]
+
+CONTENT_LENGTH_HEADER: Final = b"content-length"
+TEXT_DOCUMENT_SYNC_INCREMENTAL: Final = 2
+# See https://microsoft.github.io/language-server-protocol/specifications/lsp/3.17/specification/#errorCodes
+METHOD_NOT_FOUND: Final = -32601
+INVALID_REQUEST: Final = -32600
+REQUEST_FAILED: Final = -32803
+# The errors of the formatting of a document, answered as failed requests
+FORMATTING_ERRORS: Final = (
+    FormattingVerificationError,
+    InvalidYamlContentError,
+    ResourceLimitExceededError,
+    RecursionError,
+    YAMLError,
+)
+DOCUMENT_SEPARATOR_PATTERN: Final = re.compile(r"^---(?:[ \t]|$)")
+# The document end marker (`...`) ending a document
+DOCUMENT_END_PATTERN: Final = re.compile(r"(?:^|\n)\.\.\.[ \t]*\n?\Z")
+# A line without YAML content: blank, or a comment
+EMPTY_LINE_PATTERN: Final = re.compile(r"^[ \t]*(?:#.*)?\r?\n?$")
+
+
+def utf16_length(text: str) -> int:
+    """Return the length of a string in UTF-16 code units, as used by LSP positions."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def utf16_offset_to_index(line: str, character: int) -> int:
+    """Convert a UTF-16 character offset within a line to a string index."""
+    if line.isascii():
+        return min(character, len(line))
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1  # noqa: PLR2004
+    return len(line)
+
+
+def position_to_index(lines: list[str], position: JsonObject) -> int:
+    """Convert an LSP position to an index in the text made of `lines` (with line endings)."""
+    line = position["line"]
+    if line >= len(lines):
+        return sum(len(text) for text in lines)
+    return sum(len(text) for text in lines[:line]) + utf16_offset_to_index(
+        lines[line].rstrip("\r\n"), position["character"]
+    )
+
+
+def apply_content_change(text: str, change: JsonObject) -> str:
+    """Apply a `TextDocumentContentChangeEvent` to a text."""
+    if "range" not in change:
+        return change["text"]
+    lines = text.splitlines(keepends=True)
+    start = position_to_index(lines, change["range"]["start"])
+    end = position_to_index(lines, change["range"]["end"])
+    return text[:start] + change["text"] + text[end:]
+
+
+def compute_minimal_edits(original: str, formatted: str) -> list[JsonObject]:
+    """Return the `TextEdit`s turning `original` into `formatted`.
+
+    A single edit replacing the lines between the longest common prefix and suffix
+    of lines is returned, or no edit at all if both texts are identical.
+    """
+    if original == formatted:
+        return []
+    original_lines = original.splitlines(keepends=True)
+    formatted_lines = formatted.splitlines(keepends=True)
+    prefix = 0
+    max_prefix = min(len(original_lines), len(formatted_lines))
+    while prefix < max_prefix and original_lines[prefix] == formatted_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    max_suffix = max_prefix - prefix
+    while suffix < max_suffix and original_lines[-1 - suffix] == formatted_lines[-1 - suffix]:
+        suffix += 1
+    end_line = len(original_lines) - suffix
+    if end_line == len(original_lines) and original_lines and not original_lines[-1].endswith("\n"):
+        # The last line has no line ending, the edit must end at its last character
+        end = {"line": end_line - 1, "character": utf16_length(original_lines[-1])}
+    else:
+        end = {"line": end_line, "character": 0}
+    return [
+        {
+            "range": {"start": {"line": prefix, "character": 0}, "end": end},
+            "newText": "".join(formatted_lines[prefix : len(formatted_lines) - suffix]),
+        }
+    ]
+
+
+def split_yaml_documents(text: str) -> list[tuple[int, str]]:
+    """Split a YAML stream on document start markers (`---` at column 0).
+
+    The directives (`%YAML`, `%TAG`) stay with the document following them.
+
+    Returns:
+        The documents, as `(first line number, text)` tuples, whose concatenation is the original text.
+    """
+    documents: list[tuple[int, str]] = []
+    current: list[str] = []
+    first_line = 0
+    # Whether the current chunk holds directives, and YAML content
+    has_directives = has_content = False
+    for line_number, line in enumerate(text.splitlines(keepends=True)):
+        is_directive = line.startswith("%")
+        if current and (
+            (is_directive and has_content)
+            or (DOCUMENT_SEPARATOR_PATTERN.match(line) and (has_content or not has_directives))
+        ):
+            documents.append((first_line, "".join(current)))
+            current = []
+            first_line = line_number
+            has_directives = has_content = False
+        current.append(line)
+        has_directives = has_directives or is_directive
+        has_content = has_content or not (is_directive or EMPTY_LINE_PATTERN.match(line))
+    if current:
+        documents.append((first_line, "".join(current)))
+    return documents
+
+
+def format_yaml_range(text: str, yamkix_config: YamkixConfig, start_line: int, end_line: int) -> str:
+    """Format only the YAML documents of a stream that intersect a range of lines.
+
+    Chunks without any YAML document (comments only) are left as is. A document is formatted
+    with its directives.
+
+    Raises:
+        InvalidYamlContentError: If one of the documents to format is invalid.
+    """
+    formatted_documents = []
+    documents = split_yaml_documents(text)
+    for index, (first_line, document) in enumerate(documents):
+        last_line = first_line + len(document.splitlines()) - 1
+        if last_line < start_line or first_line > end_line:
+            formatted_documents.append(document)
+            continue
+        formatted = format_yaml_content(document, yamkix_config) or document
+        if index + 1 < len(documents) and documents[index + 1][1].startswith("%"):
+            # The directives of the next document must follow a document end marker
+            formatted += "" if DOCUMENT_END_PATTERN.search(formatted) else "...\n"
+        formatted_documents.append(formatted)
+    return "".join(formatted_documents)
+
+
+def get_yamkix_config_from_initialization_options(options: JsonObject | None) -> YamkixConfig:
+    """Build the formatting configuration from the `initializationOptions` sent by the client.
+
+    The options are the keyword arguments of `get_yamkix_config_from_default`, either at the top
+    level or under a `yamkix` key. Unknown options are ignored.
+    """
+    if not options:
+        return get_default_yamkix_config()
+    options = options.get("yamkix", options)
+    allowed = {field.name for field in fields(YamkixConfig)} - {"io_config", "version"}
+    return get_yamkix_config_from_default(**{key: value for key, value in options.items() if key in allowed})
+
+
+class LspError(Exception):
+    """A JSON-RPC error to send back to the client."""
+
+    def __init__(self, code: int, message: str) -> None:
+        """Initialize LspError."""
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class YamkixLanguageServer:
+    """A minimal Language Server Protocol server for yamkix."""
+
+    def __init__(self, reader: IO[bytes], writer: IO[bytes], yamkix_config: YamkixConfig | None = None) -> None:
+        """Create a server reading messages from `reader` and writing them to `writer`."""
+        self._reader = reader
+        self._writer = writer
+        self.yamkix_config = yamkix_config if yamkix_config is not None else get_default_yamkix_config()
+        self.documents: dict[str, str] = {}
+        # The documents are formatted again and again, only the edited regions need to be
+        self.formatter = MinimalEditFormatter()
+        self._shutdown_requested = False
+        self._running = False
+        self._handlers: dict[str, Callable[[JsonObject], Any]] = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown,
+            "exit": self.exit,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+            "textDocument/formatting": self.formatting,
+            "textDocument/rangeFormatting": self.range_formatting,
+        }
+
+    def read_message(self) -> JsonObject | None:
+        """Read a message, `None` meaning that the input stream is closed."""
+        content_length = None
+        while True:
+            header = self._reader.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.partition(b":")
+            if name.strip().lower() == CONTENT_LENGTH_HEADER:
+                content_length = int(value.strip())
+        if content_length is None:
+            return None
+        return json.loads(self._reader.read(content_length))
+
+    def write_message(self, message: JsonObject) -> None:
+        """Write a message."""
+        body = json.dumps({"jsonrpc": "2.0", **message}, ensure_ascii=False, separators=(",", ":")).encode("UTF-8")
+        self._writer.write(b"Content-Length: " + str(len(body)).encode("ascii") + b"\r\n\r\n" + body)
+        self._writer.flush()
+
+    def handle_message(self, message: JsonObject) -> None:
+        """Dispatch a request or a notification to its handler, replying to requests."""
+        method = message.get("method")
+        is_request = "id" in message
+        if method is None:
+            return  # A response to a request we never sent
+        handler = self._handlers.get(method)
+        if handler is None:
+            if is_request:
+                self.write_message({"id": message["id"], "error": {"code": METHOD_NOT_FOUND, "message": method}})
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except LspError as e:
+            if is_request:
+                self.write_message({"id": message["id"], "error": {"code": e.code, "message": e.message}})
+            return
+        except Exception as e:  # noqa: BLE001 - an unexpected error must not stop the server
+            if is_request:
+                error = {"code": REQUEST_FAILED, "message": f"{type(e).__name__}: {e}"}
+                self.write_message({"id": message["id"], "error": error})
+            return
+        if is_request:
+            self.write_message({"id": message["id"], "result": result})
+
+    def serve(self) -> bool:
+        """Serve requests until the `exit` notification is received or the input stream is closed.
+
+        Returns:
+            Whether the client requested a shutdown before leaving.
+        """
+        self._running = True
+        while self._running and (message := self.read_message()) is not None:
+            self.handle_message(message)
+        return self._shutdown_requested
+
+    def initialize(self, params: JsonObject) -> JsonObject:
+        """Handle the `initialize` request."""
+        self.yamkix_config = get_yamkix_config_from_initialization_options(params.get("initializationOptions"))
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": TEXT_DOCUMENT_SYNC_INCREMENTAL},
+                "documentFormattingProvider": True,
+                "documentRangeFormattingProvider": True,
+            },
+            "serverInfo": {"name": "yamkix"},
+        }
+
+    def shutdown(self, _params: JsonObject) -> None:
+        """Handle the `shutdown` request."""
+        self._shutdown_requested = True
+
+    def exit(self, _params: JsonObject) -> None:
+        """Handle the `exit` notification."""
+        self._running = False
+
+    def did_open(self, params: JsonObject) -> None:
+        """Handle the `textDocument/didOpen` notification."""
+        self.documents[params["textDocument"]["uri"]] = params["textDocument"]["text"]
+
+    def did_change(self, params: JsonObject) -> None:
+        """Handle the `textDocument/didChange` notification."""
+        uri = params["textDocument"]["uri"]
+        text = self.documents.get(uri, "")
+        for change in params["contentChanges"]:
+            text = apply_content_change(text, change)
+        self.documents[uri] = text
+
+    def did_close(self, params: JsonObject) -> None:
+        """Handle the `textDocument/didClose` notification."""
+        self.documents.pop(params["textDocument"]["uri"], None)
+
+    def _get_document(self, params: JsonObject) -> str:
+        uri = params["textDocument"]["uri"]
+        if uri not in self.documents:
+            raise LspError(INVALID_REQUEST, f"Unknown document {uri}")
+        return self.documents[uri]
+
+    def formatting(self, params: JsonObject) -> list[JsonObject]:
+        """Handle the `textDocument/formatting` request."""
+        text = self._get_document(params)
+        try:
+            formatted = self.formatter.format(text, self.yamkix_config)
+        except FORMATTING_ERRORS as e:
+            raise LspError(REQUEST_FAILED, str(e)) from e
+        return compute_minimal_edits(text, formatted)
+
+    def range_formatting(self, params: JsonObject) -> list[JsonObject]:
+        """Handle the `textDocument/rangeFormatting` request."""
+        text = self._get_document(params)
+        try:
+            formatted = format_yaml_range(
+                text,
+                self.yamkix_config,
+                start_line=params["range"]["start"]["line"],
+                end_line=params["range"]["end"]["line"],
+            )
+        except FORMATTING_ERRORS as e:
+            raise LspError(REQUEST_FAILED, str(e)) from e
+        return compute_minimal_edits(text, formatted)
+
+
+def run_language_server(reader: IO[bytes], writer: IO[bytes]) -> bool:
+    """Run a yamkix Language Server Protocol server until the client exits.
+
+    Returns:
+        Whether the client requested a shutdown before leaving.
+    """
+    return YamkixLanguageServer(reader, writer).serve()
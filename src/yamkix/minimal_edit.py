@@ -0,0 +1,233 @@
+"""Format some YAML content by rewriting only the regions that are not formatted yet.
+
+The regenerating engine (`format_yaml_content`) parses and dumps the whole content, even
+when a single line breaks a rule. This engine splits the content into regions, using the
+tokens (with their positions) of the `ruamel.yaml` scanner: one region per top level key
+of each document, the first region of a document holding its start marker and leading
+comments. Each region is formatted on its own by the regenerating engine, unless it is
+known to be formatted already: its text is then copied verbatim.
+
+The regions known to be formatted are the outputs of the previous formattings, kept by a
+`MinimalEditFormatter` instance: the engine pays off in long lived processes (the language
+server, the watch mode) where the same files are formatted again and again, each edit
+only rewriting the regions it touched. A cold formatter formats every region.
+
+The regenerating engine stays the reference: the content is formatted as a whole when the
+regions cannot be formatted independently (comments aligned across the top level keys, an
+alias to an anchor of another region, a keep chomped block scalar ending a region...), when
+the content is not valid, and outside of the round trip mode.
+"""
+
+import hashlib
+import itertools
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Final
+
+from ruamel.yaml.error import YAMLError
+from ruamel.yaml.tokens import (
+    AliasToken,
+    BlockEndToken,
+    BlockMappingStartToken,
+    BlockSequenceStartToken,
+    DirectiveToken,
+    DocumentEndToken,
+    DocumentStartToken,
+    FlowMappingEndToken,
+    FlowMappingStartToken,
+    FlowSequenceEndToken,
+    FlowSequenceStartToken,
+    KeyToken,
+    ScalarToken,
+    StreamEndToken,
+    TagToken,
+)
+
+from yamkix.config import YamkixConfig, YamkixStyleKey, get_yamkix_style_key
+from yamkix.errors import InvalidYamlContentError
+from yamkix.limits import check_input_size
+from yamkix.yamkix import format_yaml_content
+from yamkix.yaml_writer import get_thread_local_yaml
+
+DEFAULT_MAX_KNOWN_REGIONS: Final = 65536
+# A document end marker, e.g. written after a keep chomped (`|+`) block scalar ending a region
+DOCUMENT_END_MARKER: Final = re.compile(r"^\.\.\.(?:[ \t\r\n]|$)", re.MULTILINE)
+# The tokens opening and closing collections
+DEPTH_CHANGES: Final[dict[type, int]] = {
+    BlockMappingStartToken: 1,
+    BlockSequenceStartToken: 1,
+    FlowMappingStartToken: 1,
+    FlowSequenceStartToken: 1,
+    BlockEndToken: -1,
+    FlowMappingEndToken: -1,
+    FlowSequenceEndToken: -1,
+}
+
+
+@dataclass(frozen=True)
+class Region:
+    """A part of some YAML content that can be formatted on its own.
+
+    Attributes:
+        text: The text of the region.
+        starts_document: Whether the region is the first one of its document.
+        ends_document: Whether the region is the last one of its document.
+    """
+
+    text: str
+    starts_document: bool
+    ends_document: bool
+
+
+def _split_document(content: str, start: int, end: int, keys: list[int]) -> list[Region]:
+    """Split the document `content[start:end]` on the offsets of its top level keys, but the first one."""
+    boundaries = [start, *keys[1:], end]
+    return [
+        Region(
+            text=content[region_start:region_end],
+            starts_document=index == 0,
+            ends_document=index == len(boundaries) - 2,
+        )
+        for index, (region_start, region_end) in enumerate(itertools.pairwise(boundaries))
+    ]
+
+
+def split_regions(content: str) -> list[Region] | None:
+    """Split some YAML content into regions, whose concatenation is the original content.
+
+    A document whose top level node is not an untagged block mapping (e.g. a `!!set`) is a single region.
+
+    Returns:
+        The regions, or `None` if the content cannot be split: it is not valid, holds aliases
+        (that may refer to an anchor of another region), directives, document end markers,
+        duplicated or complex top level keys.
+    """
+    regions: list[Region] = []
+    document_start = 0
+    keys: list[int] = []
+    key_values: set[str] = set()
+    is_key_value = False
+    depth = 0
+    top_level_mapping = False
+    top_level_tagged = False
+    try:
+        # Only the positions of the tokens are needed: the (faster) safe scanner skips the comments
+        for token in get_thread_local_yaml("safe", pure=True).scan(content):
+            if isinstance(token, (AliasToken, DirectiveToken, DocumentEndToken)):
+                return None
+            if is_key_value:
+                # A top level key must be a scalar, for duplicated keys to be detected
+                if not isinstance(token, ScalarToken) or token.value in key_values:
+                    return None
+                key_values.add(token.value)
+                is_key_value = False
+            if isinstance(token, (DocumentStartToken, StreamEndToken)):
+                document_end = token.start_mark.index
+                if document_end > document_start:
+                    regions.extend(_split_document(content, document_start, document_end, keys))
+                document_start = document_end
+                keys = []
+                key_values = set()
+                top_level_mapping = False
+                top_level_tagged = False
+            elif isinstance(token, KeyToken):
+                is_key_value = top_level_mapping and depth == 1 and token.start_mark.column == 0
+                if is_key_value:
+                    keys.append(token.start_mark.index)
+            else:
+                # The keys of a tagged mapping are not formatted alike without the tag
+                top_level_tagged = top_level_tagged or (depth == 0 and isinstance(token, TagToken))
+                top_level_mapping = top_level_mapping or (
+                    depth == 0 and not top_level_tagged and isinstance(token, BlockMappingStartToken)
+                )
+                depth += DEPTH_CHANGES.get(type(token), 0)
+    except YAMLError:
+        return None
+    return regions
+
+
+def get_region_config(yamkix_config: YamkixConfig, region: Region) -> YamkixConfig:
+    """Return the config formatting a region.
+
+    Only the first region of a document gets the start marker, and only its last region the end marker.
+    """
+    if region.starts_document and region.ends_document:
+        return yamkix_config
+    return replace(
+        yamkix_config,
+        explicit_start=yamkix_config.explicit_start and region.starts_document,
+        explicit_end=yamkix_config.explicit_end and region.ends_document,
+    )
+
+
+class MinimalEditFormatter:
+    """Format YAML contents, copying verbatim the regions known to be formatted already.
+
+    The formatter remembers the regions of its outputs, per formatting options, up to
+    `max_known_regions` (the least recently used ones being forgotten first). An instance
+    must not be shared by threads formatting content concurrently.
+    """
+
+    def __init__(self, max_known_regions: int = DEFAULT_MAX_KNOWN_REGIONS) -> None:
+        """Create a new formatter, that does not know any formatted region yet."""
+        self.max_known_regions = max_known_regions
+        self._known_regions: OrderedDict[tuple[YamkixStyleKey, bool, bool, bytes], None] = OrderedDict()
+
+    def _get_region_key(self, style_key: YamkixStyleKey, region: Region) -> tuple[YamkixStyleKey, bool, bool, bytes]:
+        digest = hashlib.blake2b(region.text.encode("UTF-8"), digest_size=16).digest()
+        return (style_key, region.starts_document, region.ends_document, digest)
+
+    def _remember(self, key: tuple[YamkixStyleKey, bool, bool, bytes]) -> None:
+        self._known_regions[key] = None
+        self._known_regions.move_to_end(key)
+        while len(self._known_regions) > self.max_known_regions:
+            self._known_regions.popitem(last=False)
+
+    def is_known(self, yamkix_config: YamkixConfig, region: Region) -> bool:
+        """Tell whether a region is known to be formatted with the formatting options of `yamkix_config`."""
+        return self._get_region_key(get_yamkix_style_key(yamkix_config), region) in self._known_regions
+
+    def format(self, raw_input: str, yamkix_config: YamkixConfig) -> str:
+        """Format some YAML content in memory, like `format_yaml_content` does.
+
+        Raises:
+            InvalidYamlContentError: If the YAML content is invalid.
+            ResourceLimitExceededError: If the content exceeds one of the resource limits of the config.
+        """
+        check_input_size(raw_input, yamkix_config.limits)
+        style_key = get_yamkix_style_key(yamkix_config)
+        # A whole content is known as a region starting and ending its document, formatted with the same config
+        whole = Region(text=raw_input, starts_document=True, ends_document=True)
+        if self._get_region_key(style_key, whole) in self._known_regions:
+            return raw_input
+        regions = (
+            split_regions(raw_input)
+            if yamkix_config.parsing_mode == "rt" and not yamkix_config.align_comments
+            else None
+        )
+        if not regions:
+            return format_yaml_content(raw_input, yamkix_config)
+        chunks = []
+        formatted_keys = []
+        for region in regions:
+            key = self._get_region_key(style_key, region)
+            if key in self._known_regions:
+                self._known_regions.move_to_end(key)
+                chunks.append(region.text)
+                continue
+            try:
+                formatted = format_yaml_content(region.text, get_region_config(yamkix_config, region))
+            except InvalidYamlContentError:
+                # A region may not be valid on its own, the whole content may be
+                return format_yaml_content(raw_input, yamkix_config)
+            if not region.ends_document and DOCUMENT_END_MARKER.search(formatted):
+                # e.g. a region ending with a keep chomped block scalar: the marker would end the document there
+                return format_yaml_content(raw_input, yamkix_config)
+            chunks.append(formatted)
+            formatted_keys.append(self._get_region_key(style_key, replace(region, text=formatted)))
+        output = "".join(chunks)
+        formatted_keys.append(self._get_region_key(style_key, replace(whole, text=output)))
+        for key in formatted_keys:
+            self._remember(key)
+        return output
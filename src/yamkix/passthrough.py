@@ -0,0 +1,174 @@
+"""Carry the text of large literal block scalars through the formatting untouched.
+
+Literal block scalars (`key: |`) embedding large payloads (certificates, JSON dashboards,
+scripts) dominate the cost of their document, although `ruamel.yaml` emits their lines
+as they were read, only re-indented. Before parsing, the body of each large literal
+block scalar that is already emitted as is (printable ASCII, no trailing spaces) is
+replaced by a single line placeholder. After formatting, each placeholder is replaced by
+the original body, re-indented like the placeholder.
+
+The placeholders are checked in the formatted output: if one of them is not found alone
+on a line following a literal block scalar header, the content must be formatted again
+without passthrough.
+"""
+
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Final
+
+# The smallest body of a literal block scalar worth carrying through, in characters
+PASSTHROUGH_MIN_SIZE: Final = 4096
+# A literal block scalar header: `key: |`, `- |`, `- key: |-`... without anchor, tag or comment.
+# Block scalars of other styles are matched too, for their body to be skipped.
+BLOCK_SCALAR_HEADER: Final = re.compile(
+    r"^(?P<indent> *)(?P<dashes>(?:- +)*)(?:(?P<key>[^\s#?!&*|>'\"-][^#\n]*?|\"[^\"\n]*\"|'[^'\n]*'): +)?"
+    r"(?P<style>[|>])(?P<chomping>[-+]?)(?P<indentation>[1-9]?)[-+]? *$",
+    re.MULTILINE,
+)
+# Characters that may make the emitter change the style of a scalar, or are not worth the risk
+NOT_PASSED_THROUGH: Final = re.compile(r"[^\x20-\x7e\n]| \n")
+LEADING_SPACES: Final = re.compile(r" *")
+
+
+@dataclass(frozen=True)
+class BlockScalarBody:
+    """The body of a literal block scalar replaced by a placeholder.
+
+    Attributes:
+        placeholder: The line replacing the body, without its indentation.
+        start: The offset of the first line of the body in the original content.
+        end: The offset of the end of the last non-empty line of the body in the original content.
+        indentation: The indentation of the body in the original content.
+    """
+
+    placeholder: str
+    start: int
+    end: int
+    indentation: int
+
+
+@dataclass(frozen=True)
+class MaskedContent:
+    """Some YAML content whose large literal block scalars are replaced by placeholders.
+
+    Attributes:
+        original: The original content.
+        content: The content to format, holding the placeholders.
+        bodies: The bodies replaced by placeholders, in the order of the original content.
+    """
+
+    original: str
+    content: str
+    bodies: list[BlockScalarBody]
+
+    def get_body_values(self) -> dict[str, str]:
+        """Return the value of each body replaced by a placeholder (without its final line break), by placeholder."""
+        return {
+            body.placeholder: "\n".join(
+                line[body.indentation :] for line in self.original[body.start : body.end].split("\n")
+            )
+            for body in self.bodies
+        }
+
+
+def _get_parent_indentation(header: re.Match[str]) -> int:
+    """Return the indentation of the node holding a block scalar, its body being more indented."""
+    column = len(header["indent"])
+    dashes = header["dashes"]
+    if header["key"] is not None:
+        return column + len(dashes)
+    return column + dashes.rstrip().rfind("-")
+
+
+def _get_body_end(content: str, start: int, parent_indentation: int) -> int:
+    """Return the offset of the first line after the body of a block scalar starting at `start`."""
+    end_of_body = re.compile(rf"^ {{0,{parent_indentation}}}\S", re.MULTILINE).search(content, start)
+    return end_of_body.start() if end_of_body is not None else len(content)
+
+
+def _is_passed_through(header: re.Match[str], body: str, parent_indentation: int, min_size: int) -> bool:
+    """Tell whether a body is worth carrying through and is emitted as is by `ruamel.yaml`."""
+    if (
+        len(body) < min_size
+        or header["style"] != "|"
+        or header["chomping"] == "+"
+        or header["indentation"]
+        or (header["key"] is None and not header["dashes"])
+    ):
+        return False
+    indentation = len(body) - len(body.lstrip(" "))
+    if indentation <= parent_indentation or NOT_PASSED_THROUGH.search(body) is not None:
+        return False
+    # A line less indented than the first one ends the scalar, or is invalid
+    return re.search(rf"^ {{0,{indentation - 1}}}\S", body, re.MULTILINE) is None
+
+
+def mask_block_scalars(content: str, min_size: int = PASSTHROUGH_MIN_SIZE) -> MaskedContent | None:
+    """Replace the body of the large literal block scalars of `content` by placeholders.
+
+    Returns:
+        The masked content, or `None` if there is no body to carry through.
+    """
+    # The placeholders must not be found anywhere else in the content
+    prefix = f"yamkix-passthrough-{uuid.uuid4().hex}"
+    bodies: list[BlockScalarBody] = []
+    position = 0
+    while (header := BLOCK_SCALAR_HEADER.search(content, position)) is not None:
+        start = header.end() + 1
+        parent_indentation = _get_parent_indentation(header)
+        next_line = _get_body_end(content, start, parent_indentation)
+        # The empty lines following the body are left in place, they are not part of the (clipped) value
+        end = start + len(content[start:next_line].rstrip(" \n"))
+        if _is_passed_through(header, content[start:end], parent_indentation, min_size):
+            bodies.append(
+                BlockScalarBody(
+                    placeholder=f"{prefix}-{len(bodies)}",
+                    start=start,
+                    end=end,
+                    indentation=LEADING_SPACES.match(content, start).end() - start,  # pyright: ignore[reportOptionalMemberAccess]
+                )
+            )
+        position = max(next_line, header.end())
+    if not bodies:
+        return None
+    chunks = []
+    position = 0
+    for body in bodies:
+        chunks.extend((content[position : body.start], " " * body.indentation, body.placeholder))
+        position = body.end
+    chunks.append(content[position:])
+    return MaskedContent(original=content, content="".join(chunks), bodies=bodies)
+
+
+def unmask_block_scalars(formatted: str, masked: MaskedContent) -> str | None:
+    """Replace the placeholders of the formatted content by the original bodies, re-indented.
+
+    Returns:
+        The formatted content, or `None` if a placeholder is not found where expected.
+    """
+    found: list[tuple[int, int, BlockScalarBody]] = []
+    for body in masked.bodies:
+        offset = formatted.find(body.placeholder)
+        if offset == -1 or formatted.find(body.placeholder, offset + 1) != -1:
+            return None
+        line_start = formatted.rfind("\n", 0, offset) + 1
+        header_line = formatted[formatted.rfind("\n", 0, max(line_start - 1, 0)) + 1 : line_start].rstrip("\n ")
+        if (
+            formatted[line_start:offset].strip(" ")
+            or not header_line.endswith(("|", "|-"))
+            or not formatted.startswith("\n", offset + len(body.placeholder))
+        ):
+            return None
+        found.append((offset, offset - line_start, body))
+    chunks = []
+    position = 0
+    for offset, indentation, body in sorted(found, key=lambda item: item[0]):
+        chunks.append(formatted[position : offset - indentation])
+        text = masked.original[body.start : body.end]
+        if indentation != body.indentation:
+            text = re.sub(rf"^ {{{body.indentation}}}", " " * indentation, text, flags=re.MULTILINE)
+        chunks.append(text)
+        position = offset + len(body.placeholder)
+    chunks.append(formatted[position:])
+    return "".join(chunks)
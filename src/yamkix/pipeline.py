@@ -0,0 +1,285 @@
+"""Overlap the reading and writing of files with the formatting of other files.
+
+The files of a batch are processed in three stages, connected by bounded queues:
+
+- a read-ahead thread reads the inputs of the upcoming files, up to `read_ahead` files
+  waiting to be formatted,
+- the calling thread formats each file, as `round_trip_and_format` does,
+- a write-behind thread writes the outputs, up to `write_behind` outputs waiting to be
+  written.
+
+A stage waits when its output queue is full (back-pressure): the memory used stays bounded,
+and the total time gets close to the time of the slowest stage (e.g. the I/O on network file
+systems) instead of the sum of the times of all the stages.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Final
+
+from yamkix.config import YamkixConfig
+from yamkix.hooks import notify_file_end, notify_file_error, notify_file_start
+from yamkix.report import READ, WRITE, FileProcessingStats, measure, record_phase_duration
+from yamkix.yamkix import FileProcessingResult, format_yaml_content, read_input, write_formatted_output
+
+# The time to wait for a queue before checking whether the pipeline was closed, in seconds
+QUEUE_POLLING_INTERVAL: Final = 0.1
+
+
+@dataclass(frozen=True)
+class PrefetchedInput:
+    """The input of a file, read ahead of its formatting.
+
+    Attributes:
+        yamkix_config: The config of the file.
+        raw_input: The content read, `None` if it could not be read.
+        error: The error raised while reading the input, if any.
+        duration: The time taken to read the input, in seconds.
+    """
+
+    yamkix_config: YamkixConfig
+    raw_input: str | None
+    error: Exception | None
+    duration: float
+
+
+class _EndOfConfigs:
+    """Put in the read-ahead queue once the configs are exhausted, with the error raised while iterating, if any."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+
+
+class PipelinedFormatter:
+    """Read the files ahead of their formatting, and write the outputs behind it, in background threads.
+
+    Use it as a context manager, or call `close` when done: the pending outputs are written
+    when leaving the context.
+    """
+
+    def __init__(
+        self,
+        format_content: Callable[[str, YamkixConfig, FileProcessingStats | None], str] = format_yaml_content,
+        read_ahead: int = 0,
+        write_behind: int = 0,
+        on_write_error: Callable[[FileProcessingResult, Exception], None] | None = None,
+    ) -> None:
+        """Create a new formatter, the background threads are started on first use.
+
+        Args:
+            format_content: The function formatting the content of a file, taking an optional
+                `FileProcessingStats` instance as third argument.
+            read_ahead: The maximum number of files read and waiting to be formatted, 0 to read each
+                file when it is formatted.
+            write_behind: The maximum number of outputs waiting to be written, 0 to write each output
+                as soon as it is formatted.
+            on_write_error: Called with the result of a file and the error raised while writing its
+                output behind, in the calling thread, once the write failed (see `is_written`). If not
+                set, `close` raises the first of these errors.
+        """
+        self.format_content = format_content
+        self.read_ahead = read_ahead
+        self.write_behind = write_behind
+        self.on_write_error = on_write_error
+        self._closed = threading.Event()
+        self._prefetched: PrefetchedInput | None = None
+        self._reader: threading.Thread | None = None
+        self._read_queue: queue.Queue[PrefetchedInput | _EndOfConfigs] = queue.Queue(maxsize=max(read_ahead, 1))
+        self._writer: threading.Thread | None = None
+        self._write_queue: queue.Queue[tuple[str, str | None, FileProcessingResult] | None] = queue.Queue(
+            maxsize=max(write_behind, 1)
+        )
+        # The outputs written by the write-behind thread, with their error if any, not reported yet
+        self._written: deque[tuple[FileProcessingResult, Exception | None]] = deque()
+        # The results whose output is queued or being written, by `id`
+        self._unwritten: set[int] = set()
+        self._write_errors: list[tuple[FileProcessingResult, Exception]] = []
+
+    def __enter__(self) -> "PipelinedFormatter":  # noqa: PYI034
+        """Return the formatter."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Write the pending outputs and stop the background threads."""
+        self.close(flush=exc_type is None)
+
+    def _put(self, items: queue.Queue, item: object) -> bool:
+        """Put `item` in `items`, waiting for a free slot, unless the pipeline is closed."""
+        while not self._closed.is_set():
+            try:
+                items.put(item, timeout=QUEUE_POLLING_INTERVAL)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _read_configs(self, yamkix_configs: Iterable[YamkixConfig]) -> None:
+        """Read the inputs of the configs, in the read-ahead thread."""
+        try:
+            for yamkix_config in yamkix_configs:
+                start_time = time.perf_counter()
+                try:
+                    raw_input, error = read_input(yamkix_config), None
+                except Exception as e:  # noqa: BLE001
+                    # Raised when the file is formatted, as if it was read then
+                    raw_input, error = None, e
+                prefetched = PrefetchedInput(yamkix_config, raw_input, error, time.perf_counter() - start_time)
+                if not self._put(self._read_queue, prefetched):
+                    return
+        except Exception as e:  # noqa: BLE001
+            self._put(self._read_queue, _EndOfConfigs(e))
+            return
+        self._put(self._read_queue, _EndOfConfigs())
+
+    def prefetch(self, yamkix_configs: Iterable[YamkixConfig]) -> Iterable[YamkixConfig]:
+        """Return the configs, their inputs being read ahead when `read_ahead` is set.
+
+        The configs are consumed by the read-ahead thread: an error raised while iterating
+        them is raised by the returned iterator, once the configs read before are consumed.
+        """
+        if self.read_ahead == 0:
+            return yamkix_configs
+        return self._iter_prefetched(yamkix_configs)
+
+    def _iter_prefetched(self, yamkix_configs: Iterable[YamkixConfig]) -> Iterator[YamkixConfig]:
+        self._reader = threading.Thread(
+            target=self._read_configs, args=(yamkix_configs,), name="yamkix-read-ahead", daemon=True
+        )
+        self._reader.start()
+        while not isinstance(item := self._read_queue.get(), _EndOfConfigs):
+            self._prefetched = item
+            yield item.yamkix_config
+        if item.error is not None:
+            raise item.error
+
+    def _write_outputs(self) -> None:
+        """Write the outputs, in the write-behind thread, until `None` is received."""
+        while (item := self._write_queue.get()) is not None:
+            formatted, output_file, result = item
+            try:
+                write_formatted_output(formatted, output_file)
+            except Exception as e:  # noqa: BLE001
+                # Reported by the calling thread, for the file of the output, and the next outputs are still written
+                self._written.append((result, e))
+            else:
+                self._written.append((result, None))
+            self._write_queue.task_done()
+        self._write_queue.task_done()
+
+    def _read(self, yamkix_config: YamkixConfig, stats: FileProcessingStats | None) -> str:
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is None or prefetched.yamkix_config is not yamkix_config:
+            with measure(stats, READ):
+                return read_input(yamkix_config)
+        record_phase_duration(stats, READ, prefetched.duration)
+        if prefetched.error is not None:
+            raise prefetched.error
+        return prefetched.raw_input  # pyright: ignore[reportReturnType]
+
+    def _write(
+        self, formatted: str, output_file: str | None, result: FileProcessingResult, stats: FileProcessingStats | None
+    ) -> None:
+        if self.write_behind == 0:
+            with measure(stats, WRITE):
+                write_formatted_output(formatted, output_file)
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_outputs, name="yamkix-write-behind", daemon=True)
+            self._writer.start()
+        self._unwritten.add(id(result))
+        self._write_queue.put((formatted, output_file, result))
+
+    def _report_written_outputs(self) -> None:
+        """Mark the outputs written behind as such, setting the error of the files whose output could not be."""
+        while self._written:
+            result, error = self._written.popleft()
+            self._unwritten.discard(id(result))
+            if error is None:
+                continue
+            result.error = True
+            if self.on_write_error is not None:
+                self.on_write_error(result, error)
+            else:
+                self._write_errors.append((result, error))
+
+    def is_written(self, result: FileProcessingResult) -> bool:
+        """Tell whether the output of a file is written, its result being final (e.g. `error` set if it failed).
+
+        The outputs written behind are only known to be written by the calling thread on the next call to
+        `round_trip_and_format`, or to `wait_for_outputs`.
+        """
+        return id(result) not in self._unwritten
+
+    def wait_for_outputs(self) -> None:
+        """Wait until the outputs waiting to be written behind are written."""
+        if self._writer is not None:
+            self._write_queue.join()
+        self._report_written_outputs()
+
+    def round_trip_and_format(
+        self, yamkix_config: YamkixConfig, stats: FileProcessingStats | None = None
+    ) -> FileProcessingResult:
+        """Load a file and save it formatted, like `round_trip_and_format`.
+
+        The input is the one read ahead if the config was returned by `prefetch`. With
+        `write_behind`, the output is written later on: the write phase is not measured in
+        `stats`, and the result is final once `is_written`: a write error is reported to
+        `on_write_error` (or raised by `close`).
+
+        Raises:
+            InvalidYamlContentError: If the YAML content is invalid.
+            ResourceLimitExceededError: If the input exceeds one of the resource limits of the config.
+            OSError: If an input cannot be read, or an output cannot be written.
+        """
+        self._report_written_outputs()
+        notify_file_start(yamkix_config)
+        try:
+            raw_input = self._read(yamkix_config, stats)
+            formatted = self.format_content(raw_input, yamkix_config, stats)
+            result = FileProcessingResult(
+                input_display_name=yamkix_config.io_config.input_display_name,
+                error=False,
+                unchanged=formatted == raw_input,
+            )
+            self._write(formatted, yamkix_config.io_config.output, result, stats)
+        except Exception as error:
+            notify_file_error(yamkix_config, error)
+            raise
+        notify_file_end(result)
+        return result
+
+    def close(self, flush: bool = True) -> None:
+        """Stop the background threads, after writing the pending outputs if `flush` is set.
+
+        Raises:
+            OSError: If `flush` is set, an output could not be written and `on_write_error` is not set.
+        """
+        self._closed.set()
+        if self._writer is not None:
+            if not flush:
+                self._written.clear()
+                with self._write_queue.mutex:
+                    self._write_queue.queue.clear()
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._reader is not None:
+            # Once closed, the read-ahead thread stops when it puts its next input: only wait for it on
+            # success, it may be blocked reading its configs otherwise (e.g. a list of files from STDIN)
+            if flush:
+                self._reader.join()
+            self._reader = None
+        if flush:
+            self._report_written_outputs()
+            if self._write_errors:
+                raise self._write_errors[0][1]
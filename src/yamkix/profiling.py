@@ -0,0 +1,128 @@
+"""Profile the processing of files with `cProfile`, in process and in the worker processes (`--profile-out`).
+
+The profiles of the worker processes are sent back to the parent process when the
+workers are stopped, and merged with the in-process profile into a single `pstats` file.
+"""
+
+import cProfile
+import functools
+import pstats
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Final, ParamSpec, TypeVar
+
+DEFAULT_PROFILE_TOP: Final = 20
+YAMKIX_PACKAGE: Final = "yamkix"
+RUAMEL_PACKAGE: Final = "ruamel.yaml"
+OTHER_PACKAGE: Final = "other"
+PACKAGES: Final = (YAMKIX_PACKAGE, RUAMEL_PACKAGE, OTHER_PACKAGE)
+YAMKIX_SOURCE_DIR: Final = str(Path(__file__).parent)
+
+# The raw stats of a profile, as found in `cProfile.Profile.stats` after `create_stats`
+RawProfileStats = dict[tuple[str, int, str], tuple[Any, ...]]
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class _RawStatsLoader:
+    """Let `pstats.Stats` load raw stats, e.g. received from a worker process."""
+
+    def __init__(self, stats: RawProfileStats) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        """Do nothing, the stats are already created."""
+
+
+def get_package(filename: str) -> str:
+    """Return the package (see `PACKAGES`) of the source file of a profiled function."""
+    if filename.startswith(YAMKIX_SOURCE_DIR):
+        return YAMKIX_PACKAGE
+    if "ruamel" in Path(filename).parts:
+        return RUAMEL_PACKAGE
+    return OTHER_PACKAGE
+
+
+class ProfileCollector:
+    """Profile the processing of files in process, and collect the profiles of the worker processes."""
+
+    def __init__(self) -> None:
+        """Create a new collector, nothing is profiled until a profiled function is called."""
+        self._profiler = cProfile.Profile()
+        self._depth = 0
+        self._worker_stats: list[RawProfileStats] = []
+
+    def profiled(self, func: Callable[P, R]) -> Callable[P, R]:
+        """Return a wrapper of `func` profiling its calls."""
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            self._depth += 1
+            if self._depth == 1:
+                self._profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._profiler.disable()
+
+        return wrapper
+
+    def add_worker_stats(self, stats: RawProfileStats) -> None:
+        """Add the profile of a worker process."""
+        self._worker_stats.append(stats)
+
+    def get_raw_stats(self) -> RawProfileStats:
+        """Return the raw stats of the profile of the current process, that can be sent to another process."""
+        self._profiler.create_stats()
+        return self._profiler.stats  # pyright: ignore[reportAttributeAccessIssue]
+
+    def get_stats(self) -> pstats.Stats:
+        """Return the merged profile of the current process and of the worker processes."""
+        merged = pstats.Stats()
+        for stats in (dict(self.get_raw_stats()), *self._worker_stats):
+            # pstats.Stats refuses to load an empty profile
+            if stats:
+                merged.add(_RawStatsLoader(stats))
+        return merged
+
+    def write(self, path: Path, top: int = DEFAULT_PROFILE_TOP) -> Path:
+        """Write the merged profile as a `pstats` file, and its summary (see `format_profile_summary`).
+
+        Returns:
+            The path of the summary, `path` with a `.txt` suffix appended.
+        """
+        stats = self.get_stats()
+        stats.dump_stats(path)
+        summary_path = path.with_name(path.name + ".txt")
+        summary_path.write_text(format_profile_summary(stats, top), encoding="UTF-8")
+        return summary_path
+
+
+def format_profile_summary(stats: pstats.Stats, top: int = DEFAULT_PROFILE_TOP) -> str:
+    """Return the self time of each package, and the `top` functions of each package by self time."""
+    raw_stats: RawProfileStats = stats.stats  # pyright: ignore[reportAttributeAccessIssue]
+    total_time: float = stats.total_tt  # pyright: ignore[reportAttributeAccessIssue]
+    functions_by_package: dict[str, list[tuple[float, float, int, str]]] = {package: [] for package in PACKAGES}
+    for (filename, line, name), (_, calls, self_time, cumulative_time, _) in raw_stats.items():
+        function = name if filename == "~" else f"{name} ({filename}:{line})"
+        functions_by_package[get_package(filename)].append((self_time, cumulative_time, calls, function))
+    lines = [
+        f"Total: {total_time:.3f}s in {sum(value[1] for value in raw_stats.values())} calls",
+        "",
+        "Self time by package:",
+    ]
+    for package, functions in functions_by_package.items():
+        package_time = sum(function[0] for function in functions)
+        lines.append(f"  {package:<12} {package_time:8.3f}s {100 * package_time / max(total_time, 1e-9):5.1f}%")
+    for package, functions in functions_by_package.items():
+        lines.extend(
+            ("", f"Top {top} functions of {package} by self time:", "     calls   self(s)  cumul(s)  function")
+        )
+        lines.extend(
+            f"  {calls:8d}  {self_time:8.3f}  {cumulative_time:8.3f}  {function}"
+            for self_time, cumulative_time, calls, function in sorted(functions, reverse=True)[:top]
+        )
+    return "\n".join(lines) + "\n"
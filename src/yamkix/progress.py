@@ -0,0 +1,165 @@
+"""Report the progress of a batch run from a separate thread.
+
+The processing loop only pays for a few attribute updates per file: the files are
+counted while they are pulled from the iterable of configs (see `ProgressReporter.track`),
+and the progress line is rendered by a background thread at a throttled rate. On an
+interactive terminal, the line is redrawn in place, otherwise (e.g. in CI logs) a plain
+line is printed periodically.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sized
+from types import TracebackType
+from typing import Final, TextIO
+
+from yamkix.config import YamkixConfig
+from yamkix.helpers import MEBIBYTE
+
+INTERACTIVE_REFRESH_INTERVAL: Final = 0.2
+PLAIN_REFRESH_INTERVAL: Final = 10.0
+SECONDS_PER_MINUTE: Final = 60
+CLEAR_LINE: Final = "\r\x1b[K"
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration like `42s` or `3m07s`."""
+    minutes, seconds = divmod(round(seconds), SECONDS_PER_MINUTE)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def _get_input_size(yamkix_config: YamkixConfig) -> int:
+    input_file = yamkix_config.io_config.input
+    if input_file is None:
+        return 0
+    try:
+        return os.stat(input_file).st_size  # noqa: PTH116
+    except OSError:
+        return 0
+
+
+class ProgressReporter:
+    """Track the files processed by a batch run and report the progress from a background thread.
+
+    Use it as a context manager around the processing loop, and wrap the configs to process
+    with `track`.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        interval: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a new reporter.
+
+        Args:
+            stream: The stream to write to, `sys.stderr` by default. The progress line is
+                redrawn in place when the stream is an interactive terminal.
+            interval: The time between two reports, in seconds. Defaults to
+                `INTERACTIVE_REFRESH_INTERVAL` or `PLAIN_REFRESH_INTERVAL`.
+            clock: The clock used to measure the throughput.
+        """
+        self._stream = stream if stream is not None else sys.stderr
+        self.interactive = self._stream.isatty()
+        if interval is None:
+            interval = INTERACTIVE_REFRESH_INTERVAL if self.interactive else PLAIN_REFRESH_INTERVAL
+        self.interval = interval
+        self._clock = clock
+        self.total: int | None = None
+        self.done = 0
+        self.bytes_done = 0
+        self.slowest: tuple[str, float] | None = None
+        self._current: tuple[str, int, float] | None = None
+        self._start_time = clock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "ProgressReporter":  # noqa: PYI034
+        """Start reporting from a background thread."""
+        self._start_time = self._clock()
+        self._thread = threading.Thread(target=self._run, name="yamkix-progress", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the background thread and print the final progress line."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._write(self.format_progress(), final=True)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._write(self.format_progress())
+
+    def _write(self, line: str, final: bool = False) -> None:
+        if self.interactive:
+            self._stream.write(CLEAR_LINE + line + ("\n" if final else ""))
+        else:
+            self._stream.write(line + "\n")
+        self._stream.flush()
+
+    def _finish_current(self) -> None:
+        if self._current is None:
+            return
+        name, size, start_time = self._current
+        elapsed = self._clock() - start_time
+        self.done += 1
+        self.bytes_done += size
+        if self.slowest is None or elapsed > self.slowest[1]:
+            self.slowest = (name, elapsed)
+        self._current = None
+
+    def track(self, yamkix_configs: Iterable[YamkixConfig]) -> Iterator[YamkixConfig]:
+        """Yield the configs, counting a file as done when the next one is requested.
+
+        The total number of files is known when `yamkix_configs` is sized (e.g. a list).
+        """
+        if isinstance(yamkix_configs, Sized):
+            self.total = len(yamkix_configs)
+        try:
+            for yamkix_config in yamkix_configs:
+                self._current = (
+                    yamkix_config.io_config.input_display_name,
+                    _get_input_size(yamkix_config),
+                    self._clock(),
+                )
+                yield yamkix_config
+                self._finish_current()
+        finally:
+            self._current = None
+
+    def format_progress(self) -> str:
+        """Return the progress line: files and bytes done, throughput, ETA and slowest file."""
+        elapsed = max(self._clock() - self._start_time, 1e-9)
+        done = self.done
+        files_per_second = done / elapsed
+        parts = [f"{done}/{self.total} files" if self.total is not None else f"{done} files"]
+        if self.total:
+            parts[0] += f" ({100 * done // self.total}%)"
+        parts.extend(
+            (
+                f"{self.bytes_done / MEBIBYTE:.1f} MiB",
+                f"{files_per_second:.1f} files/s",
+                f"{self.bytes_done / MEBIBYTE / elapsed:.2f} MiB/s",
+            )
+        )
+        if self.total is not None and files_per_second > 0:
+            parts.append(f"ETA {format_duration((self.total - done) / files_per_second)}")
+        slowest = self.slowest
+        current = self._current
+        if current is not None and (slowest is None or self._clock() - current[2] > slowest[1]):
+            # The file being processed is already the slowest one
+            slowest = (current[0], self._clock() - current[2])
+        if slowest is not None:
+            parts.append(f"slowest: {slowest[0]} ({slowest[1]:.3f}s)")
+        return "[yamkix] Progress: " + ", ".join(parts)
@@ -0,0 +1,230 @@
+"""Measure the processing of each file and stream the measures to a NDJSON report (`--report`).
+
+The measures are only taken when a `FileProcessingStats` instance is passed down the
+processing functions, or when hooks are registered (see `yamkix.hooks`): otherwise, the
+processing does not pay for any timer or count.
+"""
+
+import contextlib
+import json
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import IO, TYPE_CHECKING, Any, Final
+
+from ruamel.yaml.comments import CommentedBase
+from ruamel.yaml.tokens import CommentToken
+
+from yamkix.hooks import notify_phase_end, registered_hooks
+
+if TYPE_CHECKING:
+    from yamkix.yamkix import FileProcessingResult
+
+# The phases of the processing of a file, in order
+READ: Final = "read"
+PARSE: Final = "parse"
+TRANSFORM: Final = "transform"
+EMIT: Final = "emit"
+VERIFY: Final = "verify"
+WRITE: Final = "write"
+PHASES: Final = (READ, PARSE, TRANSFORM, EMIT, VERIFY, WRITE)
+# The transforms, part of the TRANSFORM phase
+QUOTES: Final = "quotes"
+BLOCK_STYLE: Final = "block_style"
+COMMENT_ALIGNMENT: Final = "comment_alignment"
+COMMENT_SPACING: Final = "comment_spacing"
+# Returned when there is nothing to measure, a null context can be reused
+NO_MEASURE: Final = contextlib.nullcontext()
+
+
+@dataclass
+class FileProcessingStats:
+    """Sizes, counts and durations measured while processing a file.
+
+    Attributes:
+        durations: The duration of each phase (see `PHASES`) that was run, in seconds.
+        transforms: The duration of each transform that was applied, in seconds.
+        input_bytes: The size of the input, encoded in UTF-8.
+        output_bytes: The size of the output, encoded in UTF-8.
+        documents: The number of documents of the input.
+        nodes: The number of nodes (scalars, mapping keys, maps and lists) of the input.
+        comments: The number of comment lines of the input.
+    """
+
+    durations: dict[str, float] = field(default_factory=dict)
+    transforms: dict[str, float] = field(default_factory=dict)
+    input_bytes: int | None = None
+    output_bytes: int | None = None
+    documents: int | None = None
+    nodes: int | None = None
+    comments: int | None = None
+
+    def add_phase_duration(self, phase: str, duration: float) -> None:
+        """Add `duration` to the duration of `phase`."""
+        self.durations[phase] = self.durations.get(phase, 0.0) + duration
+
+    def add_transform_duration(self, transform: str, duration: float) -> None:
+        """Add `duration` to the duration of `transform` and of the `TRANSFORM` phase."""
+        self.transforms[transform] = self.transforms.get(transform, 0.0) + duration
+        self.add_phase_duration(TRANSFORM, duration)
+
+    def record_input(self, raw_input: str, documents: list[Any]) -> None:
+        """Record the size of the input and count its documents, nodes and comments."""
+        self.input_bytes = len(raw_input.encode("UTF-8"))
+        self.documents = len(documents)
+        self.nodes = count_nodes(documents) - 1  # Not counting the list of documents
+        self.comments = count_comments(documents)
+
+    def update(self, other: "FileProcessingStats") -> None:
+        """Add the measures of `other`, e.g. taken in a worker process, to these ones."""
+        for phase, duration in other.durations.items():
+            self.durations[phase] = self.durations.get(phase, 0.0) + duration
+        for transform, duration in other.transforms.items():
+            self.transforms[transform] = self.transforms.get(transform, 0.0) + duration
+        for name in ("input_bytes", "output_bytes", "documents", "nodes", "comments"):
+            if (value := getattr(other, name)) is not None:
+                setattr(self, name, value)
+
+
+@contextlib.contextmanager
+def _measure(stats: FileProcessingStats | None, name: str, is_transform: bool) -> Iterator[None]:
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start_time
+        if stats is not None:
+            if is_transform:
+                stats.add_transform_duration(name, duration)
+            else:
+                stats.add_phase_duration(name, duration)
+        notify_phase_end(name, duration)
+
+
+def measure(stats: FileProcessingStats | None, phase: str) -> contextlib.AbstractContextManager[None]:
+    """Measure the duration of `phase` if `stats` is set or if hooks are registered."""
+    if stats is None and not registered_hooks:
+        return NO_MEASURE
+    return _measure(stats, phase, is_transform=False)
+
+
+def measure_transform(stats: FileProcessingStats | None, transform: str) -> contextlib.AbstractContextManager[None]:
+    """Measure the duration of `transform` if `stats` is set or if hooks are registered."""
+    if stats is None and not registered_hooks:
+        return NO_MEASURE
+    return _measure(stats, transform, is_transform=True)
+
+
+def record_phase_duration(stats: FileProcessingStats | None, phase: str, duration: float) -> None:
+    """Record the duration of `phase`, measured beforehand (e.g. by another thread), like `measure` does."""
+    if stats is not None:
+        stats.add_phase_duration(phase, duration)
+    notify_phase_end(phase, duration)
+
+
+def count_nodes(data: Any) -> int:  # noqa: ANN401
+    """Count the nodes of some loaded YAML content, the nodes shared by aliases being counted once."""
+    count = 0
+    seen: set[int] = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, (dict, list)):
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            if isinstance(node, dict):
+                stack.extend(node.keys())
+                stack.extend(node.values())
+            else:
+                stack.extend(node)
+    return count
+
+
+def _iter_comment_tokens(comment: Any) -> Iterator[CommentToken]:  # noqa: ANN401
+    if isinstance(comment, CommentToken):
+        yield comment
+    elif isinstance(comment, list):
+        for item in comment:
+            yield from _iter_comment_tokens(item)
+
+
+def count_comments(data: Any) -> int:  # noqa: ANN401
+    """Count the comment lines of some content loaded in round trip mode.
+
+    A comment token may be attached to several nodes (e.g. a flow list and its key), it is counted once.
+    """
+    tokens: dict[int, CommentToken] = {}
+    seen: set[int] = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, (dict, list)) or id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, CommentedBase) and hasattr(node, "ca"):
+            for comment in (node.ca.comment, *node.ca.items.values(), node.ca.end):
+                tokens.update((id(token), token) for token in _iter_comment_tokens(comment))
+        stack.extend(node.values() if isinstance(node, dict) else node)
+    return sum(1 for token in tokens.values() for line in token.value.splitlines() if line.lstrip().startswith("#"))
+
+
+def get_report_record(result: "FileProcessingResult", stats: FileProcessingStats | None) -> dict[str, Any]:
+    """Return the report record of a file, as a JSON compatible dict.
+
+    The duration of the phases that were not run (e.g. after an error) is `None`.
+    """
+    stats = stats if stats is not None else FileProcessingStats()
+    return {
+        "input": result.input_display_name,
+        "error": result.error,
+        "unchanged": result.unchanged,
+        "timed_out": result.timed_out,
+        "elapsed": result.elapsed,
+        **{phase: stats.durations.get(phase) for phase in PHASES},
+        "transforms": stats.transforms,
+        "input_bytes": stats.input_bytes,
+        "output_bytes": stats.output_bytes,
+        "documents": stats.documents,
+        "nodes": stats.nodes,
+        "comments": stats.comments,
+    }
+
+
+class ReportWriter:
+    """Write one JSON record per processed file to a NDJSON file, as the results arrive.
+
+    Use it as a context manager to open and close the file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Create a new writer, the file is opened (and truncated) when entering the context."""
+        self.path = path
+        self._stream: IO[str] | None = None
+
+    def __enter__(self) -> "ReportWriter":  # noqa: PYI034
+        """Open the report file."""
+        self._stream = self.path.open(mode="w", encoding="UTF-8")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the report file."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def write(self, result: "FileProcessingResult", stats: FileProcessingStats | None) -> None:
+        """Write the record of a file, flushed so that the report can be followed during the run."""
+        if self._stream is None:
+            msg = "ReportWriter must be used as a context manager."
+            raise RuntimeError(msg)
+        self._stream.write(json.dumps(get_report_record(result, stats)) + "\n")
+        self._stream.flush()
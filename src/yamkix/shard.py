@@ -0,0 +1,226 @@
+"""Split the files to process into balanced shards, and report the results of each shard.
+
+Files are assigned to shards deterministically, so that each CI node running
+`yamkix --shard i/N` over the same list of files processes a distinct part of it.
+Shards are balanced by the recorded processing time of the files when available
+(see `--shard-timings`), by their size otherwise.
+"""
+
+import json
+import os
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Final
+
+from yamkix.errors import InvalidShardReportError, InvalidShardSpecError
+from yamkix.yamkix import FileProcessingResult
+
+SHARD_REPORT_VERSION: Final = 1
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """A shard of the files to process.
+
+    Attributes:
+        index: The index of the shard, starting at 1.
+        count: The total number of shards.
+    """
+
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        """Return the shard as `index/count`."""
+        return f"{self.index}/{self.count}"
+
+
+def parse_shard_spec(value: str) -> ShardSpec:
+    """Parse a shard specification like `2/8`.
+
+    Raises:
+        InvalidShardSpecError: If the specification is not `i/N` with `1 <= i <= N`.
+    """
+    index, _, count = value.partition("/")
+    try:
+        shard = ShardSpec(index=int(index), count=int(count))
+    except ValueError as e:
+        raise InvalidShardSpecError(value) from e
+    if not 1 <= shard.index <= shard.count:
+        raise InvalidShardSpecError(value)
+    return shard
+
+
+def _get_file_size(file: str) -> int:
+    try:
+        return max(os.stat(file).st_size, 1)  # noqa: PTH116
+    except OSError:
+        return 1
+
+
+def get_file_weights(files: Sequence[str], timings: dict[str, float] | None = None) -> list[float]:
+    """Return the expected cost of processing each file.
+
+    Recorded timings are used when available. The other files are weighted by their size,
+    converted to seconds with the average throughput of the files with a recorded timing.
+    Files that cannot be stat'ed weigh as much as a one byte file.
+    """
+    sizes = [_get_file_size(file) for file in files]
+    timings = timings or {}
+    known = [(timings[file], size) for file, size in zip(files, sizes, strict=True) if file in timings]
+    known_size = sum(size for _, size in known)
+    seconds_per_byte = sum(timing for timing, _ in known) / known_size if known_size else 1.0
+    return [timings.get(file, size * seconds_per_byte) for file, size in zip(files, sizes, strict=True)]
+
+
+def assign_shards(weights: Sequence[float], count: int) -> list[int]:
+    """Assign items to `count` shards, balancing the total weight of each shard.
+
+    Items are taken from the heaviest to the lightest (ties broken by position), each one
+    going to the least loaded shard. The result only depends on the weights.
+
+    Returns:
+        The (0-based) shard of each item.
+    """
+    loads = [0.0] * count
+    sizes = [0] * count
+    assignments = [0] * len(weights)
+    for position in sorted(range(len(weights)), key=lambda position: (-weights[position], position)):
+        shard = min(range(count), key=lambda shard: (loads[shard], sizes[shard], shard))
+        loads[shard] += weights[position]
+        sizes[shard] += 1
+        assignments[position] = shard
+    return assignments
+
+
+def select_shard(files: Sequence[str], shard: ShardSpec, timings: dict[str, float] | None = None) -> list[bool]:
+    """Tell, for each file, whether it belongs to `shard`.
+
+    The files are deduplicated and sorted before the assignment, so that the order in
+    which they are discovered does not matter.
+    """
+    unique_files = sorted(set(files))
+    assignments = dict(
+        zip(unique_files, assign_shards(get_file_weights(unique_files, timings), shard.count), strict=True)
+    )
+    return [assignments[file] == shard.index - 1 for file in files]
+
+
+@dataclass
+class ShardReport:
+    """The results of a `yamkix` run, written with `--shard-report`.
+
+    Attributes:
+        shard: The shard that was processed, `None` when all the files were.
+        elapsed: The total processing time, in seconds.
+        results: The results of the processed files.
+        shards: The shards merged in this report (for merged reports).
+    """
+
+    shard: ShardSpec | None
+    elapsed: float
+    results: list[FileProcessingResult]
+    shards: list[ShardSpec] = field(default_factory=list)
+
+    @property
+    def errors(self) -> int:
+        """Return the number of files that could not be processed."""
+        return sum(1 for result in self.results if result.error)
+
+    @property
+    def timed_out(self) -> int:
+        """Return the number of files whose processing exceeded the time budget."""
+        return sum(1 for result in self.results if result.timed_out)
+
+    @property
+    def unchanged(self) -> int:
+        """Return the number of files left unchanged."""
+        return sum(1 for result in self.results if result.unchanged)
+
+    def get_timings(self) -> dict[str, float]:
+        """Return the recorded processing time of each file."""
+        return {result.input_display_name: result.elapsed for result in self.results if result.elapsed is not None}
+
+    def get_missing_shards(self) -> list[ShardSpec]:
+        """Return the shards that should have been merged, but were not."""
+        shards = self.shards or ([self.shard] if self.shard is not None else [])
+        counts = {shard.count for shard in shards}
+        if len(counts) != 1:
+            return []
+        (count,) = counts
+        indexes = {shard.index for shard in shards}
+        return [ShardSpec(index=index, count=count) for index in range(1, count + 1) if index not in indexes]
+
+    def to_json(self) -> dict[str, Any]:
+        """Return the report as a JSON compatible dict."""
+        return {
+            "version": SHARD_REPORT_VERSION,
+            "shard": str(self.shard) if self.shard is not None else None,
+            "shards": [str(shard) for shard in self.shards],
+            "elapsed": self.elapsed,
+            "results": [
+                {
+                    "input": result.input_display_name,
+                    "error": result.error,
+                    "unchanged": result.unchanged,
+                    "elapsed": result.elapsed,
+                    "timed_out": result.timed_out,
+                }
+                for result in self.results
+            ],
+        }
+
+
+def write_shard_report(path: Path, report: ShardReport) -> None:
+    """Write a report as JSON."""
+    with path.open(mode="w", encoding="UTF-8") as stream:
+        json.dump(report.to_json(), stream, indent=2)
+        stream.write("\n")
+
+
+def read_shard_report(path: Path) -> ShardReport:
+    """Read a report written by `write_shard_report`.
+
+    Raises:
+        InvalidShardReportError: If the file is not a valid report.
+    """
+    try:
+        content = json.loads(path.read_text(encoding="UTF-8"))
+        version = content["version"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise InvalidShardReportError(str(path), str(e)) from e
+    if version != SHARD_REPORT_VERSION:
+        raise InvalidShardReportError(str(path), f"unsupported version {version}")
+    try:
+        return ShardReport(
+            shard=parse_shard_spec(content["shard"]) if content["shard"] is not None else None,
+            shards=[parse_shard_spec(shard) for shard in content["shards"]],
+            elapsed=float(content["elapsed"]),
+            results=[
+                FileProcessingResult(
+                    input_display_name=result["input"],
+                    error=bool(result["error"]),
+                    unchanged=bool(result["unchanged"]),
+                    elapsed=result["elapsed"],
+                    timed_out=bool(result.get("timed_out", False)),
+                )
+                for result in content["results"]
+            ],
+        )
+    except (ValueError, KeyError, TypeError) as e:  # InvalidShardSpecError is a ValueError
+        raise InvalidShardReportError(str(path), str(e)) from e
+
+
+def merge_shard_reports(reports: Iterable[ShardReport]) -> ShardReport:
+    """Merge the reports of several shards into a single one.
+
+    The elapsed time of the merged report is the one of the slowest shard.
+    """
+    merged = ShardReport(shard=None, elapsed=0.0, results=[])
+    for report in reports:
+        merged.results.extend(report.results)
+        merged.elapsed = max(merged.elapsed, report.elapsed)
+        merged.shards.extend(report.shards or ([report.shard] if report.shard is not None else []))
+    merged.shards.sort(key=lambda shard: (shard.count, shard.index))
+    return merged
@@ -0,0 +1,223 @@
+"""Format YAML content in a supervised worker process, with a time budget per file.
+
+The parent process reads the inputs and writes the outputs, the worker process only
+parses and formats content. A worker exceeding the budget is killed (and replaced
+on the next call) so that a single pathological file cannot stall a whole batch.
+
+The memory of a long lived worker grows with the object graphs and caches of the files
+it formats. A worker can be recycled, between two files, once it formatted a given number
+of files or once its resident set size (RSS) exceeds a threshold: it is stopped and
+replaced on the next call, the file it just formatted being returned as usual.
+"""
+
+import multiprocessing
+import os
+import pickle
+import sys
+from multiprocessing.connection import Connection
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+from yamkix.config import YamkixConfig
+from yamkix.errors import FileProcessingTimeoutError, InvalidYamlContentError, WorkerProcessError
+from yamkix.profiling import ProfileCollector
+from yamkix.report import READ, WRITE, FileProcessingStats, measure
+from yamkix.yamkix import FileProcessingResult, format_yaml_content, read_input, write_formatted_output
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+
+def get_current_rss() -> int | None:
+    """Return the resident set size of the current process in bytes, `None` if it cannot be measured.
+
+    On Linux, the current RSS is read from `/proc`. Elsewhere, the peak RSS is returned.
+    """
+    try:
+        return int(Path("/proc/self/statm").read_bytes().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        # e.g. on Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes, but on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _worker_main(connection: Connection, profile: bool = False) -> None:
+    """Format the content received from the parent until `None` is received.
+
+    When `profile` is set, the formatting is profiled and the profile is sent to the parent before exiting.
+    """
+    profiler = ProfileCollector() if profile else None
+    format_content = profiler.profiled(format_yaml_content) if profiler is not None else format_yaml_content
+    while (request := connection.recv()) is not None:
+        raw_input, yamkix_config, collect_stats = request
+        stats = FileProcessingStats() if collect_stats else None
+        # Each response ends with the RSS of the worker, once the file is formatted
+        try:
+            formatted = format_content(raw_input, yamkix_config, stats)
+            connection.send(("ok", formatted, stats, get_current_rss()))
+        except InvalidYamlContentError as e:
+            # InvalidYamlContentError cannot be unpickled, it takes no argument
+            connection.send(("invalid", e.__cause__, get_current_rss()))
+        except Exception as e:  # noqa: BLE001
+            try:
+                connection.send(("error", e, e.__cause__, get_current_rss()))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                connection.send(("error", RuntimeError(repr(e)), None, get_current_rss()))
+    if profiler is not None:
+        connection.send(profiler.get_raw_stats())
+
+
+class SupervisedFormatter:
+    """Format YAML content in a worker process, killed when it exceeds a time budget.
+
+    Use it as a context manager, or call `close` when done, to stop the worker process.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        profiler: ProfileCollector | None = None,
+        max_files_per_worker: int | None = None,
+        max_worker_rss: int | None = None,
+    ) -> None:
+        """Create a new formatter, the worker process is started on the first call.
+
+        Args:
+            timeout: The time budget to format the content of a file, in seconds.
+            profiler: If set, the worker processes profile the formatting and their profiles are
+                added to `profiler` when they are stopped. The profile of a worker killed because
+                of a timeout is lost.
+            max_files_per_worker: If set, a worker is recycled once it formatted this number of files.
+            max_worker_rss: If set, a worker is recycled once its resident set size exceeds this
+                number of bytes, after formatting a file.
+        """
+        self.timeout = timeout
+        self.profiler = profiler
+        self.max_files_per_worker = max_files_per_worker
+        self.max_worker_rss = max_worker_rss
+        self.recycled_workers = 0
+        self._context = multiprocessing.get_context()
+        self._process: BaseProcess | None = None
+        self._connection: Connection | None = None
+        self._worker_files = 0
+
+    def __enter__(self) -> "SupervisedFormatter":  # noqa: PYI034
+        """Return the formatter."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the worker process."""
+        self.close()
+
+    def _start(self) -> Connection:
+        parent_connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main, args=(child_connection, self.profiler is not None), daemon=True
+        )
+        self._process.start()
+        child_connection.close()
+        self._connection = parent_connection
+        self._worker_files = 0
+        return parent_connection
+
+    def _recycle_if_needed(self, rss: int | None) -> None:
+        """Stop the worker once it reached one of its limits, it is replaced on the next call."""
+        self._worker_files += 1
+        if (self.max_files_per_worker is not None and self._worker_files >= self.max_files_per_worker) or (
+            self.max_worker_rss is not None and rss is not None and rss > self.max_worker_rss
+        ):
+            self.close()
+            self.recycled_workers += 1
+
+    def _kill(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._process = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def format(self, raw_input: str, yamkix_config: YamkixConfig, stats: FileProcessingStats | None = None) -> str:
+        """Format some YAML content in the worker process, like `format_yaml_content`.
+
+        The measures taken in the worker process are added to `stats`, if set. The worker is
+        recycled afterwards if it reached one of its limits.
+
+        Raises:
+            InvalidYamlContentError: If the YAML content is invalid.
+            ResourceLimitExceededError: If the content exceeds one of the resource limits of the config.
+            FileProcessingTimeoutError: If the formatting takes longer than the time budget.
+            WorkerProcessError: If the worker process dies.
+            Exception: Any other error raised by the formatting in the worker process (e.g. a `YAMLError`).
+        """
+        connection = self._connection or self._start()
+        connection.send((raw_input, yamkix_config, stats is not None))
+        if not connection.poll(self.timeout):
+            self._kill()
+            raise FileProcessingTimeoutError(self.timeout)
+        try:
+            response = connection.recv()
+        except EOFError as e:
+            exit_code = self._process.exitcode if self._process is not None else None
+            self._kill()
+            raise WorkerProcessError(exit_code) from e
+        *response, rss = response
+        self._recycle_if_needed(rss)
+        if response[0] == "invalid":
+            raise InvalidYamlContentError from response[1]
+        if response[0] == "error":
+            _, error, cause = response
+            raise error from cause
+        _, formatted, worker_stats = response
+        if stats is not None and worker_stats is not None:
+            stats.update(worker_stats)
+        return formatted
+
+    def round_trip_and_format(
+        self, yamkix_config: YamkixConfig, stats: FileProcessingStats | None = None
+    ) -> FileProcessingResult:
+        """Load a file and save it formatted, like `round_trip_and_format`, with a time budget.
+
+        Raises:
+            InvalidYamlContentError: If the YAML content is invalid.
+            ResourceLimitExceededError: If the content exceeds one of the resource limits of the config.
+            FileProcessingTimeoutError: If the formatting takes longer than the time budget.
+            WorkerProcessError: If the worker process dies.
+        """
+        yamkix_io_config = yamkix_config.io_config
+        with measure(stats, READ):
+            raw_input = read_input(yamkix_config)
+        formatted = self.format(raw_input, yamkix_config, stats)
+        with measure(stats, WRITE):
+            write_formatted_output(formatted, yamkix_io_config.output)
+        return FileProcessingResult(
+            input_display_name=yamkix_io_config.input_display_name,
+            error=False,
+            unchanged=formatted == raw_input,
+        )
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        if self._connection is not None and self._process is not None:
+            try:
+                self._connection.send(None)
+                if self.profiler is not None and self._connection.poll(self.timeout):
+                    self.profiler.add_worker_stats(self._connection.recv())
+            except (OSError, EOFError):
+                self._kill()
+                return
+            self._process.join(timeout=self.timeout)
+        self._kill()
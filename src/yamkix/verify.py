@@ -0,0 +1,131 @@
+"""Check that the formatting did not change the data of the documents (`--verify`).
+
+Each document is reduced to a structural (Merkle) hash of its node tree: the hash of a
+node combines its tag with its value (scalars) or the hashes of its children (maps and
+lists). The input documents are hashed while they are loaded, from the nodes built for
+the formatting itself. The output is then composed (not constructed) by a `safe` loader,
+that uses the C extension of `ruamel.yaml` when it is installed, and its documents are
+hashed the same way.
+
+The scalars of the standard tags (ints, floats, booleans, nulls, timestamps, binary) are
+hashed from their constructed value, so that equivalent representations (`~` and `null`,
+`0o17` and `15`) hash the same, e.g. when formatting in `safe` mode. Comments, styles and
+quotes are not part of the data: the hash of a document does not depend on them.
+"""
+
+import hashlib
+from collections.abc import Iterator
+from typing import Any, Final
+
+from ruamel.yaml import YAML
+from ruamel.yaml.constructor import SafeConstructor
+from ruamel.yaml.error import YAMLError
+from ruamel.yaml.nodes import MappingNode, Node, ScalarNode
+
+from yamkix.errors import FormattingVerificationError
+from yamkix.yaml_writer import get_thread_local_yaml
+
+# The tags of the scalars hashed from their constructed value, the other ones from their text
+CONSTRUCTED_SCALAR_TAGS: Final = frozenset(
+    f"tag:yaml.org,2002:{name}" for name in ("binary", "bool", "float", "int", "null", "timestamp")
+)
+
+
+def _get_scalar_value(node: ScalarNode, substitutions: dict[str, str] | None) -> str:
+    """Return the text a scalar is hashed from."""
+    tag = node.tag
+    if tag in CONSTRUCTED_SCALAR_TAGS:
+        try:
+            # A constructor bound to a loader, for the YAML version to use
+            constructor = get_thread_local_yaml("safe", pure=True).constructor
+            return repr(SafeConstructor.yaml_constructors[tag](constructor, node))
+        except (YAMLError, ValueError, TypeError):
+            return node.value
+    if substitutions:
+        # The placeholder of a large literal block scalar, followed by its chomped line break
+        placeholder = node.value.rstrip("\n")
+        if placeholder in substitutions:
+            return substitutions[placeholder] + node.value[len(placeholder) :]
+    return node.value
+
+
+def hash_node(node: Node, substitutions: dict[str, str] | None = None) -> bytes:
+    """Return the structural hash of a node tree.
+
+    Args:
+        node: The root of the tree, e.g. a document.
+        substitutions: The values to hash instead of the values of some scalars, e.g. the
+            bodies replaced by placeholders (see `yamkix.passthrough`).
+    """
+    hashes: dict[int, bytes] = {}
+    # Iterative post-order traversal, the nodes shared by aliases being hashed once
+    stack: list[tuple[Node, bool]] = [(node, False)]
+    while stack:
+        current, children_hashed = stack.pop()
+        if id(current) in hashes:
+            continue
+        if isinstance(current, ScalarNode):
+            digest = hashlib.blake2b(b"s", digest_size=16)
+            digest.update(f"{current.tag}\0{_get_scalar_value(current, substitutions)}".encode(errors="surrogatepass"))
+            hashes[id(current)] = digest.digest()
+            continue
+        children = (
+            [child for pair in current.value for child in pair]
+            if isinstance(current, MappingNode)
+            else list(current.value)
+        )
+        if not children_hashed:
+            stack.append((current, True))
+            stack.extend((child, False) for child in children if id(child) not in hashes)
+            continue
+        if isinstance(current, MappingNode):
+            # The keys of a mapping are not ordered, e.g. the `safe` mode sorts them
+            child_hashes = sorted(hashes[id(key)] + hashes[id(value)] for key, value in current.value)
+        else:
+            child_hashes = [hashes[id(item)] for item in current.value]
+        digest = hashlib.blake2b(b"m" if isinstance(current, MappingNode) else b"q", digest_size=16)
+        digest.update(f"{current.tag}\0{len(child_hashes)}".encode())
+        for child_hash in child_hashes:
+            digest.update(child_hash)
+        hashes[id(current)] = digest.digest()
+    return hashes[id(node)]
+
+
+class FormattingVerifier:
+    """Hash the documents of an input while they are loaded, and check the formatted output against them."""
+
+    def __init__(self, substitutions: dict[str, str] | None = None) -> None:
+        """Create a new verifier.
+
+        Args:
+            substitutions: The values to hash instead of the values of some scalars of the
+                input, e.g. the bodies replaced by placeholders (see `yamkix.passthrough`).
+        """
+        self.substitutions = substitutions
+        self.document_hashes: list[bytes] = []
+
+    def load_all(self, yaml: YAML, content: str) -> Iterator[Any]:
+        """Load the documents of `content` like `yaml.load_all` does, hashing them on the way."""
+        for node in yaml.compose_all(content):
+            self.document_hashes.append(hash_node(node, self.substitutions))
+            yield yaml.constructor.construct_document(node)
+
+    def verify(self, formatted: str) -> None:
+        """Check that the documents of the formatted output hold the same data as the input ones.
+
+        Raises:
+            FormattingVerificationError: If the data of a document changed, or the output is not valid.
+        """
+        try:
+            output_hashes = [hash_node(node) for node in get_thread_local_yaml("safe").compose_all(formatted)]
+        except YAMLError as error:
+            raise FormattingVerificationError(
+                reason=f"the output is not valid YAML ({error.__class__.__name__})"
+            ) from error
+        if len(output_hashes) != len(self.document_hashes):
+            raise FormattingVerificationError(
+                reason=f"the output holds {len(output_hashes)} document(s) instead of {len(self.document_hashes)}"
+            )
+        for index, (expected, actual) in enumerate(zip(self.document_hashes, output_hashes, strict=True)):
+            if expected != actual:
+                raise FormattingVerificationError(reason=f"the data of document {index + 1} changed")
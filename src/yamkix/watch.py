@@ -0,0 +1,324 @@
+"""Watch directories and reformat YAML files as they are saved.
+
+On Linux, changes are detected with `inotify` (one watch per directory, whatever the
+number of files it holds). Elsewhere, or when `inotify` cannot be used, the watched
+trees are polled.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, Protocol
+
+from ruamel.yaml.error import YAMLError
+
+from yamkix.config import YamkixConfig, get_yamkix_config_for_file
+from yamkix.errors import (
+    FormattingVerificationError,
+    InvalidConfigFileError,
+    InvalidYamlContentError,
+    ResourceLimitExceededError,
+)
+from yamkix.helpers import is_yaml_file, iter_yaml_files
+from yamkix.minimal_edit import MinimalEditFormatter
+from yamkix.yamkix import FileProcessingResult
+
+if TYPE_CHECKING:
+    from yamkix.config_file import YamkixConfigResolver
+
+DEFAULT_DEBOUNCE_DELAY: Final = 0.2
+DEFAULT_POLLING_INTERVAL: Final = 1.0
+
+# See inotify(7)
+IN_CLOSE_WRITE: Final = 0x00000008
+IN_MOVED_TO: Final = 0x00000080
+IN_CREATE: Final = 0x00000100
+IN_Q_OVERFLOW: Final = 0x00004000
+IN_IGNORED: Final = 0x00008000
+IN_ONLYDIR: Final = 0x01000000
+IN_ISDIR: Final = 0x40000000
+IN_CLOEXEC: Final = 0o2000000
+INOTIFY_WATCH_MASK: Final = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+INOTIFY_EVENT_HEADER: Final = struct.Struct("iIII")
+INOTIFY_READ_SIZE: Final = 64 * 1024
+
+
+class ChangesDetector(Protocol):
+    """Detect changed files under the watched roots."""
+
+    def wait_for_changes(self, timeout: float | None) -> set[Path]:
+        """Return the files changed since the last call, waiting up to `timeout` seconds for one."""
+        ...  # pragma: no cover
+
+    def close(self) -> None:
+        """Release the resources held by the detector."""
+        ...  # pragma: no cover
+
+
+class InotifyChangesDetector:
+    """Detect changes with Linux `inotify`, using one watch per directory."""
+
+    def __init__(self, roots: list[Path]) -> None:
+        """Watch all the directories under the directory roots, and the parent directory of the file roots.
+
+        Raises:
+            OSError: If `inotify` is not available or the watch limit is reached.
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._roots = roots
+        self._directories: dict[int, Path] = {}
+        # Single files are watched through their parent directory
+        self._files = {root.resolve() for root in roots if root.is_file()}
+        self._directory_roots = [root.resolve() for root in roots if root.is_dir()]
+        try:
+            for root in roots:
+                if root.is_dir():
+                    self._add_tree(root)
+                else:
+                    # Not its subdirectories: they may hold a whole tree, e.g. for a file in the home directory
+                    self._add_watch(root.parent)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), INOTIFY_WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_add_watch failed for {directory}: {os.strerror(error)}")
+        self._directories[wd] = directory
+
+    def _add_tree(self, directory: Path) -> set[Path]:
+        """Watch a directory tree, returning the YAML files it already holds."""
+        files = set()
+        for dir_path, _, file_names in os.walk(directory):
+            self._add_watch(Path(dir_path))
+            files.update(Path(dir_path) / name for name in file_names if is_yaml_file(name))
+        return files
+
+    def _is_under_directory_roots(self, path: Path) -> bool:
+        resolved_path = path.resolve()
+        return any(resolved_path.is_relative_to(root) for root in self._directory_roots)
+
+    def _is_selected(self, path: Path) -> bool:
+        if path.resolve() in self._files:
+            return True
+        return is_yaml_file(path) and self._is_under_directory_roots(path)
+
+    def _read_events(self) -> set[Path]:
+        changed: set[Path] = set()
+        buffer = os.read(self._fd, INOTIFY_READ_SIZE)
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            if mask & IN_Q_OVERFLOW:
+                # Some events were lost: consider everything as changed
+                changed.update(iter_yaml_files(self._roots))
+                continue
+            if mask & IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            directory = self._directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self._is_under_directory_roots(path):
+                    changed.update(self._add_tree(path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and self._is_selected(path):
+                changed.add(path)
+        return changed
+
+    def wait_for_changes(self, timeout: float | None) -> set[Path]:
+        """Return the files changed since the last call, waiting up to `timeout` seconds for one."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        return self._read_events()
+
+    def close(self) -> None:
+        """Close the `inotify` file descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingChangesDetector:
+    """Detect changes by periodically comparing the modification time and size of the files."""
+
+    def __init__(self, roots: list[Path], interval: float = DEFAULT_POLLING_INTERVAL) -> None:
+        """Take a first snapshot of the watched files."""
+        self._roots = roots
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + interval
+
+    def _take_snapshot(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for path in iter_yaml_files(self._roots):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait_for_changes(self, timeout: float | None) -> set[Path]:
+        """Return the files changed since the last call, waiting up to `timeout` seconds for one."""
+        delay = self._next_poll - time.monotonic()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(delay, 0))
+        self._next_poll = time.monotonic() + self._interval
+        snapshot = self._take_snapshot()
+        changed = {path for path, signature in snapshot.items() if self._snapshot.get(path) != signature}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def get_changes_detector(
+    roots: list[Path], use_polling: bool = False, polling_interval: float = DEFAULT_POLLING_INTERVAL
+) -> ChangesDetector:
+    """Return an `inotify` based detector when possible, a polling one otherwise."""
+    if not use_polling:
+        try:
+            return InotifyChangesDetector(roots)
+        except OSError:
+            pass
+    return PollingChangesDetector(roots, interval=polling_interval)
+
+
+class YamkixWatcher:
+    """Reformat the YAML files under some roots as they change.
+
+    Bursts of changes are debounced, only changed files are reformatted (with warm
+    cached writers) and files are only written back when their content changes.
+    The watcher does not react to its own writes.
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        roots: list[Path],
+        yamkix_config: YamkixConfig,
+        debounce_delay: float = DEFAULT_DEBOUNCE_DELAY,
+        use_polling: bool = False,
+        polling_interval: float = DEFAULT_POLLING_INTERVAL,
+        config_resolver: "YamkixConfigResolver | None" = None,
+    ) -> None:
+        """Create a new watcher.
+
+        Args:
+            roots: The directories (or files) to watch.
+            yamkix_config: The formatting options to use, its `io_config` is not taken into account.
+            debounce_delay: How long to wait for the changes to settle before reformatting, in seconds.
+            use_polling: Whether to poll the watched trees instead of using `inotify`.
+            polling_interval: How often the watched trees are polled when `inotify` is not used, in seconds.
+            config_resolver: If set, resolves the formatting options of each file from the configuration files.
+        """
+        self.roots = roots
+        self.yamkix_config = yamkix_config
+        self.debounce_delay = debounce_delay
+        self.use_polling = use_polling
+        self.polling_interval = polling_interval
+        self.config_resolver = config_resolver
+        self._own_writes: dict[Path, tuple[int, int]] = {}
+        # The files are formatted again and again, only the edited regions need to be
+        self._formatter = MinimalEditFormatter()
+
+    def _is_own_write(self, path: Path) -> bool:
+        signature = self._own_writes.get(path)
+        if signature is None:
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return signature == (stat.st_mtime_ns, stat.st_size)
+
+    def format_file(self, path: Path) -> FileProcessingResult:
+        """Reformat a single file, writing it back only if its content changes.
+
+        Raises:
+            InvalidYamlContentError: If the file is not valid YAML.
+            InvalidConfigFileError: If the configuration file of the file is invalid.
+        """
+        yamkix_config = get_yamkix_config_for_file(self.yamkix_config, str(path))
+        if self.config_resolver is not None:
+            yamkix_config = self.config_resolver.resolve(yamkix_config)
+        raw_input = path.read_text(encoding="UTF-8")
+        formatted = self._formatter.format(raw_input, yamkix_config)
+        unchanged = formatted == raw_input
+        if not unchanged:
+            path.write_text(formatted, encoding="UTF-8")
+            stat = path.stat()
+            self._own_writes[path] = (stat.st_mtime_ns, stat.st_size)
+        return FileProcessingResult(
+            input_display_name=yamkix_config.io_config.input_display_name,
+            error=False,
+            unchanged=unchanged,
+        )
+
+    def process_changes(self, changed: set[Path]) -> list[FileProcessingResult]:
+        """Reformat the changed files, skipping the ones last written by the watcher itself."""
+        results = []
+        for path in sorted(changed):
+            if not path.is_file() or self._is_own_write(path):
+                continue
+            self._own_writes.pop(path, None)
+            try:
+                results.append(self.format_file(path))
+            except (
+                FormattingVerificationError,
+                InvalidConfigFileError,
+                InvalidYamlContentError,
+                ResourceLimitExceededError,
+                OSError,
+                UnicodeDecodeError,
+                # e.g. a duplicated key, or a too deeply nested document
+                YAMLError,
+                RecursionError,
+            ):
+                results.append(FileProcessingResult(input_display_name=str(path), error=True, unchanged=False))
+        return results
+
+    def run(
+        self,
+        on_results: Callable[[list[FileProcessingResult]], None],
+        stop_event: threading.Event | None = None,
+    ) -> None:
+        """Watch until `stop_event` is set (or forever), calling `on_results` after each reformatting batch."""
+        detector = get_changes_detector(
+            self.roots, use_polling=self.use_polling, polling_interval=self.polling_interval
+        )
+        try:
+            while stop_event is None or not stop_event.is_set():
+                changed = detector.wait_for_changes(timeout=self.debounce_delay)
+                if not changed:
+                    continue
+                # Debounce: wait for the burst of changes to settle
+                while more_changes := detector.wait_for_changes(timeout=self.debounce_delay):
+                    changed |= more_changes
+                if results := self.process_changes(changed):
+                    on_results(results)
+        finally:
+            detector.close()
@@ -1,27 +1,54 @@
 """Load a yaml file and save it formatted according to some rules."""
 
 import sys
-from copy import deepcopy
+from collections.abc import Iterable
 from dataclasses import dataclass
 from io import StringIO
 from pathlib import Path
-from typing import TextIO
+from typing import Any, TextIO
 
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedBase
 from ruamel.yaml.parser import ParserError
 from ruamel.yaml.scanner import ScannerError
 
+from yamkix.comment_free import is_comment_free
 from yamkix.comments import align_comments, process_comments
 from yamkix.config import YamkixConfig
+from yamkix.direct_emitter import emit_document
 from yamkix.errors import InvalidYamlContentError
 from yamkix.helpers import (
     convert_flow_to_block_style,
     convert_single_to_double_quotes,
+    strip_leading_double_space,
     strip_leading_double_space_and_trailing_spaces,
     strip_trailing_spaces,
 )
-from yamkix.yaml_writer import get_opinionated_yaml_writer
+from yamkix.hooks import notify_document, notify_file_end, notify_file_error, notify_file_start, registered_hooks
+from yamkix.json_input import load_json_document, looks_like_json
+from yamkix.limits import check_file_size, check_input_size
+from yamkix.passthrough import mask_block_scalars, unmask_block_scalars
+from yamkix.report import (
+    BLOCK_STYLE,
+    COMMENT_ALIGNMENT,
+    COMMENT_SPACING,
+    EMIT,
+    PARSE,
+    QUOTES,
+    READ,
+    VERIFY,
+    WRITE,
+    FileProcessingStats,
+    measure,
+    measure_transform,
+)
+from yamkix.verify import FormattingVerifier
+from yamkix.yaml_writer import (
+    discard_cached_yaml_instances,
+    get_cached_comment_free_loader,
+    get_cached_yaml_writers,
+    reset_yaml_directives,
+)
 
 
 @dataclass
@@ -32,18 +59,29 @@ class FileProcessingResult:
         input_display_name: Display name of the processed input (file path or 'STDIN').
         error: Whether the file failed to parse.
         unchanged: Whether the output content is identical to the input content.
+        elapsed: The processing time, in seconds, if it was measured.
+        timed_out: Whether the processing was aborted because it exceeded its time budget
+            (`error` is also set in this case).
     """
 
     input_display_name: str
     error: bool
     unchanged: bool
+    elapsed: float | None = None
+    timed_out: bool = False
 
 
-def round_trip_and_format(yamkix_config: YamkixConfig) -> FileProcessingResult:
+def round_trip_and_format(
+    yamkix_config: YamkixConfig, stats: FileProcessingStats | None = None
+) -> FileProcessingResult:
     """Load a file and save it formatted.
 
+    The output is only written once the whole content is formatted. The registered hooks
+    (see `yamkix.hooks`) are notified of the start and end of the processing.
+
     Arguments:
         yamkix_config: The configuration for the Yamkix processing.
+        stats: If set, receives the sizes, counts and phase durations measured while processing the file.
 
     Returns:
         A FileProcessingResult describing whether an error occurred and whether
@@ -51,49 +89,312 @@ def round_trip_and_format(yamkix_config: YamkixConfig) -> FileProcessingResult:
 
     Raises:
         InvalidYamlContentError: If the YAML content is invalid.
+        ResourceLimitExceededError: If the input exceeds one of the resource limits of the config.
     """
-    double_quotes_yaml = None
-    yaml = get_opinionated_yaml_writer(yamkix_config)
-    if yamkix_config.quotes_preserved is False and yamkix_config.enforce_double_quotes:
-        double_quotes_yaml = deepcopy(yaml)
-        double_quotes_yaml.preserve_quotes = True
+    notify_file_start(yamkix_config)
+    try:
+        result = _round_trip_and_format(yamkix_config, stats)
+    except Exception as error:
+        notify_file_error(yamkix_config, error)
+        raise
+    notify_file_end(result)
+    return result
+
+
+def _round_trip_and_format(yamkix_config: YamkixConfig, stats: FileProcessingStats | None) -> FileProcessingResult:
     yamkix_io_config = yamkix_config.io_config
-    input_file = yamkix_io_config.input
-    if input_file is not None:
-        with Path(input_file).open(encoding="UTF-8") as f_input:
-            raw_input = f_input.read()
-        parsed = yaml.load_all(raw_input)
-    else:
-        raw_input = sys.stdin.read()
-        parsed = yaml.load_all(raw_input)
-    ready_for_dump = []
+    with measure(stats, READ):
+        raw_input = read_input(yamkix_config)
+    formatted = format_yaml_content(raw_input, yamkix_config, stats)
+    with measure(stats, WRITE):
+        write_formatted_output(formatted, yamkix_io_config.output)
+    return FileProcessingResult(
+        input_display_name=yamkix_io_config.input_display_name,
+        error=False,
+        unchanged=formatted == raw_input,
+    )
+
+
+def read_input(yamkix_config: YamkixConfig) -> str:
+    """Read the input of a config, a file or `STDIN` if its `input` is `None`.
+
+    Raises:
+        ResourceLimitExceededError: If the file exceeds the `max_bytes` limit of the config.
+    """
+    input_file = yamkix_config.io_config.input
+    if input_file is None:
+        return sys.stdin.read()
+    check_file_size(input_file, yamkix_config.limits)
+    with Path(input_file).open(encoding="UTF-8") as f_input:
+        return f_input.read()
+
+
+def write_formatted_output(formatted: str, output_file: str | None) -> None:
+    """Write formatted content to a file, or to `STDOUT` if `output_file` is `None`."""
+    if output_file is None:
+        sys.stdout.write(formatted)
+        return
+    with Path(output_file).open(mode="w", encoding="UTF-8") as out:
+        out.write(formatted)
+
+
+def read_all_documents(parsed: Iterable[Any]) -> list[Any]:
+    """Consume the result of a `yaml.load_all` call.
+
+    Args:
+        parsed: The (lazy) result of a `yaml.load_all` call.
+
+    Returns:
+        The list of parsed documents.
+
+    Raises:
+        InvalidYamlContentError: If the YAML content is invalid.
+    """
     try:
         # Read the parsed content to force the scanner to issue errors if any
-        ready_for_dump = list(parsed)
-
+        return list(parsed)
     except (ScannerError, ParserError) as parsing_error:
         raise InvalidYamlContentError from parsing_error
 
-    output_buffer = StringIO()
-    yamkix_dump_all(
-        one_or_more_items=ready_for_dump,
-        yaml=yaml,
-        dash_inwards=yamkix_config.dash_inwards,
-        output_file=yamkix_io_config.output,
-        spaces_before_comment=yamkix_config.spaces_before_comment,
-        double_quotes_yaml=double_quotes_yaml,
-        capture_buffer=output_buffer,
-        align_comments_flag=yamkix_config.align_comments,
-        enforce_block_style_flag=yamkix_config.enforce_block_style,
+
+def format_yaml_content(raw_input: str, yamkix_config: YamkixConfig, stats: FileProcessingStats | None = None) -> str:
+    """Format some YAML content in memory.
+
+    The `io_config` part of the configuration is ignored: nothing is read from or
+    written to a file, `STDIN` or `STDOUT`. The `YAML` writers are cached and reused
+    across calls sharing the same formatting options.
+
+    Arguments:
+        raw_input: The YAML content to format.
+        yamkix_config: The configuration for the Yamkix processing.
+        stats: If set, receives the sizes, counts and durations of the parse, transform and emit phases.
+
+    Returns:
+        The formatted YAML content.
+
+    Raises:
+        InvalidYamlContentError: If the YAML content is invalid.
+        ResourceLimitExceededError: If the content exceeds one of the resource limits of the config.
+        FormattingVerificationError: If `yamkix_config.verify` is set and the formatting changed the data.
+    """
+    check_input_size(raw_input, yamkix_config.limits)
+    # The directives of a content are kept by the cached `YAML` instances: they must not apply to the next ones
+    reset_yaml_directives(yamkix_config)
+    try:
+        formatted = _format_raw_input(raw_input, yamkix_config, stats)
+    except Exception:
+        # The cached `YAML` instances may be stuck in the load or dump that raised
+        discard_cached_yaml_instances(yamkix_config)
+        raise
+    finally:
+        reset_yaml_directives(yamkix_config)
+    if stats is not None:
+        stats.output_bytes = len(formatted.encode("UTF-8"))
+    return formatted
+
+
+def _format_raw_input(raw_input: str, yamkix_config: YamkixConfig, stats: FileProcessingStats | None) -> str:
+    """Format `raw_input` (see `format_yaml_content`), with the cached `YAML` instances."""
+    formatted = _format_json_content(raw_input, yamkix_config, stats)
+    verifier = None
+    # The large literal block scalars are only preserved as such in round trip mode, and the hooks observe the
+    # documents with their values
+    masked = (
+        mask_block_scalars(raw_input)
+        if formatted is None and yamkix_config.parsing_mode == "rt" and not registered_hooks
+        else None
     )
-    unchanged = output_buffer.getvalue() == raw_input
-    return FileProcessingResult(
-        input_display_name=yamkix_io_config.input_display_name,
-        error=False,
-        unchanged=unchanged,
+    if masked is not None:
+        verifier = FormattingVerifier(masked.get_body_values()) if yamkix_config.verify else None
+        formatted = unmask_block_scalars(
+            _format_content(masked.content, raw_input, yamkix_config, stats, verifier), masked
+        )
+    if formatted is None:
+        verifier = FormattingVerifier() if yamkix_config.verify else None
+        formatted = _format_content(raw_input, raw_input, yamkix_config, stats, verifier)
+    if verifier is not None:
+        with measure(stats, VERIFY):
+            verifier.verify(formatted)
+    return formatted
+
+
+def _format_content(
+    content: str,
+    raw_input: str,
+    yamkix_config: YamkixConfig,
+    stats: FileProcessingStats | None,
+    verifier: FormattingVerifier | None = None,
+) -> str:
+    """Format `content`, that is `raw_input` or `raw_input` with placeholders (see `yamkix.passthrough`).
+
+    When `verifier` is set, the documents are hashed while they are loaded. The contents
+    without comments are loaded without looking for them (see `yamkix.comment_free`).
+    """
+    comment_free = yamkix_config.parsing_mode == "rt" and is_comment_free(content)
+    writer = get_cached_yaml_writers(yamkix_config)[0]
+    yaml = get_cached_comment_free_loader(yamkix_config) if comment_free else writer
+    # The parser keeps the version of a `%YAML` directive and the `%TAG` handles on the (cached)
+    # loader: they are only used for the dump of this content
+    yaml.version, yaml.tags = None, None
+    try:
+        with measure(stats, PARSE):
+            ready_for_dump = read_all_documents(
+                yaml.load_all(content) if verifier is None else verifier.load_all(yaml, content)
+            )
+        version, tags = yaml.version, yaml.tags
+    finally:
+        yaml.version, yaml.tags = None, None
+    return _dump_documents(
+        ready_for_dump, raw_input, yamkix_config, stats, has_comments=not comment_free, version=version, tags=tags
     )
 
 
+def _format_json_content(raw_input: str, yamkix_config: YamkixConfig, stats: FileProcessingStats | None) -> str | None:
+    """Format `raw_input` if it is JSON loaded by the `json` module (see `yamkix.json_input`), `None` otherwise.
+
+    The resource limits and the verification rely on the nodes of the YAML parser: the
+    content is then left to it.
+    """
+    if yamkix_config.limits is not None or yamkix_config.verify or not looks_like_json(raw_input):
+        return None
+    yaml = get_cached_yaml_writers(yamkix_config)[0]
+    with measure(stats, PARSE):
+        document = load_json_document(raw_input, yaml)
+    if document is None:
+        return None
+    return _dump_documents([document], raw_input, yamkix_config, stats, has_comments=False)
+
+
+def _dump_documents(  # noqa: PLR0913
+    ready_for_dump: list[Any],
+    raw_input: str,
+    yamkix_config: YamkixConfig,
+    stats: FileProcessingStats | None,
+    has_comments: bool,
+    *,
+    version: tuple[int, int] | None = None,
+    tags: dict[str, str] | None = None,
+) -> str:
+    """Transform and dump the documents loaded from `raw_input`, skipping the comment transforms without comments.
+
+    `version` and `tags` are the version of the `%YAML` directive and the handles of the `%TAG`
+    directives of `raw_input`, if any, to write back.
+    """
+    yaml, double_quotes_yaml = get_cached_yaml_writers(yamkix_config)
+    if stats is not None:
+        stats.record_input(raw_input, ready_for_dump)
+    output_buffer = StringIO()
+    yaml.version, yaml.tags = version, tags
+    try:
+        yamkix_dump_all_to_stream(
+            one_or_more_items=ready_for_dump,
+            yaml=yaml,
+            dash_inwards=yamkix_config.dash_inwards,
+            out=output_buffer,
+            spaces_before_comment=yamkix_config.spaces_before_comment if has_comments else None,
+            double_quotes_yaml=double_quotes_yaml,
+            align_comments_flag=yamkix_config.align_comments and has_comments,
+            enforce_block_style_flag=yamkix_config.enforce_block_style,
+            stats=stats,
+        )
+    finally:
+        # The double quotes writer loads the first dump, and its directives
+        for writer in (yaml, double_quotes_yaml):
+            if writer is not None:
+                writer.version, writer.tags = None, None
+    return output_buffer.getvalue()
+
+
+def prepare_document_for_dump(  # noqa: PLR0913, PLR0917
+    doc: Any,  # noqa: ANN401
+    yaml: YAML,
+    double_quotes_yaml: YAML | None = None,
+    align_comments_flag: bool = False,
+    enforce_block_style_flag: bool = False,
+    stats: FileProcessingStats | None = None,
+) -> tuple[Any, YAML]:
+    """Apply the document level transformations before dumping a document.
+
+    Args:
+        doc: The YAML document to transform.
+        yaml: The `YAML` writer to use. Configured from a `YamkixConfig` instance.
+        double_quotes_yaml: An optional `YAML` writer for double quotes management.
+        align_comments_flag: Whether to align EOL comments within each dict/list to the maximum column.
+        enforce_block_style_flag: Whether to convert flow-style (JSON-like) collections to block style.
+        stats: If set, receives the duration of each transform.
+
+    Returns:
+        The transformed document and the `YAML` writer that must be used to dump it.
+    """
+    # If we have a double_quotes_yaml instance, then proceed to an extra roundtrip
+    # the first one, using the `yaml` instance, will remove unnecessary quotes
+    # and convert all quotes to single quote
+    # Then we read again the document, with a parser that preserve quotes
+    # and we replace all SingleQuotedScalarString by DoubleQuotedScalarString
+    # and we finally dump the transformed document
+    if double_quotes_yaml is not None:
+        with measure_transform(stats, QUOTES):
+            doc_after_first_rt_as_string = StringIO()
+            yaml.dump(data=doc, stream=doc_after_first_rt_as_string)
+            single_item = double_quotes_yaml.load(doc_after_first_rt_as_string.getvalue())
+            single_item = convert_single_to_double_quotes(single_item)
+        yaml_instance = double_quotes_yaml
+    else:
+        yaml_instance = yaml
+        single_item = doc
+    if enforce_block_style_flag:
+        with measure_transform(stats, BLOCK_STYLE):
+            convert_flow_to_block_style(data=single_item)
+    if align_comments_flag:
+        with measure_transform(stats, COMMENT_ALIGNMENT):
+            align_comments(data=single_item)
+    return single_item, yaml_instance
+
+
+def yamkix_dump_all_to_stream(  # noqa: PLR0913, PLR0917
+    one_or_more_items: list[Any],
+    yaml: YAML,
+    dash_inwards: bool,
+    out: TextIO,
+    spaces_before_comment: int | None,
+    double_quotes_yaml: YAML | None = None,
+    align_comments_flag: bool = False,
+    enforce_block_style_flag: bool = False,
+    stats: FileProcessingStats | None = None,
+) -> None:
+    """Dump all the documents from the input structure to a stream.
+
+    Args:
+        one_or_more_items: The YAML document(s) to dump. The result of a `yaml.load_all` call.
+        yaml: The `YAML` writer to use. Configured from a `YamkixConfig` instance.
+        dash_inwards: Whether to apply dash inwards formatting.
+        out: The output stream to write to.
+        spaces_before_comment: The number of spaces to use before comments.
+        double_quotes_yaml: An optional `YAML` writer for double quotes management.
+        align_comments_flag: Whether to align EOL comments within each dict/list to the maximum column.
+        enforce_block_style_flag: Whether to convert flow-style (JSON-like) collections to block style.
+        stats: If set, receives the duration of the transforms and of the emit phase.
+    """
+    for index, doc in enumerate(one_or_more_items):
+        single_item, yaml_instance = prepare_document_for_dump(
+            doc,
+            yaml=yaml,
+            double_quotes_yaml=double_quotes_yaml,
+            align_comments_flag=align_comments_flag,
+            enforce_block_style_flag=enforce_block_style_flag,
+            stats=stats,
+        )
+        yamkix_dump_one(
+            single_item=single_item,
+            yaml=yaml_instance,
+            dash_inwards=dash_inwards,
+            out=out,
+            spaces_before_comment=spaces_before_comment,
+            stats=stats,
+        )
+        notify_document(single_item, index)
+
+
 def yamkix_dump_all(  # noqa: PLR0913, PLR0917
     one_or_more_items: list[CommentedBase],
     yaml: YAML,
@@ -125,26 +426,15 @@ def yamkix_dump_all(  # noqa: PLR0913, PLR0917
     if output_file is not None and (output_file_path := Path(output_file)).is_file():  # Walrus baby
         with output_file_path.open(mode="w", encoding="UTF-8") as _:
             pass
-    for doc in one_or_more_items:
-        # If we have a double_quotes_yaml instance, then proceed to an extra roundtrip
-        # the first one, using the `yaml` instance, will remove unnecessary quotes
-        # and convert all quotes to single quote
-        # Then we read again the document, with a parser that preserve quotes
-        # and we replace all SingleQuotedScalarString by DoubleQuotedScalarString
-        # and we finally dump the transformed document
-        if double_quotes_yaml is not None:
-            doc_after_first_rt_as_string = StringIO()
-            yaml.dump(data=doc, stream=doc_after_first_rt_as_string)
-            single_item = double_quotes_yaml.load(doc_after_first_rt_as_string.getvalue())
-            single_item = convert_single_to_double_quotes(single_item)
-            yaml_instance = double_quotes_yaml
-        else:
-            yaml_instance = yaml
-            single_item = doc
-        if enforce_block_style_flag:
-            convert_flow_to_block_style(data=single_item)
-        if align_comments_flag:
-            align_comments(data=single_item)
+    for index, doc in enumerate(one_or_more_items):
+        single_item, yaml_instance = prepare_document_for_dump(
+            doc,
+            yaml=yaml,
+            double_quotes_yaml=double_quotes_yaml,
+            align_comments_flag=align_comments_flag,
+            enforce_block_style_flag=enforce_block_style_flag,
+        )
+        notify_document(single_item, index)
         if output_file is None:
             out = sys.stdout
             yamkix_dump_one(
@@ -181,12 +471,13 @@ def yamkix_dump_all(  # noqa: PLR0913, PLR0917
                 )
 
 
-def yamkix_dump_one(
+def yamkix_dump_one(  # noqa: PLR0913, PLR0917
     single_item: CommentedBase,
     yaml: YAML,
     dash_inwards: bool,
     out: TextIO,
     spaces_before_comment: int | None,
+    stats: FileProcessingStats | None = None,
 ) -> None:
     """Dump a single document.
 
@@ -197,10 +488,19 @@ def yamkix_dump_one(
         dash_inwards: Whether to apply dash inwards formatting.
         out: The output stream to write to.
         spaces_before_comment: The number of spaces to use before comments.
+        stats: If set, receives the duration of the comment spacing transform and of the emit phase.
     """
     if spaces_before_comment is not None:
-        process_comments(data=single_item, column=spaces_before_comment)
-    if dash_inwards and type(single_item).__name__ == "CommentedSeq":
-        yaml.dump(data=single_item, stream=out, transform=strip_leading_double_space_and_trailing_spaces)
-    else:
-        yaml.dump(data=single_item, stream=out, transform=strip_trailing_spaces)
+        with measure_transform(stats, COMMENT_SPACING):
+            process_comments(data=single_item, column=spaces_before_comment)
+    with measure(stats, EMIT):
+        emitted = emit_document(single_item, yaml)
+        if emitted is not None:
+            # Written without trailing spaces
+            if dash_inwards and type(single_item).__name__ == "CommentedSeq":
+                emitted = strip_leading_double_space(emitted)
+            out.write(emitted)
+        elif dash_inwards and type(single_item).__name__ == "CommentedSeq":
+            yaml.dump(data=single_item, stream=out, transform=strip_leading_double_space_and_trailing_spaces)
+        else:
+            yaml.dump(data=single_item, stream=out, transform=strip_trailing_spaces)
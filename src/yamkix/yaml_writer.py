@@ -1,13 +1,23 @@
 """Helper to deal with Yamkix configuration of the YAML instance."""
 
+import threading
+from copy import deepcopy
+from typing import Final
+
 from ruamel.yaml import YAML
+from ruamel.yaml.scanner import Scanner
 
-from yamkix.config import YamkixConfig
+from yamkix.comment_free import CommentFreeParser
+from yamkix.config import YamkixConfig, YamkixStyleKey, get_yamkix_style_key
+from yamkix.limits import set_resource_limits
 
 OPINIONATED_MAPPING_VALUE = 2
 OPINIONATED_SEQUENCE_VALUE = 4
 OPINIONATED_OFFSET_VALUE = 2
 
+# A `YAML` instance holds the state of the load or dump in progress: each thread caches its own writers
+_THREAD_LOCAL: Final = threading.local()
+
 
 def get_opinionated_yaml_writer(
     yamkix_config: YamkixConfig,
@@ -23,8 +33,13 @@ def get_opinionated_yaml_writer(
             <li>`sequence = 4` (sequence indent)</li>
             <li>`offset = 2` (sequence dash offset)</li>
         </ul>
+        When `yamkix_config.limits` is set, the pure Python parser is used to enforce them.
     """
-    yaml = YAML(typ=yamkix_config.parsing_mode)
+    if yamkix_config.limits is not None:
+        yaml = YAML(typ=yamkix_config.parsing_mode, pure=True)
+        set_resource_limits(yaml, yamkix_config.limits)
+    else:
+        yaml = YAML(typ=yamkix_config.parsing_mode)
     yaml.explicit_start = yamkix_config.explicit_start
     yaml.explicit_end = yamkix_config.explicit_end
     yaml.default_flow_style = yamkix_config.default_flow_style
@@ -35,3 +50,118 @@ def get_opinionated_yaml_writer(
             mapping=OPINIONATED_MAPPING_VALUE, sequence=OPINIONATED_SEQUENCE_VALUE, offset=OPINIONATED_OFFSET_VALUE
         )
     return yaml
+
+
+def get_double_quotes_yaml_writer(yaml: YAML, yamkix_config: YamkixConfig) -> YAML | None:
+    """Return the extra `YAML` writer used to enforce double quotes, if the config requires one.
+
+    Parameters:
+        yaml: The `YAML` writer configured from `yamkix_config`.
+        yamkix_config: a YamkixConfig instance
+    Returns:
+        A copy of `yaml` that preserves quotes when double quotes must be enforced, `None` otherwise.
+    """
+    if yamkix_config.quotes_preserved is False and yamkix_config.enforce_double_quotes:
+        double_quotes_yaml = deepcopy(yaml)
+        double_quotes_yaml.preserve_quotes = True
+        return double_quotes_yaml
+    return None
+
+
+def get_cached_yaml_writers(yamkix_config: YamkixConfig) -> tuple[YAML, YAML | None]:
+    """Return warm `YAML` writers, shared by all the configs with the same formatting options.
+
+    The writers are cached per thread: threads formatting content concurrently never share a writer.
+
+    Parameters:
+        yamkix_config: a YamkixConfig instance, its `io_config` is not taken into account
+    Returns:
+        The opinionated `YAML` writer and the optional double quotes `YAML` writer
+        (see `get_double_quotes_yaml_writer`).
+    """
+    cached_writers: dict[YamkixStyleKey, tuple[YAML, YAML | None]] | None = getattr(_THREAD_LOCAL, "writers", None)
+    if cached_writers is None:
+        cached_writers = _THREAD_LOCAL.writers = {}
+    style_key = get_yamkix_style_key(yamkix_config)
+    writers = cached_writers.get(style_key)
+    if writers is None:
+        yaml = get_opinionated_yaml_writer(yamkix_config)
+        writers = (yaml, get_double_quotes_yaml_writer(yaml, yamkix_config))
+        cached_writers[style_key] = writers
+    return writers
+
+
+def get_cached_comment_free_loader(yamkix_config: YamkixConfig) -> YAML:
+    """Return a warm `YAML` loader for the contents without comments (see `yamkix.comment_free`).
+
+    The loader is configured like the opinionated `YAML` writer of `yamkix_config`, resource
+    limits included, with a scanner that does not look for comments. It is cached per thread,
+    like the writers.
+
+    Parameters:
+        yamkix_config: a YamkixConfig instance in `rt` parsing mode, its `io_config` is not taken into account
+    """
+    cached_loaders: dict[YamkixStyleKey, YAML] | None = getattr(_THREAD_LOCAL, "comment_free_loaders", None)
+    if cached_loaders is None:
+        cached_loaders = _THREAD_LOCAL.comment_free_loaders = {}
+    style_key = get_yamkix_style_key(yamkix_config)
+    loader = cached_loaders.get(style_key)
+    if loader is None:
+        loader = get_opinionated_yaml_writer(yamkix_config)
+        loader.Scanner = Scanner
+        loader.Parser = CommentFreeParser
+        cached_loaders[style_key] = loader
+    return loader
+
+
+def reset_yaml_directives(yamkix_config: YamkixConfig) -> None:
+    """Forget the `%YAML` version and `%TAG` handles kept by the cached `YAML` instances of the current thread.
+
+    The parser of `ruamel.yaml` stores the version of a `%YAML` directive and the handles of the
+    `%TAG` directives on the `YAML` instance, that then resolves the following loads and writes
+    the following dumps with them.
+
+    Parameters:
+        yamkix_config: a YamkixConfig instance, its `io_config` is not taken into account
+    """
+    style_key = get_yamkix_style_key(yamkix_config)
+    yaml_instances = [
+        *getattr(_THREAD_LOCAL, "writers", {}).get(style_key, ()),
+        getattr(_THREAD_LOCAL, "comment_free_loaders", {}).get(style_key),
+        *getattr(_THREAD_LOCAL, "readers", {}).values(),
+    ]
+    for yaml in yaml_instances:
+        if yaml is not None:
+            yaml.version = None
+            yaml.tags = None
+
+
+def discard_cached_yaml_instances(yamkix_config: YamkixConfig) -> None:
+    """Drop the cached `YAML` instances of the current thread for the formatting options of `yamkix_config`.
+
+    A `YAML` instance is left in the state of a load or dump that raised (e.g. an unfinished
+    dump context): the next calls get new instances.
+
+    Parameters:
+        yamkix_config: a YamkixConfig instance, its `io_config` is not taken into account
+    """
+    style_key = get_yamkix_style_key(yamkix_config)
+    getattr(_THREAD_LOCAL, "writers", {}).pop(style_key, None)
+    getattr(_THREAD_LOCAL, "comment_free_loaders", {}).pop(style_key, None)
+    getattr(_THREAD_LOCAL, "readers", {}).clear()
+
+
+def get_thread_local_yaml(typ: str, pure: bool = False) -> YAML:
+    """Return a `YAML` instance of the current thread, created on first use, e.g. to scan or compose content.
+
+    Parameters:
+        typ: The type of the instance, e.g. `safe`.
+        pure: Whether to use the pure Python implementation, even if the C extension is installed.
+    """
+    readers: dict[tuple[str, bool], YAML] | None = getattr(_THREAD_LOCAL, "readers", None)
+    if readers is None:
+        readers = _THREAD_LOCAL.readers = {}
+    yaml = readers.get((typ, pure))
+    if yaml is None:
+        yaml = readers[(typ, pure)] = YAML(typ=typ, pure=pure)
+    return yaml
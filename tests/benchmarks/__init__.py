@@ -0,0 +1 @@
+"""Provide benchmarks."""
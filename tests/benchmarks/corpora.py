@@ -0,0 +1,86 @@
+"""Generate deterministic synthetic YAML corpora for the benchmarks."""
+
+import json
+import random
+from collections.abc import Callable
+from typing import Final
+
+SEED: Final = 42
+
+
+def _deployment(index: int) -> str:
+    return f"""\
+---
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: 'app-{index}'
+  labels: {{app: "app-{index}", tier: backend}}
+spec:
+  replicas: {index % 5 + 1}
+  template:
+    spec:
+      containers:
+      - name: app
+        image: "registry.example.com/app:{index}.0.0"
+        args: ["--port", "80{index % 100:02d}", '--verbose']
+        env:
+        - name: INDEX
+          value: '{index}'
+        - name: GREETING
+          value: "hello world"
+"""
+
+
+def multi_doc_stream(documents: int = 100) -> str:
+    """Return a stream of Kubernetes-like manifests, as found in rendered Helm charts."""
+    return "".join(_deployment(index) for index in range(documents))
+
+
+def giant_document(keys: int = 1000) -> str:
+    """Return a single document holding a large nested map."""
+    rng = random.Random(SEED)  # noqa: S311
+    lines = ["---", "items:"]
+    for index in range(keys):
+        lines.append(f"  key_{index}:")
+        lines.append(f"    id: {index}")
+        lines.append(f"    name: 'item {index}'")
+        lines.append(f"    weight: {rng.random():.6f}")
+        lines.append(f"    tags: [{', '.join(f'tag{rng.randrange(100)}' for _ in range(3))}]")
+    return "\n".join(lines) + "\n"
+
+
+def comment_heavy(entries: int = 1000) -> str:
+    """Return a document where each entry carries a comment line and an end of line comment."""
+    lines = ["# A configuration file with a lot of comments", "---"]
+    for index in range(entries):
+        lines.append(f"# The setting number {index}")
+        lines.append(f"setting_{index}: {index}   # the value of setting {index}")
+    return "\n".join(lines) + "\n"
+
+
+def json_document(items: int = 10000) -> str:
+    """Return a pretty printed JSON document, as generated by tools (about 2 MiB with the default size)."""
+    rng = random.Random(SEED)  # noqa: S311
+    document = {
+        "items": [
+            {
+                "id": index,
+                "name": f"item {index}",
+                "weight": round(rng.random(), 6),
+                "tags": [f"tag{rng.randrange(100)}" for _ in range(3)],
+                "enabled": index % 2 == 0,
+                "parent": None,
+            }
+            for index in range(items)
+        ]
+    }
+    return json.dumps(document, indent=2) + "\n"
+
+
+CORPORA: Final[dict[str, Callable[[], str]]] = {
+    "multi_doc_stream": multi_doc_stream,
+    "giant_document": giant_document,
+    "comment_heavy": comment_heavy,
+    "json_document": json_document,
+}
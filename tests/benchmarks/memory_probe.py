@@ -0,0 +1,58 @@
+"""Measure the memory used by `round_trip_and_format` on a file, in a fresh process.
+
+Usage: `python memory_probe.py FILE MODE`, `MODE` being one of `MODES`. Prints the
+measures as JSON on STDOUT.
+"""
+
+import json
+import os
+import resource
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Final
+
+from yamkix.config import YamkixInputOutputConfig, get_yamkix_config_from_default
+from yamkix.yamkix import format_yaml_content, round_trip_and_format
+
+MODES: Final = {
+    "default": {},
+    "double_quotes": {"quotes_preserved": False, "enforce_double_quotes": True},
+}
+# ru_maxrss is in kilobytes on Linux, in bytes on macOS
+MAXRSS_UNIT: Final = 1 if sys.platform == "darwin" else 1024
+PROC_STATUS_PATH: Final = Path("/proc/self/status")
+KILOBYTE: Final = 1024
+
+
+def get_max_rss() -> int:
+    """Return the peak resident set size of the process, in bytes.
+
+    On Linux, `ru_maxrss` is inherited from the parent process (e.g. pytest): the high
+    water mark of the memory of this process (`VmHWM`) is read instead.
+    """
+    if PROC_STATUS_PATH.exists():
+        for line in PROC_STATUS_PATH.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * KILOBYTE
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT
+
+
+def main(path: str, mode: str) -> None:
+    """Print the tracemalloc peak and the peak RSS of the process while formatting `path`."""
+    config = get_yamkix_config_from_default(
+        io_config=YamkixInputOutputConfig(input=path, output=os.devnull), **MODES[mode]
+    )
+    # Warm up: imports and cached YAML writers are not part of the measures
+    format_yaml_content("a: 1\n", config)
+    round_trip_and_format(config)
+    rss_peak = get_max_rss()
+    tracemalloc.start()
+    round_trip_and_format(config)
+    _, tracemalloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    json.dump({"tracemalloc_peak": tracemalloc_peak, "rss_peak": rss_peak}, sys.stdout)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
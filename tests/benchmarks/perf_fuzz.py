@@ -0,0 +1,311 @@
+"""Fuzz the formatting for inputs whose runtime grows super-linearly with their size.
+
+A `Shape` describes a family of generated inputs (nesting, comment density, anchors,
+long scalars, flow collections) and the transforms of the pipeline to run, one of its
+dimensions (the `axis`) growing with the size. The growth exponent of a shape is measured
+between two sizes, relative to the number of bytes of the input: a shape is flagged when
+its runtime grows faster than `MAX_GROWTH_EXPONENT`.
+
+Usage: `python perf_fuzz.py [--runs N] [--seed SEED] [--save]`. Each flagged shape is
+shrunk to the simplest shape still flagged and, with `--save`, written to `CORPUS_DIR` as
+a reproducer checked by `test_perf_fuzz.py`. The corpus also holds guard shapes (`guard-*.yml`),
+written the same way, for the transforms and dimensions most likely to regress.
+"""
+
+import argparse
+import dataclasses
+import gc
+import json
+import math
+import random
+import sys
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final
+
+from yamkix.config import YamkixConfig, get_yamkix_config_from_default
+from yamkix.yamkix import format_yaml_content
+
+CORPUS_DIR: Final = Path(__file__).parent / "perf_corpus"
+SHAPE_HEADER: Final = "# perf-fuzz shape: "
+# The dimension of the input growing with the size
+ENTRIES: Final = "entries"
+DEPTH: Final = "depth"
+SCALAR_LENGTH: Final = "scalar_length"
+DOCUMENTS: Final = "documents"
+FLOW_ITEMS: Final = "flow_items"
+AXES: Final = (ENTRIES, DEPTH, SCALAR_LENGTH, DOCUMENTS, FLOW_ITEMS)
+# The transforms of the pipeline, on top of the round trip
+DOUBLE_QUOTES: Final = "double_quotes"
+BLOCK_STYLE: Final = "block_style"
+COMMENT_ALIGNMENT: Final = "comment_alignment"
+COMMENT_SPACING: Final = "comment_spacing"
+TRANSFORMS: Final = (DOUBLE_QUOTES, BLOCK_STYLE, COMMENT_ALIGNMENT, COMMENT_SPACING)
+# A linear runtime has an exponent of 1, leave room for the noise of the measures
+MAX_GROWTH_EXPONENT: Final = 1.5
+# The runtime added by the base size must dominate the noise of the timer
+MIN_BASE_DURATION: Final = 0.02
+# Deeper inputs hit the recursion limit of the parser
+MAX_BASE_SIZES: Final = {ENTRIES: 4096, DEPTH: 32, SCALAR_LENGTH: 65536, DOCUMENTS: 1024, FLOW_ITEMS: 4096}
+GROWTH_FACTOR: Final = 4
+REPEATS: Final = 3
+# The resolution of the measures, in seconds
+MIN_DURATION: Final = 1e-6
+
+
+@dataclass(frozen=True)
+class Shape:
+    """A family of generated inputs, and the transforms to run on them.
+
+    Attributes:
+        axis: The dimension growing with the size, one of `AXES`.
+        nesting: The depth of the nested maps of each entry.
+        comment_density: The share of the lines carrying a comment, between 0 and 1.
+        anchors: Whether the entries are aliases of an anchored entry.
+        scalar_length: The length of the long scalar of each entry, 0 for none.
+        flow: Whether each entry holds collections written in flow style, always the case along `FLOW_ITEMS`.
+        transforms: The transforms to run, among `TRANSFORMS`.
+    """
+
+    axis: str = ENTRIES
+    nesting: int = 0
+    comment_density: float = 0.0
+    anchors: bool = False
+    scalar_length: int = 0
+    flow: bool = False
+    transforms: tuple[str, ...] = ()
+
+    def to_json(self) -> str:
+        """Return the shape as a JSON string."""
+        return json.dumps(dataclasses.asdict(self), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, value: str) -> "Shape":
+        """Return the shape described by a JSON string."""
+        fields = json.loads(value)
+        return cls(**{**fields, "transforms": tuple(fields["transforms"])})
+
+
+def get_config(shape: Shape) -> YamkixConfig:
+    """Return the configuration running the transforms of `shape`."""
+    return get_yamkix_config_from_default(
+        quotes_preserved=DOUBLE_QUOTES not in shape.transforms,
+        enforce_double_quotes=DOUBLE_QUOTES in shape.transforms,
+        enforce_block_style=BLOCK_STYLE in shape.transforms,
+        align_comments=COMMENT_ALIGNMENT in shape.transforms,
+        spaces_before_comment=1 if COMMENT_SPACING in shape.transforms else None,
+    )
+
+
+def _comment(rng: random.Random, shape: Shape, text: str) -> str:
+    return f"  # {text}" if rng.random() < shape.comment_density else ""
+
+
+def _entry(  # noqa: PLR0913, PLR0917
+    rng: random.Random, shape: Shape, index: int, depth: int, scalar_length: int, flow_items: int
+) -> Iterator[str]:
+    """Yield the lines of the value of an entry, indented under its key."""
+    indent = "  "
+    if flow_items:
+        items = ", ".join(f"'item {index}-{item}'" for item in range(flow_items))
+        yield f"{indent}tags: [{items}]{_comment(rng, shape, 'flow list')}"
+        yield f'{indent}labels: {{name: "entry-{index}", index: {index}}}{_comment(rng, shape, "flow map")}'
+    if scalar_length:
+        scalar = " ".join(f"word{rng.randrange(1000)}" for _ in range(scalar_length // 8 + 1))[:scalar_length]
+        yield f"{indent}description: '{scalar}'{_comment(rng, shape, 'long scalar')}"
+    for level in range(depth):
+        indent = "  " * (level + 1)
+        yield f"{indent}level_{level}:{_comment(rng, shape, f'level {level}')}"
+    yield f'{"  " * (depth + 1)}value: "{index}"{_comment(rng, shape, f"value {index}")}'
+
+
+def generate(shape: Shape, size: int, seed: int = 0) -> str:
+    """Generate the input of `shape` at `size`, `shape.axis` being set to `size`."""
+    rng = random.Random(seed)  # noqa: S311
+    entries = size if shape.axis == ENTRIES else 16
+    depth = size if shape.axis == DEPTH else shape.nesting
+    scalar_length = size if shape.axis == SCALAR_LENGTH else shape.scalar_length
+    documents = size if shape.axis == DOCUMENTS else 1
+    flow_items = size if shape.axis == FLOW_ITEMS else 3 * shape.flow
+    lines: list[str] = []
+    for document in range(documents):
+        lines.append("---")
+        if rng.random() < shape.comment_density:
+            lines.append(f"# document {document}")
+        lines.append("template: &template" if shape.anchors else "template:")
+        lines.extend(_entry(rng, shape, -1, depth, scalar_length, flow_items))
+        for index in range(entries):
+            if shape.anchors:
+                lines.append(f"entry_{index}: *template{_comment(rng, shape, f'entry {index}')}")
+            else:
+                lines.append(f"entry_{index}:{_comment(rng, shape, f'entry {index}')}")
+                lines.extend(_entry(rng, shape, index, depth, scalar_length, flow_items))
+    return "\n".join(lines) + "\n"
+
+
+def time_format(content: str, config: YamkixConfig) -> float:
+    """Return the best runtime of `REPEATS` formattings of `content`, in seconds."""
+    durations = []
+    for _ in range(REPEATS):
+        gc.collect()
+        start_time = time.perf_counter()
+        format_yaml_content(content, config)
+        durations.append(time.perf_counter() - start_time)
+    return min(durations)
+
+
+@dataclass(frozen=True)
+class GrowthMeasure:
+    """The runtime of a shape at three sizes: 0, the base size and the grown size.
+
+    The input at size 0 holds the part of the input not depending on the size. Its runtime
+    (e.g. the fixed cost of a document) is subtracted from the two others, so that it does
+    not hide the growth of the runtime of the part depending on the size.
+
+    Attributes:
+        fixed_bytes: The number of bytes of the input at size 0.
+        fixed_duration: The runtime at size 0, in seconds.
+        base_size: The base size, see `measure_growth`.
+        base_bytes: The number of bytes of the input at `base_size`.
+        base_duration: The runtime at `base_size`, in seconds.
+        grown_bytes: The number of bytes of the input at `base_size * GROWTH_FACTOR`.
+        grown_duration: The runtime at `base_size * GROWTH_FACTOR`, in seconds.
+    """
+
+    fixed_bytes: int
+    fixed_duration: float
+    base_size: int
+    base_bytes: int
+    base_duration: float
+    grown_bytes: int
+    grown_duration: float
+
+    @property
+    def exponent(self) -> float:
+        """The exponent of the growth of the runtime relative to the number of bytes of the input."""
+        base_duration = max(self.base_duration - self.fixed_duration, MIN_DURATION)
+        grown_duration = max(self.grown_duration - self.fixed_duration, MIN_DURATION)
+        return math.log(grown_duration / base_duration) / math.log(
+            (self.grown_bytes - self.fixed_bytes) / (self.base_bytes - self.fixed_bytes)
+        )
+
+    @property
+    def super_linear(self) -> bool:
+        """Whether the runtime grows faster than `MAX_GROWTH_EXPONENT`."""
+        return self.exponent > MAX_GROWTH_EXPONENT
+
+
+def measure_growth(shape: Shape) -> GrowthMeasure:
+    """Measure the growth of the runtime of `shape`.
+
+    The base size is doubled from 1 until it at least doubles the runtime at size 0, and adds
+    at least `MIN_BASE_DURATION` to it.
+    """
+    config = get_config(shape)
+    format_yaml_content("a: 1\n", config)  # Warm up the cached YAML writers
+    fixed_content = generate(shape, 0)
+    fixed_duration = time_format(fixed_content, config)
+    size = 1
+    content = generate(shape, size)
+    duration = time_format(content, config)
+    while duration - fixed_duration < max(MIN_BASE_DURATION, fixed_duration) and size < MAX_BASE_SIZES[shape.axis]:
+        size *= 2
+        content = generate(shape, size)
+        duration = time_format(content, config)
+    grown_content = generate(shape, size * GROWTH_FACTOR)
+    return GrowthMeasure(
+        fixed_bytes=len(fixed_content.encode("UTF-8")),
+        fixed_duration=fixed_duration,
+        base_size=size,
+        base_bytes=len(content.encode("UTF-8")),
+        base_duration=duration,
+        grown_bytes=len(grown_content.encode("UTF-8")),
+        grown_duration=time_format(grown_content, config),
+    )
+
+
+def random_shape(rng: random.Random) -> Shape:
+    """Return a random shape."""
+    return Shape(
+        axis=rng.choice(AXES),
+        nesting=rng.randrange(5),
+        comment_density=rng.choice((0.0, 0.5, 1.0)),
+        anchors=rng.random() < 0.5,
+        scalar_length=rng.choice((0, 80, 1000)),
+        flow=rng.random() < 0.5,
+        transforms=tuple(transform for transform in TRANSFORMS if rng.random() < 0.5),
+    )
+
+
+def simpler_shapes(shape: Shape) -> Iterator[Shape]:
+    """Yield the shapes one step simpler than `shape`."""
+    if shape.nesting:
+        yield dataclasses.replace(shape, nesting=0)
+        yield dataclasses.replace(shape, nesting=shape.nesting - 1)
+    if shape.comment_density:
+        yield dataclasses.replace(shape, comment_density=0.0)
+    if shape.anchors:
+        yield dataclasses.replace(shape, anchors=False)
+    if shape.scalar_length:
+        yield dataclasses.replace(shape, scalar_length=0)
+    if shape.flow:
+        yield dataclasses.replace(shape, flow=False)
+    for transform in shape.transforms:
+        yield dataclasses.replace(shape, transforms=tuple(other for other in shape.transforms if other != transform))
+
+
+def shrink(shape: Shape) -> Shape:
+    """Return the simplest shape derived from `shape` that is still super-linear."""
+    shrinking = True
+    while shrinking:
+        shrinking = False
+        for candidate in simpler_shapes(shape):
+            if measure_growth(candidate).super_linear:
+                shape = candidate
+                shrinking = True
+                break
+    return shape
+
+
+def get_reproducer(shape: Shape, measure: GrowthMeasure) -> str:
+    """Return a reproducer for the corpus: the shape as a header comment, and its input at the base size."""
+    return f"{SHAPE_HEADER}{shape.to_json()}\n{generate(shape, measure.base_size)}"
+
+
+def read_reproducer_shape(path: Path) -> Shape:
+    """Return the shape of a reproducer of the corpus."""
+    header = path.read_text(encoding="UTF-8").splitlines()[0]
+    return Shape.from_json(header.removeprefix(SHAPE_HEADER))
+
+
+def main() -> int:
+    """Fuzz random shapes, shrink the super-linear ones and optionally save them to the corpus."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="the number of random shapes to measure")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random shapes")
+    parser.add_argument("--save", action="store_true", help="write the shrunk shapes to the corpus")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)  # noqa: S311
+    flagged = 0
+    for run in range(args.runs):
+        shape = random_shape(rng)
+        measure = measure_growth(shape)
+        print(f"{run:4d} exponent {measure.exponent:5.2f} {shape.to_json()}")  # noqa: T201
+        if not measure.super_linear:
+            continue
+        flagged += 1
+        shrunk = shrink(shape)
+        shrunk_measure = measure_growth(shrunk)
+        print(f"     shrunk to exponent {shrunk_measure.exponent:5.2f} {shrunk.to_json()}")  # noqa: T201
+        if args.save:
+            CORPUS_DIR.mkdir(exist_ok=True)
+            path = CORPUS_DIR / f"seed{args.seed}-run{run}.yml"
+            path.write_text(get_reproducer(shrunk, shrunk_measure), encoding="UTF-8")
+            print(f"     saved to {path}")  # noqa: T201
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Compare the emission of a large document by the direct emitter and by `ruamel.yaml`.
+
+The direct emitter (see `yamkix.direct_emitter`) must produce the output of `ruamel.yaml`,
+and emit the document at least `MIN_SPEEDUP` times faster.
+"""
+
+from collections.abc import Callable
+from typing import Final
+
+import pytest
+from pytest_mock import MockerFixture
+
+from tests.benchmarks.corpora import giant_document, json_document
+from yamkix.config import get_yamkix_config_from_default
+from yamkix.report import EMIT, FileProcessingStats
+from yamkix.yamkix import format_yaml_content
+
+MIN_SPEEDUP: Final = 3
+
+pytestmark = pytest.mark.benchmark
+
+
+class TestDirectEmitter:
+    """Provide benchmarks of the direct emitter."""
+
+    @pytest.mark.parametrize("corpus", [giant_document, json_document], ids=lambda corpus: corpus.__name__)
+    def test_faster_than_ruamel(self, mocker: MockerFixture, corpus: Callable[[], str]) -> None:
+        """Test that the direct emitter emits the document faster than `ruamel.yaml`, for the same output."""
+        # GIVEN
+        content = corpus()
+        config = get_yamkix_config_from_default(enforce_block_style=True)
+        direct_stats = FileProcessingStats()
+        ruamel_stats = FileProcessingStats()
+
+        # WHEN
+        direct_output = format_yaml_content(content, config, direct_stats)
+        mocker.patch("yamkix.yamkix.emit_document", return_value=None)
+        ruamel_output = format_yaml_content(content, config, ruamel_stats)
+
+        # THEN
+        assert direct_output == ruamel_output
+        direct_duration = direct_stats.durations[EMIT]
+        ruamel_duration = ruamel_stats.durations[EMIT]
+        assert direct_duration * MIN_SPEEDUP <= ruamel_duration, (
+            f"the direct emitter emitted the document in {direct_duration:.3f}s, ruamel.yaml in {ruamel_duration:.3f}s"
+        )
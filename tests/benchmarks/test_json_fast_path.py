@@ -0,0 +1,51 @@
+"""Compare the parsing of a multi-MiB JSON document by the `json` module and by `ruamel.yaml`.
+
+The JSON fast path (see `yamkix.json_input`) must produce the output of the YAML parser,
+and parse the document at least `MIN_SPEEDUP` times faster than the `rt` and `safe` loaders.
+"""
+
+from typing import Final
+
+import pytest
+from pytest_mock import MockerFixture
+
+from tests.benchmarks.corpora import json_document
+from yamkix.config import get_yamkix_config_from_default
+from yamkix.report import PARSE, FileProcessingStats
+from yamkix.yamkix import format_yaml_content
+
+MIN_SPEEDUP: Final = 5
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(name="content", scope="module")
+def content_fixture() -> str:
+    """Provide the JSON document."""
+    return json_document()
+
+
+class TestJsonFastPath:
+    """Provide benchmarks of the JSON fast path."""
+
+    @pytest.mark.parametrize("parsing_mode", ["rt", "safe"])
+    def test_faster_than_the_yaml_parser(self, mocker: MockerFixture, content: str, parsing_mode: str) -> None:
+        """Test that the JSON fast path parses the document faster than the YAML parser, for the same output."""
+        # GIVEN
+        config = get_yamkix_config_from_default(parsing_mode=parsing_mode)
+        fast_path_stats = FileProcessingStats()
+        yaml_parser_stats = FileProcessingStats()
+
+        # WHEN
+        fast_path_output = format_yaml_content(content, config, fast_path_stats)
+        mocker.patch("yamkix.yamkix.load_json_document", return_value=None)
+        yaml_parser_output = format_yaml_content(content, config, yaml_parser_stats)
+
+        # THEN
+        assert fast_path_output == yaml_parser_output
+        fast_path_duration = fast_path_stats.durations[PARSE]
+        yaml_parser_duration = yaml_parser_stats.durations[PARSE]
+        assert fast_path_duration * MIN_SPEEDUP <= yaml_parser_duration, (
+            f"the JSON fast path parsed the document in {fast_path_duration:.3f}s, "
+            f"the YAML parser in {yaml_parser_duration:.3f}s"
+        )
@@ -0,0 +1,102 @@
+"""Check the memory used to format synthetic corpora against recorded baselines.
+
+Each case runs in a fresh process (see `memory_probe.py`) so that the peak RSS is not
+polluted by the other tests. The baselines depend on the Python version, they are recorded
+for each supported version: run with `YAMKIX_UPDATE_MEMORY_BASELINES=1` to record them for
+the current one, e.g. after an intended change of the memory usage or for a new version.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Final
+
+import pytest
+
+from tests.benchmarks.corpora import CORPORA
+
+PROBE_PATH: Final = Path(__file__).parent / "memory_probe.py"
+BASELINES_PATH: Final = Path(__file__).parent / "memory_baselines.json"
+PROJECT_PATH: Final = Path(__file__).parent.parent.parent
+SRC_PATH: Final = PROJECT_PATH / "src"
+UPDATE_BASELINES: Final = os.environ.get("YAMKIX_UPDATE_MEMORY_BASELINES") == "1"
+PYTHON_VERSION: Final = f"{sys.version_info.major}.{sys.version_info.minor}"
+# tracemalloc is deterministic for a given Python version, the RSS depends on the allocator and the platform
+TOLERANCES: Final = {"tracemalloc_peak": 0.10, "rss_peak": 0.50}
+CASES: Final = [
+    ("multi_doc_stream", "default"),
+    ("giant_document", "default"),
+    ("comment_heavy", "default"),
+    ("multi_doc_stream", "double_quotes"),
+]
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(sys.platform == "win32", reason="the peak RSS is measured with the resource module"),
+]
+
+
+def read_baselines() -> dict[str, dict[str, dict[str, int]]]:
+    """Read the recorded baselines, by Python version and by case."""
+    return json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+
+
+def measure_memory(path: Path, mode: str) -> dict[str, int]:
+    """Measure the memory used to format a file in a fresh process."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(SRC_PATH), os.environ.get("PYTHONPATH", "")])}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, str(PROBE_PATH), str(path), mode], check=True, capture_output=True, text=True, env=env
+    )
+    return json.loads(result.stdout)
+
+
+def get_supported_python_versions() -> set[str]:
+    """Return the Python versions listed in the classifiers of the project."""
+    pyproject = (PROJECT_PATH / "pyproject.toml").read_text()
+    return set(re.findall(r'"Programming Language :: Python :: (3\.\d+)"', pyproject))
+
+
+class TestMemory:
+    """Provide memory benchmarks."""
+
+    @pytest.mark.parametrize(("corpus", "mode"), CASES, ids=[f"{corpus}-{mode}" for corpus, mode in CASES])
+    def test_memory_within_baseline(self, tmp_path: Path, corpus: str, mode: str) -> None:
+        """Test that formatting a corpus does not use more memory than recorded."""
+        # GIVEN
+        path = tmp_path / f"{corpus}.yml"
+        path.write_text(CORPORA[corpus]())
+        case = f"{corpus}-{mode}"
+
+        # WHEN
+        measures = measure_memory(path, mode)
+
+        # THEN
+        baselines = read_baselines()
+        if UPDATE_BASELINES:
+            baselines.setdefault(PYTHON_VERSION, {})[case] = measures
+            BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+            return
+        baseline = baselines.get(PYTHON_VERSION, {}).get(case)
+        if baseline is None:
+            pytest.skip(f"no baseline for {case} on Python {PYTHON_VERSION}, see YAMKIX_UPDATE_MEMORY_BASELINES")
+        for measure, tolerance in TOLERANCES.items():
+            assert measures[measure] <= baseline[measure] * (1 + tolerance), (
+                f"{measure} is {measures[measure]} bytes, the baseline is {baseline[measure]} bytes"
+            )
+
+    def test_baselines_cover_the_supported_versions(self) -> None:
+        """Test that each supported Python version has a baseline for each case, none of them being skipped."""
+        # GIVEN
+        cases = {f"{corpus}-{mode}" for corpus, mode in CASES}
+
+        # WHEN
+        baselines = read_baselines()
+
+        # THEN
+        supported_versions = get_supported_python_versions()
+        assert supported_versions
+        for version in supported_versions:
+            assert set(baselines.get(version, {})) == cases, f"missing baselines for Python {version}"
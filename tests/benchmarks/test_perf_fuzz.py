@@ -0,0 +1,59 @@
+"""Check that the runtime of the formatting grows linearly with the size of the input.
+
+The random shapes of `perf_fuzz.py` are measured with fixed seeds, and the shapes of the
+corpus are measured too: the reproducers of the super-linear behaviors found so far (see
+`perf_fuzz.py --save`), and guard shapes (`guard-*.yml`) stressing each transform of the
+pipeline and each growing dimension of the input.
+"""
+
+import random
+from pathlib import Path
+from typing import Final
+
+import pytest
+
+from tests.benchmarks.perf_fuzz import (
+    CORPUS_DIR,
+    MAX_GROWTH_EXPONENT,
+    measure_growth,
+    random_shape,
+    read_reproducer_shape,
+    shrink,
+)
+
+SEEDS: Final = range(5)
+CORPUS_PATHS: Final = sorted(CORPUS_DIR.glob("*.yml"))
+
+pytestmark = pytest.mark.benchmark
+
+
+class TestPerfFuzz:
+    """Provide performance fuzzing tests."""
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_random_shape_scales_linearly(self, seed: int) -> None:
+        """Test that the runtime of a random shape does not grow super-linearly."""
+        # GIVEN
+        shape = random_shape(random.Random(seed))  # noqa: S311
+
+        # WHEN
+        measure = measure_growth(shape)
+
+        # THEN
+        if measure.super_linear:
+            pytest.fail(
+                f"exponent {measure.exponent:.2f} > {MAX_GROWTH_EXPONENT} for {shape.to_json()}, "
+                f"shrunk to {shrink(shape).to_json()}"
+            )
+
+    @pytest.mark.parametrize("path", CORPUS_PATHS, ids=[path.stem for path in CORPUS_PATHS])
+    def test_reproducer_scales_linearly(self, path: Path) -> None:
+        """Test that the runtime of a shape of the corpus does not grow super-linearly (anymore)."""
+        # GIVEN
+        shape = read_reproducer_shape(path)
+
+        # WHEN
+        measure = measure_growth(shape)
+
+        # THEN
+        assert measure.exponent <= MAX_GROWTH_EXPONENT, f"exponent {measure.exponent:.2f} for {shape.to_json()}"
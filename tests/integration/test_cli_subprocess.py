@@ -61,17 +61,18 @@ class TestCliSubprocess:
         # THEN
         assert result.returncode == 0
         assert result.stdout == expected.read_text()
-        assert "input=STDIN" in result.stderr
-        assert "output=STDOUT" in result.stderr
+        assert "Configuration:" in result.stderr
+        # The processed file is only printed with --verbose
+        assert "input=STDIN" not in result.stderr
 
     def test_stdin_explicit_input(self, datadir: Path) -> None:
-        """Test reading from STDIN when --input=STDIN is specified."""
+        """Test reading from STDIN when --input=STDIN is specified, the processed file being printed with --verbose."""
         # GIVEN
         source = datadir / "simple.yml"
         expected = datadir / "simple--default.yml"
 
         # WHEN
-        result = run_yamkix(["--input=STDIN"], stdin=source.read_text())
+        result = run_yamkix(["--input=STDIN", "--verbose"], stdin=source.read_text())
 
         # THEN
         assert result.returncode == 0
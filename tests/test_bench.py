@@ -0,0 +1,157 @@
+"""Provide tests for the bench module."""
+
+import itertools
+import json
+from pathlib import Path
+
+import pytest
+
+from yamkix.bench import (
+    BenchFile,
+    BenchResult,
+    format_bench_results,
+    format_bench_results_as_json,
+    get_percentile,
+    read_bench_files,
+    run_benchmark,
+)
+from yamkix.config import YamkixConfig, get_yamkix_config_from_default
+
+
+def get_bench_file(content: str, name: str = "test.yml") -> BenchFile:
+    """Return a file of the corpus that is not on disk."""
+    return BenchFile(path=Path(name), content=content, size=len(content.encode("UTF-8")))
+
+
+class TestReadBenchFiles:
+    """Provide tests for the read_bench_files function."""
+
+    def test_files_and_directories(self, tmp_path: Path) -> None:
+        """Test that the yaml files found under the directories are read, the files being read as is."""
+        # GIVEN
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "a.yaml").write_text("a: é\n")
+        (tmp_path / "sub" / "notes.txt").write_text("not yaml")
+        single = tmp_path / "single.txt"
+        single.write_text("b: 1\n")
+
+        # WHEN
+        files = read_bench_files([tmp_path / "sub", single])
+
+        # THEN
+        assert files == [
+            BenchFile(path=tmp_path / "sub" / "a.yaml", content="a: é\n", size=6),
+            BenchFile(path=single, content="b: 1\n", size=5),
+        ]
+
+
+class TestGetPercentile:
+    """Provide tests for the get_percentile function."""
+
+    @pytest.mark.parametrize(
+        ("percentile", "expected"),
+        [(50, 5.0), (90, 9.0), (99, 10.0), (100, 10.0), (1, 1.0)],
+    )
+    def test_nearest_rank(self, percentile: int, expected: float) -> None:
+        """Test that the percentiles use the nearest rank method."""
+        # WHEN / THEN
+        assert get_percentile([float(value) for value in range(1, 11)], percentile) == expected
+
+    def test_no_values(self) -> None:
+        """Test that the percentile of no values is 0."""
+        # WHEN / THEN
+        assert get_percentile([], 50) == 0.0
+
+
+class TestRunBenchmark:
+    """Provide tests for the run_benchmark function."""
+
+    def test_measures(self) -> None:
+        """Test that each file is timed on each repetition, the invalid files being excluded."""
+        # GIVEN
+        files = [get_bench_file("a: 1\n"), get_bench_file("b: [1, 2]\n"), get_bench_file("a: [\n")]
+        config = get_yamkix_config_from_default()
+        clock = itertools.count(step=0.5).__next__
+
+        # WHEN
+        result = run_benchmark("test", files, lambda _: config, warmup=2, repetitions=3, clock=clock)
+
+        # THEN
+        assert (result.name, result.files, result.errors, result.total_bytes) == ("test", 2, 1, 15)
+        assert result.latencies == [0.5] * 6
+        assert result.elapsed == 3.0
+        assert result.bytes_per_second == 15.0
+        assert result.files_per_second == 2.0
+        assert result.peak_memory > 0
+
+    def test_config_of_each_file(self) -> None:
+        """Test that each file is formatted with its own config."""
+        # GIVEN
+        files = [get_bench_file("a: 1\n", "a.yml"), get_bench_file("b: 1\n", "b.yml")]
+        requested = []
+
+        def get_config(path: Path) -> YamkixConfig:
+            requested.append(path)
+            return get_yamkix_config_from_default()
+
+        # WHEN
+        run_benchmark("test", files, get_config, warmup=0, repetitions=1)
+
+        # THEN
+        assert requested == [Path("a.yml"), Path("b.yml")]
+
+
+class TestFormatBenchResults:
+    """Provide tests for the format_bench_results and format_bench_results_as_json functions."""
+
+    @pytest.fixture(name="results")
+    def results_fixture(self) -> list[BenchResult]:
+        """Provide the results of two configurations."""
+        return [
+            BenchResult(
+                name="a", files=2, errors=0, total_bytes=2048, repetitions=2, latencies=[0.5] * 4, peak_memory=1024
+            ),
+            BenchResult(
+                name="b", files=2, errors=1, total_bytes=2048, repetitions=2, latencies=[1.0] * 4, peak_memory=2048
+            ),
+        ]
+
+    def test_table(self, results: list[BenchResult]) -> None:
+        """Test that the table holds a line per configuration, compared with the first one."""
+        # WHEN
+        lines = format_bench_results(results).splitlines()
+
+        # THEN
+        assert lines[0].split() == [
+            "config",
+            "files",
+            "errors",
+            "MiB/s",
+            "files/s",
+            "p50(ms)",
+            "p90(ms)",
+            "p99(ms)",
+            "peak(MiB)",
+            "relative",
+        ]
+        assert lines[1].split() == ["a", "2", "0", "0.002", "2.0", "500.000", "500.000", "500.000", "0.00", "x1.00"]
+        assert lines[2].split()[-1] == "x2.00"
+
+    def test_json(self, results: list[BenchResult]) -> None:
+        """Test that the JSON holds a record per configuration."""
+        # WHEN
+        records = json.loads(format_bench_results_as_json(results))
+
+        # THEN
+        assert records[1] == {
+            "name": "b",
+            "files": 2,
+            "errors": 1,
+            "total_bytes": 2048,
+            "repetitions": 2,
+            "elapsed": 4.0,
+            "bytes_per_second": 1024.0,
+            "files_per_second": 1.0,
+            "latency": {"p50": 1.0, "p90": 1.0, "p99": 1.0},
+            "peak_memory": 2048,
+        }
@@ -1,14 +1,19 @@
 """Tests for the Typer-based CLI implementation."""
 
+import json
+import pstats
 from pathlib import Path
 
 import pytest
 from pytest_mock import MockerFixture
 from typer.testing import CliRunner
 
+import yamkix.pipeline
 from yamkix._cli import app, echo_version
 from yamkix.config import get_default_yamkix_config
-from yamkix.errors import InvalidYamlContentError
+from yamkix.config_file import YamkixConfigResolver
+from yamkix.errors import GitCommandError, InvalidYamlContentError
+from yamkix.logger import Verbosity, YamkixLogger
 from yamkix.yamkix import FileProcessingResult
 
 runner = CliRunner()
@@ -57,6 +62,13 @@ def test_echo_version(
 class TestCli:
     """Provide unit tests for the CLI."""
 
+    @pytest.fixture(autouse=True)
+    def no_config_files(self, mocker: MockerFixture) -> None:
+        """Keep the configs unchanged, as if there was no configuration file."""
+        mocker.patch.object(
+            YamkixConfigResolver, "resolve", autospec=True, side_effect=lambda _self, config, _file=None: config
+        )
+
     def test_invalid_typ(self) -> None:
         """Test running the CLI with an invalid typ."""
         # WHEN
@@ -73,7 +85,7 @@ class TestCli:
         mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
         mock_config = mocker.Mock()
         mock_create_config.return_value = [mock_config]
-        mock_print_config = mocker.patch("yamkix._cli.print_yamkix_config")
+        mock_print_config = mocker.patch.object(YamkixLogger, "log_config")
         mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
         test_file = shared_datadir / "simple.yml"
         # WHEN
@@ -98,9 +110,11 @@ class TestCli:
             line_width=default_config.line_width,
             align_comments=default_config.align_comments,
             files=None,
+            limits=None,
+            verify=False,
         )
         mock_print_config.assert_called_once_with(mock_config)
-        mock_round_trip.assert_called_once_with(mock_config)
+        mock_round_trip.assert_called_once_with(mock_config, None)
 
     def test_default_values_with_one_argument(self, mocker: MockerFixture, shared_datadir: Path) -> None:
         """Test running the CLI without any parameters uses default values."""
@@ -108,7 +122,7 @@ class TestCli:
         mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
         mock_config = mocker.Mock()
         mock_create_config.return_value = [mock_config]
-        mock_print_config = mocker.patch("yamkix._cli.print_yamkix_config")
+        mock_print_config = mocker.patch.object(YamkixLogger, "log_config")
         mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
         test_file = shared_datadir / "simple.yml"
         # WHEN
@@ -133,9 +147,11 @@ class TestCli:
             line_width=default_config.line_width,
             align_comments=default_config.align_comments,
             files=[test_file],
+            limits=None,
+            verify=False,
         )
         mock_print_config.assert_called_once_with(mock_config)
-        mock_round_trip.assert_called_once_with(mock_config)
+        mock_round_trip.assert_called_once_with(mock_config, None)
 
     def test_default_values_with_two_arguments(self, mocker: MockerFixture, shared_datadir: Path) -> None:
         """Test running the CLI without any parameters uses default values."""
@@ -145,7 +161,7 @@ class TestCli:
         mock_config2 = mocker.Mock()
         configs = [mock_config1, mock_config2]
         mock_create_config.return_value = configs
-        mock_print_config = mocker.patch("yamkix._cli.print_yamkix_config")
+        mock_print_config = mocker.patch.object(YamkixLogger, "log_config")
         mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
         test_file1 = shared_datadir / "simple.yml"
         test_file2 = shared_datadir / "multi-doc-1.yml"
@@ -171,6 +187,8 @@ class TestCli:
             line_width=default_config.line_width,
             align_comments=default_config.align_comments,
             files=[test_file1, test_file2],
+            limits=None,
+            verify=False,
         )
         mock_print_config.assert_called()
         assert mock_print_config.call_count == len(configs)
@@ -183,7 +201,7 @@ class TestCli:
         mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
         mock_config = mocker.Mock()
         mock_create_config.return_value = [mock_config]
-        mock_print_config = mocker.patch("yamkix._cli.print_yamkix_config")
+        mock_log = mocker.patch.object(YamkixLogger, "log")
         mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
         test_file = shared_datadir / "simple.yml"
         # WHEN
@@ -192,7 +210,7 @@ class TestCli:
         # THEN
         assert result.exit_code == 0
         mock_create_config.assert_called_once()
-        mock_print_config.assert_not_called()
+        mock_log.assert_not_called()
         mock_round_trip.assert_called_once()
 
     def test_invalid_yaml_content_error_management(self, mocker: MockerFixture, shared_datadir: Path) -> None:
@@ -201,10 +219,9 @@ class TestCli:
         mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
         mock_config = mocker.Mock()
         mock_create_config.return_value = [mock_config]
-        mock_print_config = mocker.patch("yamkix._cli.print_yamkix_config")
+        mock_print_config = mocker.patch.object(YamkixLogger, "log_config")
         mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format", side_effect=InvalidYamlContentError)
-        mock_get_stderr_console = mocker.patch("yamkix._cli.get_stderr_console")
-        mock_stderr_console = mock_get_stderr_console.return_value
+        mock_log = mocker.patch.object(YamkixLogger, "log")
         test_file = shared_datadir / "simple.yml"
         # WHEN
         result = runner.invoke(app, ["--input", str(test_file)])
@@ -214,7 +231,7 @@ class TestCli:
         mock_create_config.assert_called_once()
         mock_print_config.assert_called_once()
         mock_round_trip.assert_called_once()
-        mock_stderr_console.print.assert_called()
+        mock_log.assert_called()
 
     def test_line_width_arg(self, mocker: MockerFixture, shared_datadir: Path) -> None:
         """Test the line_width arg."""
@@ -222,7 +239,7 @@ class TestCli:
         mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
         mock_config = mocker.Mock()
         mock_create_config.return_value = [mock_config]
-        mocker.patch("yamkix._cli.print_yamkix_config")
+        mocker.patch.object(YamkixLogger, "log_config")
         mocker.patch("yamkix._cli.round_trip_and_format")
         test_file = shared_datadir / "simple.yml"
 
@@ -248,6 +265,8 @@ class TestCli:
             line_width=100,
             align_comments=default_config.align_comments,
             files=None,
+            limits=None,
+            verify=False,
         )
 
     @pytest.mark.parametrize(
@@ -263,7 +282,7 @@ class TestCli:
         mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
         mock_config = mocker.Mock()
         mock_create_config.return_value = [mock_config]
-        mocker.patch("yamkix._cli.print_yamkix_config")
+        mocker.patch.object(YamkixLogger, "log_config")
         mocker.patch("yamkix._cli.round_trip_and_format")
         test_file = shared_datadir / "simple.yml"
 
@@ -289,6 +308,8 @@ class TestCli:
             line_width=default_config.line_width,
             align_comments=default_config.align_comments,
             files=None,
+            limits=None,
+            verify=False,
         )
 
     def test_summary_mode_not_printed_when_flag_absent(self, mocker: MockerFixture, shared_datadir: Path) -> None:
@@ -297,11 +318,10 @@ class TestCli:
         mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
         mock_config = mocker.Mock()
         mock_create_config.return_value = [mock_config]
-        mocker.patch("yamkix._cli.print_yamkix_config")
+        mocker.patch.object(YamkixLogger, "log_config")
         fake_result = FileProcessingResult(input_display_name="test.yml", error=False, unchanged=True)
         mocker.patch("yamkix._cli.round_trip_and_format", return_value=fake_result)
-        mock_get_stderr_console = mocker.patch("yamkix._cli.get_stderr_console")
-        mock_stderr_console = mock_get_stderr_console.return_value
+        mock_log = mocker.patch.object(YamkixLogger, "log")
         test_file = shared_datadir / "simple.yml"
 
         # WHEN
@@ -309,7 +329,7 @@ class TestCli:
 
         # THEN
         assert result.exit_code == 0
-        mock_stderr_console.print.assert_not_called()
+        mock_log.assert_not_called()
 
     def test_summary_mode_printed_when_flag_present(self, mocker: MockerFixture, shared_datadir: Path) -> None:
         """Test that summary is printed to stderr when --summary is passed."""
@@ -317,11 +337,10 @@ class TestCli:
         mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
         mock_config = mocker.Mock()
         mock_create_config.return_value = [mock_config]
-        mocker.patch("yamkix._cli.print_yamkix_config")
+        mocker.patch.object(YamkixLogger, "log_config")
         fake_result = FileProcessingResult(input_display_name="test.yml", error=False, unchanged=False)
         mocker.patch("yamkix._cli.round_trip_and_format", return_value=fake_result)
-        mock_get_stderr_console = mocker.patch("yamkix._cli.get_stderr_console")
-        mock_stderr_console = mock_get_stderr_console.return_value
+        mock_log = mocker.patch.object(YamkixLogger, "log")
         test_file = shared_datadir / "simple.yml"
 
         # WHEN
@@ -329,9 +348,9 @@ class TestCli:
 
         # THEN
         assert result.exit_code == 0
-        mock_stderr_console.print.assert_called_once()
-        call_args = mock_stderr_console.print.call_args
-        summary_text = call_args[0][0]
+        mock_log.assert_called_once()
+        call_args = mock_log.call_args
+        summary_text = call_args[0][1]
         assert "1 file(s) processed" in summary_text
         assert "0 error(s)" in summary_text
         assert "0 unchanged" in summary_text
@@ -344,15 +363,14 @@ class TestCli:
         mock_config2 = mocker.Mock()
         mock_config3 = mocker.Mock()
         mock_create_config.return_value = [mock_config1, mock_config2, mock_config3]
-        mocker.patch("yamkix._cli.print_yamkix_config")
+        mocker.patch.object(YamkixLogger, "log_config")
         results = [
             FileProcessingResult(input_display_name="a.yml", error=False, unchanged=True),
             FileProcessingResult(input_display_name="b.yml", error=False, unchanged=False),
             FileProcessingResult(input_display_name="c.yml", error=True, unchanged=False),
         ]
         mocker.patch("yamkix._cli.round_trip_and_format", side_effect=results)
-        mock_get_stderr_console = mocker.patch("yamkix._cli.get_stderr_console")
-        mock_stderr_console = mock_get_stderr_console.return_value
+        mock_log = mocker.patch.object(YamkixLogger, "log")
         test_file = shared_datadir / "simple.yml"
 
         # WHEN - InvalidYamlContentError is raised for mock_config3 inside the CLI loop
@@ -370,8 +388,868 @@ class TestCli:
         # THEN
         assert result.exit_code == 0
         # The summary print is the last call on the console
-        last_call_args = mock_stderr_console.print.call_args_list[-1]
-        summary_text = last_call_args[0][0]
+        last_call_args = mock_log.call_args_list[-1]
+        summary_text = last_call_args[0][1]
         assert "3 file(s) processed" in summary_text
         assert "1 error(s)" in summary_text
         assert "1 unchanged" in summary_text
+
+    def test_git_index_mode(self, mocker: MockerFixture) -> None:
+        """Test that --git-index formats the staged files through a GitIndexFormatter."""
+        # GIVEN
+        mock_create_config = mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args")
+        mock_config = mocker.Mock()
+        mock_create_config.return_value = [mock_config]
+        mocker.patch.object(YamkixLogger, "log_config")
+        mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
+        mock_formatter_class = mocker.patch("yamkix._cli.GitIndexFormatter")
+        mock_formatter = mock_formatter_class.return_value.__enter__.return_value
+        staged_config = mocker.Mock()
+        mock_formatter.get_configs.return_value = [staged_config]
+
+        # WHEN
+        result = runner.invoke(app, ["--git-index"])
+
+        # THEN
+        assert result.exit_code == 0
+        mock_formatter.get_configs.assert_called_once_with([mock_config])
+        mock_formatter.format_staged_file.assert_called_once_with(staged_config, None)
+        mock_round_trip.assert_not_called()
+
+    def test_git_index_mode_git_error(self, mocker: MockerFixture) -> None:
+        """Test that a git failure in --git-index mode exits with an error."""
+        # GIVEN
+        mocker.patch("yamkix._cli.create_yamkix_config_from_typer_args", return_value=[mocker.Mock()])
+        mocker.patch("yamkix._cli.GitIndexFormatter", side_effect=GitCommandError("rev-parse", "not a git repository"))
+        mock_log = mocker.patch.object(YamkixLogger, "log")
+
+        # WHEN
+        result = runner.invoke(app, ["--git-index"])
+
+        # THEN
+        assert result.exit_code == 1
+        mock_log.assert_called_once()
+
+    def test_files_from_file(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        """Test that --files-from reads the list of files to process from a file."""
+        # GIVEN
+        mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
+        files_list = tmp_path / "files.txt"
+        files_list.write_text("a.yml\nb.yml\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--files-from", str(files_list)])
+
+        # THEN
+        assert result.exit_code == 0
+        processed = [call.args[0].io_config for call in mock_round_trip.call_args_list]
+        assert [(c.input, c.output) for c in processed] == [("a.yml", "a.yml"), ("b.yml", "b.yml")]
+
+    def test_files_from_stdin_nul_separated(self, mocker: MockerFixture) -> None:
+        """Test that --files-from - -0 reads a NUL separated list of files from STDIN."""
+        # GIVEN
+        mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--files-from", "-", "-0"], input=b"a.yml\0b c.yml\0")
+
+        # THEN
+        assert result.exit_code == 0
+        processed = [call.args[0].io_config.input for call in mock_round_trip.call_args_list]
+        assert processed == ["a.yml", "b c.yml"]
+
+    def test_files_from_with_files_arguments(self, mocker: MockerFixture, shared_datadir: Path) -> None:
+        """Test that --files-from cannot be used with files arguments."""
+        # GIVEN
+        mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
+
+        # WHEN
+        result = runner.invoke(app, ["--files-from", "-", str(shared_datadir / "simple.yml")])
+
+        # THEN
+        assert result.exit_code != 0
+        assert "--files-from" in result.output
+        mock_round_trip.assert_not_called()
+
+    def test_watch_requires_paths(self, mocker: MockerFixture) -> None:
+        """Test that --watch requires files or directories as arguments."""
+        # GIVEN
+        mock_watch = mocker.patch("yamkix._cli.watch_and_reformat")
+
+        # WHEN
+        result = runner.invoke(app, ["--watch"])
+
+        # THEN
+        assert result.exit_code != 0
+        assert "--watch" in result.output
+        mock_watch.assert_not_called()
+
+    def test_watch(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        """Test that --watch watches the paths passed as arguments instead of processing them."""
+        # GIVEN
+        mock_watch = mocker.patch("yamkix._cli.watch_and_reformat")
+        mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
+
+        # WHEN
+        result = runner.invoke(app, ["--watch", "--watch-polling", "--silent", str(tmp_path)])
+
+        # THEN
+        assert result.exit_code == 0
+        mock_watch.assert_called_once()
+        assert mock_watch.call_args.args[0] == [tmp_path]
+        assert mock_watch.call_args.kwargs["use_polling"] is True
+        assert mock_watch.call_args.kwargs["status_log"].verbosity == Verbosity.QUIET
+        assert isinstance(mock_watch.call_args.kwargs["config_resolver"], YamkixConfigResolver)
+        mock_round_trip.assert_not_called()
+
+
+class TestConfigFiles:
+    """Provide tests for the configuration files support of the CLI."""
+
+    @pytest.fixture(name="repository")
+    def repository_fixture(self, tmp_path: Path) -> Path:
+        """Provide a tree with a configuration file using a different style for a vendor directory."""
+        (tmp_path / ".yamkix.toml").write_text('[[overrides]]\nfiles = ["vendor"]\ndash_inwards = false\n')
+        (tmp_path / "vendor").mkdir()
+        for path in (tmp_path / "a.yml", tmp_path / "vendor" / "b.yml"):
+            path.write_text("list:\n- item\n")
+        return tmp_path
+
+    def test_per_path_style(self, repository: Path) -> None:
+        """Test that a single invocation formats each file with its own style."""
+        # WHEN
+        result = runner.invoke(app, ["--silent", str(repository / "a.yml"), str(repository / "vendor" / "b.yml")])
+
+        # THEN
+        assert result.exit_code == 0
+        assert (repository / "a.yml").read_text() == "---\nlist:\n  - item\n"
+        assert (repository / "vendor" / "b.yml").read_text() == "---\nlist:\n- item\n"
+
+    def test_explicit_cli_option_takes_precedence(self, repository: Path) -> None:
+        """Test that options explicitly set on the command line take precedence over the configuration file."""
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--no-dash-inwards", str(repository / "a.yml")])
+
+        # THEN
+        assert result.exit_code == 0
+        assert (repository / "a.yml").read_text() == "---\nlist:\n- item\n"
+
+    def test_explicit_config_file(self, repository: Path, tmp_path_factory: pytest.TempPathFactory) -> None:
+        """Test that --config applies a configuration file to all the files."""
+        # GIVEN
+        config_file = tmp_path_factory.mktemp("config") / "custom.toml"
+        config_file.write_text("explicit_start = false\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--config", str(config_file), str(repository / "vendor" / "b.yml")])
+
+        # THEN
+        assert result.exit_code == 0
+        assert (repository / "vendor" / "b.yml").read_text() == "list:\n  - item\n"
+
+    def test_invalid_config_file(self, repository: Path) -> None:
+        """Test that an invalid configuration file is reported as an error."""
+        # GIVEN
+        (repository / ".yamkix.toml").write_text("unknown = 1\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", str(repository / "a.yml")])
+
+        # THEN
+        assert result.exit_code == 1
+        assert (repository / "a.yml").read_text() == "list:\n- item\n"
+
+
+class TestTimeout:
+    """Provide tests for the --timeout option."""
+
+    def test_timed_out_files_are_reported(self, tmp_path: Path) -> None:
+        """Test that a file exceeding the time budget is reported as timed out."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        slow_content = "".join(f"key{index}:   value\n" for index in range(5000))
+        test_file.write_text(slow_content)
+        report = tmp_path / "report.json"
+
+        # WHEN: the budget is way shorter than the time needed to start the worker process and format the file
+        result = runner.invoke(
+            app, ["--silent", "--summary", "--timeout", "0.000001", "--shard-report", str(report), str(test_file)]
+        )
+
+        # THEN
+        assert result.exit_code == 0
+        assert "1 error(s) (1 timed out)" in result.output
+        assert json.loads(report.read_text())["results"][0]["timed_out"] is True
+        assert test_file.read_text() == slow_content
+
+    def test_files_are_formatted(self, tmp_path: Path) -> None:
+        """Test that files are formatted in the worker process."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a:   1\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--timeout", "30", str(test_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert test_file.read_text() == "---\na: 1\n"
+
+    def test_workers_are_recycled(self, tmp_path: Path) -> None:
+        """Test that the worker processes are recycled, the recycling being reported in the summary."""
+        # GIVEN
+        files = [tmp_path / f"file{index}.yml" for index in range(5)]
+        for file in files:
+            file.write_text("a:   1\n")
+
+        # WHEN
+        result = runner.invoke(
+            app, ["--silent", "--summary", "--timeout", "30", "--max-files-per-worker", "2", *map(str, files)]
+        )
+
+        # THEN
+        assert result.exit_code == 0
+        assert "5 file(s) processed, 0 error(s), 0 unchanged, 2 worker(s) recycled," in result.output
+        assert all(file.read_text() == "---\na: 1\n" for file in files)
+
+    @pytest.mark.parametrize("args", [[], ["--timeout", "30"]], ids=["in_process", "worker"])
+    @pytest.mark.parametrize(
+        ("content", "message"),
+        [
+            pytest.param("a: 1\na: 2\n", 'found duplicate key "a"', id="duplicate_key"),
+            pytest.param("a: " + "[" * 5000 + "]" * 5000 + "\n", "maximum recursion depth exceeded", id="too_deep"),
+        ],
+    )
+    def test_yaml_errors_are_reported(self, tmp_path: Path, args: list[str], content: str, message: str) -> None:
+        """Test that a file the YAML library fails on is reported as an error, the next files being formatted."""
+        # GIVEN
+        failing_file = tmp_path / "failing.yml"
+        failing_file.write_text(content)
+        next_file = tmp_path / "next.yml"
+        next_file.write_text("a:   1\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--summary", *args, str(failing_file), str(next_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert f"Error processing [{failing_file}]" in result.output
+        assert message in result.output
+        assert "2 file(s) processed, 1 error(s)" in result.output
+        assert failing_file.read_text() == content
+        assert next_file.read_text() == "---\na: 1\n"
+
+    @pytest.mark.parametrize("option", [["--max-files-per-worker", "10"], ["--max-worker-rss", "512"]])
+    def test_worker_limits_require_timeout(self, option: list[str]) -> None:
+        """Test that the workers can only be recycled when the files are processed in worker processes."""
+        # WHEN
+        result = runner.invoke(app, [*option, "a.yml"])
+
+        # THEN
+        assert result.exit_code == 2
+        assert "requires --timeout" in result.output
+
+    def test_invalid_timeout(self) -> None:
+        """Test that the timeout must be positive."""
+        # WHEN
+        result = runner.invoke(app, ["--timeout", "0", "a.yml"])
+
+        # THEN
+        assert result.exit_code == 2
+        assert "must be a positive number of seconds" in result.output
+
+
+class TestShards:
+    """Provide tests for the sharding support of the CLI."""
+
+    @pytest.fixture(name="yaml_files")
+    def yaml_files_fixture(self, tmp_path: Path) -> list[Path]:
+        """Provide some files to format."""
+        files = []
+        for index in range(6):
+            path = tmp_path / f"file{index}.yml"
+            path.write_text("".join(f"key{line}:   value\n" for line in range(index + 1)))
+            files.append(path)
+        return files
+
+    def test_shards_and_merge_reports(self, yaml_files: list[Path], tmp_path: Path) -> None:
+        """Test that each file is processed by exactly one shard and that the reports can be merged."""
+        # WHEN
+        shard_results = [
+            runner.invoke(
+                app,
+                [
+                    "--silent",
+                    "--shard",
+                    f"{index}/2",
+                    "--shard-report",
+                    str(tmp_path / f"report{index}.json"),
+                    *(str(path) for path in yaml_files),
+                ],
+            )
+            for index in (1, 2)
+        ]
+        merge_result = runner.invoke(
+            app,
+            [
+                "merge-reports",
+                "--output",
+                str(tmp_path / "merged.json"),
+                str(tmp_path / "report1.json"),
+                str(tmp_path / "report2.json"),
+            ],
+        )
+
+        # THEN
+        assert [result.exit_code for result in shard_results] == [0, 0]
+        assert all(path.read_text().startswith("---\n") for path in yaml_files)
+        processed = [
+            {result["input"] for result in json.loads((tmp_path / f"report{index}.json").read_text())["results"]}
+            for index in (1, 2)
+        ]
+        assert processed[0].isdisjoint(processed[1])
+        assert processed[0] | processed[1] == {str(path) for path in yaml_files}
+        assert merge_result.exit_code == 0
+        assert "6 file(s) processed, 0 error(s)" in merge_result.output
+        assert len(json.loads((tmp_path / "merged.json").read_text())["results"]) == len(yaml_files)
+
+    def test_merge_reports_missing_shard(self, yaml_files: list[Path], tmp_path: Path) -> None:
+        """Test that merge-reports fails when the report of a shard is missing."""
+        # GIVEN
+        report = tmp_path / "report.json"
+        runner.invoke(app, ["--silent", "--shard", "1/2", "--shard-report", str(report), str(yaml_files[0])])
+
+        # WHEN
+        result = runner.invoke(app, ["merge-reports", str(report)])
+
+        # THEN
+        assert result.exit_code == 1
+        assert "missing shard report(s) for 2/2" in result.output
+
+    def test_merge_reports_with_errors(self, tmp_path: Path, shared_datadir: Path) -> None:
+        """Test that merge-reports fails when a file could not be processed."""
+        # GIVEN
+        report = tmp_path / "report.json"
+        runner.invoke(
+            app, ["--silent", "--shard-report", str(report), str(shared_datadir / "malformed-yaml-file.yml")]
+        )
+
+        # WHEN
+        result = runner.invoke(app, ["merge-reports", str(report)])
+
+        # THEN
+        assert result.exit_code == 1
+        assert "1 error(s)" in result.output
+
+    @pytest.mark.parametrize(
+        ("args", "message"),
+        [
+            pytest.param(["--shard", "3/2", "a.yml"], "is not a valid shard", id="invalid_spec"),
+            pytest.param(["--shard", "1/2"], "requires files", id="no_files"),
+        ],
+    )
+    def test_invalid_shard(self, args: list[str], message: str) -> None:
+        """Test that invalid --shard usages are rejected."""
+        # WHEN
+        result = runner.invoke(app, args)
+
+        # THEN
+        assert result.exit_code == 2
+        assert message in result.output
+
+
+class TestBenchCommand:
+    """Provide tests for the bench subcommand."""
+
+    def test_compare_configs(self, tmp_path: Path) -> None:
+        """Test that each configuration is benchmarked, without writing the files."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a:   [1, 2]\n")
+        block_style = tmp_path / "block.toml"
+        block_style.write_text("enforce_block_style = true\n")
+        defaults = tmp_path / "defaults.toml"
+        defaults.write_text("")
+        json_output = tmp_path / "bench.json"
+
+        # WHEN
+        result = runner.invoke(
+            app,
+            [
+                "bench",
+                "--config",
+                str(block_style),
+                "--config",
+                str(defaults),
+                "--repetitions",
+                "2",
+                "--json",
+                str(json_output),
+                str(tmp_path),
+            ],
+        )
+
+        # THEN
+        assert result.exit_code == 0
+        assert test_file.read_text() == "a:   [1, 2]\n"
+        assert [line.split()[0] for line in result.stdout.splitlines()] == [
+            "config",
+            str(block_style),
+            str(defaults),
+        ]
+        records = json.loads(json_output.read_text())
+        assert [(record["files"], record["repetitions"]) for record in records] == [(1, 2), (1, 2)]
+
+    def test_json_to_stdout(self, tmp_path: Path) -> None:
+        """Test that the results can be written as JSON to STDOUT instead of the table."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: 1\n")
+
+        # WHEN
+        result = runner.invoke(app, ["bench", "--json", "-", str(test_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert [record["name"] for record in json.loads(result.stdout)] == ["default"]
+
+    def test_invalid_config_file(self, tmp_path: Path) -> None:
+        """Test that an invalid configuration file is reported."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: 1\n")
+        config_file = tmp_path / "invalid.toml"
+        config_file.write_text("unknown_option = true\n")
+
+        # WHEN
+        result = runner.invoke(app, ["bench", "--config", str(config_file), str(test_file)])
+
+        # THEN
+        assert result.exit_code == 1
+        assert "Error:" in result.output
+
+    def test_no_files(self, tmp_path: Path) -> None:
+        """Test that the command fails when no yaml file is found."""
+        # WHEN
+        result = runner.invoke(app, ["bench", str(tmp_path)])
+
+        # THEN
+        assert result.exit_code == 1
+        assert "no yaml file to benchmark" in result.output
+
+
+class TestLspCommand:
+    """Provide tests for the lsp subcommand."""
+
+    @pytest.mark.parametrize(("clean_exit", "exit_code"), [(True, 0), (False, 1)])
+    def test_lsp(self, mocker: MockerFixture, clean_exit: bool, exit_code: int) -> None:
+        """Test that `yamkix lsp` runs the language server instead of formatting files."""
+        # GIVEN
+        mock_server = mocker.patch("yamkix._cli.run_language_server", return_value=clean_exit)
+        mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
+
+        # WHEN
+        result = runner.invoke(app, ["lsp"])
+
+        # THEN
+        assert result.exit_code == exit_code
+        mock_server.assert_called_once()
+        mock_round_trip.assert_not_called()
+
+    def test_explicit_format_command(self, mocker: MockerFixture, shared_datadir: Path) -> None:
+        """Test that the default `format` command can also be named explicitly."""
+        # GIVEN
+        mock_round_trip = mocker.patch("yamkix._cli.round_trip_and_format")
+        test_file = shared_datadir / "simple.yml"
+
+        # WHEN
+        result = runner.invoke(app, ["format", "--silent", str(test_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        mock_round_trip.assert_called_once()
+
+
+class TestYamlVersion:
+    """Provide tests for the files with a `%YAML` directive."""
+
+    @pytest.mark.parametrize(
+        "args", [[], ["--timeout", "30"], ["--threads", "2"]], ids=["default", "timeout", "threads"]
+    )
+    def test_version_does_not_apply_to_the_next_files(self, tmp_path: Path, args: list[str]) -> None:
+        """Test that the `%YAML` version of a file is only used for that file."""
+        # GIVEN
+        yaml_1_1_file = tmp_path / "a.yml"
+        yaml_1_1_file.write_text("%YAML 1.1\n---\na: 1\n")
+        other_file = tmp_path / "b.yml"
+        other_file.write_text("answer: y\nb: on\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", *args, str(yaml_1_1_file), str(other_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert yaml_1_1_file.read_text() == "%YAML 1.1\n---\na: 1\n"
+        assert other_file.read_text() == "---\nanswer: y\nb: on\n"
+
+
+class TestResourceLimits:
+    """Provide tests for the resource limits options."""
+
+    def test_files_exceeding_limits_are_reported(self, tmp_path: Path) -> None:
+        """Test that a file exceeding a limit is reported as an error, the other files being processed."""
+        # GIVEN
+        deep_file = tmp_path / "deep.yml"
+        deep_file.write_text("a:\n  b:\n    c: 1\n")
+        flat_file = tmp_path / "flat.yml"
+        flat_file.write_text("a:   1\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--summary", "--max-depth", "2", str(deep_file), str(flat_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert "Resource limit exceeded: max_depth is 2" in result.output
+        assert "2 file(s) processed, 1 error(s)" in result.output
+        assert deep_file.read_text() == "a:\n  b:\n    c: 1\n"
+        assert flat_file.read_text() == "---\na: 1\n"
+
+    def test_limits_in_worker_process(self, tmp_path: Path) -> None:
+        """Test that the limits are enforced in the supervised worker process too."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("- 1\n- 2\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--timeout", "30", "--max-nodes", "2", str(test_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert "Resource limit exceeded: max_nodes is 2" in result.output
+
+    def test_invalid_limit(self) -> None:
+        """Test that the limits must be positive."""
+        # WHEN
+        result = runner.invoke(app, ["--max-bytes", "0", "a.yml"])
+
+        # THEN
+        assert result.exit_code == 2
+
+
+class TestVerify:
+    """Provide tests for the --verify option."""
+
+    def test_verified_files_are_formatted(self, tmp_path: Path) -> None:
+        """Test that the files passing the verification are formatted."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a:   1\nb: [x,   y]\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--verify", str(test_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert test_file.read_text() == "---\na: 1\nb: [x, y]\n"
+
+    def test_files_failing_the_verification(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        """Test that a file failing the verification is reported as an error, not written, and exits with code 1."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a:   1\n")
+        # The data is changed after it was loaded (and hashed)
+        mocker.patch("yamkix.yamkix.read_all_documents", side_effect=lambda parsed: [{"a": 2} for _ in parsed])
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--summary", "--verify", str(test_file)])
+
+        # THEN
+        assert result.exit_code == 1
+        assert "Formatting verification failed: the data of document 1 changed" in result.output
+        assert "1 file(s) processed, 1 error(s)" in result.output
+        assert test_file.read_text() == "a:   1\n"
+
+
+class TestThreads:
+    """Provide tests for the --threads option."""
+
+    def test_files_are_formatted_in_threads(self, tmp_path: Path) -> None:
+        """Test that the files are formatted, the results being reported in the order of the files."""
+        # GIVEN
+        files = [tmp_path / f"file{index}.yml" for index in range(10)]
+        for file in files:
+            file.write_text("a:   1\n")
+        files[3].write_text("a: [\n")
+        report = tmp_path / "report.json"
+
+        # WHEN
+        result = runner.invoke(
+            app, ["--silent", "--summary", "--threads", "3", "--shard-report", str(report), *map(str, files)]
+        )
+
+        # THEN
+        assert result.exit_code == 0
+        assert "10 file(s) processed, 1 error(s)" in result.output
+        assert [record["input"] for record in json.loads(report.read_text())["results"]] == list(map(str, files))
+        assert all(file.read_text() == "---\na: 1\n" for index, file in enumerate(files) if index != 3)
+
+    @pytest.mark.parametrize(
+        ("args", "option"),
+        [
+            (["--timeout", "10"], "--timeout"),
+            (["--profile-out", "profile.out"], "--profile-out"),
+            (["--git-index"], "--git-index"),
+            (["--watch"], "--watch"),
+        ],
+    )
+    def test_incompatible_options(self, args: list[str], option: str) -> None:
+        """Test that --threads cannot be used with the options processing the files in a single thread."""
+        # WHEN
+        result = runner.invoke(app, ["--threads", "2", *args, "a.yml"])
+
+        # THEN
+        assert result.exit_code == 2
+        assert f"cannot be used with {option}" in result.output
+
+    def test_progress_cannot_be_used_with_threads(self) -> None:
+        """Test that --progress is rejected with --threads, that consumes the files before they are processed."""
+        # WHEN
+        result = runner.invoke(app, ["--progress", "--threads", "2", "a.yml"])
+
+        # THEN
+        assert result.exit_code == 2
+        assert "cannot be used with --threads" in result.output
+
+
+class TestPipeline:
+    """Provide tests for the --read-ahead and --write-behind options."""
+
+    def test_files_are_formatted(self, tmp_path: Path) -> None:
+        """Test that the files are read ahead and written behind."""
+        # GIVEN
+        files = [tmp_path / f"file{index}.yml" for index in range(5)]
+        for file in files:
+            file.write_text("a:   1\n")
+        files[1].write_text("a: [\n")
+
+        # WHEN
+        result = runner.invoke(
+            app,
+            ["--silent", "--summary", "--read-ahead", "2", "--write-behind", "2", *map(str, files)],
+        )
+
+        # THEN
+        assert result.exit_code == 0
+        assert "5 file(s) processed, 1 error(s)" in result.output
+        assert [file.read_text() for file in files] == ["---\na: 1\n", "a: [\n", *["---\na: 1\n"] * 3]
+
+    @pytest.mark.parametrize("failed_index", [1, 4])
+    def test_write_errors_are_reported_for_their_file(
+        self, mocker: MockerFixture, tmp_path: Path, failed_index: int
+    ) -> None:
+        """Test that an output that cannot be written behind is reported for its file, the others being written."""
+        # GIVEN
+        files = [tmp_path / f"file{index}.yml" for index in range(5)]
+        for file in files:
+            file.write_text("a:   1\n")
+        write_formatted_output = yamkix.pipeline.write_formatted_output
+
+        def fail_on_one_file(formatted: str, output_file: str | None) -> None:
+            if output_file == str(files[failed_index]):
+                msg = f"Permission denied: '{output_file}'"
+                raise PermissionError(msg)
+            write_formatted_output(formatted, output_file)
+
+        mocker.patch("yamkix.pipeline.write_formatted_output", side_effect=fail_on_one_file)
+
+        # WHEN
+        result = runner.invoke(app, ["--summary", "--write-behind", "2", *map(str, files)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert f"Error processing [{files[failed_index]}]: Permission denied" in result.output
+        assert "5 file(s) processed, 1 error(s)" in result.output
+        assert [file.read_text() for file in files] == [
+            "a:   1\n" if index == failed_index else "---\na: 1\n" for index in range(5)
+        ]
+
+    @pytest.mark.parametrize("failed_index", [1, 4])
+    def test_write_errors_are_reported_in_the_report(
+        self, mocker: MockerFixture, tmp_path: Path, failed_index: int
+    ) -> None:
+        """Test that the record of a file whose output cannot be written behind is an error, in order."""
+        # GIVEN
+        files = [tmp_path / f"file{index}.yml" for index in range(5)]
+        for file in files:
+            file.write_text("a:   1\n")
+        report = tmp_path / "report.ndjson"
+        write_formatted_output = yamkix.pipeline.write_formatted_output
+
+        def fail_on_one_file(formatted: str, output_file: str | None) -> None:
+            if output_file == str(files[failed_index]):
+                msg = f"Permission denied: '{output_file}'"
+                raise PermissionError(msg)
+            write_formatted_output(formatted, output_file)
+
+        mocker.patch("yamkix.pipeline.write_formatted_output", side_effect=fail_on_one_file)
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--write-behind", "2", "--report", str(report), *map(str, files)])
+
+        # THEN
+        assert result.exit_code == 0
+        records = [json.loads(line) for line in report.read_text().splitlines()]
+        assert [record["input"] for record in records] == list(map(str, files))
+        assert [record["error"] for record in records] == [index == failed_index for index in range(5)]
+
+    @pytest.mark.parametrize("args", [["--threads", "2"], ["--timeout", "10"], ["--git-index"], ["--watch"]])
+    def test_incompatible_options(self, args: list[str]) -> None:
+        """Test that the pipeline cannot be used with the options processing the files differently."""
+        # WHEN
+        result = runner.invoke(app, ["--read-ahead", "2", *args, "a.yml"])
+
+        # THEN
+        assert result.exit_code == 2
+        assert f"cannot be used with {args[0]}" in result.output
+
+    def test_progress_cannot_be_used_with_read_ahead(self) -> None:
+        """Test that --progress is rejected with --read-ahead, that consumes the files before they are processed."""
+        # WHEN
+        result = runner.invoke(app, ["--progress", "--read-ahead", "2", "a.yml"])
+
+        # THEN
+        assert result.exit_code == 2
+        assert "cannot be used with --read-ahead" in result.output
+
+
+class TestVerbosity:
+    """Provide tests for the verbosity options."""
+
+    @pytest.fixture(name="yaml_files")
+    def yaml_files_fixture(self, tmp_path: Path) -> list[Path]:
+        """Provide some files to format."""
+        files = [tmp_path / f"file{index}.yml" for index in range(3)]
+        for file in files:
+            file.write_text("a:   1\n")
+        return files
+
+    def test_config_printed_once(self, yaml_files: list[Path]) -> None:
+        """Test that the effective config is printed once for all the files sharing it."""
+        # WHEN
+        result = runner.invoke(app, [str(file) for file in yaml_files])
+
+        # THEN
+        assert result.exit_code == 0
+        assert result.output.count("Configuration: typ=rt") == 1
+        assert "Processing:" not in result.output
+
+    def test_verbose(self, yaml_files: list[Path]) -> None:
+        """Test that -V prints a line per file and -VV the outcome of each file."""
+        # WHEN
+        verbose = runner.invoke(app, ["-V", *(str(file) for file in yaml_files)])
+        debug = runner.invoke(app, ["-VV", *(str(file) for file in yaml_files)])
+
+        # THEN
+        assert verbose.exit_code == 0
+        assert verbose.output.count("[yamkix] Processing: input=") == 3
+        assert "reformatted in" not in verbose.output
+        assert debug.exit_code == 0
+        assert debug.output.count(": unchanged in ") == 3
+
+
+class TestProgress:
+    """Provide tests for the --progress option."""
+
+    def test_progress_is_reported(self, tmp_path: Path) -> None:
+        """Test that the final progress line is printed on stderr."""
+        # GIVEN
+        files = [tmp_path / f"file{index}.yml" for index in range(2)]
+        for file in files:
+            file.write_text("a:   1\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", "--progress", *(str(file) for file in files)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert "[yamkix] Progress: 2/2 files (100%)" in result.output
+        assert all(file.read_text() == "---\na: 1\n" for file in files)
+
+    def test_progress_cannot_be_used_with_timeout(self) -> None:
+        """Test that --progress is rejected with --timeout, whose worker processes are forked."""
+        # WHEN
+        result = runner.invoke(app, ["--progress", "--timeout", "10", "a.yml"])
+
+        # THEN
+        assert result.exit_code == 2
+        assert "cannot be used with --timeout" in result.output
+
+    def test_no_progress_by_default(self, tmp_path: Path) -> None:
+        """Test that no progress is reported without --progress."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: 1\n")
+
+        # WHEN
+        result = runner.invoke(app, ["--silent", str(test_file)])
+
+        # THEN
+        assert result.exit_code == 0
+        assert "Progress:" not in result.output
+
+
+class TestReport:
+    """Provide tests for the --report option."""
+
+    @pytest.mark.parametrize("timeout", [[], ["--timeout", "60"]])
+    def test_report_is_written(self, tmp_path: Path, timeout: list[str]) -> None:
+        """Test that a record is written for each file, in or out of a worker process."""
+        # GIVEN
+        valid_file = tmp_path / "valid.yml"
+        valid_file.write_text("a:   1 # comment\n")
+        invalid_file = tmp_path / "invalid.yml"
+        invalid_file.write_text("a: [\n")
+        report = tmp_path / "report.ndjson"
+
+        # WHEN
+        result = runner.invoke(
+            app, ["--silent", "-c", "1", *timeout, "--report", str(report), str(valid_file), str(invalid_file)]
+        )
+
+        # THEN
+        assert result.exit_code == 0
+        valid, invalid = [json.loads(line) for line in report.read_text().splitlines()]
+        assert valid["input"] == str(valid_file)
+        assert all(valid[phase] is not None for phase in ("read", "parse", "emit", "write"))
+        assert valid["transforms"] == {"comment_spacing": pytest.approx(valid["transform"])}
+        assert (valid["input_bytes"], valid["output_bytes"]) == (17, 19)
+        assert (valid["documents"], valid["nodes"], valid["comments"]) == (1, 3, 1)
+        assert invalid["error"] is True
+        assert invalid["read"] is not None
+        assert invalid["emit"] is None
+
+
+class TestProfileOut:
+    """Provide tests for the --profile-out option."""
+
+    @pytest.mark.parametrize("timeout", [[], ["--timeout", "60"]])
+    def test_profile_is_written(self, tmp_path: Path, timeout: list[str]) -> None:
+        """Test that the profile of the processing is written, in or out of a worker process."""
+        # GIVEN
+        files = [tmp_path / f"file{index}.yml" for index in range(2)]
+        for file in files:
+            file.write_text("a:   1\n")
+        profile_out = tmp_path / "profile.out"
+
+        # WHEN
+        result = runner.invoke(
+            app,
+            [*timeout, "--profile-out", str(profile_out), "--profile-top", "3", *(str(file) for file in files)],
+        )
+
+        # THEN
+        assert result.exit_code == 0
+        assert f"[yamkix] Profile written to {profile_out}" in result.output
+        stats = pstats.Stats(str(profile_out))
+        assert {"format_yaml_content", "load_all"} <= {name for (_, _, name) in stats.stats}  # pyright: ignore[reportAttributeAccessIssue]
+        assert "Top 3 functions of yamkix by self time:" in (tmp_path / "profile.out.txt").read_text()
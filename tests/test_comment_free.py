@@ -0,0 +1,173 @@
+"""Provide tests for the comment_free module."""
+
+import pytest
+from pytest_mock import MockerFixture
+
+import yamkix.yamkix
+from yamkix.comment_free import is_comment_free
+from yamkix.config import get_yamkix_config_from_default
+from yamkix.yamkix import format_yaml_content
+from yamkix.yaml_writer import get_cached_comment_free_loader, get_cached_yaml_writers
+
+CONTENTS = {
+    "mapping": "a:   1\nb:\n  - x\n  - 'y'\n  - \"z\"\nc: {d: [1, 2], e: null}\n",
+    "several_documents": "---\na: 1\n...\n---\n- &anchor value\n- *anchor\n- !custom tagged\n",
+    "block_scalars": "a: |\n  line 1\n  line 2\nb: |-\n  kept\nc: a > b\n",
+    "long_lines": "a: " + "word " * 40 + "\nb: '" + "quoted " * 30 + "'\n",
+    "crlf": "a: 1\r\nb:\r\n- x\r\n",
+}
+CONFIG_OPTIONS = {
+    "default": {},
+    "no_explicit_start": {"explicit_start": False},
+    "double_quotes": {"quotes_preserved": False, "enforce_double_quotes": True, "spaces_before_comment": 2},
+    "align_comments": {"align_comments": True},
+    "block_style": {"enforce_block_style": True},
+    "no_dash_inwards": {"dash_inwards": False},
+    "narrow": {"line_width": 30},
+}
+
+
+def format_with_comments_scan(mocker: MockerFixture, content: str, config_options: dict) -> str:
+    """Return the output of the formatting of `content` when it is loaded by the round trip scanner."""
+    mocker.patch("yamkix.yamkix.is_comment_free", return_value=False)
+    try:
+        return format_yaml_content(content, get_yamkix_config_from_default(**config_options))
+    finally:
+        mocker.stopall()
+
+
+class TestIsCommentFree:
+    """Provide tests for the is_comment_free function."""
+
+    @pytest.mark.parametrize("content_name", CONTENTS)
+    def test_comment_free(self, content_name: str) -> None:
+        """Test that the contents without comments, blank lines nor folded scalars are comment free."""
+        # GIVEN / WHEN / THEN
+        assert is_comment_free(CONTENTS[content_name])
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("a: 1  # comment\n", id="comment"),
+            pytest.param("a: 'no # comment'\n", id="hash_in_scalar"),
+            pytest.param("a: 1\n\nb: 2\n", id="blank_line"),
+            pytest.param("a: 1\n  \r\nb: 2\n", id="blank_line_with_spaces"),
+            pytest.param("\na: 1\n", id="leading_blank_line"),
+            pytest.param("a: >\n  folded\n", id="folded_scalar"),
+            pytest.param("a: >-2\r\n  folded\r\n", id="folded_scalar_with_indicators"),
+            pytest.param("%YAML 1.1\n---\na: 1\n", id="yaml_directive"),
+            pytest.param("%TAG !e! tag:example.com,2000:\n---\na: !e!foo x\n", id="tag_directive"),
+        ],
+    )
+    def test_not_comment_free(self, content: str) -> None:
+        """Test that the contents for which the round trip scanner records more than tokens are not comment free."""
+        # GIVEN / WHEN / THEN
+        assert not is_comment_free(content)
+
+
+class TestCommentFreePath:
+    """Provide tests for the formatting of the contents without comments."""
+
+    @pytest.mark.parametrize("config_name", CONFIG_OPTIONS)
+    @pytest.mark.parametrize("content_name", CONTENTS)
+    def test_same_output_as_the_round_trip_scanner(
+        self, mocker: MockerFixture, content_name: str, config_name: str
+    ) -> None:
+        """Test that the output is the one of the formatting of the content loaded by the round trip scanner."""
+        # GIVEN
+        content = CONTENTS[content_name]
+        expected = format_with_comments_scan(mocker, content, CONFIG_OPTIONS[config_name])
+        spy_get_cached_comment_free_loader = mocker.spy(yamkix.yamkix, "get_cached_comment_free_loader")
+
+        # WHEN
+        formatted = format_yaml_content(content, get_yamkix_config_from_default(**CONFIG_OPTIONS[config_name]))
+
+        # THEN
+        assert formatted == expected
+        spy_get_cached_comment_free_loader.assert_called_once()
+
+    @pytest.mark.parametrize("config_name", CONFIG_OPTIONS)
+    def test_tag_directives_are_kept(self, mocker: MockerFixture, config_name: str) -> None:
+        """Test that a content with a `%TAG` directive is formatted like by the round trip scanner, with it."""
+        # GIVEN
+        content = "%TAG !e! tag:example.com,2000:\n---\na: !e!foo x\n"
+        expected = format_with_comments_scan(mocker, content, CONFIG_OPTIONS[config_name])
+
+        # WHEN
+        formatted = format_yaml_content(content, get_yamkix_config_from_default(**CONFIG_OPTIONS[config_name]))
+
+        # THEN
+        assert formatted == expected
+        assert formatted.startswith("%TAG !e! tag:example.com,2000:\n")
+
+    def test_comment_transforms_are_skipped(self, mocker: MockerFixture) -> None:
+        """Test that the comment transforms are not run on documents without comments."""
+        # GIVEN
+        spy_yamkix_dump_all_to_stream = mocker.spy(yamkix.yamkix, "yamkix_dump_all_to_stream")
+        config = get_yamkix_config_from_default(align_comments=True, spaces_before_comment=2)
+
+        # WHEN
+        format_yaml_content(CONTENTS["mapping"], config)
+
+        # THEN
+        assert spy_yamkix_dump_all_to_stream.call_args.kwargs["spaces_before_comment"] is None
+        assert spy_yamkix_dump_all_to_stream.call_args.kwargs["align_comments_flag"] is False
+
+    def test_yaml_version_is_not_kept(self) -> None:
+        """Test that the version of a `%YAML` directive is dumped, and not kept by the cached instances."""
+        # GIVEN
+        config = get_yamkix_config_from_default()
+
+        # WHEN
+        formatted = format_yaml_content("%YAML 1.1\n---\na: 1\n", config)
+        next_formatted = format_yaml_content("b: on\n", config)
+
+        # THEN
+        assert formatted == "%YAML 1.1\n---\na: 1\n"
+        assert next_formatted == "---\nb: on\n"
+        assert get_cached_yaml_writers(config)[0].version is None
+        assert get_cached_comment_free_loader(config).version is None
+
+    def test_tag_handles_are_not_kept(self, mocker: MockerFixture) -> None:
+        """Test that the handles of a `%TAG` directive are not kept by the cached instances for the next contents."""
+        # GIVEN
+        config = get_yamkix_config_from_default()
+        spy_emit_document = mocker.spy(yamkix.yamkix, "emit_document")
+
+        # WHEN
+        format_yaml_content("%TAG !e! tag:example.com,2000:\n---\na: !e!foo x\n", config)
+        next_formatted = format_yaml_content("b: 1\n", config)
+
+        # THEN
+        assert next_formatted == "---\nb: 1\n"
+        assert spy_emit_document.spy_return_list[-1] is not None
+        assert all(writer.tags is None for writer in get_cached_yaml_writers(config) if writer is not None)
+
+    @pytest.mark.parametrize("content", ["%YAML 1.1\n---\na: 1\n", "%YAML 1.1\n---\na: 1  # comment\n"])
+    def test_yaml_version_is_kept_per_content(self, mocker: MockerFixture, content: str) -> None:
+        """Test that the version is only kept for the dump of its content, even without a reset of the writers."""
+        # GIVEN
+        mocker.patch("yamkix.yamkix.reset_yaml_directives")
+        config = get_yamkix_config_from_default(quotes_preserved=False, enforce_double_quotes=True)
+
+        # WHEN
+        formatted = format_yaml_content(content, config)
+        next_formatted = format_yaml_content("b: on\n", config)
+
+        # THEN
+        assert formatted == content
+        assert next_formatted == "---\nb: on\n"
+        assert get_cached_comment_free_loader(config).version is None
+        assert all(writer.version is None for writer in get_cached_yaml_writers(config) if writer is not None)
+
+    def test_not_taken_in_safe_mode(self, mocker: MockerFixture) -> None:
+        """Test that the contents are loaded by the `safe` loader in `safe` parsing mode."""
+        # GIVEN
+        spy_get_cached_comment_free_loader = mocker.spy(yamkix.yamkix, "get_cached_comment_free_loader")
+
+        # WHEN
+        formatted = format_yaml_content("a:   1\n", get_yamkix_config_from_default(parsing_mode="safe"))
+
+        # THEN
+        assert formatted == "---\na: 1\n"
+        spy_get_cached_comment_free_loader.assert_not_called()
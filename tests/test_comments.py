@@ -1,10 +1,12 @@
 """Test the comments management."""
 
+from io import StringIO
+
 from pytest_mock import MockerFixture
 from ruamel.yaml import YAML
-from ruamel.yaml.comments import CommentedMap, CommentedSeq
+from ruamel.yaml.comments import CommentedBase, CommentedMap, CommentedSeq
 
-from yamkix.comments import align_comments, fix_for_issue29
+from yamkix.comments import align_comments, fix_for_issue29, yamkix_add_eol_comment
 
 
 def test_fix_for_issue29_when_not_none(mocker: MockerFixture) -> None:
@@ -49,6 +51,20 @@ def test_yamkix_add_eol_comment() -> None:
     yaml = YAML()
     code = yaml.load(inp)
     assert code["family"] == "Smith"
+    yamkix_add_eol_comment(code, "very common", "family", column=3)
+    output = StringIO()
+    yaml.dump(code, output)
+    assert "family: Smith   # very common\n" in output.getvalue()
+
+
+def test_commented_base_is_not_patched() -> None:
+    """Test that importing yamkix leaves the ruamel.yaml classes untouched, for the other users and threads."""
+    # GIVEN / WHEN
+    import yamkix.yamkix  # noqa: F401, PLC0415
+
+    # THEN
+    assert CommentedBase.yaml_add_eol_comment is not yamkix_add_eol_comment
+    assert CommentedBase.yaml_add_eol_comment.__module__ == "ruamel.yaml.comments"
 
 
 def test_align_comments_with_no_comments() -> None:
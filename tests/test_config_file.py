@@ -0,0 +1,198 @@
+"""Provide tests for the config_file module."""
+
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from pytest_mock import MockerFixture
+
+from yamkix.config import get_default_yamkix_config, get_yamkix_config_for_file, get_yamkix_style_key
+from yamkix.config_file import YamkixConfigResolver, compile_glob, load_config_file
+from yamkix.errors import InvalidConfigFileError
+
+
+@pytest.mark.parametrize(
+    ("pattern", "path", "expected"),
+    [
+        pytest.param("*.yml", "a.yml", True, id="basename_at_root"),
+        pytest.param("*.yml", "a/b/c.yml", True, id="basename_at_any_depth"),
+        pytest.param("*.yml", "a.yaml", False, id="basename_no_match"),
+        pytest.param("vendor", "vendor/a.yml", True, id="directory_at_root"),
+        pytest.param("vendor", "a/vendor/b/c.yml", True, id="directory_at_any_depth"),
+        pytest.param("vendor/", "vendor/a.yml", True, id="trailing_slash"),
+        pytest.param("vendor/**", "vendor/a/b.yml", True, id="double_star_last"),
+        pytest.param("vendor/*.yml", "a/vendor/b.yml", False, id="anchored"),
+        pytest.param("vendor/*", "vendor/a/b.yml", True, id="anchored_directory_below"),
+        pytest.param("charts/**/values.yaml", "charts/values.yaml", True, id="double_star_no_directory"),
+        pytest.param("charts/**/values.yaml", "charts/a/b/values.yaml", True, id="double_star_directories"),
+        pytest.param("charts/*/values.yaml", "charts/a/b/values.yaml", False, id="star_single_directory"),
+        pytest.param("file?.yml", "file1.yml", True, id="question_mark"),
+        pytest.param("file[!0-9].yml", "file1.yml", False, id="negated_class"),
+        pytest.param("file[0-9].yml", "file1.yml", True, id="class"),
+        pytest.param("a+b.yml", "a+b.yml", True, id="escaped"),
+    ],
+)
+def test_compile_glob(pattern: str, path: str, expected: bool) -> None:
+    """Test the glob patterns semantics."""
+    assert bool(compile_glob(pattern).match(path)) is expected
+
+
+class TestLoadConfigFile:
+    """Provide tests for the load_config_file function."""
+
+    def test_yamkix_toml(self, tmp_path: Path) -> None:
+        """Test loading a .yamkix.toml file, with kebab-case names and overrides."""
+        # GIVEN
+        config_path = tmp_path / ".yamkix.toml"
+        # editorconfig-checker-disable
+        config_path.write_text(
+            dedent("""\
+                spaces-before-comment = 1
+
+                [[overrides]]
+                files = ["vendor/**"]
+                dash_inwards = false
+            """)
+        )
+        # editorconfig-checker-enable
+
+        # WHEN
+        sut = load_config_file(config_path)
+
+        # THEN
+        assert sut is not None
+        assert sut.options == {"spaces_before_comment": 1}
+        assert len(sut.overrides) == 1
+        assert sut.overrides[0].options == {"dash_inwards": False}
+        assert sut.get_matching_overrides(tmp_path / "vendor" / "a.yml") == (0,)
+        assert sut.get_matching_overrides(tmp_path / "a.yml") == ()
+
+    def test_pyproject_without_tool_yamkix(self, tmp_path: Path) -> None:
+        """Test that a pyproject.toml file without [tool.yamkix] table is not a configuration file."""
+        # GIVEN
+        config_path = tmp_path / "pyproject.toml"
+        config_path.write_text('[project]\nname = "sut"\n')
+
+        # WHEN / THEN
+        assert load_config_file(config_path) is None
+
+    def test_pyproject_with_tool_yamkix(self, tmp_path: Path) -> None:
+        """Test loading the [tool.yamkix] table of a pyproject.toml file."""
+        # GIVEN
+        config_path = tmp_path / "pyproject.toml"
+        config_path.write_text("[tool.yamkix]\nexplicit_start = false\n")
+
+        # WHEN
+        sut = load_config_file(config_path)
+
+        # THEN
+        assert sut is not None
+        assert sut.options == {"explicit_start": False}
+
+    @pytest.mark.parametrize(
+        ("content", "message"),
+        [
+            pytest.param("unknown = 1\n", "unknown option 'unknown'", id="unknown_option"),
+            pytest.param('line_width = "80"\n', "option 'line_width' must be of type int", id="wrong_type"),
+            pytest.param("line_width = true\n", "option 'line_width' must be of type int", id="bool_for_int"),
+            pytest.param('parsing_mode = "json"\n', "must be one of 'rt' or 'safe'", id="parsing_mode"),
+            pytest.param("[[overrides]]\ndash_inwards = false\n", "requires a 'files' list", id="override_files"),
+            pytest.param("line_width = \n", "Invalid yamkix configuration file", id="invalid_toml"),
+        ],
+    )
+    def test_invalid(self, tmp_path: Path, content: str, message: str) -> None:
+        """Test that invalid configuration files raise an InvalidConfigFileError."""
+        # GIVEN
+        config_path = tmp_path / ".yamkix.toml"
+        config_path.write_text(content)
+
+        # WHEN / THEN
+        with pytest.raises(InvalidConfigFileError, match=message):
+            load_config_file(config_path)
+
+
+class TestYamkixConfigResolver:
+    """Provide tests for the YamkixConfigResolver class."""
+
+    @pytest.fixture(name="repository")
+    def repository_fixture(self, tmp_path: Path) -> Path:
+        """Provide a tree with a configuration file at its root, and one in a sub directory."""
+        (tmp_path / "pyproject.toml").write_text(
+            '[tool.yamkix]\nspaces_before_comment = 1\n\n[[tool.yamkix.overrides]]\nfiles = ["vendor"]\n'
+            "dash_inwards = false\n"
+        )
+        (tmp_path / "vendor").mkdir()
+        (tmp_path / "nested" / "deep").mkdir(parents=True)
+        (tmp_path / "nested" / ".yamkix.toml").write_text("explicit_start = false\n")
+        return tmp_path
+
+    def test_nearest_config_file_and_overrides(self, repository: Path) -> None:
+        """Test that the nearest configuration file and its matching overrides apply."""
+        # GIVEN
+        base_config = get_default_yamkix_config()
+        sut = YamkixConfigResolver(base_config)
+
+        # WHEN
+        root_config = sut.resolve(get_yamkix_config_for_file(base_config, str(repository / "a.yml")))
+        vendor_config = sut.resolve(get_yamkix_config_for_file(base_config, str(repository / "vendor" / "b.yml")))
+        nested_config = sut.resolve(
+            get_yamkix_config_for_file(base_config, str(repository / "nested" / "deep" / "c.yml"))
+        )
+
+        # THEN
+        assert (root_config.spaces_before_comment, root_config.dash_inwards) == (1, True)
+        assert (vendor_config.spaces_before_comment, vendor_config.dash_inwards) == (1, False)
+        assert vendor_config.io_config.input == str(repository / "vendor" / "b.yml")
+        # The nearest configuration file wins, they are not merged
+        assert (nested_config.spaces_before_comment, nested_config.explicit_start) == (None, False)
+
+    def test_forced_options_take_precedence(self, repository: Path) -> None:
+        """Test that the forced options take precedence over the configuration files."""
+        # GIVEN
+        base_config = get_default_yamkix_config()
+        sut = YamkixConfigResolver(base_config, forced_options={"dash_inwards": True})
+
+        # WHEN
+        config = sut.resolve(get_yamkix_config_for_file(base_config, str(repository / "vendor" / "b.yml")))
+
+        # THEN
+        assert (config.spaces_before_comment, config.dash_inwards) == (1, True)
+
+    def test_forced_config_file(self, repository: Path) -> None:
+        """Test that an explicit configuration file applies to all the files."""
+        # GIVEN
+        base_config = get_default_yamkix_config()
+        sut = YamkixConfigResolver(base_config, config_file=repository / "nested" / ".yamkix.toml")
+
+        # WHEN
+        config = sut.resolve(get_yamkix_config_for_file(base_config, str(repository / "a.yml")))
+
+        # THEN
+        assert config.explicit_start is False
+        assert config.spaces_before_comment is None
+
+    def test_unchanged_config_is_returned_as_is(self, tmp_path: Path) -> None:
+        """Test that a config is returned as is when no configuration file changes it."""
+        # GIVEN
+        base_config = get_default_yamkix_config()
+        yamkix_config = get_yamkix_config_for_file(base_config, str(tmp_path / "a.yml"))
+        sut = YamkixConfigResolver(base_config)
+
+        # WHEN / THEN
+        assert sut.resolve(yamkix_config) is yamkix_config
+
+    def test_discovery_and_configs_are_cached(self, repository: Path, mocker: MockerFixture) -> None:
+        """Test that configuration files are loaded once and effective configs shared."""
+        # GIVEN
+        mock_load_config_file = mocker.patch("yamkix.config_file.load_config_file", wraps=load_config_file)
+        base_config = get_default_yamkix_config()
+        sut = YamkixConfigResolver(base_config)
+
+        # WHEN
+        configs = [sut.get_formatting_config(repository / "vendor" / name) for name in ("a.yml", "b.yml", "c.yml")]
+        other = sut.get_formatting_config(repository / "a.yml")
+
+        # THEN
+        assert mock_load_config_file.call_count == 1
+        assert configs[0] is configs[1] is configs[2]
+        assert get_yamkix_style_key(other) != get_yamkix_style_key(configs[0])
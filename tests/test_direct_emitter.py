@@ -0,0 +1,186 @@
+"""Provide tests for the direct_emitter module."""
+
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from ruamel.yaml import YAML
+
+import yamkix.yamkix
+from yamkix.config import get_yamkix_config_from_default
+from yamkix.direct_emitter import emit_document
+from yamkix.yamkix import format_yaml_content
+from yamkix.yaml_writer import get_opinionated_yaml_writer
+
+EXPECTED_DIR = Path(__file__).parent / "data" / "expected"
+CONTENTS = {
+    "mapping": "a:   1\nb:\n  - x\n  - 'y'\n  - \"z\"\nc:\n    d:\n    - 1\n    e: null\nf: {}\ng: []\n",
+    "sequence": "- a\n- - nested\n  - k: v\n    l:\n    - 1\n- ~\n- true\n- 1.50\n",
+    "several_documents": "a: 1\n---\n- x\n---\nb: [c]\n",
+    "scalars_to_quote": "a: 'yes'\nb: \"1\"\nc: ''\nd: it's\ne: \"say \\\"hi\\\"\"\nf: 'a: b'\ng: -x\nh: é\n",
+    "block_scalars": "a: |\n  line 1\n  line 2\nb:\n- |-\n  kept\nc: a > b\n",
+    "long_lines": "a: " + "word " * 12 + "\nb: '" + "quoted " * 8 + "'\n",
+}
+CONFIG_OPTIONS = {
+    "default": {},
+    "no_explicit_start": {"explicit_start": False},
+    "explicit_end": {"explicit_end": True},
+    "double_quotes": {"quotes_preserved": False, "enforce_double_quotes": True},
+    "no_quotes_preserved": {"quotes_preserved": False},
+    "block_style": {"enforce_block_style": True},
+    "no_dash_inwards": {"dash_inwards": False},
+    "narrow": {"line_width": 70},
+}
+# The expected outputs without comments, anchors nor flow style collections, with the options they were formatted with
+COVERED_EXPECTED = {
+    "flow-style-collections--default-flow-style-and-enforce-block-style": {
+        "default_flow_style": True,
+        "enforce_block_style": True,
+    },
+    "flow-style-collections--enforce-block-style": {"enforce_block_style": True},
+    "flow-style-collections--no-quotes-preserved-enforce-double-quotes-enforce-block-style": {
+        "quotes_preserved": False,
+        "enforce_double_quotes": True,
+        "enforce_block_style": True,
+    },
+    "lists-and-maps-json-style--enforce-block-style": {"enforce_block_style": True},
+    "no-start-no-end--default": {},
+    "no-start-no-end--no-explicit-start": {"explicit_start": False},
+    "no-start-no-end--no-quotes-preserved-enforce-double-quotes": {
+        "quotes_preserved": False,
+        "enforce_double_quotes": True,
+    },
+    "no-start-no-end--no-quotes-preserved": {"quotes_preserved": False},
+    "no-start-no-end--set-explicit-end": {"explicit_end": True},
+}
+
+
+def format_with_ruamel(mocker: MockerFixture, content: str, config_options: dict) -> str:
+    """Return the output of the formatting of `content` when every document is dumped by `ruamel.yaml`."""
+    mocker.patch("yamkix.yamkix.emit_document", return_value=None)
+    try:
+        return format_yaml_content(content, get_yamkix_config_from_default(**config_options))
+    finally:
+        mocker.stopall()
+
+
+def get_writer(**config_options: object) -> YAML:
+    """Return a new yamkix writer, for the given options."""
+    return get_opinionated_yaml_writer(get_yamkix_config_from_default(**config_options))
+
+
+def dump(data: object, yaml: YAML) -> str:
+    """Return the output of `yaml.dump` for `data`, without any transform."""
+    out = StringIO()
+    yaml.dump(data, out)
+    return out.getvalue()
+
+
+class TestEmitDocument:
+    """Provide tests for the emit_document function."""
+
+    @pytest.mark.parametrize("expected_file", sorted(EXPECTED_DIR.glob("*.yml")), ids=lambda path: path.stem)
+    def test_same_output_as_ruamel_on_the_expected_outputs(self, expected_file: Path) -> None:
+        """Test that the documents of the expected outputs, when covered, are emitted as `ruamel.yaml` dumps them."""
+        # GIVEN
+        yaml = get_writer(dash_inwards="no-dash-inwards" not in expected_file.name)
+        documents = list(yaml.load_all(expected_file.read_text()))
+
+        # WHEN
+        emitted = [emit_document(document, yaml) for document in documents]
+
+        # THEN
+        for document, document_emitted in zip(documents, emitted, strict=True):
+            if document_emitted is not None:
+                assert document_emitted == dump(document, yaml)
+
+    @pytest.mark.parametrize(
+        ("content", "config_options"),
+        [
+            pytest.param("a: &anchor 1\nb: 2\n", {}, id="anchor"),
+            pytest.param("a: [1]\n", {}, id="flow_sequence"),
+            pytest.param("a: {b: 1}\n", {}, id="flow_mapping"),
+            pytest.param("a: !custom value\n", {}, id="tag"),
+            pytest.param("a: 1  # comment\n", {}, id="comment"),
+            pytest.param("a: &x {b: 1}\nc:\n  <<: *x\n", {}, id="merge_key"),
+            pytest.param("a: >\n  folded\n", {}, id="folded_scalar"),
+            pytest.param("a: " + "word " * 20 + "\n", {"line_width": 40}, id="long_line"),
+            pytest.param('a: "bell \\a"\n', {}, id="non_printable"),
+            pytest.param("a: 2001-12-14\n", {}, id="timestamp"),
+            pytest.param("plain scalar\n", {}, id="scalar_document"),
+            pytest.param("{}\n", {}, id="empty_document"),
+            pytest.param("? [a, b]\n: c\n", {}, id="complex_key"),
+            pytest.param("k" * 130 + ": v\n", {}, id="long_key"),
+        ],
+    )
+    def test_not_covered(self, content: str, config_options: dict) -> None:
+        """Test that the documents with constructs the direct emitter does not write are left to `ruamel.yaml`."""
+        # GIVEN
+        yaml = get_writer(**config_options)
+        document = yaml.load(content)
+
+        # WHEN
+        emitted = emit_document(document, yaml)
+
+        # THEN
+        assert emitted is None
+
+    def test_not_covered_with_a_yaml_version(self) -> None:
+        """Test that the documents are left to `ruamel.yaml` when a `%YAML` directive must be written."""
+        # GIVEN
+        yaml = get_writer()
+        document = yaml.load("a: 1\n")
+        yaml.version = (1, 2)
+
+        # WHEN
+        emitted = emit_document(document, yaml)
+
+        # THEN
+        assert emitted is None
+
+    def test_not_covered_in_safe_mode(self) -> None:
+        """Test that the documents are left to `ruamel.yaml` when the writer is not a round trip one."""
+        # GIVEN
+        yaml = get_writer(parsing_mode="safe")
+        document = yaml.load("a: 1\n")
+
+        # WHEN
+        emitted = emit_document(document, yaml)
+
+        # THEN
+        assert emitted is None
+
+
+class TestDirectEmitterPath:
+    """Provide tests for the formatting of the documents emitted directly."""
+
+    @pytest.mark.parametrize("config_name", CONFIG_OPTIONS)
+    @pytest.mark.parametrize("content_name", CONTENTS)
+    def test_same_output_as_ruamel(self, mocker: MockerFixture, content_name: str, config_name: str) -> None:
+        """Test that the output is the one of the formatting of the documents dumped by `ruamel.yaml`."""
+        # GIVEN
+        content = CONTENTS[content_name]
+        expected = format_with_ruamel(mocker, content, CONFIG_OPTIONS[config_name])
+        spy_emit_document = mocker.spy(yamkix.yamkix, "emit_document")
+
+        # WHEN
+        formatted = format_yaml_content(content, get_yamkix_config_from_default(**CONFIG_OPTIONS[config_name]))
+
+        # THEN
+        assert formatted == expected
+        assert any(spy_return is not None for spy_return in spy_emit_document.spy_return_list)
+
+    @pytest.mark.parametrize("expected_name", COVERED_EXPECTED)
+    def test_expected_outputs_are_emitted_directly(self, mocker: MockerFixture, expected_name: str) -> None:
+        """Test that the expected outputs without comments are formatted as they are, by the direct emitter."""
+        # GIVEN
+        expected = (EXPECTED_DIR / f"{expected_name}.yml").read_text()
+        spy_emit_document = mocker.spy(yamkix.yamkix, "emit_document")
+
+        # WHEN
+        formatted = format_yaml_content(expected, get_yamkix_config_from_default(**COVERED_EXPECTED[expected_name]))
+
+        # THEN
+        assert formatted == expected
+        assert None not in spy_emit_document.spy_return_list
@@ -0,0 +1,178 @@
+"""Provide tests for the git_index module."""
+
+import hashlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from yamkix.config import YamkixInputOutputConfig, get_default_yamkix_config, get_yamkix_config_from_default
+from yamkix.errors import GitBlobReadError, GitCommandError, InvalidYamlContentError
+from yamkix.git_index import GitCatFileBatch, GitIndexFormatter, get_git_toplevel, list_index_entries, write_blobs
+
+
+def git(repo: Path, *args: str) -> str:
+    """Run a git command in the test repository."""
+    return subprocess.run(  # noqa: S603
+        ["git", "-c", "user.name=yamkix", "-c", "user.email=yamkix@example.com", *args],  # noqa: S607
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+@pytest.fixture(name="repo")
+def repo_fixture(tmp_path: Path) -> Path:
+    """Provide a git repository with some staged files."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "--quiet")
+    (repo / "sub").mkdir()
+    (repo / "sub" / "unformatted.yml").write_text("key:   value\nlist:\n- a\n")
+    (repo / "formatted.yaml").write_text("---\nkey: value\n")
+    (repo / "not-yaml.txt").write_text("key:   value\n")
+    git(repo, "add", ".")
+    return repo
+
+
+class TestGitIndexFormatter:
+    """Provide tests for the GitIndexFormatter class."""
+
+    def test_formats_all_staged_yaml_files(self, repo: Path) -> None:
+        """Test that all staged yaml files are formatted in the index and the worktree is left untouched."""
+        # GIVEN
+        config = get_default_yamkix_config()
+
+        # WHEN
+        with GitIndexFormatter(cwd=repo) as formatter:
+            configs = formatter.get_configs([config])
+            results = [formatter.format_staged_file(c) for c in configs]
+
+        # THEN
+        assert sorted(r.input_display_name for r in results) == ["formatted.yaml", "sub/unformatted.yml"]
+        assert {r.input_display_name: r.unchanged for r in results} == {
+            "formatted.yaml": True,
+            "sub/unformatted.yml": False,
+        }
+        assert git(repo, "show", ":sub/unformatted.yml") == "---\nkey: value\nlist:\n  - a\n"
+        assert (repo / "sub" / "unformatted.yml").read_text() == "key:   value\nlist:\n- a\n"
+        assert git(repo, "show", ":not-yaml.txt") == "key:   value\n"
+
+    def test_only_selected_files(self, repo: Path) -> None:
+        """Test that only the files passed as inputs are selected, unstaged ones being ignored."""
+        # GIVEN
+        (repo / "unstaged.yml").write_text("a: b\n")
+        configs = [
+            get_yamkix_config_from_default(io_config=YamkixInputOutputConfig(input=p, output=p))
+            for p in [str(repo / "formatted.yaml"), str(repo / "unstaged.yml")]
+        ]
+
+        # WHEN
+        with GitIndexFormatter(cwd=repo) as formatter:
+            selected = formatter.get_configs(configs)
+
+        # THEN
+        assert [c.io_config.input for c in selected] == ["formatted.yaml"]
+
+    def test_invalid_content_does_not_prevent_flush(self, repo: Path) -> None:
+        """Test that an invalid staged file is reported while the other files are still formatted."""
+        # GIVEN
+        (repo / "invalid.yml").write_text("key: [value\n")
+        git(repo, "add", "invalid.yml")
+        config = get_default_yamkix_config()
+
+        # WHEN
+        with GitIndexFormatter(cwd=repo) as formatter:
+            for staged_config in formatter.get_configs([config]):
+                if staged_config.io_config.input == "invalid.yml":
+                    with pytest.raises(InvalidYamlContentError):
+                        formatter.format_staged_file(staged_config)
+                else:
+                    formatter.format_staged_file(staged_config)
+
+        # THEN
+        assert git(repo, "show", ":sub/unformatted.yml") == "---\nkey: value\nlist:\n  - a\n"
+
+    def test_non_utf8_content_is_reported(self, repo: Path) -> None:
+        """Test that a staged file that is not UTF-8 is reported as invalid, and left as is."""
+        # GIVEN
+        (repo / "latin1.yml").write_bytes("key:   café\n".encode("latin-1"))
+        git(repo, "add", "latin1.yml")
+        config = get_default_yamkix_config()
+
+        # WHEN
+        with GitIndexFormatter(cwd=repo) as formatter:
+            for staged_config in formatter.get_configs([config]):
+                if staged_config.io_config.input == "latin1.yml":
+                    with pytest.raises(InvalidYamlContentError) as error:
+                        formatter.format_staged_file(staged_config)
+                else:
+                    formatter.format_staged_file(staged_config)
+
+        # THEN
+        assert isinstance(error.value.__cause__, UnicodeDecodeError)
+        assert git(repo, "show", ":sub/unformatted.yml") == "---\nkey: value\nlist:\n  - a\n"
+        assert (repo / "latin1.yml").read_bytes() == "key:   café\n".encode("latin-1")
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs file names that are not UTF-8")
+    def test_non_utf8_path(self, repo: Path) -> None:
+        """Test that a staged file whose path is not UTF-8 is formatted."""
+        # GIVEN
+        path = os.fsdecode(b"caf\xe9.yml")
+        (repo / path).write_text("key:   value\n")
+        git(repo, "add", path)
+
+        # WHEN
+        with GitIndexFormatter(cwd=repo) as formatter:
+            results = [formatter.format_staged_file(c) for c in formatter.get_configs([get_default_yamkix_config()])]
+
+        # THEN
+        assert path in [r.input_display_name for r in results]
+        assert git(repo, "show", f":{path}") == "---\nkey: value\n"
+
+    def test_not_a_repository(self, tmp_path: Path) -> None:
+        """Test that a GitCommandError is raised outside of a git repository."""
+        with pytest.raises(GitCommandError):
+            get_git_toplevel(tmp_path)
+
+
+def test_list_index_entries(repo: Path) -> None:
+    """Test list_index_entries."""
+    # WHEN
+    entries = list_index_entries(get_git_toplevel(repo))
+
+    # THEN
+    assert sorted(e.path for e in entries) == ["formatted.yaml", "not-yaml.txt", "sub/unformatted.yml"]
+    assert all(e.mode == "100644" for e in entries)
+
+
+def test_write_blobs(repo: Path) -> None:
+    """Test that the blobs are written as they are, and named like by git hash-object."""
+    # GIVEN
+    contents = [b"key: value\n", b"", b"\xff\x00binary\r\n", b"a: 1\n" * 10000]
+
+    # WHEN
+    object_names = write_blobs(get_git_toplevel(repo), contents)
+
+    # THEN
+    assert object_names == [
+        hashlib.sha1(b"blob %d\0" % len(content) + content, usedforsecurity=False).hexdigest() for content in contents
+    ]
+    assert git(repo, "cat-file", "-p", object_names[0]) == "key: value\n"
+    assert write_blobs(get_git_toplevel(repo), []) == []
+
+
+def test_cat_file_batch_missing_object(repo: Path) -> None:
+    """Test that reading a missing object raises GitBlobReadError."""
+    # GIVEN
+    cat_file = GitCatFileBatch(get_git_toplevel(repo))
+
+    # WHEN / THEN
+    try:
+        with pytest.raises(GitBlobReadError):
+            cat_file.read_blob("0" * 40)
+    finally:
+        cat_file.close()
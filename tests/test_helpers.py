@@ -1,9 +1,11 @@
 """Test helpers."""
 
-from io import StringIO
+from io import BytesIO, StringIO
+from pathlib import Path
 from textwrap import dedent
 
 import pytest
+from pytest_mock import MockerFixture
 from ruamel.yaml import YAML
 from ruamel.yaml.scalarstring import DoubleQuotedScalarString, SingleQuotedScalarString
 
@@ -11,6 +13,8 @@ from yamkix.helpers import (
     convert_flow_to_block_style,
     convert_single_to_double_quotes,
     get_yamkix_version,
+    iter_paths_from_stream,
+    iter_yaml_files,
     remove_all_linebreaks,
     string_is_comment,
     strip_leading_double_space,
@@ -474,3 +478,63 @@ class TestConvertFlowToBlockStyle:
             copy: *anc
         """)
         assert self._round_trip(yaml_input) == expected
+
+
+class TestIterPathsFromStream:
+    """Provide tests for the iter_paths_from_stream function."""
+
+    @pytest.mark.parametrize(
+        ("content", "nul_separated", "expected"),
+        [
+            pytest.param(b"a.yml\nb c.yml\n", False, ["a.yml", "b c.yml"], id="newline_separated"),
+            pytest.param(b"a.yml\r\n\nb.yml", False, ["a.yml", "b.yml"], id="crlf_empty_and_no_trailing_newline"),
+            pytest.param(b"a.yml\0b\nc.yml\0", True, ["a.yml", "b\nc.yml"], id="nul_separated"),
+            pytest.param(b"a.yml\0\0b.yml", True, ["a.yml", "b.yml"], id="nul_separated_empty_entry"),
+            pytest.param(b"", True, [], id="empty"),
+        ],
+    )
+    def test_iter_paths(self, content: bytes, nul_separated: bool, expected: list[str]) -> None:
+        """Test that paths are split according to the separator."""
+        assert list(iter_paths_from_stream(BytesIO(content), nul_separated=nul_separated)) == expected
+
+    def test_nul_separated_paths_spanning_chunks(self, mocker: MockerFixture) -> None:
+        """Test that a path spanning two chunks is yielded once, in full."""
+        # GIVEN
+        mocker.patch("yamkix.helpers.FILES_FROM_CHUNK_SIZE", 3)
+
+        # WHEN
+        sut = list(iter_paths_from_stream(BytesIO(b"first.yml\0second.yml\0"), nul_separated=True))
+
+        # THEN
+        assert sut == ["first.yml", "second.yml"]
+
+    def test_is_lazy(self) -> None:
+        """Test that the first path is yielded before the stream is exhausted."""
+        # GIVEN
+        stream = BytesIO(b"a.yml\nb.yml\n")
+
+        # WHEN
+        first = next(iter_paths_from_stream(stream))
+
+        # THEN
+        assert first == "a.yml"
+        assert stream.tell() < len(b"a.yml\nb.yml\n")
+
+
+class TestIterYamlFiles:
+    """Provide tests for the iter_yaml_files function."""
+
+    def test_iter_yaml_files(self, tmp_path: Path) -> None:
+        """Test that the YAML files under the directories are found, and the files given are kept as is."""
+        # GIVEN
+        (tmp_path / "dir" / "sub").mkdir(parents=True)
+        for name in ("dir/a.yml", "dir/sub/b.yaml", "dir/c.json", "d.txt"):
+            (tmp_path / name).write_text("a: 1\n")
+
+        # WHEN
+        sut = list(iter_yaml_files([tmp_path / "dir", tmp_path / "d.txt"]))
+
+        # THEN
+        assert sorted(sut) == sorted(
+            [tmp_path / "dir" / "a.yml", tmp_path / "dir" / "sub" / "b.yaml", tmp_path / "d.txt"]
+        )
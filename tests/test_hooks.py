@@ -0,0 +1,163 @@
+"""Provide tests for the hooks module."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yamkix import (
+    FileProcessingResult,
+    YamkixConfig,
+    YamkixHooks,
+    register_hooks,
+    round_trip_and_format,
+    unregister_hooks,
+)
+from yamkix.config import YamkixInputOutputConfig, get_yamkix_config_from_default
+from yamkix.errors import InvalidYamlContentError
+from yamkix.report import NO_MEASURE, measure
+
+
+class RecordingHooks(YamkixHooks):
+    """Record the events."""
+
+    def __init__(self) -> None:
+        """Start with no event."""
+        self.events: list[tuple[str, Any]] = []
+
+    def on_file_start(self, yamkix_config: YamkixConfig) -> None:
+        """Record the event."""
+        self.events.append(("file_start", yamkix_config.io_config.input_display_name))
+
+    def on_phase_end(self, phase: str, duration: float) -> None:
+        """Record the event."""
+        assert duration >= 0
+        self.events.append(("phase_end", phase))
+
+    def on_document(self, document: Any, index: int) -> None:  # noqa: ANN401
+        """Record the event."""
+        self.events.append(("document", (dict(document), index)))
+
+    def on_file_end(self, result: FileProcessingResult) -> None:
+        """Record the event."""
+        self.events.append(("file_end", result.unchanged))
+
+    def on_file_error(self, yamkix_config: YamkixConfig, error: Exception) -> None:
+        """Record the event."""
+        self.events.append(("file_error", (yamkix_config.io_config.input_display_name, type(error))))
+
+
+@pytest.fixture(name="hooks")
+def hooks_fixture() -> Iterator[RecordingHooks]:
+    """Provide registered hooks, unregistered after the test."""
+    hooks = RecordingHooks()
+    register_hooks(hooks)
+    yield hooks
+    unregister_hooks(hooks)
+
+
+def get_config(path: Path, **options: Any) -> YamkixConfig:  # noqa: ANN401
+    """Return a config formatting a file in place."""
+    return get_yamkix_config_from_default(
+        io_config=YamkixInputOutputConfig(input=str(path), output=str(path)), **options
+    )
+
+
+class TestHooks:
+    """Provide tests for the hooks called while processing a file."""
+
+    def test_events(self, hooks: RecordingHooks, tmp_path: Path) -> None:
+        """Test that the hooks are notified of each event, in order."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a:   1 # comment\n---\nb: 2\n")
+
+        # WHEN
+        round_trip_and_format(get_config(test_file, spaces_before_comment=1))
+
+        # THEN
+        assert hooks.events == [
+            ("file_start", str(test_file)),
+            ("phase_end", "read"),
+            ("phase_end", "parse"),
+            ("phase_end", "comment_spacing"),
+            ("phase_end", "emit"),
+            ("document", ({"a": 1}, 0)),
+            ("phase_end", "comment_spacing"),
+            ("phase_end", "emit"),
+            ("document", ({"b": 2}, 1)),
+            ("phase_end", "write"),
+            ("file_end", False),
+        ]
+
+    def test_error(self, hooks: RecordingHooks, tmp_path: Path) -> None:
+        """Test that the hooks are notified of an error."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: [\n")
+
+        # WHEN
+        with pytest.raises(InvalidYamlContentError):
+            round_trip_and_format(get_config(test_file))
+
+        # THEN
+        assert hooks.events == [
+            ("file_start", str(test_file)),
+            ("phase_end", "read"),
+            ("phase_end", "parse"),
+            ("file_error", (str(test_file), InvalidYamlContentError)),
+        ]
+
+    def test_unregistered_hooks_are_not_called(self, tmp_path: Path) -> None:
+        """Test that the hooks are not called once unregistered."""
+        # GIVEN
+        hooks = RecordingHooks()
+        register_hooks(hooks)
+        unregister_hooks(hooks)
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: 1\n")
+
+        # WHEN
+        round_trip_and_format(get_config(test_file))
+
+        # THEN
+        assert hooks.events == []
+
+    def test_nothing_measured_without_hooks(self) -> None:
+        """Test that phases are not timed when no hook is registered and no stats are collected."""
+        # WHEN / THEN
+        assert measure(None, "parse") is NO_MEASURE
+
+    def test_default_hooks_do_nothing(self, tmp_path: Path) -> None:
+        """Test that hooks only need to override the events they observe."""
+        # GIVEN
+        hooks = YamkixHooks()
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: 1\n")
+        register_hooks(hooks)
+
+        # WHEN
+        try:
+            result = round_trip_and_format(get_config(test_file))
+        finally:
+            unregister_hooks(hooks)
+
+        # THEN
+        assert result.unchanged is False
+
+    def test_document_with_a_large_literal_block_scalar(self, hooks: RecordingHooks, tmp_path: Path) -> None:
+        """Test that the hooks are notified once per document, with the body of the large literal block scalars."""
+        # GIVEN
+        body = "".join(f"line {index}\n" for index in range(1000))
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: |\n" + "".join(f"  {line}\n" for line in body.splitlines()) + "---\nb: 2\n")
+
+        # WHEN
+        round_trip_and_format(get_config(test_file))
+
+        # THEN
+        assert [event for event in hooks.events if event[0] == "document"] == [
+            ("document", ({"a": body}, 0)),
+            ("document", ({"b": 2}, 1)),
+        ]
@@ -0,0 +1,177 @@
+"""Provide tests for the json_input module."""
+
+import json
+
+import pytest
+from pytest_mock import MockerFixture
+from ruamel.yaml.comments import CommentedMap, CommentedSeq
+from ruamel.yaml.scalarfloat import ScalarFloat
+from ruamel.yaml.scalarstring import DoubleQuotedScalarString
+
+import yamkix.yamkix
+from yamkix.config import YamkixResourceLimits, get_yamkix_config_from_default
+from yamkix.json_input import load_json_document, looks_like_json
+from yamkix.yamkix import format_yaml_content
+from yamkix.yaml_writer import get_cached_yaml_writers
+
+CONTENTS = {
+    "object": '{"a": 1, "b": [1, 2, {"c": "x y", "d": null, "e": true, "f": 1.5e3}], "g": {}, "h": []}',
+    "array": '[\n  "a",\n  [1, -2.50, 1E+5],\n  {"key": "value", "quotes": "\'\\"", "<<": "merge?"}\n]\n',
+    "pretty_printed": json.dumps({"items": [{"id": index, "tags": ["x", "y"]} for index in range(3)]}, indent=4),
+    "escapes": '{"escaped": "\\/\\u00e9\\t\\n\\u0000", "unicode": "é中"}',
+    "blanks": ' {\t"a" :\t[ ]\r\n\t}\r\n\r\n',
+}
+CONFIG_OPTIONS = {
+    "default": {},
+    "safe": {"parsing_mode": "safe"},
+    "quotes_not_preserved": {"quotes_preserved": False},
+    "double_quotes": {"quotes_preserved": False, "enforce_double_quotes": True},
+    "block_style": {"enforce_block_style": True},
+    "no_dash_inwards": {"dash_inwards": False, "enforce_block_style": True},
+    "narrow": {"line_width": 20},
+}
+
+
+def format_with_yaml_parser(mocker: MockerFixture, content: str, config_options: dict) -> str:
+    """Return the output of the formatting of `content` when the JSON fast path is not taken."""
+    mocker.patch("yamkix.yamkix.load_json_document", return_value=None)
+    try:
+        return format_yaml_content(content, get_yamkix_config_from_default(**config_options))
+    finally:
+        mocker.stopall()
+
+
+class TestLoadJsonDocument:
+    """Provide tests for the load_json_document function."""
+
+    def test_round_trip_document(self) -> None:
+        """Test that the document is built like the `rt` loader builds it."""
+        # GIVEN
+        yaml = get_cached_yaml_writers(get_yamkix_config_from_default())[0]
+
+        # WHEN
+        document = load_json_document('{"a": [1, 1.50, "x"], "b": {}}', yaml)
+
+        # THEN
+        assert isinstance(document, CommentedMap)
+        assert document.fa.flow_style()
+        assert all(isinstance(key, DoubleQuotedScalarString) for key in document)
+        assert isinstance(document["a"], CommentedSeq)
+        assert document["a"].fa.flow_style()
+        assert type(document["a"][0]) is int
+        assert isinstance(document["a"][1], ScalarFloat)
+        assert isinstance(document["a"][2], DoubleQuotedScalarString)
+        assert document == {"a": [1, 1.5, "x"], "b": {}}
+
+    def test_quotes_not_preserved(self) -> None:
+        """Test that the strings are plain strings when the quotes are not preserved."""
+        # GIVEN
+        yaml = get_cached_yaml_writers(get_yamkix_config_from_default(quotes_preserved=False))[0]
+
+        # WHEN
+        document = load_json_document('["x"]', yaml)
+
+        # THEN
+        assert type(document[0]) is str
+
+    def test_safe_document(self) -> None:
+        """Test that the document is made of plain dicts and lists in `safe` mode."""
+        # GIVEN
+        yaml = get_cached_yaml_writers(get_yamkix_config_from_default(parsing_mode="safe"))[0]
+
+        # WHEN
+        document = load_json_document('{"a": [1, 1.5e3, {"b": null}]}', yaml)
+
+        # THEN
+        assert type(document) is dict
+        assert type(document["a"]) is list
+        assert document == {"a": [1, 1500.0, {"b": None}]}
+
+    @pytest.mark.parametrize("parsing_mode", ["rt", "safe"])
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("{a: 1}", id="flow_mapping"),
+            pytest.param('{"a": 1}\n---\n{"b": 2}\n', id="several_documents"),
+            pytest.param('{"a": 1, "a": 2}', id="duplicated_keys"),
+            pytest.param('{"' + "k" * 200 + '": 1}', id="long_key"),
+            pytest.param("[NaN, Infinity]", id="constants"),
+        ],
+    )
+    def test_left_to_the_yaml_parser(self, content: str, parsing_mode: str) -> None:
+        """Test that the contents that are not JSON, or not loaded the same way by the YAML parser, are not loaded."""
+        # GIVEN
+        yaml = get_cached_yaml_writers(get_yamkix_config_from_default(parsing_mode=parsing_mode))[0]
+
+        # WHEN / THEN
+        assert load_json_document(content, yaml) is None
+
+
+class TestLooksLikeJson:
+    """Provide tests for the looks_like_json function."""
+
+    @pytest.mark.parametrize("content_name", CONTENTS)
+    def test_json(self, content_name: str) -> None:
+        """Test that JSON objects and arrays look like JSON."""
+        # GIVEN / WHEN / THEN
+        assert looks_like_json(CONTENTS[content_name])
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("a: 1\n", id="yaml"),
+            pytest.param('"a"', id="scalar"),
+            pytest.param("\ufeff[]", id="byte_order_mark"),
+            pytest.param("\t[]", id="leading_tab"),
+            pytest.param("[]\n\t", id="trailing_tab"),
+            pytest.param("\n[]", id="leading_line_break"),
+            pytest.param("[1\n\n]", id="blank_line"),
+            pytest.param('{"a"\n: 1}', id="key_line_break"),
+            pytest.param("[1,\r2]", id="carriage_return"),
+            pytest.param('["\\ud83d\\ude00"]', id="surrogate_pair"),
+        ],
+    )
+    def test_not_json(self, content: str) -> None:
+        """Test that the contents that are not JSON, or not read as JSON by the YAML parser, do not look like JSON."""
+        # GIVEN / WHEN / THEN
+        assert not looks_like_json(content)
+
+
+class TestJsonFastPath:
+    """Provide tests for the formatting of JSON content through the `json` module."""
+
+    @pytest.mark.parametrize("config_name", CONFIG_OPTIONS)
+    @pytest.mark.parametrize("content_name", CONTENTS)
+    def test_same_output_as_the_yaml_parser(self, mocker: MockerFixture, content_name: str, config_name: str) -> None:
+        """Test that the output is the one of the formatting of the content loaded by the YAML parser."""
+        # GIVEN
+        content = CONTENTS[content_name]
+        config = get_yamkix_config_from_default(**CONFIG_OPTIONS[config_name])
+        expected = format_with_yaml_parser(mocker, content, CONFIG_OPTIONS[config_name])
+        spy_load_json_document = mocker.spy(yamkix.yamkix, "load_json_document")
+
+        # WHEN
+        formatted = format_yaml_content(content, config)
+
+        # THEN
+        assert formatted == expected
+        assert spy_load_json_document.spy_return is not None
+
+    @pytest.mark.parametrize(
+        "config_options",
+        [
+            pytest.param({"verify": True}, id="verify"),
+            pytest.param({"limits": YamkixResourceLimits(max_depth=10)}, id="limits"),
+        ],
+    )
+    def test_not_taken(self, mocker: MockerFixture, config_options: dict) -> None:
+        """Test that the content is left to the YAML parser when the config relies on its nodes."""
+        # GIVEN
+        spy_load_json_document = mocker.spy(yamkix.yamkix, "load_json_document")
+
+        # WHEN
+        formatted = format_yaml_content('{"a": 1}', get_yamkix_config_from_default(**config_options))
+
+        # THEN
+        assert formatted == '--- {"a": 1}\n'
+        spy_load_json_document.assert_not_called()
@@ -0,0 +1,136 @@
+"""Provide tests for the limits module."""
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+from yamkix.config import YamkixResourceLimits, get_yamkix_config_from_default
+from yamkix.errors import ResourceLimitExceededError
+from yamkix.limits import check_file_size, check_input_size
+from yamkix.yamkix import format_yaml_content
+
+BILLION_LAUGHS = """\
+a: &a [x, x, x, x, x, x, x, x, x, x]
+b: &b [*a, *a, *a, *a, *a, *a, *a, *a, *a, *a]
+c: &c [*b, *b, *b, *b, *b, *b, *b, *b, *b, *b]
+d: [*c, *c, *c, *c, *c, *c, *c, *c, *c, *c]
+"""
+
+
+def format_with_limits(raw_input: str, parsing_mode: str = "rt", **limits: int) -> str:
+    """Format some content with the given resource limits."""
+    config = get_yamkix_config_from_default(parsing_mode=parsing_mode, limits=YamkixResourceLimits(**limits))
+    return format_yaml_content(raw_input, config)
+
+
+class TestCheckInputSize:
+    """Provide tests for the check_input_size function."""
+
+    @pytest.mark.parametrize(
+        ("raw_input", "max_bytes", "exceeded"),
+        [
+            ("a: 1\n", 5, False),
+            ("a: 12\n", 5, True),
+            ("a: é\n", 6, False),
+            ("a: é\n", 5, True),
+            ("a: 🦊\n", 8, False),
+            ("a: 🦊\n", 7, True),
+        ],
+    )
+    def test_utf8_size(self, raw_input: str, max_bytes: int, exceeded: bool) -> None:
+        """Test that the size is the one of the UTF-8 encoded content."""
+        # GIVEN
+        limits = YamkixResourceLimits(max_bytes=max_bytes)
+
+        # WHEN / THEN
+        if exceeded:
+            with pytest.raises(ResourceLimitExceededError, match=f"max_bytes is {max_bytes}"):
+                check_input_size(raw_input, limits)
+        else:
+            check_input_size(raw_input, limits)
+
+    def test_no_limit(self) -> None:
+        """Test that nothing is checked without limits."""
+        # WHEN / THEN
+        check_input_size("a: 1\n" * 1000, None)
+        check_input_size("a: 1\n" * 1000, YamkixResourceLimits(max_depth=1))
+
+    def test_file_size(self, tmp_path: Path) -> None:
+        """Test that the size of a file is checked without reading it."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: 12\n")
+
+        # WHEN / THEN
+        check_file_size(str(test_file), YamkixResourceLimits(max_bytes=6))
+        with pytest.raises(ResourceLimitExceededError, match="max_bytes is 5"):
+            check_file_size(str(test_file), YamkixResourceLimits(max_bytes=5))
+
+
+class TestLimitedComposer:
+    """Provide tests for the limits enforced while parsing."""
+
+    @pytest.mark.parametrize("parsing_mode", ["rt", "safe"])
+    def test_within_limits(self, parsing_mode: str) -> None:
+        """Test that content within the limits is formatted as without limits."""
+        # GIVEN
+        raw_input = "a:\n  b: &b [1, 2]\n  c: *b\n---\nd: 3\n"
+        config = get_yamkix_config_from_default(parsing_mode=parsing_mode)
+
+        # WHEN
+        formatted = format_with_limits(
+            raw_input, parsing_mode, max_bytes=100, max_documents=2, max_depth=4, max_nodes=11, max_alias_expansion=3
+        )
+
+        # THEN
+        assert formatted == format_yaml_content(raw_input, config)
+
+    @pytest.mark.parametrize("parsing_mode", ["rt", "safe"])
+    @pytest.mark.parametrize(
+        ("raw_input", "limits", "exceeded_limit"),
+        [
+            ("---\na: 1\n---\nb: 2\n---\nc: 3\n", {"max_documents": 2}, "max_documents"),
+            ("a:\n  b:\n    c: 1\n", {"max_depth": 2}, "max_depth"),
+            ("[[[[[[[[]]]]]]]]\n", {"max_depth": 4}, "max_depth"),
+            ("- 1\n- 2\n- 3\n", {"max_nodes": 3}, "max_nodes"),
+            (BILLION_LAUGHS, {"max_alias_expansion": 1000}, "max_alias_expansion"),
+        ],
+    )
+    def test_limit_exceeded(
+        self, parsing_mode: str, raw_input: str, limits: dict[str, int], exceeded_limit: str
+    ) -> None:
+        """Test that the processing is aborted when a limit is exceeded."""
+        # WHEN / THEN
+        with pytest.raises(ResourceLimitExceededError) as exc_info:
+            format_with_limits(raw_input, parsing_mode, **limits)
+        assert exc_info.value.limit == exceeded_limit
+
+    def test_alias_expansion_counts_nested_aliases(self) -> None:
+        """Test that an alias counts all the nodes it refers to, including the ones reached through aliases."""
+        # GIVEN: *b expands to 3 nodes (the sequence and the 2 nodes of *a), *a to 1 node
+        raw_input = "a: &a x\nb: &b [*a, y]\nc: *b\n"
+
+        # WHEN / THEN
+        assert format_with_limits(raw_input, max_alias_expansion=4) == "---\na: &a x\nb: &b [*a, y]\nc: *b\n"
+        with pytest.raises(ResourceLimitExceededError):
+            format_with_limits(raw_input, max_alias_expansion=3)
+
+    def test_counters_are_reset_for_each_stream(self) -> None:
+        """Test that the (cached) writers can be reused after a limit was exceeded."""
+        # GIVEN
+        limits = {"max_depth": 2, "max_nodes": 3}
+        with pytest.raises(ResourceLimitExceededError):
+            format_with_limits("a:\n  b:\n    c: 1\n", **limits)
+
+        # WHEN / THEN
+        assert format_with_limits("a: 1\n", **limits) == "---\na: 1\n"
+        assert format_with_limits("b: 1\n", **limits) == "---\nb: 1\n"
+
+    def test_error_can_be_pickled(self) -> None:
+        """Test that the error can be sent from a worker process."""
+        # WHEN
+        error = pickle.loads(pickle.dumps(ResourceLimitExceededError("max_nodes", 3)))  # noqa: S301
+
+        # THEN
+        assert (error.limit, error.maximum, str(error)) == ("max_nodes", 3, "Resource limit exceeded: max_nodes is 3")
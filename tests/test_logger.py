@@ -0,0 +1,128 @@
+"""Provide tests for the logger module."""
+
+import io
+from dataclasses import replace
+
+import pytest
+from pytest_mock import MockerFixture
+
+from yamkix.config import get_default_yamkix_config, get_yamkix_config_for_file
+from yamkix.logger import Verbosity, YamkixLogger, get_verbosity
+from yamkix.yamkix import FileProcessingResult
+
+
+@pytest.mark.parametrize(
+    ("silent", "verbose", "expected"),
+    [
+        (False, 0, Verbosity.NORMAL),
+        (False, 1, Verbosity.VERBOSE),
+        (False, 2, Verbosity.DEBUG),
+        (False, 5, Verbosity.DEBUG),
+        (True, 0, Verbosity.QUIET),
+        (True, 2, Verbosity.QUIET),
+    ],
+)
+def test_get_verbosity(silent: bool, verbose: int, expected: Verbosity) -> None:
+    """Test that --silent wins over --verbose, and that --verbose is capped."""
+    # WHEN / THEN
+    assert get_verbosity(silent, verbose) == expected
+
+
+class TestYamkixLogger:
+    """Provide tests for the YamkixLogger class."""
+
+    @pytest.mark.parametrize(
+        ("verbosity", "expected"),
+        [
+            (Verbosity.QUIET, "error\n"),
+            (Verbosity.NORMAL, "error\nwarning\ninfo\n"),
+            (Verbosity.DEBUG, "error\nwarning\ninfo\ndebug\n"),
+        ],
+    )
+    def test_levels(self, verbosity: Verbosity, expected: str) -> None:
+        """Test that only the messages of the enabled levels are printed, as plain text."""
+        # GIVEN
+        stream = io.StringIO()
+        sut = YamkixLogger(verbosity, stream=stream)
+
+        # WHEN
+        sut.error("error")
+        sut.warning("warning")
+        sut.info("info")
+        sut.log(Verbosity.DEBUG, "debug")
+
+        # THEN
+        assert stream.getvalue() == expected
+
+    def test_config_printed_once_per_distinct_config(self) -> None:
+        """Test that the effective config is printed once, whatever the number of files sharing it."""
+        # GIVEN
+        stream = io.StringIO()
+        sut = YamkixLogger(Verbosity.NORMAL, stream=stream)
+        config = get_default_yamkix_config()
+        other_config = replace(config, dash_inwards=False)
+
+        # WHEN
+        for file in ("a.yml", "b.yml", "c.yml"):
+            sut.log_config(get_yamkix_config_for_file(config, file))
+        sut.log_config(get_yamkix_config_for_file(other_config, "d.yml"))
+
+        # THEN
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 2
+        assert "Configuration: typ=rt" in lines[0]
+        assert "dash_inwards=True" in lines[0]
+        assert "dash_inwards=False" in lines[1]
+
+    def test_files_printed_when_verbose(self) -> None:
+        """Test that a line is printed per file when verbose."""
+        # GIVEN
+        stream = io.StringIO()
+        sut = YamkixLogger(Verbosity.VERBOSE, stream=stream)
+        config = get_default_yamkix_config()
+
+        # WHEN
+        sut.log_config(get_yamkix_config_for_file(config, "a.yml"))
+        sut.log_config(get_yamkix_config_for_file(config, "b.yml"))
+
+        # THEN
+        assert stream.getvalue().splitlines()[1:] == [
+            "[yamkix] Processing: input=a.yml, output=a.yml",
+            "[yamkix] Processing: input=b.yml, output=b.yml",
+        ]
+
+    @pytest.mark.parametrize(
+        ("result", "expected"),
+        [
+            (FileProcessingResult("a.yml", error=False, unchanged=True, elapsed=0.0125), "a.yml: unchanged in 0.013s"),
+            (FileProcessingResult("a.yml", error=False, unchanged=False), "a.yml: reformatted"),
+            (FileProcessingResult("a.yml", error=True, unchanged=False, elapsed=1.0), "a.yml: error in 1.000s"),
+        ],
+    )
+    def test_results_printed_when_debug(self, result: FileProcessingResult, expected: str) -> None:
+        """Test that the outcome of each file is printed at the debug level only."""
+        # GIVEN
+        verbose_stream = io.StringIO()
+        debug_stream = io.StringIO()
+
+        # WHEN
+        YamkixLogger(Verbosity.VERBOSE, stream=verbose_stream).log_result(result)
+        YamkixLogger(Verbosity.DEBUG, stream=debug_stream).log_result(result)
+
+        # THEN
+        assert not verbose_stream.getvalue()
+        assert debug_stream.getvalue() == f"[yamkix] {expected}\n"
+
+    def test_rich_console_when_interactive(self, mocker: MockerFixture) -> None:
+        """Test that the rich console is only used when stderr is a terminal."""
+        # GIVEN
+        mocker.patch("sys.stderr.isatty", return_value=True)
+        mock_get_stderr_console = mocker.patch("yamkix.logger.get_stderr_console")
+
+        # WHEN
+        YamkixLogger().error("[not markup]")
+
+        # THEN
+        mock_get_stderr_console.return_value.print.assert_called_once_with(
+            "[not markup]", style="error", markup=False, highlight=False
+        )
@@ -0,0 +1,317 @@
+"""Provide tests for the lsp module."""
+
+import json
+from io import BytesIO
+from textwrap import dedent
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from yamkix.config import get_default_yamkix_config
+from yamkix.lsp import (
+    METHOD_NOT_FOUND,
+    REQUEST_FAILED,
+    YamkixLanguageServer,
+    apply_content_change,
+    compute_minimal_edits,
+    format_yaml_range,
+    get_yamkix_config_from_initialization_options,
+    split_yaml_documents,
+)
+
+URI = "file:///tmp/sut.yml"
+
+
+def encode_messages(*messages: dict[str, Any]) -> bytes:
+    """Frame JSON-RPC messages as a client would."""
+    framed = b""
+    for message in messages:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("UTF-8")
+        framed += f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+    return framed
+
+
+def decode_messages(output: bytes) -> list[dict[str, Any]]:
+    """Read the JSON-RPC messages written by the server."""
+    server = YamkixLanguageServer(BytesIO(output), BytesIO())
+    messages = []
+    while (message := server.read_message()) is not None:
+        messages.append(message)
+    return messages
+
+
+def apply_edits(text: str, edits: list[dict[str, Any]]) -> str:
+    """Apply the text edits returned by the server."""
+    for edit in edits:
+        text = apply_content_change(text, {"range": edit["range"], "text": edit["newText"]})
+    return text
+
+
+class TestComputeMinimalEdits:
+    """Provide tests for the compute_minimal_edits function."""
+
+    def test_no_edit_when_unchanged(self) -> None:
+        """Test that no edit is returned when the text is unchanged."""
+        assert compute_minimal_edits("---\na: 1\n", "---\na: 1\n") == []
+
+    def test_only_changed_lines_are_replaced(self) -> None:
+        """Test that the edit only covers the lines that change."""
+        # GIVEN
+        original = "---\na: 1\nb:   2\nc: 3\n"
+        formatted = "---\na: 1\nb: 2\nc: 3\n"
+
+        # WHEN
+        edits = compute_minimal_edits(original, formatted)
+
+        # THEN
+        assert edits == [
+            {"range": {"start": {"line": 2, "character": 0}, "end": {"line": 3, "character": 0}}, "newText": "b: 2\n"}
+        ]
+        assert apply_edits(original, edits) == formatted
+
+    @pytest.mark.parametrize(
+        ("original", "formatted"),
+        [
+            pytest.param("a: 1", "---\na: 1\n", id="no_trailing_newline"),
+            pytest.param("", "---\na: 1\n", id="empty"),
+            pytest.param("a: é\nb:  ü", "---\na: é\nb: ü\n", id="non_ascii"),
+            pytest.param("---\na: 1\n\n\n", "---\na: 1\n", id="lines_removed_at_end"),
+        ],
+    )
+    def test_edits_produce_formatted_text(self, original: str, formatted: str) -> None:
+        """Test that applying the edits produces the formatted text."""
+        assert apply_edits(original, compute_minimal_edits(original, formatted)) == formatted
+
+
+def test_apply_content_change_with_utf16_positions() -> None:
+    """Test that incremental changes use UTF-16 code units for characters."""
+    # GIVEN: the emoji takes 2 UTF-16 code units
+    text = "a: 😀b\n"
+
+    # WHEN
+    sut = apply_content_change(
+        text, {"range": {"start": {"line": 0, "character": 5}, "end": {"line": 0, "character": 6}}, "text": "c"}
+    )
+
+    # THEN
+    assert sut == "a: 😀c\n"
+
+
+def test_split_yaml_documents() -> None:
+    """Test that the split documents can be joined back to the original text."""
+    # GIVEN
+    text = "# comment\n---\na: 1\n--- # second\nb: 2\n---\n"
+
+    # WHEN
+    documents = split_yaml_documents(text)
+
+    # THEN
+    assert documents == [(0, "# comment\n"), (1, "---\na: 1\n"), (3, "--- # second\nb: 2\n"), (5, "---\n")]
+
+
+def test_split_yaml_documents_keeps_the_directives_with_their_document() -> None:
+    """Test that the directives are split with the document following them."""
+    # GIVEN
+    text = "%YAML 1.1\n# comment\n---\na: 1\n...\n%TAG !e! tag:example.com,2000:\n---\nb: !e!x 2\n"
+
+    # WHEN
+    documents = split_yaml_documents(text)
+
+    # THEN
+    assert documents == [
+        (0, "%YAML 1.1\n# comment\n---\na: 1\n...\n"),
+        (5, "%TAG !e! tag:example.com,2000:\n---\nb: !e!x 2\n"),
+    ]
+    assert "".join(document for _, document in documents) == text
+
+
+class TestFormatYamlRange:
+    """Provide tests for the format_yaml_range function."""
+
+    def test_only_intersecting_documents_are_formatted(self) -> None:
+        """Test that the documents outside of the range are left as is."""
+        # GIVEN
+        text = "---\na:   1\n---\nb:   2\n---\nc:   3\n"
+
+        # WHEN
+        sut = format_yaml_range(text, get_default_yamkix_config(), start_line=3, end_line=3)
+
+        # THEN
+        assert sut == "---\na:   1\n---\nb: 2\n---\nc:   3\n"
+
+    @pytest.mark.parametrize(
+        ("start_line", "expected"),
+        [
+            pytest.param(3, "---\na:   1\n...\n%YAML 1.1\n---\nb: 0o10\nc: true\n", id="directive"),
+            pytest.param(6, "---\na:   1\n...\n%YAML 1.1\n---\nb: 0o10\nc: true\n", id="document"),
+            pytest.param(1, "---\na: 1\n...\n%YAML 1.1\n---\nb:   0o10\nc: on\n", id="previous_document"),
+        ],
+    )
+    def test_yaml_directive(self, start_line: int, expected: str) -> None:
+        """Test that a document is formatted with its `%YAML` directive, and stays separated from the previous one."""
+        # GIVEN
+        text = "---\na:   1\n...\n%YAML 1.1\n---\nb:   0o10\nc: on\n"
+
+        # WHEN
+        sut = format_yaml_range(text, get_default_yamkix_config(), start_line=start_line, end_line=start_line)
+
+        # THEN
+        assert sut == expected
+
+    def test_comments_only_chunk_is_kept(self) -> None:
+        """Test that a chunk without any document is not dropped."""
+        # GIVEN
+        text = "# header\n---\na:   1\n"
+
+        # WHEN
+        sut = format_yaml_range(text, get_default_yamkix_config(), start_line=0, end_line=2)
+
+        # THEN
+        assert sut == "# header\n---\na: 1\n"
+
+
+def test_get_yamkix_config_from_initialization_options() -> None:
+    """Test that known options are taken into account and unknown ones ignored."""
+    # WHEN
+    sut = get_yamkix_config_from_initialization_options({"yamkix": {"dash_inwards": False, "unknown": 1}})
+
+    # THEN
+    assert sut.dash_inwards is False
+    assert sut.explicit_start is True
+
+
+class TestYamkixLanguageServer:
+    """Provide tests for the YamkixLanguageServer class."""
+
+    def test_session(self) -> None:
+        """Test a whole session: open, change, format, range format, shutdown and exit."""
+        # GIVEN
+        text = "---\na:   1\n---\nb:\n- x\n"
+        reader = BytesIO(
+            encode_messages(
+                {"id": 1, "method": "initialize", "params": {"initializationOptions": {"dash_inwards": False}}},
+                {"method": "initialized", "params": {}},
+                {"method": "textDocument/didOpen", "params": {"textDocument": {"uri": URI, "text": text}}},
+                {
+                    "method": "textDocument/didChange",
+                    "params": {
+                        "textDocument": {"uri": URI},
+                        "contentChanges": [
+                            {
+                                "range": {"start": {"line": 1, "character": 5}, "end": {"line": 1, "character": 6}},
+                                "text": "2",
+                            }
+                        ],
+                    },
+                },
+                {
+                    "id": 2,
+                    "method": "textDocument/rangeFormatting",
+                    "params": {
+                        "textDocument": {"uri": URI},
+                        "range": {"start": {"line": 1, "character": 0}, "end": {"line": 1, "character": 1}},
+                    },
+                },
+                {"id": 3, "method": "textDocument/formatting", "params": {"textDocument": {"uri": URI}}},
+                {"id": 4, "method": "unknown/method", "params": {}},
+                {"id": 5, "method": "shutdown"},
+                {"method": "exit"},
+            )
+        )
+        writer = BytesIO()
+        server = YamkixLanguageServer(reader, writer)
+
+        # WHEN
+        clean_exit = server.serve()
+
+        # THEN
+        assert clean_exit is True
+        responses = {message["id"]: message for message in decode_messages(writer.getvalue())}
+        assert responses[1]["result"]["capabilities"]["documentFormattingProvider"] is True
+        changed_text = "---\na:   2\n---\nb:\n- x\n"
+        assert apply_edits(changed_text, responses[2]["result"]) == "---\na: 2\n---\nb:\n- x\n"
+        # editorconfig-checker-disable
+        assert apply_edits(changed_text, responses[3]["result"]) == dedent("""\
+            ---
+            a: 2
+            ---
+            b:
+            - x
+        """)
+        # editorconfig-checker-enable
+        assert responses[4]["error"]["code"] == METHOD_NOT_FOUND
+        assert responses[5]["result"] is None
+
+    def test_formatting_invalid_document(self) -> None:
+        """Test that formatting an invalid document returns an error."""
+        # GIVEN
+        reader = BytesIO(
+            encode_messages(
+                {"method": "textDocument/didOpen", "params": {"textDocument": {"uri": URI, "text": "a: [b\n"}}},
+                {"id": 1, "method": "textDocument/formatting", "params": {"textDocument": {"uri": URI}}},
+            )
+        )
+        writer = BytesIO()
+
+        # WHEN
+        clean_exit = YamkixLanguageServer(reader, writer).serve()
+
+        # THEN
+        assert clean_exit is False
+        (response,) = decode_messages(writer.getvalue())
+        assert response["error"]["code"] == REQUEST_FAILED
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            pytest.param("a: 1\na: 2\n", id="duplicate_key"),
+            pytest.param("a: " + "[" * 2000 + "]" * 2000 + "\n", id="too_deep"),
+        ],
+    )
+    def test_server_survives_a_failed_formatting(self, text: str) -> None:
+        """Test that a document the formatting fails on is answered with an error, the next requests being served."""
+        # GIVEN
+        other_uri = "file:///tmp/other.yml"
+        reader = BytesIO(
+            encode_messages(
+                {"method": "textDocument/didOpen", "params": {"textDocument": {"uri": URI, "text": text}}},
+                {"id": 1, "method": "textDocument/formatting", "params": {"textDocument": {"uri": URI}}},
+                {"method": "textDocument/didOpen", "params": {"textDocument": {"uri": other_uri, "text": "b:   1\n"}}},
+                {"id": 2, "method": "textDocument/formatting", "params": {"textDocument": {"uri": other_uri}}},
+                {"id": 3, "method": "shutdown"},
+                {"method": "exit"},
+            )
+        )
+        writer = BytesIO()
+
+        # WHEN
+        clean_exit = YamkixLanguageServer(reader, writer).serve()
+
+        # THEN
+        assert clean_exit is True
+        responses = {message["id"]: message for message in decode_messages(writer.getvalue())}
+        assert responses[1]["error"]["code"] == REQUEST_FAILED
+        assert apply_edits("b:   1\n", responses[2]["result"]) == "---\nb: 1\n"
+
+    def test_unexpected_error_is_answered(self, mocker: MockerFixture) -> None:
+        """Test that an unexpected error of a handler is answered as a failed request, without stopping the server."""
+        # GIVEN
+        reader = BytesIO(
+            encode_messages(
+                {"id": 1, "method": "initialize", "params": {}},
+                {"id": 2, "method": "shutdown"},
+                {"method": "exit"},
+            )
+        )
+        writer = BytesIO()
+        server = YamkixLanguageServer(reader, writer)
+        mocker.patch.dict(server._handlers, {"initialize": mocker.Mock(side_effect=KeyError("boom"))})  # noqa: SLF001
+
+        # WHEN
+        clean_exit = server.serve()
+
+        # THEN
+        assert clean_exit is True
+        responses = {message["id"]: message for message in decode_messages(writer.getvalue())}
+        assert responses[1]["error"] == {"code": REQUEST_FAILED, "message": "KeyError: 'boom'"}
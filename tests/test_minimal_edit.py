@@ -0,0 +1,236 @@
+"""Provide tests for the minimal_edit module."""
+
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+import yamkix.minimal_edit
+from yamkix.config import get_yamkix_config_from_default
+from yamkix.errors import InvalidYamlContentError
+from yamkix.minimal_edit import MinimalEditFormatter, Region, get_region_config, split_regions
+from yamkix.yamkix import format_yaml_content
+
+SOURCE_FILES = sorted((Path(__file__).parent / "data" / "source").glob("*.yml"))
+CONTENTS = {
+    "blank_lines_between_keys": "a: 1\n\n\nb: 2\n\n",
+    "comments_between_keys": "a: 1   # eol\n# c1\n\n  # indented\nb:\n    - x\n    - 'y'\n",
+    "head_comments": "# head\n\na:\n  k: v\nb: [1,2]\n",
+    "flow_values": "a: {x: 1, y: [1,2]}\nb: [1, 2]\n",
+    "documents": "---\na: 1\nb: 2\n---\n- x\n-   y\n---\nc: 3\nd: 4\n",
+    "block_scalars": "a:\n- x\nb:\n  c: |\n    text\n\n    more\nd: >\n  folded\n",
+    "trailing_comment": "a: 1\nb: 2\n# trailing\n",
+    "quotes": "a: 'single'\nb: \"double\"\nc: plain\n",
+    "tags": "a: !tag 1\nb: !!str 2\n",
+    "long_lines": "a: long " + "word " * 40 + "\nb: 2\n",
+    "anchors_and_aliases": "a: &x\n  k: v\nb: *x\n",
+    "duplicated_keys": "a: 1\n'a': 2\n",
+    "keep_chomped_block_scalar": "a: |+\n  x\n\nb: 1\n",
+    "keep_chomped_last_value": "a: 1\nb: |+\n  x\n\n",
+    "set": "--- !!set\n? a\n? b\n",
+    "tagged_mapping": "--- !custom\na: 1\nb: 2\n",
+    "empty": "",
+}
+CONFIG_OPTIONS = {
+    "default": {},
+    "no_markers": {"explicit_start": False},
+    "end_markers": {"explicit_end": True},
+    "no_dash_inwards": {"dash_inwards": False},
+    "double_quotes": {"quotes_preserved": False, "enforce_double_quotes": True, "spaces_before_comment": 2},
+    "aligned_comments": {"align_comments": True},
+    "safe": {"parsing_mode": "safe"},
+}
+
+
+def format_with_reference_engine(content: str, config_options: dict) -> str:
+    """Return the output (or the error) of the regenerating engine."""
+    try:
+        return format_yaml_content(content, get_yamkix_config_from_default(**config_options))
+    except Exception as error:  # noqa: BLE001
+        return repr(type(error))
+
+
+def format_with_minimal_edit_engine(formatter: MinimalEditFormatter, content: str, config_options: dict) -> str:
+    """Return the output (or the error) of the minimal edit engine."""
+    try:
+        return formatter.format(content, get_yamkix_config_from_default(**config_options))
+    except Exception as error:  # noqa: BLE001
+        return repr(type(error))
+
+
+class TestSplitRegions:
+    """Provide tests for the split_regions function."""
+
+    def test_one_region_per_top_level_key(self) -> None:
+        """Test that the documents are split on their top level keys, the comments staying in place."""
+        # GIVEN
+        content = "# head\na:\n  b: 1\n# about c\nc: [1, 2]\n---\n- x\n---\nd: 1\ne: 2\n"
+
+        # WHEN
+        regions = split_regions(content)
+
+        # THEN
+        assert regions == [
+            Region(text="# head\na:\n  b: 1\n# about c\n", starts_document=True, ends_document=False),
+            Region(text="c: [1, 2]\n", starts_document=False, ends_document=True),
+            Region(text="---\n- x\n", starts_document=True, ends_document=True),
+            Region(text="---\nd: 1\n", starts_document=True, ends_document=False),
+            Region(text="e: 2\n", starts_document=False, ends_document=True),
+        ]
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("a: &x 1\nb: *x\n", id="alias"),
+            pytest.param("%YAML 1.2\n---\na: 1\n", id="directive"),
+            pytest.param("a: 1\n...\n", id="document_end"),
+            pytest.param("a: 1\n'a': 2\n", id="duplicated_keys"),
+            pytest.param("? [x]\n: 1\nb: 2\n", id="complex_key"),
+            pytest.param("a: 'unterminated\nb: 2\n", id="invalid"),
+        ],
+    )
+    def test_not_split(self, content: str) -> None:
+        """Test that the contents whose regions cannot be formatted on their own are not split."""
+        # GIVEN / WHEN / THEN
+        assert split_regions(content) is None
+
+    def test_tagged_mapping_is_a_single_region(self) -> None:
+        """Test that a document whose top level mapping is tagged (e.g. a set) is not split on its keys."""
+        # GIVEN
+        content = "--- !!set\n? a\n? b\n"
+
+        # WHEN
+        regions = split_regions(content)
+
+        # THEN
+        assert regions == [Region(text=content, starts_document=True, ends_document=True)]
+
+
+class TestGetRegionConfig:
+    """Provide tests for the get_region_config function."""
+
+    @pytest.mark.parametrize(
+        ("starts_document", "ends_document", "expected_markers"),
+        [
+            (True, True, (True, True)),
+            (True, False, (True, False)),
+            (False, True, (False, True)),
+            (False, False, (False, False)),
+        ],
+    )
+    def test_markers(self, starts_document: bool, ends_document: bool, expected_markers: tuple[bool, bool]) -> None:
+        """Test that only the first and last regions of a document get the document markers."""
+        # GIVEN
+        config = get_yamkix_config_from_default(explicit_start=True, explicit_end=True)
+        region = Region(text="a: 1\n", starts_document=starts_document, ends_document=ends_document)
+
+        # WHEN
+        region_config = get_region_config(config, region)
+
+        # THEN
+        assert (region_config.explicit_start, region_config.explicit_end) == expected_markers
+
+
+class TestMinimalEditFormatter:
+    """Provide tests for the MinimalEditFormatter class."""
+
+    @pytest.mark.parametrize("config_name", CONFIG_OPTIONS)
+    @pytest.mark.parametrize("source_file", SOURCE_FILES, ids=lambda path: path.name)
+    def test_same_output_as_the_reference_engine_on_test_data(self, source_file: Path, config_name: str) -> None:
+        """Test that the output of the engine is the one of the regenerating engine, cold and warm."""
+        # GIVEN
+        content = source_file.read_text(encoding="UTF-8")
+        expected = format_with_reference_engine(content, CONFIG_OPTIONS[config_name])
+        formatter = MinimalEditFormatter()
+
+        # WHEN / THEN
+        assert format_with_minimal_edit_engine(formatter, content, CONFIG_OPTIONS[config_name]) == expected
+        assert format_with_minimal_edit_engine(formatter, content, CONFIG_OPTIONS[config_name]) == expected
+
+    @pytest.mark.parametrize("config_name", CONFIG_OPTIONS)
+    @pytest.mark.parametrize("content_name", CONTENTS)
+    def test_same_output_as_the_reference_engine(self, content_name: str, config_name: str) -> None:
+        """Test that the output (or the error) of the engine is the one of the regenerating engine."""
+        # GIVEN
+        content = CONTENTS[content_name]
+
+        # WHEN / THEN
+        assert format_with_minimal_edit_engine(
+            MinimalEditFormatter(), content, CONFIG_OPTIONS[config_name]
+        ) == format_with_reference_engine(content, CONFIG_OPTIONS[config_name])
+
+    def test_only_the_edited_regions_are_formatted(self, mocker: MockerFixture) -> None:
+        """Test that the regions known to be formatted are copied verbatim."""
+        # GIVEN
+        config = get_yamkix_config_from_default()
+        formatter = MinimalEditFormatter()
+        formatted = formatter.format("a: 1\nb:\n- x\nc: 3\n", config)
+        edited = formatted.replace("  - x", "    - x")
+        spy_format_yaml_content = mocker.spy(yamkix.minimal_edit, "format_yaml_content")
+
+        # WHEN
+        reformatted = formatter.format(edited, config)
+
+        # THEN
+        assert reformatted == formatted == format_yaml_content(edited, config)
+        assert [call.args[0] for call in spy_format_yaml_content.call_args_list] == ["b:\n    - x\n"]
+
+    def test_known_content_is_not_split(self, mocker: MockerFixture) -> None:
+        """Test that an output of the formatter is returned as is, without being scanned."""
+        # GIVEN
+        config = get_yamkix_config_from_default()
+        formatter = MinimalEditFormatter()
+        formatted = formatter.format("a: 1\nb: 2\n", config)
+        spy_split_regions = mocker.spy(yamkix.minimal_edit, "split_regions")
+
+        # WHEN
+        reformatted = formatter.format(formatted, config)
+
+        # THEN
+        assert reformatted == formatted
+        spy_split_regions.assert_not_called()
+
+    def test_known_regions_depend_on_the_formatting_options(self) -> None:
+        """Test that a region formatted with some options is not known to be formatted with other ones."""
+        # GIVEN
+        formatter = MinimalEditFormatter()
+        formatted = formatter.format("a: 1 # one\nb: 2\n", get_yamkix_config_from_default())
+
+        # WHEN
+        reformatted = formatter.format(formatted, get_yamkix_config_from_default(spaces_before_comment=2))
+
+        # THEN
+        assert reformatted == "---\na: 1  # one\nb: 2\n"
+
+    def test_least_recently_used_regions_are_forgotten(self) -> None:
+        """Test that the formatter remembers at most `max_known_regions` regions."""
+        # GIVEN
+        config = get_yamkix_config_from_default(explicit_start=False)
+        formatter = MinimalEditFormatter(max_known_regions=2)
+
+        # WHEN
+        formatter.format("a: 1\nb: 2\n", config)
+
+        # THEN
+        assert not formatter.is_known(config, Region(text="a: 1\n", starts_document=True, ends_document=False))
+        assert formatter.is_known(config, Region(text="b: 2\n", starts_document=False, ends_document=True))
+
+    def test_keep_chomped_block_scalar_ending_a_region(self) -> None:
+        """Test that a keep chomped block scalar ending a region does not end its document."""
+        # GIVEN
+        content = "a: |+\n  x\n\nb: 1\n"
+
+        # WHEN
+        formatted = MinimalEditFormatter().format(content, get_yamkix_config_from_default())
+
+        # THEN
+        assert formatted == "---\na: |+\n  x\n\nb: 1\n"
+
+    def test_invalid_content(self) -> None:
+        """Test that invalid content raises the error of the regenerating engine."""
+        # GIVEN
+        config = get_yamkix_config_from_default()
+
+        # WHEN / THEN
+        with pytest.raises(InvalidYamlContentError):
+            MinimalEditFormatter().format("a: [1\nb: 2\n", config)
@@ -0,0 +1,161 @@
+"""Provide tests for the passthrough module."""
+
+import functools
+
+import pytest
+from pytest_mock import MockerFixture
+
+import yamkix.yamkix
+from yamkix.config import get_yamkix_config_from_default
+from yamkix.passthrough import mask_block_scalars, unmask_block_scalars
+from yamkix.report import FileProcessingStats
+from yamkix.yamkix import format_yaml_content
+
+BODY_LINES = ["line one", "  indented more", "", "after blank", '{"json": [1, 2]}', "# not a comment", "key: |"]
+
+
+def get_body(indentation: int) -> str:
+    """Return the body of a literal block scalar, indented."""
+    return "\n".join(" " * indentation + line if line else "" for line in BODY_LINES)
+
+
+CONTENTS = {
+    "top_level_key": f"a: |\n{get_body(2)}\nb: 1\n",
+    "strip_and_trailing_empty_lines": f"a: |-\n{get_body(4)}\n\n\nb: 1\n",
+    "nested_map": f"top:\n  nested: |\n{get_body(4)}\n  other: x\n",
+    "sequence": f"list:\n- |\n{get_body(2)}\n- b\n",
+    "sequence_of_maps": f"list:\n  - |-\n{get_body(4)}\n  - key: |\n{get_body(6)}\n    k2: v\n",
+    "nested_sequences": f"- - |\n{get_body(4)}\n- x\n",
+    "documents": f"---\na: |\n{get_body(1)}\n---\nb: |\n{get_body(3)}\n# trailing comment\n",
+    "other_styles": f"a: >\n{get_body(2)}\nb: |+\n{get_body(2)}\n\nc: |\n{get_body(2)}\n",
+    "quoted_keys": f"'quoted key': |\n{get_body(2)}\n\"dq\": |-\n{get_body(2)}\n",
+    "no_final_line_break": f"a: |\n{get_body(2)}",
+}
+CONFIG_OPTIONS = {
+    "default": {},
+    "no_dash_inwards": {"dash_inwards": False},
+    "double_quotes": {"quotes_preserved": False, "enforce_double_quotes": True},
+    "transforms": {"enforce_block_style": True, "align_comments": True, "spaces_before_comment": 1},
+    "safe": {"parsing_mode": "safe"},
+}
+
+
+class TestMaskBlockScalars:
+    """Provide tests for the mask_block_scalars function."""
+
+    def test_large_literal_block_scalars_are_masked(self) -> None:
+        """Test that the body of the large literal block scalars is replaced by a placeholder."""
+        # GIVEN
+        content = f"a: |\n{get_body(2)}\nb: >\n{get_body(2)}\nc: |\n  small\n"
+
+        # WHEN
+        masked = mask_block_scalars(content, min_size=20)
+
+        # THEN
+        assert masked is not None
+        assert [body.indentation for body in masked.bodies] == [2]
+        assert masked.content == f"a: |\n  {masked.bodies[0].placeholder}\nb: >\n{get_body(2)}\nc: |\n  small\n"
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("a: |\n  trailing space \n  x\n", id="trailing_space"),
+            pytest.param("a: |\n  tab\there\n", id="tab"),
+            pytest.param("a: |\n  caf\u00e9\n", id="non_ascii"),
+            pytest.param(f"a: |2\n{get_body(2)}\n", id="indentation_indicator"),
+            pytest.param(f"a: |+\n{get_body(2)}\n", id="keep_chomping"),
+            pytest.param(f"a: &anchor |\n{get_body(2)}\n", id="anchor"),
+            pytest.param(f"a: | # comment\n{get_body(2)}\n", id="comment"),
+            pytest.param(f"--- |\n{get_body(2)}\n", id="document_scalar"),
+        ],
+    )
+    def test_not_masked(self, content: str) -> None:
+        """Test that the block scalars that may be changed by the emitter are left as is."""
+        # WHEN / THEN
+        assert mask_block_scalars(content, min_size=1) is None
+
+    def test_small_bodies_are_not_masked(self) -> None:
+        """Test that the bodies smaller than the minimum size are left as is."""
+        # GIVEN
+        content = f"a: |\n{get_body(2)}\n"
+
+        # WHEN / THEN
+        assert mask_block_scalars(content) is None
+        assert mask_block_scalars(content, min_size=len(content)) is None
+
+    def test_headers_in_a_body_are_skipped(self) -> None:
+        """Test that the lines of a block scalar looking like a block scalar header are not masked."""
+        # GIVEN
+        content = f"a: >\n  b: |\n{get_body(4)}\nc: 1\n"
+
+        # WHEN / THEN
+        assert mask_block_scalars(content, min_size=1) is None
+
+
+class TestUnmaskBlockScalars:
+    """Provide tests for the unmask_block_scalars function."""
+
+    def test_bodies_are_reindented(self) -> None:
+        """Test that the bodies are restored with the indentation of their placeholder."""
+        # GIVEN
+        masked = mask_block_scalars(f"a:\n    b: |\n{get_body(8)}\n", min_size=1)
+        assert masked is not None
+        formatted = f"a:\n  b: |\n    {masked.bodies[0].placeholder}\n"
+
+        # WHEN / THEN
+        assert unmask_block_scalars(formatted, masked) == f"a:\n  b: |\n{get_body(4)}\n"
+
+    @pytest.mark.parametrize(
+        "formatted",
+        [
+            pytest.param("a: PLACEHOLDER\n", id="not_a_block_scalar"),
+            pytest.param("a: |\n  PLACEHOLDER\nb: |\n  PLACEHOLDER\n", id="duplicated"),
+            pytest.param("a: |\n  PLACEHOLDER and more\n", id="not_alone"),
+            pytest.param("a: b\n", id="missing"),
+        ],
+    )
+    def test_placeholder_not_found(self, formatted: str) -> None:
+        """Test that the unmasking fails when a placeholder is not found alone after a literal header."""
+        # GIVEN
+        masked = mask_block_scalars(f"a: |\n{get_body(2)}\n", min_size=1)
+        assert masked is not None
+
+        # WHEN / THEN
+        assert unmask_block_scalars(formatted.replace("PLACEHOLDER", masked.bodies[0].placeholder), masked) is None
+
+
+class TestFormatWithPassthrough:
+    """Provide tests for the formatting of content holding large literal block scalars."""
+
+    @pytest.mark.parametrize("config_name", CONFIG_OPTIONS)
+    @pytest.mark.parametrize("content_name", CONTENTS)
+    def test_same_output_as_without_passthrough(
+        self, mocker: MockerFixture, content_name: str, config_name: str
+    ) -> None:
+        """Test that carrying the bodies through does not change the formatted output."""
+        # GIVEN
+        content = CONTENTS[content_name]
+        config = get_yamkix_config_from_default(**CONFIG_OPTIONS[config_name])
+        mocker.patch("yamkix.yamkix.mask_block_scalars", return_value=None)
+        expected = format_yaml_content(content, config)
+        mocker.patch("yamkix.yamkix.mask_block_scalars", functools.partial(mask_block_scalars, min_size=1))
+
+        # WHEN / THEN
+        assert format_yaml_content(content, config) == expected
+
+    def test_bodies_are_not_parsed(self, mocker: MockerFixture) -> None:
+        """Test that the body of a large literal block scalar does not reach the parser."""
+        # GIVEN
+        content = f"a: |\n{get_body(2)}\n"
+        config = get_yamkix_config_from_default()
+        mocker.patch("yamkix.yamkix.mask_block_scalars", functools.partial(mask_block_scalars, min_size=1))
+        spy_read_all_documents = mocker.spy(yamkix.yamkix, "read_all_documents")
+        stats = FileProcessingStats()
+
+        # WHEN
+        formatted = format_yaml_content(content, config, stats)
+
+        # THEN
+        assert formatted == f"---\n{content}"
+        assert "indented more" not in str(spy_read_all_documents.spy_return)
+        assert (stats.input_bytes, stats.output_bytes) == (len(content), len(formatted))
@@ -0,0 +1,204 @@
+"""Provide tests for the pipeline module."""
+
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from yamkix.config import YamkixConfig, get_default_yamkix_config, get_yamkix_config_for_file
+from yamkix.errors import InvalidConfigFileError, InvalidYamlContentError
+from yamkix.hooks import YamkixHooks, register_hooks, unregister_hooks
+from yamkix.pipeline import PipelinedFormatter
+from yamkix.report import READ, WRITE, FileProcessingStats
+
+READ_AHEAD = 2
+
+
+@pytest.fixture(name="yaml_files")
+def yaml_files_fixture(tmp_path: Path) -> list[Path]:
+    """Provide some files to format, the third one being invalid."""
+    files = [tmp_path / f"file{index}.yml" for index in range(6)]
+    for index, file in enumerate(files):
+        file.write_text(f"key{index}:   value\n")
+    files[2].write_text("a: [\n")
+    return files
+
+
+def get_configs(files: list[Path]) -> list[YamkixConfig]:
+    """Return the configs formatting the files in place."""
+    return [get_yamkix_config_for_file(get_default_yamkix_config(), str(file)) for file in files]
+
+
+def process_config(sut: PipelinedFormatter, config: YamkixConfig) -> bool | None:
+    """Process a config, returning whether the file was unchanged (`None` if the content is invalid)."""
+    try:
+        return sut.round_trip_and_format(config).unchanged
+    except InvalidYamlContentError:
+        return None
+
+
+def process_configs(sut: PipelinedFormatter, configs: list[YamkixConfig]) -> list[bool | None]:
+    """Process the configs like the CLI does."""
+    return [process_config(sut, config) for config in sut.prefetch(configs)]
+
+
+class TestPipelinedFormatter:
+    """Provide tests for the PipelinedFormatter class."""
+
+    @pytest.mark.parametrize(("read_ahead", "write_behind"), [(0, 0), (READ_AHEAD, 0), (0, 2), (READ_AHEAD, 2)])
+    def test_files_are_formatted(self, yaml_files: list[Path], read_ahead: int, write_behind: int) -> None:
+        """Test that the files are formatted in place, the invalid ones being reported and left untouched."""
+        # WHEN
+        with PipelinedFormatter(read_ahead=read_ahead, write_behind=write_behind) as sut:
+            unchanged = process_configs(sut, get_configs(yaml_files))
+
+        # THEN
+        assert unchanged == [False, False, None, False, False, False]
+        assert [file.read_text() for file in yaml_files] == [
+            "---\nkey0: value\n",
+            "---\nkey1: value\n",
+            "a: [\n",
+            "---\nkey3: value\n",
+            "---\nkey4: value\n",
+            "---\nkey5: value\n",
+        ]
+
+    @pytest.mark.parametrize(("write_behind", "measured_phases"), [(0, [READ, WRITE]), (2, [READ])])
+    def test_phases_are_measured(self, yaml_files: list[Path], write_behind: int, measured_phases: list[str]) -> None:
+        """Test that the reads done ahead are measured, and the writes done behind are not."""
+        # GIVEN
+        stats = FileProcessingStats()
+
+        # WHEN
+        with PipelinedFormatter(read_ahead=READ_AHEAD, write_behind=write_behind) as sut:
+            config = next(iter(sut.prefetch(get_configs(yaml_files))))
+            sut.round_trip_and_format(config, stats)
+
+        # THEN
+        assert [phase for phase in (READ, WRITE) if phase in stats.durations] == measured_phases
+
+    def test_read_ahead_is_bounded(self, yaml_files: list[Path]) -> None:
+        """Test that the read-ahead thread waits when `read_ahead` files are waiting to be formatted."""
+        # GIVEN
+        consumed: list[YamkixConfig] = []
+
+        def iter_configs() -> Iterator[YamkixConfig]:
+            for config in get_configs(yaml_files):
+                consumed.append(config)
+                yield config
+
+        # WHEN
+        with PipelinedFormatter(read_ahead=READ_AHEAD) as sut:
+            prefetched = iter(sut.prefetch(iter_configs()))
+            next(prefetched)
+            deadline = time.monotonic() + 5
+            while len(consumed) < READ_AHEAD + 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.1)
+
+            # THEN: the queued files, the file waiting to be queued and the file being formatted
+            assert len(consumed) == READ_AHEAD + 2
+
+    def test_read_errors_are_raised_when_the_file_is_processed(self, yaml_files: list[Path]) -> None:
+        """Test that a file that cannot be read raises its error when processed, not when read ahead."""
+        # GIVEN
+        yaml_files[0].unlink()
+
+        # WHEN
+        with PipelinedFormatter(read_ahead=READ_AHEAD) as sut:
+            prefetched = iter(sut.prefetch(get_configs(yaml_files)))
+            with pytest.raises(FileNotFoundError):
+                sut.round_trip_and_format(next(prefetched))
+            result = sut.round_trip_and_format(next(prefetched))
+
+        # THEN
+        assert result.input_display_name == str(yaml_files[1])
+
+    def test_configs_errors_are_raised_after_the_configs_read_before(self, yaml_files: list[Path]) -> None:
+        """Test that an error raised while iterating the configs is raised by the prefetching iterator."""
+        # GIVEN
+        config = get_configs(yaml_files)[0]
+
+        def iter_configs() -> Iterator[YamkixConfig]:
+            yield config
+            raise InvalidConfigFileError(path="pyproject.toml", reason="invalid")
+
+        # WHEN
+        with PipelinedFormatter(read_ahead=READ_AHEAD) as sut:
+            prefetched = iter(sut.prefetch(iter_configs()))
+
+            # THEN
+            assert next(prefetched) is config
+            with pytest.raises(InvalidConfigFileError):
+                next(prefetched)
+
+    def test_write_errors_are_raised_on_close(self, mocker: MockerFixture, yaml_files: list[Path]) -> None:
+        """Test that an error raised while writing behind is raised when the formatter is closed."""
+        # GIVEN
+        mocker.patch("yamkix.pipeline.write_formatted_output", side_effect=PermissionError("read-only"))
+        sut = PipelinedFormatter(write_behind=2)
+        sut.round_trip_and_format(get_configs(yaml_files)[0])
+
+        # WHEN / THEN
+        with pytest.raises(PermissionError, match="read-only"):
+            sut.close()
+
+    def test_write_errors_are_reported_for_their_file(self, mocker: MockerFixture, yaml_files: list[Path]) -> None:
+        """Test that an error raised while writing behind is reported with the result of its file."""
+        # GIVEN
+        write_formatted_output = mocker.patch(
+            "yamkix.pipeline.write_formatted_output", side_effect=[PermissionError("read-only"), None, None]
+        )
+        on_write_error = mocker.Mock()
+        configs = get_configs(yaml_files[:2])
+
+        # WHEN
+        with PipelinedFormatter(write_behind=2, on_write_error=on_write_error) as sut:
+            results = [sut.round_trip_and_format(config) for config in configs]
+            sut.round_trip_and_format(configs[0])
+
+        # THEN
+        assert write_formatted_output.call_count == 3
+        on_write_error.assert_called_once()
+        reported_result, reported_error = on_write_error.call_args.args
+        assert reported_result is results[0]
+        assert str(reported_error) == "read-only"
+        assert [result.error for result in results] == [True, False]
+
+    def test_results_are_final_once_written(self, mocker: MockerFixture, yaml_files: list[Path]) -> None:
+        """Test that the results are written, with their write error, once the outputs were waited for."""
+        # GIVEN
+        mocker.patch("yamkix.pipeline.write_formatted_output", side_effect=[PermissionError("read-only"), None])
+        on_write_error = mocker.Mock()
+        configs = get_configs(yaml_files[:2])
+
+        # WHEN
+        with PipelinedFormatter(write_behind=2, on_write_error=on_write_error) as sut:
+            results = [sut.round_trip_and_format(config) for config in configs]
+            sut.wait_for_outputs()
+
+            # THEN
+            assert all(sut.is_written(result) for result in results)
+            assert [result.error for result in results] == [True, False]
+            on_write_error.assert_called_once_with(results[0], mocker.ANY)
+
+    def test_hooks_are_notified(self, yaml_files: list[Path], mocker: MockerFixture) -> None:
+        """Test that the hooks are notified of the files processed, in the calling thread."""
+        # GIVEN
+        hooks = mocker.Mock(spec=YamkixHooks)
+        register_hooks(hooks)
+
+        # WHEN
+        try:
+            with PipelinedFormatter(read_ahead=READ_AHEAD, write_behind=2) as sut:
+                process_configs(sut, get_configs(yaml_files))
+        finally:
+            unregister_hooks(hooks)
+
+        # THEN
+        assert hooks.on_file_start.call_count == len(yaml_files)
+        assert hooks.on_file_end.call_count == len(yaml_files) - 1
+        assert hooks.on_file_error.call_count == 1
+        assert hooks.on_phase_end.call_args_list[0].args[0] == READ
@@ -0,0 +1,133 @@
+"""Provide tests for the profiling module."""
+
+import pstats
+from pathlib import Path
+
+import pytest
+
+from yamkix.config import get_yamkix_config_from_default
+from yamkix.profiling import (
+    OTHER_PACKAGE,
+    RUAMEL_PACKAGE,
+    YAMKIX_PACKAGE,
+    ProfileCollector,
+    format_profile_summary,
+    get_package,
+)
+from yamkix.supervisor import SupervisedFormatter
+from yamkix.yamkix import format_yaml_content
+
+
+def get_profiled_functions(stats: pstats.Stats) -> dict[str, int]:
+    """Return the number of calls of each profiled function, by name."""
+    return {name: calls for (_, _, name), (_, calls, *_) in stats.stats.items()}  # pyright: ignore[reportAttributeAccessIssue]
+
+
+class TestGetPackage:
+    """Provide tests for the get_package function."""
+
+    @pytest.mark.parametrize(
+        ("filename", "expected"),
+        [
+            (str(Path(__file__).parent.parent / "src" / "yamkix" / "yamkix.py"), YAMKIX_PACKAGE),
+            ("/venv/lib/python3.13/site-packages/ruamel/yaml/scanner.py", RUAMEL_PACKAGE),
+            ("/usr/lib/python3.13/io.py", OTHER_PACKAGE),
+            ("~", OTHER_PACKAGE),
+        ],
+    )
+    def test_get_package(self, filename: str, expected: str) -> None:
+        """Test that functions are split between yamkix, ruamel.yaml and the other packages."""
+        # WHEN / THEN
+        assert get_package(filename) == expected
+
+
+class TestProfileCollector:
+    """Provide tests for the ProfileCollector class."""
+
+    def test_only_profiled_calls_are_recorded(self) -> None:
+        """Test that only the calls of the profiled functions (and their callees) are recorded."""
+        # GIVEN
+        sut = ProfileCollector()
+        config = get_yamkix_config_from_default()
+        profiled_format = sut.profiled(format_yaml_content)
+
+        # WHEN
+        profiled_format("a: 1\n", config)
+        format_yaml_content("b: 1\n", config)
+        profiled_format("c: 1\n", config)
+
+        # THEN
+        functions = get_profiled_functions(sut.get_stats())
+        assert functions["format_yaml_content"] == 2
+        assert "load_all" in functions
+
+    def test_nested_profiled_calls(self) -> None:
+        """Test that a profiled function can call another profiled function."""
+        # GIVEN
+        sut = ProfileCollector()
+        inner = sut.profiled(sorted)
+
+        @sut.profiled
+        def outer(values: list[int]) -> list[int]:
+            return inner(values)
+
+        # WHEN
+        outer([3, 1, 2])
+        sorted([2, 1])
+
+        # THEN
+        functions = get_profiled_functions(sut.get_stats())
+        assert functions["outer"] == 1
+        assert functions["<built-in method builtins.sorted>"] == 1
+
+    def test_worker_profiles_are_merged(self, tmp_path: Path) -> None:
+        """Test that the profiles of the worker processes are merged with the in-process one."""
+        # GIVEN
+        sut = ProfileCollector()
+        config = get_yamkix_config_from_default()
+        profile_out = tmp_path / "profile.out"
+
+        # WHEN
+        with SupervisedFormatter(timeout=60, profiler=sut) as formatter:
+            formatter.format("a: 1\n", config)
+            formatter.format("b: 1\n", config)
+        sut.profiled(format_yaml_content)("c: 1\n", config)
+        summary_path = sut.write(profile_out)
+
+        # THEN
+        assert get_profiled_functions(pstats.Stats(str(profile_out)))["format_yaml_content"] == 3
+        assert summary_path == tmp_path / "profile.out.txt"
+        assert "Top 20 functions of ruamel.yaml by self time:" in summary_path.read_text()
+
+    def test_nothing_profiled(self, tmp_path: Path) -> None:
+        """Test that an empty profile can be written."""
+        # GIVEN
+        sut = ProfileCollector()
+
+        # WHEN
+        summary_path = sut.write(tmp_path / "profile.out")
+
+        # THEN
+        assert summary_path.read_text().startswith("Total: 0.000s in 0 calls")
+
+
+class TestFormatProfileSummary:
+    """Provide tests for the format_profile_summary function."""
+
+    def test_summary(self) -> None:
+        """Test that the summary lists the self time of each package and its hottest functions."""
+        # GIVEN
+        collector = ProfileCollector()
+        config = get_yamkix_config_from_default()
+        collector.profiled(format_yaml_content)("a: [1, 2]\n", config)
+
+        # WHEN
+        summary = format_profile_summary(collector.get_stats(), top=2)
+
+        # THEN
+        lines = summary.splitlines()
+        assert lines[2] == "Self time by package:"
+        assert [line.split()[0] for line in lines[3:6]] == ["yamkix", "ruamel.yaml", "other"]
+        for package in ("yamkix", "ruamel.yaml", "other"):
+            header = lines.index(f"Top 2 functions of {package} by self time:")
+            assert len([line for line in lines[header + 2 : header + 4] if line.startswith("  ")]) == 2
@@ -0,0 +1,152 @@
+"""Provide tests for the progress module."""
+
+import io
+import threading
+from pathlib import Path
+
+import pytest
+
+from yamkix.config import YamkixInputOutputConfig, get_yamkix_config_from_default
+from yamkix.helpers import MEBIBYTE
+from yamkix.progress import CLEAR_LINE, ProgressReporter, format_duration
+
+
+class FakeClock:
+    """A clock moved forward by the tests."""
+
+    def __init__(self) -> None:
+        """Start at 0."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+class FakeTerminal(io.StringIO):
+    """A stream pretending to be an interactive terminal."""
+
+    def isatty(self) -> bool:
+        """Pretend to be a terminal."""
+        return True
+
+
+def create_files(tmp_path: Path, sizes: list[int]) -> list[str]:
+    """Create files of the given sizes and return their paths."""
+    paths = []
+    for index, size in enumerate(sizes):
+        path = tmp_path / f"file{index}.yml"
+        path.write_text("a" * size)
+        paths.append(str(path))
+    return paths
+
+
+class TestFormatDuration:
+    """Provide tests for the format_duration function."""
+
+    @pytest.mark.parametrize(
+        ("seconds", "expected"), [(0, "0s"), (42.4, "42s"), (59.6, "1m00s"), (187, "3m07s"), (3600, "60m00s")]
+    )
+    def test_format_duration(self, seconds: float, expected: str) -> None:
+        """Test the format of the durations."""
+        # WHEN / THEN
+        assert format_duration(seconds) == expected
+
+
+class TestProgressReporter:
+    """Provide tests for the ProgressReporter class."""
+
+    def test_track_counts_files_and_bytes(self, tmp_path: Path) -> None:
+        """Test that a file is counted as done when the next one is requested."""
+        # GIVEN
+        clock = FakeClock()
+        configs = [
+            get_yamkix_config_from_default(io_config=YamkixInputOutputConfig(input=path, output=path))
+            for path in create_files(tmp_path, [MEBIBYTE, 3 * MEBIBYTE])
+        ]
+        sut = ProgressReporter(stream=io.StringIO(), clock=clock)
+
+        # WHEN
+        tracked = sut.track(configs)
+        next(tracked)
+        clock.now = 1.0
+        next(tracked)
+        clock.now = 4.0
+        progress_before_end = sut.format_progress()
+        list(tracked)
+
+        # THEN
+        assert progress_before_end == (
+            "[yamkix] Progress: 1/2 files (50%), 1.0 MiB, 0.2 files/s, 0.25 MiB/s, ETA 4s, "
+            f"slowest: {tmp_path / 'file1.yml'} (3.000s)"
+        )
+        assert (sut.total, sut.done, sut.bytes_done) == (2, 2, 4 * MEBIBYTE)
+        assert sut.format_progress() == (
+            "[yamkix] Progress: 2/2 files (100%), 4.0 MiB, 0.5 files/s, 1.00 MiB/s, ETA 0s, "
+            f"slowest: {tmp_path / 'file1.yml'} (3.000s)"
+        )
+
+    def test_unknown_total(self) -> None:
+        """Test that neither the total nor the ETA is reported when the configs are not sized."""
+        # GIVEN
+        clock = FakeClock()
+        sut = ProgressReporter(stream=io.StringIO(), clock=clock)
+
+        # WHEN
+        for _ in sut.track(get_yamkix_config_from_default() for _ in range(3)):
+            clock.now += 1.0
+
+        # THEN
+        assert (
+            sut.format_progress()
+            == "[yamkix] Progress: 3 files, 0.0 MiB, 1.0 files/s, 0.00 MiB/s, slowest: STDIN (1.000s)"
+        )
+
+    def test_no_file_done(self) -> None:
+        """Test the progress before any file is done."""
+        # GIVEN
+        sut = ProgressReporter(stream=io.StringIO(), clock=FakeClock())
+
+        # WHEN / THEN
+        assert sut.format_progress() == "[yamkix] Progress: 0 files, 0.0 MiB, 0.0 files/s, 0.00 MiB/s"
+
+    def test_plain_lines_are_printed_periodically(self) -> None:
+        """Test that the background thread prints a plain line per interval, and a final line on exit."""
+        # GIVEN
+        stream = io.StringIO()
+        line_printed = threading.Event()
+        original_write = stream.write
+
+        def write(text: str) -> int:
+            line_printed.set()
+            return original_write(text)
+
+        stream.write = write  # type: ignore[method-assign]
+
+        # WHEN
+        with ProgressReporter(stream=stream, interval=0.001) as sut:
+            assert line_printed.wait(timeout=5)
+            for _ in sut.track([get_yamkix_config_from_default()]):
+                pass
+
+        # THEN
+        lines = stream.getvalue().splitlines()
+        assert len(lines) >= 2
+        assert all(line.startswith("[yamkix] Progress: ") for line in lines)
+        assert lines[-1].startswith("[yamkix] Progress: 1/1 files (100%)")
+        assert CLEAR_LINE not in stream.getvalue()
+
+    def test_line_is_redrawn_on_a_terminal(self) -> None:
+        """Test that the line is redrawn in place on a terminal, and ended on exit."""
+        # GIVEN
+        stream = FakeTerminal()
+
+        # WHEN
+        with ProgressReporter(stream=stream, interval=60) as sut:
+            for _ in sut.track([get_yamkix_config_from_default()]):
+                pass
+
+        # THEN
+        assert stream.getvalue().startswith(CLEAR_LINE + "[yamkix] Progress: 1/1 files (100%)")
+        assert stream.getvalue().endswith("\n")
+        assert stream.getvalue().count("\n") == 1
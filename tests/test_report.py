@@ -0,0 +1,171 @@
+"""Provide tests for the report module."""
+
+import json
+from pathlib import Path
+
+import pytest
+from ruamel.yaml import YAML
+
+from yamkix.config import YamkixInputOutputConfig, get_yamkix_config_from_default
+from yamkix.report import (
+    PHASES,
+    FileProcessingStats,
+    ReportWriter,
+    count_comments,
+    count_nodes,
+    get_report_record,
+)
+from yamkix.yamkix import FileProcessingResult, format_yaml_content, round_trip_and_format
+
+COMMENTED_CONTENT = """\
+# top
+a: 1 # c1
+# before b
+b: [1, 2] # c2
+c:
+  - x # c3
+  # end
+"""
+
+
+class TestCounts:
+    """Provide tests for the count_nodes and count_comments functions."""
+
+    @pytest.mark.parametrize(
+        ("content", "expected"),
+        [
+            ("a\n", 1),
+            ("a: 1\n", 3),
+            ("a: [1, 2]\nb: {c: 3}\n", 9),
+            # The items of the anchored list are counted once, the alias counts as a node
+            ("a: &a [1, 2]\nb: *a\n", 7),
+        ],
+    )
+    def test_count_nodes(self, content: str, expected: int) -> None:
+        """Test that scalars, mapping keys, maps and lists are counted."""
+        # WHEN / THEN
+        assert count_nodes(YAML().load(content)) == expected
+
+    def test_count_comments(self) -> None:
+        """Test that each comment line is counted, wherever it is attached."""
+        # WHEN / THEN
+        assert count_comments(YAML().load(COMMENTED_CONTENT)) == 6
+        assert count_comments(YAML(typ="safe").load(COMMENTED_CONTENT)) == 0
+
+
+class TestFileProcessingStats:
+    """Provide tests for the FileProcessingStats class."""
+
+    def test_measures_taken_while_formatting(self) -> None:
+        """Test that the sizes, counts and durations of each phase and transform are recorded."""
+        # GIVEN
+        config = get_yamkix_config_from_default(
+            quotes_preserved=False,
+            enforce_double_quotes=True,
+            enforce_block_style=True,
+            align_comments=True,
+            spaces_before_comment=1,
+        )
+        stats = FileProcessingStats()
+
+        # WHEN
+        formatted = format_yaml_content(COMMENTED_CONTENT, config, stats)
+
+        # THEN
+        assert formatted == format_yaml_content(COMMENTED_CONTENT, config)
+        assert set(stats.durations) == {"parse", "transform", "emit"}
+        assert set(stats.transforms) == {"quotes", "block_style", "comment_alignment", "comment_spacing"}
+        assert stats.durations["transform"] == pytest.approx(sum(stats.transforms.values()))
+        assert (stats.input_bytes, stats.output_bytes) == (len(COMMENTED_CONTENT), len(formatted))
+        assert (stats.documents, stats.nodes, stats.comments) == (1, 10, 6)
+
+    def test_read_and_write_are_measured(self, tmp_path: Path) -> None:
+        """Test that reading and writing a file are measured too."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a: 1\n---\nb: 2\n")
+        config = get_yamkix_config_from_default(
+            io_config=YamkixInputOutputConfig(input=str(test_file), output=str(test_file))
+        )
+        stats = FileProcessingStats()
+
+        # WHEN
+        round_trip_and_format(config, stats)
+
+        # THEN
+        assert set(stats.durations) == {"read", "parse", "emit", "write"}
+        assert stats.transforms == {}
+        assert stats.documents == 2
+
+    def test_update(self) -> None:
+        """Test that the measures of another instance are added."""
+        # GIVEN
+        sut = FileProcessingStats(durations={"read": 1.0}, input_bytes=3)
+        other = FileProcessingStats(durations={"read": 0.5, "parse": 2.0}, transforms={"quotes": 1.0}, nodes=4)
+
+        # WHEN
+        sut.update(other)
+
+        # THEN
+        assert sut == FileProcessingStats(
+            durations={"read": 1.5, "parse": 2.0}, transforms={"quotes": 1.0}, input_bytes=3, nodes=4
+        )
+
+
+class TestReportWriter:
+    """Provide tests for the ReportWriter class."""
+
+    def test_one_record_per_file(self, tmp_path: Path) -> None:
+        """Test that a JSON record is written per file, the phases that did not run being null."""
+        # GIVEN
+        report = tmp_path / "report.ndjson"
+        stats = FileProcessingStats(durations={"read": 0.5}, input_bytes=12)
+
+        # WHEN
+        with ReportWriter(report) as sut:
+            sut.write(FileProcessingResult(input_display_name="a.yml", error=False, unchanged=True), stats)
+            # THEN: the record is already on disk
+            assert len(report.read_text().splitlines()) == 1
+            sut.write(FileProcessingResult(input_display_name="b.yml", error=True, unchanged=False), None)
+
+        # THEN
+        records = [json.loads(line) for line in report.read_text().splitlines()]
+        assert [record["input"] for record in records] == ["a.yml", "b.yml"]
+        assert records[0]["read"] == 0.5
+        assert records[0]["input_bytes"] == 12
+        assert all(records[1][phase] is None for phase in PHASES)
+        assert records[1]["error"] is True
+
+    def test_record_keys(self) -> None:
+        """Test the keys of a record."""
+        # WHEN
+        record = get_report_record(FileProcessingResult(input_display_name="a.yml", error=False, unchanged=True), None)
+
+        # THEN
+        assert list(record) == [
+            "input",
+            "error",
+            "unchanged",
+            "timed_out",
+            "elapsed",
+            "read",
+            "parse",
+            "transform",
+            "emit",
+            "verify",
+            "write",
+            "transforms",
+            "input_bytes",
+            "output_bytes",
+            "documents",
+            "nodes",
+            "comments",
+        ]
+
+    def test_must_be_used_as_context_manager(self, tmp_path: Path) -> None:
+        """Test that writing outside of the context fails."""
+        # WHEN / THEN
+        with pytest.raises(RuntimeError, match="context manager"):
+            ReportWriter(tmp_path / "report.ndjson").write(
+                FileProcessingResult(input_display_name="a.yml", error=False, unchanged=True), None
+            )
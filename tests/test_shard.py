@@ -0,0 +1,142 @@
+"""Provide tests for the shard module."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from yamkix.errors import InvalidShardReportError, InvalidShardSpecError
+from yamkix.shard import (
+    ShardReport,
+    ShardSpec,
+    assign_shards,
+    get_file_weights,
+    merge_shard_reports,
+    parse_shard_spec,
+    read_shard_report,
+    select_shard,
+    write_shard_report,
+)
+from yamkix.yamkix import FileProcessingResult
+
+
+class TestParseShardSpec:
+    """Provide tests for the parse_shard_spec function."""
+
+    def test_valid(self) -> None:
+        """Test parsing a valid shard specification."""
+        assert parse_shard_spec("2/8") == ShardSpec(index=2, count=8)
+
+    @pytest.mark.parametrize("value", ["0/8", "9/8", "1", "a/b", "1/0", ""])
+    def test_invalid(self, value: str) -> None:
+        """Test that invalid shard specifications raise an InvalidShardSpecError."""
+        with pytest.raises(InvalidShardSpecError):
+            parse_shard_spec(value)
+
+
+def test_assign_shards_balances_weights() -> None:
+    """Test that the heaviest items are spread first, to the least loaded shards."""
+    # GIVEN
+    weights = [10.0, 1.0, 1.0, 7.0, 2.0, 1.0]
+
+    # WHEN
+    sut = assign_shards(weights, 2)
+
+    # THEN
+    loads = [sum(weight for weight, shard in zip(weights, sut, strict=True) if shard == index) for index in (0, 1)]
+    assert sorted(loads) == [11.0, 11.0]
+
+
+def test_get_file_weights(tmp_path: Path) -> None:
+    """Test that recorded timings are used, and sizes converted to seconds for the other files."""
+    # GIVEN
+    known = tmp_path / "known.yml"
+    known.write_text("a" * 100)
+    unknown = tmp_path / "unknown.yml"
+    unknown.write_text("a" * 50)
+
+    # WHEN
+    sut = get_file_weights([str(known), str(unknown), str(tmp_path / "missing.yml")], {str(known): 2.0})
+
+    # THEN
+    assert sut == [2.0, 1.0, 0.02]
+
+
+def test_select_shard_is_a_partition(tmp_path: Path) -> None:
+    """Test that the shards are disjoint, cover all the files and do not depend on the order of the files."""
+    # GIVEN
+    files = []
+    for index in range(20):
+        path = tmp_path / f"file{index}.yml"
+        path.write_text("a: 1\n" * (index + 1))
+        files.append(str(path))
+
+    # WHEN
+    selections = [select_shard(files, ShardSpec(index=index, count=3)) for index in (1, 2, 3)]
+    reversed_selection = select_shard(files[::-1], ShardSpec(index=1, count=3))
+
+    # THEN
+    assert [sum(selected) for selected in zip(*selections, strict=True)] == [1] * len(files)
+    assert reversed_selection == selections[0][::-1]
+
+
+class TestShardReport:
+    """Provide tests for the shard reports."""
+
+    def test_write_and_read(self, tmp_path: Path) -> None:
+        """Test that a written report can be read back."""
+        # GIVEN
+        report = ShardReport(
+            shard=ShardSpec(index=1, count=2),
+            elapsed=1.5,
+            results=[FileProcessingResult(input_display_name="a.yml", error=False, unchanged=True, elapsed=0.5)],
+        )
+        path = tmp_path / "report.json"
+
+        # WHEN
+        write_shard_report(path, report)
+
+        # THEN
+        assert read_shard_report(path) == report
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("not json", id="not_json"),
+            pytest.param(json.dumps({"version": 99}), id="unsupported_version"),
+            pytest.param(json.dumps({"version": 1, "shard": "3/2"}), id="invalid_shard"),
+            pytest.param(json.dumps({"version": 1, "shard": None}), id="missing_keys"),
+        ],
+    )
+    def test_read_invalid(self, tmp_path: Path, content: str) -> None:
+        """Test that reading an invalid report raises an InvalidShardReportError."""
+        # GIVEN
+        path = tmp_path / "report.json"
+        path.write_text(content)
+
+        # WHEN / THEN
+        with pytest.raises(InvalidShardReportError):
+            read_shard_report(path)
+
+    def test_merge(self) -> None:
+        """Test merging the reports of several shards."""
+        # GIVEN
+        reports = [
+            ShardReport(
+                shard=ShardSpec(index=index, count=3),
+                elapsed=float(index),
+                results=[FileProcessingResult(input_display_name=f"{index}.yml", error=index == 3, unchanged=False)],
+            )
+            for index in (3, 1)
+        ]
+
+        # WHEN
+        sut = merge_shard_reports(reports)
+
+        # THEN
+        assert sut.shard is None
+        assert sut.shards == [ShardSpec(index=1, count=3), ShardSpec(index=3, count=3)]
+        assert sut.elapsed == 3.0
+        assert [result.input_display_name for result in sut.results] == ["3.yml", "1.yml"]
+        assert sut.errors == 1
+        assert sut.get_missing_shards() == [ShardSpec(index=2, count=3)]
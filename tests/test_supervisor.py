@@ -0,0 +1,104 @@
+"""Provide tests for the supervisor module."""
+
+from pathlib import Path
+
+import pytest
+from ruamel.yaml.parser import ParserError
+
+from yamkix.config import get_default_yamkix_config, get_yamkix_config_for_file
+from yamkix.errors import FileProcessingTimeoutError, InvalidYamlContentError
+from yamkix.supervisor import SupervisedFormatter, get_current_rss
+from yamkix.yamkix import format_yaml_content
+
+# Way shorter than the time needed to start a worker process and to format SLOW_CONTENT
+TOO_SHORT_TIMEOUT = 1e-6
+SLOW_CONTENT = "".join(f"key{index}:   value\n" for index in range(5000))
+TIMEOUT = 30.0
+
+
+class TestSupervisedFormatter:
+    """Provide tests for the SupervisedFormatter class."""
+
+    def test_format(self) -> None:
+        """Test that the content is formatted like in process."""
+        # GIVEN
+        raw_input = "a:   1\nb:\n- c # comment\n"
+        config = get_default_yamkix_config()
+
+        # WHEN
+        with SupervisedFormatter(TIMEOUT) as sut:
+            formatted = sut.format(raw_input, config)
+
+        # THEN
+        assert formatted == format_yaml_content(raw_input, config)
+
+    def test_invalid_content(self) -> None:
+        """Test that invalid content raises an InvalidYamlContentError with the parser error as cause."""
+        # WHEN / THEN
+        with SupervisedFormatter(TIMEOUT) as sut, pytest.raises(InvalidYamlContentError) as exc_info:
+            sut.format("a: [b\n", get_default_yamkix_config())
+        assert isinstance(exc_info.value.__cause__, ParserError)
+
+    def test_timeout_kills_and_replaces_the_worker(self) -> None:
+        """Test that a file exceeding the budget is reported and that the next files are still processed."""
+        # GIVEN
+        config = get_default_yamkix_config()
+
+        with SupervisedFormatter(TOO_SHORT_TIMEOUT) as sut:
+            # WHEN / THEN
+            with pytest.raises(FileProcessingTimeoutError, match="Processing took longer than 1e-06s"):
+                sut.format(SLOW_CONTENT, config)
+            sut.timeout = TIMEOUT
+            assert sut.format("a: 1\n", config) == "---\na: 1\n"
+
+    def test_round_trip_and_format(self, tmp_path: Path) -> None:
+        """Test that the file is read and written by the parent process."""
+        # GIVEN
+        test_file = tmp_path / "test.yml"
+        test_file.write_text("a:   1\n")
+        config = get_yamkix_config_for_file(get_default_yamkix_config(), str(test_file))
+
+        # WHEN
+        with SupervisedFormatter(TIMEOUT) as sut:
+            result = sut.round_trip_and_format(config)
+
+        # THEN
+        assert test_file.read_text() == "---\na: 1\n"
+        assert result.unchanged is False
+        assert result.error is False
+        assert result.input_display_name == str(test_file)
+
+    @pytest.mark.parametrize(
+        ("limits", "expected_recycled_workers"),
+        [
+            pytest.param({}, 0, id="no_limit"),
+            pytest.param({"max_files_per_worker": 2}, 3, id="max_files_per_worker"),
+            pytest.param({"max_worker_rss": 1}, 6, id="max_worker_rss"),
+        ],
+    )
+    def test_workers_are_recycled(self, limits: dict, expected_recycled_workers: int) -> None:
+        """Test that a worker is replaced once it reached one of its limits, the files being formatted as usual."""
+        # GIVEN
+        config = get_default_yamkix_config()
+
+        with SupervisedFormatter(TIMEOUT, **limits) as sut:
+            # WHEN / THEN
+            for index in range(5):
+                assert sut.format(f"a:   {index}\n", config) == f"---\na: {index}\n"
+            # A file reported as invalid by the worker counts too
+            with pytest.raises(InvalidYamlContentError):
+                sut.format("a: [b\n", config)
+        assert sut.recycled_workers == expected_recycled_workers
+
+
+class TestGetCurrentRss:
+    """Provide tests for the get_current_rss function."""
+
+    def test_rss_is_measured(self) -> None:
+        """Test that the resident set size of the current process is returned, in bytes."""
+        # GIVEN / WHEN
+        rss = get_current_rss()
+
+        # THEN
+        assert rss is not None
+        assert rss > 1024 * 1024
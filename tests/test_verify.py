@@ -0,0 +1,162 @@
+"""Provide tests for the verify module."""
+
+import functools
+import pickle
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from ruamel.yaml import YAML
+
+from yamkix.config import get_yamkix_config_from_default
+from yamkix.errors import FormattingVerificationError, InvalidYamlContentError
+from yamkix.passthrough import mask_block_scalars
+from yamkix.verify import FormattingVerifier, hash_node
+from yamkix.yamkix import format_yaml_content
+
+SOURCE_FILES = sorted((Path(__file__).parent / "data" / "source").glob("*.yml"))
+CONFIG_OPTIONS = {
+    "default": {},
+    "double_quotes": {"quotes_preserved": False, "enforce_double_quotes": True},
+    "block_style": {"enforce_block_style": True, "align_comments": True, "spaces_before_comment": 1},
+    "flow_style": {"default_flow_style": True},
+    "safe": {"parsing_mode": "safe"},
+}
+
+
+def get_document_hashes(content: str) -> list[bytes]:
+    """Return the hashes of the documents of some content."""
+    return [hash_node(node) for node in YAML(typ="safe", pure=True).compose_all(content)]
+
+
+class TestHashNode:
+    """Provide tests for the hash_node function."""
+
+    @pytest.mark.parametrize(
+        ("content", "equivalent"),
+        [
+            pytest.param("a: 1 # comment\nb: [x, 'y']\n", "a: 1\nb:\n  - x\n  - y\n", id="styles_and_comments"),
+            pytest.param("b: 2\na: 1\n", "a: 1\nb: 2\n", id="keys_order"),
+            pytest.param("a: ~\nb: 0o17\nc: 1e3\n", "a: null\nb: 15\nc: 1000.0\n", id="scalar_representations"),
+            pytest.param("a: &x [1]\nb: *x\n", "a: [1]\nb: [1]\n", id="aliases"),
+            pytest.param("a: >-\n  folded\n  text\n", "a: folded text\n", id="block_scalars"),
+        ],
+    )
+    def test_equivalent_contents(self, content: str, equivalent: str) -> None:
+        """Test that contents holding the same data have the same hashes."""
+        # GIVEN / WHEN / THEN
+        assert get_document_hashes(content) == get_document_hashes(equivalent)
+
+    @pytest.mark.parametrize(
+        ("content", "different"),
+        [
+            pytest.param("a: 1\n", "a: '1'\n", id="quoted_int"),
+            pytest.param("a: [1, 2]\n", "a: [2, 1]\n", id="sequence_order"),
+            pytest.param("a: {b: 1}\n", "a: [b, 1]\n", id="collection_kind"),
+            pytest.param("a: !tag x\n", "a: x\n", id="tag"),
+            pytest.param("a: |\n  text\n", "a: |-\n  text\n", id="chomping"),
+            pytest.param("a:\n  b: 1\n", "a:\nb: 1\n", id="structure"),
+        ],
+    )
+    def test_different_contents(self, content: str, different: str) -> None:
+        """Test that contents holding different data have different hashes."""
+        # GIVEN / WHEN / THEN
+        assert get_document_hashes(content) != get_document_hashes(different)
+
+    def test_substitutions(self) -> None:
+        """Test that the value of a placeholder is replaced by its substitution, keeping the chomped line break."""
+        # GIVEN
+        node = next(iter(YAML(typ="safe", pure=True).compose_all("a: |\n  placeholder\n")))
+
+        # WHEN
+        substituted = hash_node(node, {"placeholder": "line one\nline two"})
+
+        # THEN
+        assert [substituted] == get_document_hashes("a: |\n  line one\n  line two\n")
+
+
+class TestFormattingVerifier:
+    """Provide tests for the FormattingVerifier class."""
+
+    def test_load_all(self) -> None:
+        """Test that the documents are loaded like `yaml.load_all` does, and hashed."""
+        # GIVEN
+        content = "---\na: 1\n---\n- b\n"
+        verifier = FormattingVerifier()
+
+        # WHEN
+        documents = list(verifier.load_all(YAML(), content))
+
+        # THEN
+        assert documents == list(YAML().load_all(content))
+        assert verifier.document_hashes == get_document_hashes(content)
+
+    @pytest.mark.parametrize(
+        ("formatted", "reason"),
+        [
+            pytest.param("---\na: 2\n", "the data of document 1 changed", id="changed"),
+            pytest.param("---\na: 1\n---\na: 1\n", r"the output holds 2 document\(s\) instead of 1", id="documents"),
+            pytest.param("a: [1\n", "the output is not valid YAML", id="invalid"),
+        ],
+    )
+    def test_verify_fails(self, formatted: str, reason: str) -> None:
+        """Test that an output that does not hold the data of the input fails the verification."""
+        # GIVEN
+        verifier = FormattingVerifier()
+        list(verifier.load_all(YAML(), "a: 1\n"))
+
+        # WHEN / THEN
+        with pytest.raises(FormattingVerificationError, match=reason):
+            verifier.verify(formatted)
+
+    def test_error_can_be_pickled(self) -> None:
+        """Test that the error can be sent from a worker process."""
+        # WHEN
+        error = pickle.loads(pickle.dumps(FormattingVerificationError("the data of document 1 changed")))  # noqa: S301
+
+        # THEN
+        assert str(error) == "Formatting verification failed: the data of document 1 changed"
+
+
+class TestFormatWithVerification:
+    """Provide tests for the formatting with `verify` set."""
+
+    @pytest.mark.parametrize("config_name", CONFIG_OPTIONS)
+    @pytest.mark.parametrize("source_file", SOURCE_FILES, ids=lambda path: path.name)
+    def test_test_data_is_verified(self, source_file: Path, config_name: str) -> None:
+        """Test that the formatting of the test data passes the verification, with the same output."""
+        # GIVEN
+        content = source_file.read_text(encoding="UTF-8")
+        config = get_yamkix_config_from_default(**CONFIG_OPTIONS[config_name])
+        try:
+            expected = format_yaml_content(content, config)
+        except InvalidYamlContentError:
+            pytest.skip("invalid test data")
+
+        # WHEN / THEN
+        assert (
+            format_yaml_content(content, get_yamkix_config_from_default(**CONFIG_OPTIONS[config_name], verify=True))
+            == expected
+        )
+
+    def test_large_block_scalars_are_verified(self, mocker: MockerFixture) -> None:
+        """Test that the bodies carried through the formatting are verified with their original value."""
+        # GIVEN
+        content = "a: |\n  line one\n\n    indented\nb: |-\n  other\n"
+        mocker.patch("yamkix.yamkix.mask_block_scalars", functools.partial(mask_block_scalars, min_size=1))
+
+        # WHEN
+        formatted = format_yaml_content(content, get_yamkix_config_from_default(verify=True))
+
+        # THEN
+        assert formatted == f"---\n{content}"
+
+    def test_changed_data_fails(self, mocker: MockerFixture) -> None:
+        """Test that an output holding other data than the input fails the verification."""
+        # GIVEN
+        # The data is changed after it was loaded (and hashed)
+        mocker.patch("yamkix.yamkix.read_all_documents", side_effect=lambda parsed: [{"a": 2} for _ in parsed])
+
+        # WHEN / THEN
+        with pytest.raises(FormattingVerificationError):
+            format_yaml_content("a: 1\n", get_yamkix_config_from_default(verify=True))
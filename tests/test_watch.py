@@ -0,0 +1,220 @@
+"""Provide tests for the watch module."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from yamkix.config import get_default_yamkix_config
+from yamkix.watch import InotifyChangesDetector, PollingChangesDetector, YamkixWatcher, get_changes_detector
+from yamkix.yamkix import FileProcessingResult
+
+UNFORMATTED = "key:   value\nlist:\n- a\n"
+FORMATTED = "---\nkey: value\nlist:\n  - a\n"
+WAIT_TIMEOUT = 5.0
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is only available on Linux")
+
+
+def wait_for_changes(detector: InotifyChangesDetector | PollingChangesDetector) -> set[Path]:
+    """Wait until the detector reports some changes."""
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        if changed := detector.wait_for_changes(timeout=0.1):
+            return changed
+    return set()
+
+
+class TestYamkixWatcher:
+    """Provide tests for the YamkixWatcher class."""
+
+    def test_process_changes(self, tmp_path: Path) -> None:
+        """Test that changed files are reformatted and that the watcher's own writes are ignored."""
+        # GIVEN
+        sut = tmp_path / "sut.yml"
+        sut.write_text(UNFORMATTED)
+        watcher = YamkixWatcher([tmp_path], get_default_yamkix_config())
+
+        # WHEN
+        first_results = watcher.process_changes({sut})
+        second_results = watcher.process_changes({sut})
+
+        # THEN
+        assert first_results == [FileProcessingResult(input_display_name=str(sut), error=False, unchanged=False)]
+        assert second_results == []
+        assert sut.read_text() == FORMATTED
+
+    def test_process_changes_does_not_rewrite_formatted_files(self, tmp_path: Path) -> None:
+        """Test that already formatted files are not written back."""
+        # GIVEN
+        sut = tmp_path / "sut.yml"
+        sut.write_text(FORMATTED)
+        mtime_ns = sut.stat().st_mtime_ns
+        watcher = YamkixWatcher([tmp_path], get_default_yamkix_config())
+
+        # WHEN
+        results = watcher.process_changes({sut})
+
+        # THEN
+        assert results == [FileProcessingResult(input_display_name=str(sut), error=False, unchanged=True)]
+        assert sut.stat().st_mtime_ns == mtime_ns
+
+    def test_process_changes_reports_errors_and_skips_deleted_files(self, tmp_path: Path) -> None:
+        """Test that invalid files are reported as errors and deleted files are skipped."""
+        # GIVEN
+        invalid = tmp_path / "invalid.yml"
+        invalid.write_text("key: [value\n")
+        watcher = YamkixWatcher([tmp_path], get_default_yamkix_config())
+
+        # WHEN
+        results = watcher.process_changes({invalid, tmp_path / "deleted.yml"})
+
+        # THEN
+        assert results == [FileProcessingResult(input_display_name=str(invalid), error=True, unchanged=False)]
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("key: 1\nkey: 2\n", id="duplicated_key"),
+            pytest.param("a:\n" + "- " * 2000 + "x\n", id="too_deep"),
+        ],
+    )
+    def test_process_changes_reports_yaml_errors(self, tmp_path: Path, content: str) -> None:
+        """Test that an edit raising a YAML library error is reported, the next edits being reformatted."""
+        # GIVEN
+        sut = tmp_path / "sut.yml"
+        sut.write_text(FORMATTED)
+        watcher = YamkixWatcher([tmp_path], get_default_yamkix_config())
+
+        # WHEN
+        sut.write_text(content)
+        error_results = watcher.process_changes({sut})
+        sut.write_text(UNFORMATTED)
+        next_results = watcher.process_changes({sut})
+
+        # THEN
+        assert error_results == [FileProcessingResult(input_display_name=str(sut), error=True, unchanged=False)]
+        assert next_results == [FileProcessingResult(input_display_name=str(sut), error=False, unchanged=False)]
+        assert sut.read_text() == FORMATTED
+
+    @pytest.mark.parametrize("use_polling", [pytest.param(True, id="polling"), pytest.param(False, id="inotify")])
+    def test_run(self, tmp_path: Path, use_polling: bool) -> None:
+        """Test that files saved while watching are reformatted."""
+        # GIVEN
+        watcher = YamkixWatcher(
+            [tmp_path],
+            get_default_yamkix_config(),
+            debounce_delay=0.05,
+            use_polling=use_polling,
+            polling_interval=0.05,
+        )
+        received: list[FileProcessingResult] = []
+        done = threading.Event()
+        stop_event = threading.Event()
+
+        def on_results(results: list[FileProcessingResult]) -> None:
+            received.extend(results)
+            done.set()
+
+        thread = threading.Thread(target=watcher.run, kwargs={"on_results": on_results, "stop_event": stop_event})
+        thread.start()
+        try:
+            time.sleep(0.2)
+            (tmp_path / "sut.yml").write_text(UNFORMATTED)
+
+            # WHEN
+            assert done.wait(WAIT_TIMEOUT)
+        finally:
+            stop_event.set()
+            thread.join(WAIT_TIMEOUT)
+
+        # THEN
+        assert [r.input_display_name for r in received] == [str(tmp_path / "sut.yml")]
+        assert (tmp_path / "sut.yml").read_text() == FORMATTED
+
+
+@linux_only
+class TestInotifyChangesDetector:
+    """Provide tests for the InotifyChangesDetector class."""
+
+    def test_detects_writes_in_new_directories(self, tmp_path: Path) -> None:
+        """Test that files written in directories created after the start are detected."""
+        # GIVEN
+        detector = InotifyChangesDetector([tmp_path])
+        try:
+            # WHEN
+            (tmp_path / "new").mkdir()
+            # Process the directory creation event, so that the new directory gets watched
+            assert detector.wait_for_changes(timeout=WAIT_TIMEOUT) == set()
+            (tmp_path / "new" / "sut.yaml").write_text(UNFORMATTED)
+            (tmp_path / "new" / "ignored.txt").write_text(UNFORMATTED)
+            changed = wait_for_changes(detector)
+        finally:
+            detector.close()
+
+        # THEN
+        assert changed == {tmp_path / "new" / "sut.yaml"}
+
+    def test_single_file(self, tmp_path: Path) -> None:
+        """Test that only the watched file is reported when watching a single file."""
+        # GIVEN
+        watched = tmp_path / "watched.yml"
+        watched.write_text(UNFORMATTED)
+        detector = InotifyChangesDetector([watched])
+        try:
+            # WHEN
+            (tmp_path / "other.yml").write_text(UNFORMATTED)
+            watched.write_text(FORMATTED)
+            changed = wait_for_changes(detector)
+        finally:
+            detector.close()
+
+        # THEN
+        assert changed == {watched}
+
+    def test_single_file_parent_directory_is_not_watched_recursively(
+        self, mocker: MockerFixture, tmp_path: Path
+    ) -> None:
+        """Test that only the parent directory of a single file is watched, not its subdirectories."""
+        # GIVEN
+        (tmp_path / "sub" / "tree").mkdir(parents=True)
+        watched = tmp_path / "watched.yml"
+        watched.write_text(UNFORMATTED)
+        spy_add_watch = mocker.spy(InotifyChangesDetector, "_add_watch")
+
+        # WHEN
+        detector = InotifyChangesDetector([watched])
+        try:
+            (tmp_path / "new").mkdir()
+            changed = detector.wait_for_changes(timeout=WAIT_TIMEOUT)
+        finally:
+            detector.close()
+
+        # THEN
+        assert changed == set()
+        assert [call.args[1] for call in spy_add_watch.call_args_list] == [tmp_path]
+
+
+def test_polling_changes_detector(tmp_path: Path) -> None:
+    """Test that the polling detector reports modified and new files."""
+    # GIVEN
+    existing = tmp_path / "existing.yml"
+    existing.write_text(FORMATTED)
+    detector = PollingChangesDetector([tmp_path], interval=0.01)
+
+    # WHEN
+    existing.write_text(UNFORMATTED)
+    (tmp_path / "new.yml").write_text(UNFORMATTED)
+    changed = wait_for_changes(detector)
+
+    # THEN
+    assert changed == {existing, tmp_path / "new.yml"}
+
+
+def test_get_changes_detector_falls_back_to_polling(tmp_path: Path) -> None:
+    """Test that polling is used when requested."""
+    detector = get_changes_detector([tmp_path], use_polling=True)
+    assert isinstance(detector, PollingChangesDetector)
@@ -1,6 +1,7 @@
 """Provide tests for the yamkix module."""
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from textwrap import dedent
 
@@ -9,9 +10,11 @@ from pytest_mock import MockerFixture
 
 from yamkix.config import YamkixInputOutputConfig, get_default_yamkix_config, get_yamkix_config_from_default
 from yamkix.errors import InvalidYamlContentError
-from yamkix.yamkix import FileProcessingResult, round_trip_and_format, yamkix_dump_all
+from yamkix.yamkix import FileProcessingResult, format_yaml_content, round_trip_and_format, yamkix_dump_all
 from yamkix.yaml_writer import get_opinionated_yaml_writer
 
+SOURCE_DIR = Path(__file__).parent / "data" / "source"
+
 
 class TestRoundTripAndFormat:
     """Provide tests for the round_trip_and_format function."""
@@ -19,7 +22,7 @@ class TestRoundTripAndFormat:
     def test_when_parser_error(self, mocker: MockerFixture, shared_datadir: Path) -> None:
         """Test that round_trip_and_format raises InvalidYamlContentError on ParserError."""
         # GIVEN
-        mock_yamkix_dump_all = mocker.patch("yamkix.yamkix.yamkix_dump_all")
+        mock_yamkix_dump_all_to_stream = mocker.patch("yamkix.yamkix.yamkix_dump_all_to_stream")
         config = get_yamkix_config_from_default(
             io_config=YamkixInputOutputConfig(input=str(shared_datadir / "malformed-yaml-file.yml"), output=None)
         )
@@ -27,20 +30,24 @@ class TestRoundTripAndFormat:
         # WHEN / THEN
         with pytest.raises(InvalidYamlContentError):
             round_trip_and_format(config)
-        mock_yamkix_dump_all.assert_not_called()
+        mock_yamkix_dump_all_to_stream.assert_not_called()
 
     def test_read_from_stdin(self, mocker: MockerFixture) -> None:
         """Test that round_trip_and_format reads from stdin when input file is None."""
         # GIVEN
-        mock_get_opinionated_yaml_writer = mocker.patch("yamkix.yamkix.get_opinionated_yaml_writer")
+        mock_yaml = mocker.Mock()
+        mocker.patch("yamkix.yamkix.get_cached_yaml_writers", return_value=(mock_yaml, None))
         mock_sys_stdin = mocker.patch("sys.stdin")
         stdin_read_return_value = mocker.Mock()
         mock_sys_stdin.read.return_value = stdin_read_return_value
-        mock_load_all = mock_get_opinionated_yaml_writer.return_value.load_all
+        mock_load_all = mock_yaml.load_all
         load_all_return_value = iter([mocker.Mock()])
         mock_load_all.return_value = load_all_return_value
         config = get_yamkix_config_from_default(io_config=YamkixInputOutputConfig(input=None, output=None))
-        mock_yamkix_dump_all = mocker.patch("yamkix.yamkix.yamkix_dump_all")
+        mock_yamkix_dump_all_to_stream = mocker.patch("yamkix.yamkix.yamkix_dump_all_to_stream")
+        mocker.patch("yamkix.yamkix.mask_block_scalars", return_value=None)
+        mocker.patch("yamkix.yamkix.looks_like_json", return_value=False)
+        mocker.patch("yamkix.yamkix.is_comment_free", return_value=False)
 
         # WHEN
         result = round_trip_and_format(config)
@@ -48,7 +55,7 @@ class TestRoundTripAndFormat:
         # THEN
         mock_load_all.assert_called_once_with(stdin_read_return_value)
         mock_sys_stdin.read.assert_called_once()
-        mock_yamkix_dump_all.assert_called_once()
+        mock_yamkix_dump_all_to_stream.assert_called_once()
         assert isinstance(result, FileProcessingResult)
         assert result.error is False
         assert result.input_display_name == "STDIN"
@@ -152,6 +159,102 @@ class TestRoundTripAndFormat:
         assert input_file.read_text() == expected
 
 
+class TestFormatYamlContent:
+    """Provide tests for the format_yaml_content function."""
+
+    def test_formats_in_memory(self, mocker: MockerFixture) -> None:
+        """Test that format_yaml_content returns the formatted content without writing anything."""
+        # GIVEN
+        mock_stdout = mocker.patch("sys.stdout")
+        config = get_yamkix_config_from_default(io_config=YamkixInputOutputConfig(input=None, output=None))
+
+        # WHEN
+        result = format_yaml_content("key:   value\nlist:\n- a\n- b\n", config)
+
+        # THEN
+        # editorconfig-checker-disable
+        assert result == dedent("""\
+            ---
+            key: value
+            list:
+              - a
+              - b
+        """)
+        # editorconfig-checker-enable
+        mock_stdout.write.assert_not_called()
+
+    def test_invalid_content(self) -> None:
+        """Test that format_yaml_content raises InvalidYamlContentError on invalid content."""
+        # GIVEN
+        config = get_default_yamkix_config()
+
+        # WHEN / THEN
+        with pytest.raises(InvalidYamlContentError):
+            format_yaml_content("key: [value\n", config)
+
+    @pytest.mark.parametrize(
+        "config_options",
+        [
+            pytest.param({}, id="default"),
+            pytest.param({"quotes_preserved": False, "enforce_double_quotes": True}, id="double_quotes"),
+            pytest.param({"verify": True}, id="verify"),
+        ],
+    )
+    def test_yaml_version_does_not_apply_to_the_next_contents(self, config_options: dict) -> None:
+        """Test that the `%YAML` version of a content is written back, and not used for the next contents."""
+        # GIVEN
+        config = get_yamkix_config_from_default(**config_options)
+        big_block = "b: |\n" + "  line\n" * 1000
+
+        # WHEN
+        formatted = format_yaml_content("%YAML 1.1\n---\na: 1  # comment\n" + big_block, config)
+        next_formatted = format_yaml_content("answer: y\nb: on  # comment\n", config)
+
+        # THEN
+        assert formatted.startswith("%YAML 1.1\n---\na: 1  # comment\n")
+        assert next_formatted == "---\nanswer: y\nb: on  # comment\n"
+
+    def test_writers_are_usable_after_a_failed_dump(self) -> None:
+        """Test that a content failing in the middle of its dump does not break the formatting of the next ones."""
+        # GIVEN: ruamel.yaml fails to dump a literal block scalar document
+        config = get_default_yamkix_config()
+        with pytest.raises(TypeError):
+            format_yaml_content("--- |\n  foo\n", config)
+
+        # WHEN
+        result = format_yaml_content("a: 1  # comment\n", config)
+
+        # THEN
+        assert result == "---\na: 1  # comment\n"
+
+
+class TestConcurrentFormatting:
+    """Provide tests for the formatting of contents by several threads at once."""
+
+    @pytest.mark.parametrize(
+        "config_options",
+        [
+            pytest.param({}, id="default"),
+            pytest.param({"spaces_before_comment": 2, "align_comments": True}, id="comments"),
+            pytest.param({"quotes_preserved": False, "enforce_double_quotes": True}, id="double_quotes"),
+            pytest.param({"parsing_mode": "safe", "verify": True}, id="safe_verified"),
+        ],
+    )
+    def test_same_output_as_sequential_formatting(self, config_options: dict) -> None:
+        """Test that the threads do not share any state: each output is the one of a sequential formatting."""
+        # GIVEN
+        config = get_yamkix_config_from_default(**config_options)
+        contents = [path.read_text(encoding="UTF-8") for path in sorted(SOURCE_DIR.glob("*.yml"))] * 4
+        expected = [format_yaml_content(content, config) for content in contents]
+
+        # WHEN
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(lambda content: format_yaml_content(content, config), contents))
+
+        # THEN
+        assert outputs == expected
+
+
 class TestYamkixDumpAll:
     """Provide tests for the yamkix_dump_all function."""
 
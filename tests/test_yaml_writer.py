@@ -1,19 +1,26 @@
 """Test the yaml_writer init stuff."""
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
 import pytest
+from ruamel.yaml.scanner import Scanner
 
+from yamkix.comment_free import CommentFreeParser
 from yamkix.config import (
     DEFAULT_LINE_WIDTH,
     YamkixConfig,
     YamkixInputOutputConfig,
     get_default_yamkix_config,
+    get_yamkix_config_from_default,
 )
 from yamkix.yaml_writer import (
     OPINIONATED_MAPPING_VALUE,
     OPINIONATED_OFFSET_VALUE,
     OPINIONATED_SEQUENCE_VALUE,
+    discard_cached_yaml_instances,
+    get_cached_comment_free_loader,
+    get_cached_yaml_writers,
     get_opinionated_yaml_writer,
 )
 
@@ -309,3 +316,103 @@ class TestGetOpinionatedYamlWriter:
 
         # THEN
         assert yaml_writer.width == line_width
+
+
+class TestGetCachedYamlWriters:
+    """Provide tests for the get_cached_yaml_writers function."""
+
+    def test_same_style_shares_writers(self) -> None:
+        """Test that configs with the same formatting options share the same writers, whatever their io_config."""
+        # GIVEN
+        config_a = get_yamkix_config_from_default(io_config=YamkixInputOutputConfig(input="a.yml", output="a.yml"))
+        config_b = get_yamkix_config_from_default(io_config=YamkixInputOutputConfig(input="b.yml", output="b.yml"))
+
+        # WHEN
+        writers_a = get_cached_yaml_writers(config_a)
+        writers_b = get_cached_yaml_writers(config_b)
+
+        # THEN
+        assert writers_a[0] is writers_b[0]
+        assert writers_a[1] is None
+
+    def test_different_styles_do_not_share_writers(self) -> None:
+        """Test that configs with different formatting options get different writers."""
+        # GIVEN
+        config_a = get_yamkix_config_from_default(line_width=CUSTOM_LINE_WIDTH_80)
+        config_b = get_yamkix_config_from_default(line_width=CUSTOM_LINE_WIDTH_120)
+
+        # WHEN
+        yaml_a, _ = get_cached_yaml_writers(config_a)
+        yaml_b, _ = get_cached_yaml_writers(config_b)
+
+        # THEN
+        assert yaml_a is not yaml_b
+        assert yaml_a.width == CUSTOM_LINE_WIDTH_80
+        assert yaml_b.width == CUSTOM_LINE_WIDTH_120
+
+    def test_double_quotes_writer(self) -> None:
+        """Test that a double quotes writer preserving quotes is provided when double quotes are enforced."""
+        # GIVEN
+        config = get_yamkix_config_from_default(quotes_preserved=False, enforce_double_quotes=True)
+
+        # WHEN
+        yaml, double_quotes_yaml = get_cached_yaml_writers(config)
+
+        # THEN
+        assert double_quotes_yaml is not None
+        assert yaml.preserve_quotes is False
+        assert double_quotes_yaml.preserve_quotes is True
+
+    def test_threads_do_not_share_writers(self) -> None:
+        """Test that each thread gets its own writers, the writers holding the state of a load or dump."""
+        # GIVEN
+        config = get_yamkix_config_from_default()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other_thread_writers = executor.submit(get_cached_yaml_writers, config).result()
+
+        # WHEN
+        writers = get_cached_yaml_writers(config)
+
+        # THEN
+        assert writers[0] is not other_thread_writers[0]
+        assert writers[0] is get_cached_yaml_writers(config)[0]
+
+
+class TestGetCachedCommentFreeLoader:
+    """Provide tests for the get_cached_comment_free_loader function."""
+
+    def test_loader_is_cached(self) -> None:
+        """Test that the loader is cached, configured like the writer, with a scanner not looking for comments."""
+        # GIVEN
+        config = get_yamkix_config_from_default(line_width=CUSTOM_LINE_WIDTH_80)
+
+        # WHEN
+        loader = get_cached_comment_free_loader(config)
+
+        # THEN
+        assert loader is get_cached_comment_free_loader(config)
+        assert loader is not get_cached_yaml_writers(config)[0]
+        assert loader.width == CUSTOM_LINE_WIDTH_80
+        assert loader.Scanner is Scanner
+        assert loader.Parser is CommentFreeParser
+
+
+class TestDiscardCachedYamlInstances:
+    """Provide tests for the discard_cached_yaml_instances function."""
+
+    def test_instances_are_discarded(self) -> None:
+        """Test that the writers and loader of the formatting options are replaced, the other ones are kept."""
+        # GIVEN
+        config = get_yamkix_config_from_default(line_width=CUSTOM_LINE_WIDTH_80)
+        other_config = get_yamkix_config_from_default(line_width=CUSTOM_LINE_WIDTH_120)
+        writer = get_cached_yaml_writers(config)[0]
+        loader = get_cached_comment_free_loader(config)
+        other_writer = get_cached_yaml_writers(other_config)[0]
+
+        # WHEN
+        discard_cached_yaml_instances(config)
+
+        # THEN
+        assert get_cached_yaml_writers(config)[0] is not writer
+        assert get_cached_comment_free_loader(config) is not loader
+        assert get_cached_yaml_writers(other_config)[0] is other_writer